@@ -18,11 +18,18 @@ from .nodes import (
     ReflectionSummaryNode,
     ReportFormattingNode
 )
-from .state import State
+from .state import State, StateJournal
 from .tools import TavilyNewsAgency, TavilyResponse, multilingual_sentiment_analyzer, SENTIMENT_ANALYZER_AVAILABLE
 from .utils import Settings, format_search_results_for_prompt
+from config import settings as global_settings
 from loguru import logger
 
+# 报告清单（nodes 导入时已把项目根目录加入 sys.path）
+try:
+    from utils.report_manifest import record_report
+except ImportError:
+    record_report = None
+
 class DeepSearchAgent:
     """Deep Search Agent主类"""
     
@@ -55,6 +62,7 @@ class DeepSearchAgent:
         
         # 状态
         self.state = State()
+        self.journal: Optional[StateJournal] = None
         
         # 确保输出目录存在
         os.makedirs(self.config.OUTPUT_DIR, exist_ok=True)
@@ -65,6 +73,10 @@ class DeepSearchAgent:
         if self.sentiment_analyzer:
             logger.info(f"情感分析: WeiboMultilingualSentiment (支持22种语言的情感分析)")
     
+    def _setting(self, name: str, default: Any) -> Any:
+        """读取配置项：引擎配置中没有该字段时使用项目根目录 config.py 中的全局配置"""
+        return getattr(self.config, name, getattr(global_settings, name, default))
+    
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
         api_key = self.config.COMPETE_ENGINE_API_KEY
@@ -150,13 +162,14 @@ class DeepSearchAgent:
             logger.warning(f"  ⚠️  未知的搜索工具: {tool_name}，使用默认基础搜索")
             return self.search_agency.basic_search_news(query)
     
-    def research(self, query: str, save_report: bool = True) -> str:
+    def research(self, query: str, save_report: bool = True, resume_from: Optional[str] = None) -> str:
         """
         执行深度研究
         
         Args:
             query: 研究查询
             save_report: 是否保存报告到文件
+            resume_from: 检查点日志或状态文件路径；提供时沿用其中的报告结构并跳过已完成的段落和反思轮次
             
         Returns:
             最终报告内容
@@ -166,14 +179,21 @@ class DeepSearchAgent:
         logger.info(f"{'='*60}")
         
         try:
-            # Step 1: 生成报告结构
-            self._generate_report_structure(query)
+            # Step 1: 生成报告结构（从检查点恢复时沿用已有结构）
+            if resume_from:
+                self._resume_from_checkpoint(resume_from, query)
+            else:
+                self.journal = self._create_journal(query)
+            if not self.state.paragraphs:
+                self._generate_report_structure(query)
+                self._checkpoint()
             
             # Step 2: 处理每个段落
             self._process_paragraphs()
             
             # Step 3: 生成最终报告
             final_report = self._generate_final_report()
+            self._checkpoint()
             
             # Step 4: 保存报告
             if save_report:
@@ -191,6 +211,47 @@ class DeepSearchAgent:
             logger.error(f"研究过程中发生错误: {str(e)} \n错误堆栈: {error_traceback}")
             raise e
     
+    def _create_journal(self, query: str) -> Optional[StateJournal]:
+        """为新的研究创建检查点日志（OUTPUT_DIR/checkpoints 下），关闭检查点时返回 None"""
+        if not self._setting("RESEARCH_CHECKPOINT_ENABLED", True):
+            return None
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        query_safe = "".join(c for c in query if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        query_safe = query_safe.replace(' ', '_')[:30]
+        filepath = os.path.join(self.config.OUTPUT_DIR, "checkpoints", f"research_{query_safe}_{timestamp}.jsonl")
+        logger.info(f"检查点日志: {filepath}")
+        return StateJournal(filepath)
+    
+    def _resume_from_checkpoint(self, filepath: str, query: str):
+        """
+        从检查点恢复状态
+        
+        filepath 可以是检查点日志（.jsonl），也可以是 save_state 保存的完整状态（.json）；
+        后者会另建一份检查点日志继续记录。
+        """
+        if filepath.endswith(".json"):
+            self.state = State.load_from_file(filepath)
+            self.journal = self._create_journal(self.state.query or query)
+        else:
+            self.state = StateJournal.replay(filepath)
+            self.journal = StateJournal(filepath)
+        # 重写为一条快照，之后的增量记录以恢复后的状态为基准
+        self._checkpoint()
+        logger.info(f"已从检查点恢复: {filepath}，"
+                    f"已完成 {self.state.get_completed_paragraphs_count()}/{self.state.get_total_paragraphs_count()} 个段落")
+    
+    def _checkpoint(self, paragraph_index: Optional[int] = None):
+        """写检查点：指定段落时追加该段落的增量，否则写完整快照；失败只记录警告"""
+        if self.journal is None:
+            return
+        try:
+            if paragraph_index is None:
+                self.journal.snapshot(self.state)
+            else:
+                self.journal.record_paragraph(self.state, paragraph_index)
+        except Exception as e:
+            logger.warning(f"写检查点失败: {str(e)}")
+    
     def _generate_report_structure(self, query: str):
         """生成报告结构"""
         logger.info(f"\n[步骤 1] 生成报告结构...")
@@ -211,17 +272,24 @@ class DeepSearchAgent:
         total_paragraphs = len(self.state.paragraphs)
         
         for i in range(total_paragraphs):
+            if self.state.paragraphs[i].is_completed():
+                logger.info(f"\n[步骤 2.{i+1}] 段落已在检查点中完成，跳过: {self.state.paragraphs[i].title}")
+                continue
+            
             logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
             logger.info("-" * 50)
             
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
+            # 初始搜索和总结（从检查点恢复时已有初始总结则跳过）
+            if not self.state.paragraphs[i].research.latest_summary:
+                self._initial_search_and_summary(i)
+                self._checkpoint(i)
             
             # 反思循环
             self._reflection_loop(i)
             
             # 标记段落完成
             self.state.paragraphs[i].research.mark_completed()
+            self._checkpoint(i)
             
             progress = (i + 1) / total_paragraphs * 100
             logger.info(f"段落处理完成 ({progress:.1f}%)")
@@ -320,7 +388,8 @@ class DeepSearchAgent:
         """执行反思循环"""
         paragraph = self.state.paragraphs[paragraph_index]
         
-        for reflection_i in range(self.config.MAX_REFLECTIONS):
+        # 从检查点恢复时从已完成的反思轮次之后继续
+        for reflection_i in range(paragraph.research.reflection_iteration, self.config.MAX_REFLECTIONS):
             logger.info(f"  - 反思 {reflection_i + 1}/{self.config.MAX_REFLECTIONS}...")
             
             # 准备反思输入
@@ -406,6 +475,7 @@ class DeepSearchAgent:
             )
             
             logger.info(f"    反思 {reflection_i + 1} 完成")
+            self._checkpoint(paragraph_index)
     
     def _generate_final_report(self) -> str:
         """生成最终报告"""
@@ -450,6 +520,8 @@ class DeepSearchAgent:
             f.write(report_content)
         
         logger.info(f"报告已保存到: {filepath}")
+        if record_report:
+            record_report(self.config.OUTPUT_DIR, filepath)
         
         # 保存状态（如果配置允许）
         if self.config.SAVE_INTERMEDIATE_STATES:
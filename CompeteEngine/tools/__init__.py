@@ -18,7 +18,8 @@ try:
         SentimentResult,
         BatchSentimentResult,
         multilingual_sentiment_analyzer,
-        analyze_sentiment
+        analyze_sentiment,
+        start_background_warmup
     )
     SENTIMENT_ANALYZER_AVAILABLE = True
 except ImportError:
@@ -28,6 +29,7 @@ except ImportError:
     BatchSentimentResult = None
     multilingual_sentiment_analyzer = None
     analyze_sentiment = None
+    start_background_warmup = None
     SENTIMENT_ANALYZER_AVAILABLE = False
 
 __all__ = [
@@ -41,5 +43,6 @@ __all__ = [
     "BatchSentimentResult",
     "multilingual_sentiment_analyzer",
     "analyze_sentiment",
+    "start_background_warmup",
     "SENTIMENT_ANALYZER_AVAILABLE"
 ]
@@ -19,7 +19,8 @@ try:
         SentimentResult,
         BatchSentimentResult,
         multilingual_sentiment_analyzer,
-        analyze_sentiment
+        analyze_sentiment,
+        start_background_warmup
     )
     SENTIMENT_ANALYZER_AVAILABLE = True
 except ImportError:
@@ -29,6 +30,7 @@ except ImportError:
     BatchSentimentResult = None
     multilingual_sentiment_analyzer = None
     analyze_sentiment = None
+    start_background_warmup = None
     SENTIMENT_ANALYZER_AVAILABLE = False
 
 __all__ = [
@@ -43,5 +45,6 @@ __all__ = [
     "BatchSentimentResult",
     "multilingual_sentiment_analyzer",
     "analyze_sentiment",
+    "start_background_warmup",
     "SENTIMENT_ANALYZER_AVAILABLE"
 ]
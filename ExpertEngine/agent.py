@@ -5,14 +5,16 @@ Expert Agent主类
 
 import json
 import os
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 from loguru import logger
 
 from .llms import LLMClient
 from .nodes import ExpertReviewNode
 from .state import ExpertState
 from .utils.config import settings, Settings
+from .utils.chunking import split_report, chunk_headings
 from config import settings as global_settings
 
 
@@ -66,6 +68,9 @@ class ExpertAgent:
         # 状态
         self.state = ExpertState()
         
+        # 后处理模式下的后台批注任务（一次只跑一个，避免与报告生成争抢LLM并发额度）
+        self._background_executor: Optional[ThreadPoolExecutor] = None
+        
         # 确保输出目录存在
         os.makedirs(self.config.OUTPUT_DIR, exist_ok=True)
         
@@ -97,7 +102,7 @@ class ExpertAgent:
         self.expert_review_node = ExpertReviewNode(self.llm_client)
     
     def review_and_annotate(self, report_content: str, business_rules: str = "", 
-                           save_result: bool = True) -> Dict[str, Any]:
+                           save_result: bool = True, mode: Optional[str] = None) -> Dict[str, Any]:
         """
         对报告内容进行专家批注和修改
         
@@ -105,17 +110,22 @@ class ExpertAgent:
             report_content: 待批注的报告内容
             business_rules: 业务逻辑要求（可选，目前先留空）
             save_result: 是否保存结果到文件
+            mode: 批注模式 single / chunked，默认读取 EXPERT_REVIEW_MODE
             
         Returns:
             包含批注和修改后的报告内容
         """
+        mode = mode or self.config.EXPERT_REVIEW_MODE
         logger.info(f"\n{'='*60}")
-        logger.info(f"开始专家批注和修改")
+        logger.info(f"开始专家批注和修改（模式: {mode}）")
         logger.info(f"{'='*60}")
         
         try:
             # Step 1: 专家批注和修改
-            reviewed_content = self._expert_review(report_content, business_rules)
+            if mode == "chunked":
+                reviewed_content = self._expert_review_chunked(report_content, business_rules)
+            else:
+                reviewed_content = self._expert_review(report_content, business_rules)
             
             # Step 2: 保存结果
             saved_files = {}
@@ -153,6 +163,72 @@ class ExpertAgent:
         logger.info("专家批注和修改完成")
         return reviewed_content
     
+    def _expert_review_chunked(self, report_content: str, business_rules: str) -> str:
+        """
+        分块并发批注：按章节边界切块，各块共享业务规则和全文章节结构，
+        批注结果按原顺序拼回；单块失败时保留该块原文
+        """
+        prefix, chunks, suffix = split_report(report_content, self.config.EXPERT_REVIEW_CHUNK_CHARS)
+        if len(chunks) < 2:
+            logger.info("报告无法按章节切分，改为整篇批注")
+            return self._expert_review(report_content, business_rules)
+        
+        business_rules = business_rules or "暂无特定业务逻辑要求，请根据通用专业标准进行批注和修改。"
+        report_outline = [title for chunk in chunks for title in chunk_headings(chunk)]
+        self.state.original_content = report_content
+        self.state.business_rules = business_rules
+        self.state.mark_processing()
+        
+        workers = max(1, min(self.config.EXPERT_REVIEW_WORKERS, len(chunks)))
+        logger.info(f"分块批注: {len(chunks)} 块，并发 {workers}")
+        reviewed: List[str] = list(chunks)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="expert-review") as executor:
+            futures = {
+                executor.submit(self.expert_review_node.review_chunk, chunk, business_rules,
+                                report_outline, i + 1, len(chunks)): i
+                for i, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    reviewed[i] = future.result()
+                    logger.info(f"第 {i + 1}/{len(chunks)} 块批注完成")
+                except Exception as e:
+                    logger.warning(f"第 {i + 1}/{len(chunks)} 块批注失败，保留原文: {str(e)}")
+        
+        reviewed_content = prefix + "".join(reviewed) + suffix
+        self.state.reviewed_content = reviewed_content
+        self.state.mark_completed()
+        logger.info("分块批注完成")
+        return reviewed_content
+    
+    def review_in_background(self, report_content: str, business_rules: str = "",
+                             save_result: bool = True, mode: Optional[str] = None,
+                             on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> Future:
+        """
+        以后处理任务的方式批注：立即返回 Future，调用方可先使用未批注的报告
+        
+        Args:
+            on_complete: 批注成功后以 review_and_annotate 的返回值回调（在后台线程中执行）
+            
+        Returns:
+            Future，结果为 review_and_annotate 的返回值
+        """
+        if self._background_executor is None:
+            self._background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="expert-postprocess")
+        
+        def job() -> Dict[str, Any]:
+            result = self.review_and_annotate(report_content, business_rules, save_result, mode)
+            if on_complete:
+                try:
+                    on_complete(result)
+                except Exception as e:
+                    logger.exception(f"批注完成回调失败: {str(e)}")
+            return result
+        
+        logger.info("专家批注已提交到后台执行")
+        return self._background_executor.submit(job)
+    
     def _save_result(self, reviewed_content: str):
         """保存批注结果到文件"""
         # 生成文件名
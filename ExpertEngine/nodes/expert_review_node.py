@@ -3,12 +3,12 @@
 对报告内容进行批注和修改
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 from loguru import logger
 
 from .base_node import BaseNode
 from ..llms.base import LLMClient
-from ..prompts import SYSTEM_PROMPT_EXPERT_REVIEW
+from ..prompts import SYSTEM_PROMPT_EXPERT_REVIEW, SYSTEM_PROMPT_EXPERT_CHUNK_REVIEW
 
 
 class ExpertReviewNode(BaseNode):
@@ -66,6 +66,44 @@ class ExpertReviewNode(BaseNode):
             # 返回原始内容
             return input_data.get('report_content', '')
     
+    def review_chunk(self, chunk: str, business_rules: str, report_outline: List[str],
+                     chunk_index: int, chunk_total: int) -> str:
+        """
+        批注报告中的一个片段
+        
+        Args:
+            chunk: 片段内容
+            business_rules: 业务逻辑要求（各片段共享）
+            report_outline: 全文章节标题（各片段共享，用于避免重复）
+            chunk_index: 片段序号（从1开始）
+            chunk_total: 片段总数
+            
+        Returns:
+            批注后的片段
+            
+        Raises:
+            失败或输出为空时抛出异常，由调用方决定是否回退到原始片段
+        """
+        outline = "\n".join(f"- {title}" for title in report_outline) or "（无）"
+        user_prompt = f"""请对以下报告片段（第 {chunk_index}/{chunk_total} 段）进行专家批注和修改：
+
+**全文章节结构：**
+{outline}
+
+**业务逻辑要求：**
+{business_rules}
+
+**报告片段：**
+{chunk}
+
+请根据业务逻辑要求和专业标准，只对该片段中的观点进行批注和修改。"""
+        
+        response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_EXPERT_CHUNK_REVIEW, user_prompt)
+        reviewed = self.process_output(response).strip()
+        if not reviewed:
+            raise ValueError("批注输出为空")
+        return reviewed
+    
     def process_output(self, output: str) -> str:
         """
         处理LLM输出
@@ -86,6 +124,10 @@ class ExpertReviewNode(BaseNode):
                 reviewed_content = reviewed_content[11:]
                 if reviewed_content.endswith('```'):
                     reviewed_content = reviewed_content[:-3]
+            elif reviewed_content.startswith('```html'):
+                reviewed_content = reviewed_content[7:]
+                if reviewed_content.endswith('```'):
+                    reviewed_content = reviewed_content[:-3]
             elif reviewed_content.startswith('```'):
                 reviewed_content = reviewed_content[3:]
                 if reviewed_content.endswith('```'):
@@ -2,7 +2,7 @@
 ExpertEngine提示词模块
 """
 
-from .prompts import SYSTEM_PROMPT_EXPERT_REVIEW
+from .prompts import SYSTEM_PROMPT_EXPERT_REVIEW, SYSTEM_PROMPT_EXPERT_CHUNK_REVIEW
 
-__all__ = ['SYSTEM_PROMPT_EXPERT_REVIEW']
+__all__ = ['SYSTEM_PROMPT_EXPERT_REVIEW', 'SYSTEM_PROMPT_EXPERT_CHUNK_REVIEW']
 
@@ -54,3 +54,13 @@ SYSTEM_PROMPT_EXPERT_REVIEW = """
 确保批注后的报告更加专业、准确、有据可依。
 """
 
+
+# 分块批注的系统提示词：在整篇批注要求的基础上，限定只处理报告中的一个片段
+SYSTEM_PROMPT_EXPERT_CHUNK_REVIEW = SYSTEM_PROMPT_EXPERT_REVIEW + """
+**分块批注补充要求：**
+
+- 报告较长，已按章节切分后由多位专家并行批注，你只会收到其中一个连续片段以及全文的章节结构
+- 只批注和修改收到的片段，不要补写片段之外的章节，也不要重复其他章节的内容
+- 片段可能是HTML：保持原有标签结构完整（开闭标签一一对应），不要改动<script>、<style>、<canvas>及其id，批注以HTML元素的形式插入
+- 直接返回批注后的片段本身，不要添加全文标题、解释说明或代码块标记
+"""
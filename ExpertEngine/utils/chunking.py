@@ -0,0 +1,61 @@
+"""
+报告切块工具
+按章节边界把报告切成若干块，用于分块并发批注，批注后按原顺序拼回。
+"""
+
+import re
+from typing import List, Tuple
+
+# 章节边界，按优先级尝试：<section>、<h2>（HTML报告），"## "（Markdown报告）
+_BOUNDARY_PATTERNS = [
+    re.compile(r'<section\b', re.IGNORECASE),
+    re.compile(r'<h2\b', re.IGNORECASE),
+    re.compile(r'^##\s', re.MULTILINE),
+]
+_BODY_END = re.compile(r'</body\s*>', re.IGNORECASE)
+_HEADING_TEXT = re.compile(r'<h2\b[^>]*>(.*?)</h2>|^##\s+(.+)$', re.IGNORECASE | re.DOTALL | re.MULTILINE)
+_TAG = re.compile(r'<[^>]+>')
+
+
+def split_report(content: str, max_chars: int) -> Tuple[str, List[str], str]:
+    """
+    按章节边界切分报告
+
+    Args:
+        content: 报告全文（HTML或Markdown）
+        max_chars: 单块目标字符数，相邻的小章节会合并到不超过该长度
+
+    Returns:
+        (前缀, 章节块列表, 后缀)。前缀是第一个章节之前的内容（HTML头部、样式、标题等），
+        后缀是 </body> 及之后的内容，二者不参与批注；三者按顺序拼接即为原文。
+        找不到至少两个章节边界时，章节块列表为空。
+    """
+    for pattern in _BOUNDARY_PATTERNS:
+        starts = [m.start() for m in pattern.finditer(content)]
+        if len(starts) >= 2:
+            break
+    else:
+        return content, [], ""
+
+    body_end = _BODY_END.search(content, starts[-1])
+    end = body_end.start() if body_end else len(content)
+
+    sections = [content[start:stop] for start, stop in zip(starts, starts[1:] + [end])]
+
+    chunks: List[str] = []
+    for section in sections:
+        if chunks and len(chunks[-1]) + len(section) <= max_chars:
+            chunks[-1] += section
+        else:
+            chunks.append(section)
+    return content[:starts[0]], chunks, content[end:]
+
+
+def chunk_headings(chunk: str) -> List[str]:
+    """提取块内的章节标题（用于在各块之间共享报告结构）"""
+    headings = []
+    for match in _HEADING_TEXT.finditer(chunk):
+        text = _TAG.sub('', match.group(1) or match.group(2) or '').strip()
+        if text:
+            headings.append(text)
+    return headings
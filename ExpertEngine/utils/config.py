@@ -0,0 +1,27 @@
+"""
+Configuration management module for the Expert Engine.
+"""
+
+from pydantic_settings import BaseSettings
+from pydantic import Field
+from typing import Optional
+
+
+class Settings(BaseSettings):
+    """Expert Engine 配置，未配置的 LLM 参数由 ExpertAgent 回退到 REPORT_ENGINE_* 配置。"""
+    EXPERT_ENGINE_API_KEY: Optional[str] = Field(None, description="Expert Engine LLM API密钥")
+    EXPERT_ENGINE_BASE_URL: Optional[str] = Field(None, description="Expert Engine LLM基础URL")
+    EXPERT_ENGINE_MODEL_NAME: Optional[str] = Field(None, description="Expert Engine LLM模型名称")
+    OUTPUT_DIR: str = Field("final_reports", description="批注结果输出目录")
+    EXPERT_REVIEW_MODE: str = Field("single", description="批注模式：single（整篇一次调用）/chunked（按章节切块并发批注）")
+    EXPERT_REVIEW_WORKERS: int = Field(4, description="分块批注的并发数")
+    EXPERT_REVIEW_CHUNK_CHARS: int = Field(12000, description="分块批注时单块的目标字符数（相邻小章节会合并到该长度）")
+    EXPERT_REVIEW_ASYNC: bool = Field(False, description="是否作为后处理任务在后台批注（报告生成后立即返回未批注版本）")
+
+    class Config:
+        env_file = ".env"
+        env_prefix = ""
+        case_sensitive = False
+        extra = "allow"
+
+settings = Settings()
@@ -19,10 +19,17 @@ from .nodes import (
     ReflectionSummaryNode,
     ReportFormattingNode
 )
-from .state import State
-from .tools import MediaCrawlerDB, DBResponse, keyword_optimizer, multilingual_sentiment_analyzer
+from .state import State, StateJournal
+from .tools import MediaCrawlerDB, DBResponse, SearchPrefetcher, keyword_optimizer, multilingual_sentiment_analyzer
 from .utils.config import settings, Settings
 from .utils import format_search_results_for_prompt
+from config import settings as global_settings
+
+# 报告清单（nodes 导入时已把项目根目录加入 sys.path）
+try:
+    from utils.report_manifest import record_report
+except ImportError:
+    record_report = None
 
 
 class DeepSearchAgent:
@@ -44,6 +51,13 @@ class DeepSearchAgent:
         # 初始化搜索工具集
         self.search_agency = MediaCrawlerDB()
         
+        # 反思搜索流水线（可选）：数据库查询固定在查询线程上执行，LLM总结期间预取下一轮可能用到的查询
+        self.prefetcher = None
+        if self._setting("REFLECTION_PIPELINE_ENABLED", False):
+            self.prefetcher = SearchPrefetcher(
+                self.search_agency, self._setting("REFLECTION_PREFETCH_CACHE_SIZE", 8)
+            )
+        
         # 初始化情感分析器
         self.sentiment_analyzer = multilingual_sentiment_analyzer
         
@@ -52,6 +66,9 @@ class DeepSearchAgent:
         
         # 状态
         self.state = State()
+        self.journal: Optional[StateJournal] = None
+        # 本次研究中已执行的话题搜索 -> 下一页游标，重复相同的搜索时从上次结果之后继续
+        self.search_cursors: Dict[tuple, Optional[Dict[str, Any]]] = {}
         
         # 确保输出目录存在
         os.makedirs(self.config.OUTPUT_DIR, exist_ok=True)
@@ -61,6 +78,10 @@ class DeepSearchAgent:
         logger.info(f"搜索工具集: MediaCrawlerDB (支持5种本地数据库查询工具)")
         logger.info(f"情感分析: WeiboMultilingualSentiment (支持22种语言的情感分析)")
     
+    def _setting(self, name: str, default: Any) -> Any:
+        """读取配置项：引擎配置中没有该字段时使用项目根目录 config.py 中的全局配置"""
+        return getattr(self.config, name, getattr(global_settings, name, default))
+    
     def _initialize_llm(self) -> LLMClient:
         """初始化LLM客户端"""
         api_key = self.config.MARKET_ENGINE_API_KEY
@@ -118,8 +139,10 @@ class DeepSearchAgent:
                 - "search_topic_on_platform": 平台定向搜索
                 - "analyze_sentiment": 对查询结果进行情感分析
             query: 搜索关键词/话题
-            **kwargs: 额外参数（如start_date, end_date, platform, limit, enable_sentiment等）
+            **kwargs: 额外参数（如start_date, end_date, platform, limit, enable_sentiment, cursor等）
                      enable_sentiment: 是否自动对搜索结果进行情感分析（默认True）
+                     cursor: 上一次整合响应的 next_cursor（{关键词: 该关键词的分页游标}），
+                             提供时沿用其中的关键词翻页，不再重新优化关键词
             
         Returns:
             DBResponse对象（可能包含情感分析结果）
@@ -130,7 +153,7 @@ class DeepSearchAgent:
         if tool_name == "search_hot_content":
             time_period = kwargs.get("time_period", "week")
             limit = kwargs.get("limit", 100)
-            response = self.search_agency.search_hot_content(time_period=time_period, limit=limit)
+            response = self._db_call("search_hot_content", time_period=time_period, limit=limit)
             
             # 检查是否需要进行情感分析
             enable_sentiment = kwargs.get("enable_sentiment", True)
@@ -161,27 +184,38 @@ class DeepSearchAgent:
                 metadata=sentiment_result
             )
         
-        # 对于需要搜索词的工具，使用关键词优化中间件
-        optimized_response = keyword_optimizer.optimize_keywords(
-            original_query=query,
-            context=f"使用{tool_name}工具进行查询"
-        )
-        
-        logger.info(f"  🔍 原始查询: '{query}'")
-        logger.info(f"  ✨ 优化后关键词: {optimized_response.optimized_keywords}")
+        cursor = kwargs.pop("cursor", None)
+        if cursor:
+            # 翻页：沿用上一页的关键词，只查询仍有剩余结果的关键词
+            keywords = list(cursor)
+            reasoning = "沿用上一页的关键词继续翻页"
+            logger.info(f"  🔍 继续获取更多结果: '{query}'，关键词: {keywords}")
+        else:
+            # 对于需要搜索词的工具，使用关键词优化中间件
+            optimized_response = keyword_optimizer.optimize_keywords(
+                original_query=query,
+                context=f"使用{tool_name}工具进行查询"
+            )
+            keywords = optimized_response.optimized_keywords
+            reasoning = optimized_response.reasoning
+            
+            logger.info(f"  🔍 原始查询: '{query}'")
+            logger.info(f"  ✨ 优化后关键词: {keywords}")
         
         # 使用优化后的关键词进行多次查询并整合结果
         all_results = []
         total_count = 0
+        next_cursor = {}
         
-        for keyword in optimized_response.optimized_keywords:
+        for keyword in keywords:
             logger.info(f"    查询关键词: '{keyword}'")
+            keyword_cursor = cursor.get(keyword) if cursor else None
             
             try:
                 if tool_name == "search_topic_globally":
                     # 使用配置文件中的默认值，忽略agent提供的limit_per_table参数
                     limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE
-                    response = self.search_agency.search_topic_globally(topic=keyword, limit_per_table=limit_per_table)
+                    response = self._db_call("search_topic_globally", topic=keyword, limit_per_table=limit_per_table, cursor=keyword_cursor)
                 elif tool_name == "search_topic_by_date":
                     start_date = kwargs.get("start_date")
                     end_date = kwargs.get("end_date")
@@ -189,27 +223,29 @@ class DeepSearchAgent:
                     limit_per_table = self.config.DEFAULT_SEARCH_TOPIC_BY_DATE_LIMIT_PER_TABLE
                     if not start_date or not end_date:
                         raise ValueError("search_topic_by_date工具需要start_date和end_date参数")
-                    response = self.search_agency.search_topic_by_date(topic=keyword, start_date=start_date, end_date=end_date, limit_per_table=limit_per_table)
+                    response = self._db_call("search_topic_by_date", topic=keyword, start_date=start_date, end_date=end_date, limit_per_table=limit_per_table, cursor=keyword_cursor)
                 elif tool_name == "get_comments_for_topic":
                     # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // len(optimized_response.optimized_keywords)
+                    limit = self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT // len(keywords)
                     limit = max(limit, 50)
-                    response = self.search_agency.get_comments_for_topic(topic=keyword, limit=limit)
+                    response = self._db_call("get_comments_for_topic", topic=keyword, limit=limit)
                 elif tool_name == "search_topic_on_platform":
                     platform = kwargs.get("platform")
                     start_date = kwargs.get("start_date")
                     end_date = kwargs.get("end_date")
                     # 使用配置文件中的默认值，按关键词数量分配，但保证最小值
-                    limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // len(optimized_response.optimized_keywords)
+                    limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT // len(keywords)
                     limit = max(limit, 30)
                     if not platform:
                         raise ValueError("search_topic_on_platform工具需要platform参数")
-                    response = self.search_agency.search_topic_on_platform(platform=platform, topic=keyword, start_date=start_date, end_date=end_date, limit=limit)
+                    response = self._db_call("search_topic_on_platform", platform=platform, topic=keyword, start_date=start_date, end_date=end_date, limit=limit, cursor=keyword_cursor)
                 else:
                     logger.info(f"    未知的搜索工具: {tool_name}，使用默认全局搜索")
-                    response = self.search_agency.search_topic_globally(topic=keyword, limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE)
+                    response = self._db_call("search_topic_globally", topic=keyword, limit_per_table=self.config.DEFAULT_SEARCH_TOPIC_GLOBALLY_LIMIT_PER_TABLE)
                 
-                # 收集结果
+                # 收集结果，保留每个关键词的分页游标
+                if response.next_cursor:
+                    next_cursor[keyword] = response.next_cursor
                 if response.results:
                     logger.info(f"     找到 {len(response.results)} 条结果")
                     all_results.extend(response.results)
@@ -230,12 +266,13 @@ class DeepSearchAgent:
             tool_name=f"{tool_name}_optimized",
             parameters={
                 "original_query": query,
-                "optimized_keywords": optimized_response.optimized_keywords,
-                "optimization_reasoning": optimized_response.reasoning,
+                "optimized_keywords": keywords,
+                "optimization_reasoning": reasoning,
                 **kwargs
             },
             results=unique_results,
-            results_count=len(unique_results)
+            results_count=len(unique_results),
+            next_cursor=next_cursor or None
         )
         
         # 检查是否需要进行情感分析
@@ -250,6 +287,74 @@ class DeepSearchAgent:
         
         return integrated_response
     
+    # 支持键集分页（next_cursor）的话题搜索工具
+    PAGINATED_TOOLS = ("search_topic_globally", "search_topic_by_date", "search_topic_on_platform")
+    
+    def _run_search(self, search_tool: str, search_query: str, search_kwargs: Dict[str, Any]) -> DBResponse:
+        """
+        执行节点选定的搜索
+        
+        同一次研究中再次以相同的工具、搜索词和参数搜索话题时，视为"获取更多结果"：
+        带上次返回的 next_cursor 继续翻页（id < cursor），只返回之前没有取到的记录。
+        """
+        if search_tool not in self.PAGINATED_TOOLS:
+            return self.execute_search_tool(search_tool, search_query, **search_kwargs)
+        
+        key = (search_tool, search_query, tuple(sorted(search_kwargs.items())))
+        if key in self.search_cursors:
+            cursor = self.search_cursors[key]
+            if not cursor:
+                logger.info("  - 相同的查询此前已取完全部结果，不再重复查询")
+                return DBResponse(f"{search_tool}_optimized", {"original_query": search_query, **search_kwargs})
+            logger.info("  - 相同的查询此前已执行，从上次结果之后继续获取")
+            search_kwargs = {**search_kwargs, "cursor": cursor}
+        
+        response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+        self.search_cursors[key] = response.next_cursor
+        return response
+    
+    def _previous_searches(self, max_items: int = 10) -> List[Dict[str, Any]]:
+        """最近执行过的话题搜索及是否还有更多结果，供反思节点决定是否继续翻页"""
+        return [
+            {"search_tool": tool, "search_query": query,
+             **{k: v for k, v in params if not k.startswith("limit")}, "has_more": bool(cursor)}
+            for (tool, query, params), cursor in list(self.search_cursors.items())[-max_items:]
+        ]
+    
+    def _db_call(self, tool_name: str, **kwargs) -> DBResponse:
+        """调用数据库查询工具；流水线模式下经由预取器执行（可能直接取用预取结果）"""
+        if self.prefetcher:
+            return self.prefetcher.call(tool_name, **kwargs)
+        return getattr(self.search_agency, tool_name)(**kwargs)
+    
+    def _prefetch_follow_ups(self, search_tool: str, search_response: Optional[DBResponse]):
+        """
+        流水线模式下预取下一轮反思可能用到的查询：本轮热度最高的内容对应话题的评论
+        
+        预取在查询线程上运行，与随后的LLM总结重叠；下一轮查询参数相同时直接取用结果。
+        """
+        if not self.prefetcher or not search_response or not search_response.results:
+            return
+        if search_tool == "get_comments_for_topic":
+            return
+        
+        max_topics = self._setting("REFLECTION_PREFETCH_TOP_ITEMS", 3)
+        topics = []
+        top_items = sorted(search_response.results, key=lambda r: r.hotness_score or 0.0, reverse=True)
+        for item in top_items[:max_topics]:
+            if item.source_keyword and item.source_keyword not in topics:
+                topics.append(item.source_keyword)
+        for keyword in search_response.parameters.get("optimized_keywords", []):
+            if len(topics) >= max_topics:
+                break
+            if keyword not in topics:
+                topics.append(keyword)
+        
+        # 以配置的评论上限预取，之后按关键词数分配的较小上限可以直接截取
+        for topic in topics[:max_topics]:
+            self.prefetcher.prefetch("get_comments_for_topic", topic=topic,
+                                     limit=self.config.DEFAULT_GET_COMMENTS_FOR_TOPIC_LIMIT)
+    
     def _deduplicate_results(self, results: List) -> List:
         """
         去重搜索结果
@@ -372,13 +477,14 @@ class DeepSearchAgent:
                 "results": []
             }
     
-    def research(self, query: str, save_report: bool = True) -> str:
+    def research(self, query: str, save_report: bool = True, resume_from: Optional[str] = None) -> str:
         """
         执行深度研究
         
         Args:
             query: 研究查询
             save_report: 是否保存报告到文件
+            resume_from: 检查点日志或状态文件路径；提供时沿用其中的报告结构并跳过已完成的段落和反思轮次
             
         Returns:
             最终报告内容
@@ -388,14 +494,25 @@ class DeepSearchAgent:
         logger.info(f"{'='*60}")
         
         try:
-            # Step 1: 生成报告结构
-            self._generate_report_structure(query)
+            self.search_cursors = {}
+            
+            # Step 1: 生成报告结构（从检查点恢复时沿用已有结构）
+            if resume_from:
+                self._resume_from_checkpoint(resume_from, query)
+            else:
+                self.journal = self._create_journal(query)
+            if not self.state.paragraphs:
+                self._generate_report_structure(query)
+                self._checkpoint()
             
             # Step 2: 处理每个段落
             self._process_paragraphs()
+            if self.prefetcher:
+                self.prefetcher.log_stats()
             
             # Step 3: 生成最终报告
             final_report = self._generate_final_report()
+            self._checkpoint()
             
             # Step 4: 保存报告
             if save_report:
@@ -409,6 +526,47 @@ class DeepSearchAgent:
             logger.exception(f"研究过程中发生错误: {str(e)}")
             raise e
     
+    def _create_journal(self, query: str) -> Optional[StateJournal]:
+        """为新的研究创建检查点日志（OUTPUT_DIR/checkpoints 下），关闭检查点时返回 None"""
+        if not self._setting("RESEARCH_CHECKPOINT_ENABLED", True):
+            return None
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        query_safe = "".join(c for c in query if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        query_safe = query_safe.replace(' ', '_')[:30]
+        filepath = os.path.join(self.config.OUTPUT_DIR, "checkpoints", f"research_{query_safe}_{timestamp}.jsonl")
+        logger.info(f"检查点日志: {filepath}")
+        return StateJournal(filepath)
+    
+    def _resume_from_checkpoint(self, filepath: str, query: str):
+        """
+        从检查点恢复状态
+        
+        filepath 可以是检查点日志（.jsonl），也可以是 save_state 保存的完整状态（.json）；
+        后者会另建一份检查点日志继续记录。
+        """
+        if filepath.endswith(".json"):
+            self.state = State.load_from_file(filepath)
+            self.journal = self._create_journal(self.state.query or query)
+        else:
+            self.state = StateJournal.replay(filepath)
+            self.journal = StateJournal(filepath)
+        # 重写为一条快照，之后的增量记录以恢复后的状态为基准
+        self._checkpoint()
+        logger.info(f"已从检查点恢复: {filepath}，"
+                    f"已完成 {self.state.get_completed_paragraphs_count()}/{self.state.get_total_paragraphs_count()} 个段落")
+    
+    def _checkpoint(self, paragraph_index: Optional[int] = None):
+        """写检查点：指定段落时追加该段落的增量，否则写完整快照；失败只记录警告"""
+        if self.journal is None:
+            return
+        try:
+            if paragraph_index is None:
+                self.journal.snapshot(self.state)
+            else:
+                self.journal.record_paragraph(self.state, paragraph_index)
+        except Exception as e:
+            logger.warning(f"写检查点失败: {str(e)}")
+    
     def _generate_report_structure(self, query: str):
         """生成报告结构"""
         logger.info(f"\n[步骤 1] 生成报告结构...")
@@ -429,17 +587,24 @@ class DeepSearchAgent:
         total_paragraphs = len(self.state.paragraphs)
         
         for i in range(total_paragraphs):
+            if self.state.paragraphs[i].is_completed():
+                logger.info(f"\n[步骤 2.{i+1}] 段落已在检查点中完成，跳过: {self.state.paragraphs[i].title}")
+                continue
+            
             logger.info(f"\n[步骤 2.{i+1}] 处理段落: {self.state.paragraphs[i].title}")
             logger.info("-" * 50)
             
-            # 初始搜索和总结
-            self._initial_search_and_summary(i)
+            # 初始搜索和总结（从检查点恢复时已有初始总结则跳过）
+            if not self.state.paragraphs[i].research.latest_summary:
+                self._initial_search_and_summary(i)
+                self._checkpoint(i)
             
             # 反思循环
             self._reflection_loop(i)
             
             # 标记段落完成
             self.state.paragraphs[i].research.mark_completed()
+            self._checkpoint(i)
             
             progress = (i + 1) / total_paragraphs * 100
             logger.info(f"段落处理完成 ({progress:.1f}%)")
@@ -519,7 +684,7 @@ class DeepSearchAgent:
                 limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT
             search_kwargs["limit"] = limit
         
-        search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+        search_response = self._run_search(search_tool, search_query, search_kwargs)
         
         # 转换为兼容格式
         search_results = []
@@ -554,6 +719,7 @@ class DeepSearchAgent:
         
         # 更新状态中的搜索历史
         paragraph.research.add_search_results(search_query, search_results)
+        self._prefetch_follow_ups(search_tool, search_response)
         
         # 生成初始总结
         logger.info("  - 生成初始总结...")
@@ -577,14 +743,16 @@ class DeepSearchAgent:
         """执行反思循环"""
         paragraph = self.state.paragraphs[paragraph_index]
         
-        for reflection_i in range(self.config.MAX_REFLECTIONS):
+        # 从检查点恢复时从已完成的反思轮次之后继续
+        for reflection_i in range(paragraph.research.reflection_iteration, self.config.MAX_REFLECTIONS):
             logger.info(f"  - 反思 {reflection_i + 1}/{self.config.MAX_REFLECTIONS}...")
             
             # 准备反思输入
             reflection_input = {
                 "title": paragraph.title,
                 "content": paragraph.content,
-                "paragraph_latest_state": paragraph.research.latest_summary
+                "paragraph_latest_state": paragraph.research.latest_summary,
+                "previous_searches": self._previous_searches()
             }
             
             # 生成反思搜索查询
@@ -652,7 +820,7 @@ class DeepSearchAgent:
                     limit = self.config.DEFAULT_SEARCH_TOPIC_ON_PLATFORM_LIMIT
                 search_kwargs["limit"] = limit
             
-            search_response = self.execute_search_tool(search_tool, search_query, **search_kwargs)
+            search_response = self._run_search(search_tool, search_query, search_kwargs)
             
             # 转换为兼容格式
             search_results = []
@@ -687,6 +855,7 @@ class DeepSearchAgent:
             
             # 更新搜索历史
             paragraph.research.add_search_results(search_query, search_results)
+            self._prefetch_follow_ups(search_tool, search_response)
             
             # 生成反思总结
             reflection_summary_input = {
@@ -705,6 +874,7 @@ class DeepSearchAgent:
             )
             
             logger.info(f"    反思 {reflection_i + 1} 完成")
+            self._checkpoint(paragraph_index)
     
     def _generate_final_report(self) -> str:
         """生成最终报告"""
@@ -749,6 +919,8 @@ class DeepSearchAgent:
             f.write(report_content)
         
         logger.info(f"报告已保存到: {filepath}")
+        if record_report:
+            record_report(self.config.OUTPUT_DIR, filepath)
         
         # 保存状态（如果配置允许）
         if self.config.SAVE_INTERMEDIATE_STATES:
@@ -73,7 +73,12 @@ input_schema_reflection = {
     "properties": {
         "title": {"type": "string"},
         "content": {"type": "string"},
-        "paragraph_latest_state": {"type": "string"}
+        "paragraph_latest_state": {"type": "string"},
+        "previous_searches": {
+            "type": "array",
+            "description": "本次研究中已执行的话题搜索（search_tool、search_query及参数），has_more表示是否还有更多结果可以继续获取",
+            "items": {"type": "object"}
+        }
     }
 }
 
@@ -229,6 +234,7 @@ SYSTEM_PROMPT_FIRST_SEARCH = f"""
    - search_topic_on_platform: 必须提供platform参数（bilibili, weibo, douyin, kuaishou, xhs, zhihu, tieba之一）
    - analyze_sentiment: 使用texts参数提供文本列表，或使用search_query作为单个文本
    - 系统自动配置数据量参数，无需手动设置limit或limit_per_table参数
+   - 获取更多结果：search_topic_globally、search_topic_by_date、search_topic_on_platform支持分页，以与之前完全相同的search_tool、search_query和参数再次查询时，系统会从上次结果之后继续返回新的数据（不会重复）
 6. **阐述选择理由**：说明为什么这样的查询和数据获取策略能够获得最真实的市场数据
 
 **搜索词设计核心原则**：
@@ -390,6 +396,7 @@ SYSTEM_PROMPT_REFLECTION = f"""
    - search_topic_by_date: 必须提供start_date和end_date参数（格式：YYYY-MM-DD）
    - search_topic_on_platform: 必须提供platform参数（bilibili, weibo, douyin, kuaishou, xhs, zhihu, tieba之一）
    - 系统自动配置数据量参数，无需手动设置limit或limit_per_table参数
+   - 获取更多结果：若previous_searches中某次搜索方向正确但数据不足且has_more为true，可以使用与之完全相同的search_tool、search_query和参数再次查询（仅search_topic_globally、search_topic_by_date、search_topic_on_platform支持），系统会从上次结果之后继续返回新的数据，不会重复已获取的内容
 
 5. **阐述补充理由**：明确说明为什么需要这些额外的民意数据
 
@@ -6,6 +6,7 @@ Deep Search Agent状态管理
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 import json
+import os
 from datetime import datetime
 
 
@@ -256,3 +257,96 @@ class State:
         with open(filepath, 'r', encoding='utf-8') as f:
             json_str = f.read()
         return cls.from_json(json_str)
+
+
+class StateJournal:
+    """
+    研究状态的追加式检查点日志（JSON Lines）
+
+    首行是完整状态快照，之后每个段落步骤（初始总结、每轮反思、段落完成）只追加该段落的增量：
+    新增的搜索记录、最新总结和反思次数。每条记录写入后立即 fsync，进程崩溃最多丢失正在进行的一步；
+    追加记录过多时把日志压缩为一条快照。
+    """
+
+    # 追加多少条增量记录后压缩为快照
+    COMPACT_EVERY = 20
+
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self._appended = 0
+        # 每个段落已写入日志的搜索记录数，用于只追加新增部分
+        self._journaled_searches: Dict[int, int] = {}
+
+    def snapshot(self, state: "State"):
+        """把完整状态写为新的日志（先写临时文件再替换，替换前的旧日志始终完整）"""
+        directory = os.path.dirname(self.filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.filepath + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({"op": "snapshot", "state": state.to_dict()}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.filepath)
+        self._appended = 0
+        self._journaled_searches = {
+            i: len(p.research.search_history) for i, p in enumerate(state.paragraphs)
+        }
+
+    def record_paragraph(self, state: "State", paragraph_index: int):
+        """追加一个段落的增量记录，必要时压缩日志"""
+        if not os.path.exists(self.filepath):
+            self.snapshot(state)
+            return
+        paragraph = state.paragraphs[paragraph_index]
+        research = paragraph.research
+        start = self._journaled_searches.get(paragraph_index, 0)
+        record = {
+            "op": "paragraph",
+            "index": paragraph_index,
+            "search_offset": start,
+            "searches": [s.to_dict() for s in research.search_history[start:]],
+            "latest_summary": research.latest_summary,
+            "reflection_iteration": research.reflection_iteration,
+            "is_completed": research.is_completed,
+            "updated_at": state.updated_at
+        }
+        with open(self.filepath, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journaled_searches[paragraph_index] = len(research.search_history)
+        self._appended += 1
+        if self._appended >= self.COMPACT_EVERY:
+            self.snapshot(state)
+
+    @staticmethod
+    def replay(filepath: str) -> "State":
+        """
+        回放日志恢复状态
+
+        末尾写了一半的记录（崩溃时正在写入）会被忽略。
+        """
+        state: Optional[State] = None
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if record.get("op") == "snapshot":
+                    state = State.from_dict(record.get("state", {}))
+                elif record.get("op") == "paragraph" and state is not None:
+                    paragraph = state.get_paragraph(record.get("index", -1))
+                    if paragraph is None:
+                        continue
+                    research = paragraph.research
+                    del research.search_history[record.get("search_offset", 0):]
+                    research.search_history.extend(Search.from_dict(s) for s in record.get("searches", []))
+                    research.latest_summary = record.get("latest_summary", "")
+                    research.reflection_iteration = record.get("reflection_iteration", 0)
+                    research.is_completed = record.get("is_completed", False)
+                    state.updated_at = record.get("updated_at", state.updated_at)
+        if state is None:
+            raise ValueError(f"检查点日志中没有状态快照: {filepath}")
+        return state
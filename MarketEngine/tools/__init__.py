@@ -9,6 +9,7 @@ from .search import (
     DBResponse,
     print_response_summary
 )
+from .prefetch import SearchPrefetcher
 from .keyword_optimizer import (
     KeywordOptimizer,
     KeywordOptimizationResponse,
@@ -19,7 +20,8 @@ from .sentiment_analyzer import (
     SentimentResult,
     BatchSentimentResult,
     multilingual_sentiment_analyzer,
-    analyze_sentiment
+    analyze_sentiment,
+    start_background_warmup
 )
 
 __all__ = [
@@ -27,6 +29,7 @@ __all__ = [
     "QueryResult",
     "DBResponse",
     "print_response_summary",
+    "SearchPrefetcher",
     "KeywordOptimizer",
     "KeywordOptimizationResponse",
     "keyword_optimizer",
@@ -34,5 +37,6 @@ __all__ = [
     "SentimentResult",
     "BatchSentimentResult",
     "multilingual_sentiment_analyzer",
-    "analyze_sentiment"
+    "analyze_sentiment",
+    "start_background_warmup"
 ]
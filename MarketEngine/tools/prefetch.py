@@ -0,0 +1,137 @@
+"""
+数据库查询预取
+流水线模式下 Agent 的所有数据库查询都经由 SearchPrefetcher 执行：
+- 查询在同一个工作线程上运行。MediaCrawlerDB 通过 asyncio 事件循环使用异步连接池，
+  池中连接属于创建它的事件循环，固定在一个线程上才能安全地与主线程的LLM调用并发
+- 预取的查询结果放入有界缓存，之后参数相同的查询直接取用（尚未完成时等待其完成）
+- stats 记录预取的命中情况，log_stats 输出汇总，用于判断预取带来的额外数据库负载是否值得
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+
+from .search import DBResponse, MediaCrawlerDB
+
+# 结果按时间倒序取前 limit 条的工具：limit 更大的预取结果截断后与直接查询等价
+_LIMIT_SLICEABLE = {"get_comments_for_topic"}
+
+
+class SearchPrefetcher:
+    """单线程数据库查询执行器与有界预取缓存"""
+
+    def __init__(self, search_agency: MediaCrawlerDB, max_entries: int = 8):
+        """
+        Args:
+            search_agency: 数据库查询工具集
+            max_entries: 预取缓存的最大条目数，超出时丢弃最早的预取（尚未开始的会被取消）
+        """
+        self.search_agency = search_agency
+        self.max_entries = max(1, max_entries)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="market-db")
+        self._cache: "OrderedDict[Tuple, Tuple[Optional[int], Future]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 预取过的工具：只有这些工具的直接查询才算作未命中
+        self._prefetched_tools = set()
+        # prefetched 预取提交数；hits 命中；misses 预取过的工具未命中；errors 预取的查询失败；
+        # evicted 未被使用就被淘汰；direct 从未预取过的工具的直接查询
+        self.stats = {"prefetched": 0, "hits": 0, "misses": 0, "errors": 0, "evicted": 0, "direct": 0}
+
+    @staticmethod
+    def _key(tool_name: str, kwargs: Dict[str, Any]) -> Tuple:
+        # 分页游标是字典，转为有序元组后才能作为缓存键
+        return (tool_name,) + tuple(sorted(
+            (k, tuple(sorted(v.items())) if isinstance(v, dict) else v)
+            for k, v in kwargs.items() if k != "limit"
+        ))
+
+    @staticmethod
+    def _covers(tool_name: str, cached_limit: Optional[int], limit: Optional[int]) -> bool:
+        """缓存结果能否满足给定 limit 的查询"""
+        if cached_limit == limit:
+            return True
+        return tool_name in _LIMIT_SLICEABLE and (cached_limit or 0) >= (limit or 0)
+
+    def prefetch(self, tool_name: str, **kwargs) -> bool:
+        """在后台执行查询并缓存结果，已缓存（且 limit 足够）时不重复提交；返回是否提交了新查询"""
+        key = self._key(tool_name, kwargs)
+        limit = kwargs.get("limit")
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and not cached[1].cancelled() and self._covers(tool_name, cached[0], limit):
+                return False
+            while len(self._cache) >= self.max_entries:
+                _, (_, evicted) = self._cache.popitem(last=False)
+                evicted.cancel()
+                self.stats["evicted"] += 1
+            self._cache[key] = (limit, self._executor.submit(self._run, tool_name, kwargs))
+            self._prefetched_tools.add(tool_name)
+            self.stats["prefetched"] += 1
+        logger.info(f"    预取查询: {tool_name} {kwargs}")
+        return True
+
+    def call(self, tool_name: str, **kwargs) -> DBResponse:
+        """执行查询：命中预取缓存时取用缓存结果，否则在查询线程上执行并等待"""
+        future = self._take(tool_name, kwargs)
+        if future is not None:
+            try:
+                response = future.result()
+                self.stats["hits"] += 1
+                logger.info(f"    命中预取结果: {tool_name} {kwargs}")
+                return self._fit_limit(response, kwargs.get("limit"))
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"    预取查询失败，重新查询: {str(e)}")
+        elif tool_name in self._prefetched_tools:
+            self.stats["misses"] += 1
+            logger.info(f"    未命中预取结果: {tool_name} {kwargs}")
+        else:
+            self.stats["direct"] += 1
+        return self._executor.submit(self._run, tool_name, kwargs).result()
+
+    def _take(self, tool_name: str, kwargs: Dict[str, Any]) -> Optional[Future]:
+        key = self._key(tool_name, kwargs)
+        limit = kwargs.get("limit")
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is None or cached[1].cancelled():
+                return None
+            cached_limit, future = cached
+            if not self._covers(tool_name, cached_limit, limit):
+                return None
+            del self._cache[key]
+            return future
+
+    @staticmethod
+    def _fit_limit(response: DBResponse, limit: Optional[int]) -> DBResponse:
+        if limit is None or len(response.results) <= limit:
+            return response
+        results = response.results[:limit]
+        return replace(response, parameters={**response.parameters, "limit": limit},
+                       results=results, results_count=len(results))
+
+    def _run(self, tool_name: str, kwargs: Dict[str, Any]) -> DBResponse:
+        return getattr(self.search_agency, tool_name)(**kwargs)
+
+    def log_stats(self):
+        """输出预取统计：命中数与预取数之比即预取查询中真正被用到的比例"""
+        with self._lock:
+            unused = len(self._cache)
+        stats = self.stats
+        used = stats["hits"] / stats["prefetched"] if stats["prefetched"] else 0.0
+        logger.info(
+            f"预取统计: 预取 {stats['prefetched']} 次，命中 {stats['hits']} 次（{used:.0%}），"
+            f"未命中 {stats['misses']} 次，预取失败 {stats['errors']} 次，"
+            f"淘汰 {stats['evicted']} 次，尚未使用 {unused} 次，其他直接查询 {stats['direct']} 次"
+        )
+
+    def close(self):
+        """取消尚未开始的预取并关闭查询线程"""
+        with self._lock:
+            for _, future in self._cache.values():
+                future.cancel()
+            self._cache.clear()
+        self._executor.shutdown(wait=False)
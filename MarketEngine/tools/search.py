@@ -21,12 +21,18 @@ V3.0 核心更新:
 - search_topic_by_date: 在指定的历史日期范围内搜索与特定话题相关的内容。
 - get_comments_for_topic: 专门提取公众对于某一特定话题的评论数据。
 - search_topic_on_platform: 在指定的单个社交媒体平台上搜索特定话题。
+
+分页: 三个话题搜索工具均返回 `next_cursor`（按 id 的键集分页游标），
+可通过 `cursor` 参数或 `fetch_more(response)` 继续获取更多结果而无需从头扫描。
+配套索引可由 MindSpider/schema/index_advisor.py 创建。
 """
 
 import os
 import json
+import inspect
 from loguru import logger
 import asyncio
+import time
 from typing import List, Dict, Any, Optional, Literal
 from dataclasses import dataclass, field
 from ..utils.db import fetch_all
@@ -57,6 +63,9 @@ class DBResponse:
     results: List[QueryResult] = field(default_factory=list)
     results_count: int = 0
     error_message: Optional[str] = None
+    # 键集分页游标：{表名: 下一页的 id 上界}，为 None 表示已无更多结果
+    # （Agent 整合多个关键词的响应中为 {关键词: 该关键词的游标}）
+    next_cursor: Optional[Dict[str, Any]] = None
 
 # --- 2. 核心客户端与专用工具集 ---
 
@@ -115,10 +124,75 @@ class MediaCrawlerDB:
         self._table_columns_cache[table_name] = columns
         return columns
 
+    # 由迁移脚本 MindSpider/schema/migrate_engagement_columns.py 添加、爬虫写入时维护的数值列
+    NUMERIC_ENGAGEMENT_COLUMNS = ['like_num', 'comment_num', 'share_num', 'collect_num', 'coin_num', 'danmaku_num', 'view_num']
+    # 只缓存"已有列"的结果：迁移脚本可能在引擎运行期间执行，未迁移的表最多每隔这么多秒重查一次
+    HOTNESS_COLUMN_RECHECK_SECONDS = 300
+    _hotness_columns_present = set()
+    _hotness_column_checked_at = {}
+    def _has_hotness_column(self, table_name: str) -> bool:
+        """判断内容表是否已具备预计算的 hotness_score 列"""
+        if table_name in self._hotness_columns_present: return True
+        checked_at = self._hotness_column_checked_at.get(table_name)
+        if checked_at is not None and time.monotonic() - checked_at < self.HOTNESS_COLUMN_RECHECK_SECONDS: return False
+        schema_expr = 'current_schema()' if settings.DB_DIALECT == 'postgresql' else 'DATABASE()'
+        results = self._execute_query(
+            f"SELECT column_name AS col FROM information_schema.columns WHERE table_schema = {schema_expr} AND table_name = :table AND column_name = 'hotness_score'",
+            {'table': table_name},
+        )
+        if results:
+            self._hotness_columns_present.add(table_name)
+            return True
+        self._hotness_column_checked_at[table_name] = time.monotonic()
+        return False
+
+    # 热点汇总表（由 MindSpider/schema/hot_content_rollup.py 维护）允许落后于内容表的最大时长（毫秒）
+    ROLLUP_MAX_LAG_MS = 10 * 60 * 1000
+    # 新鲜度判断结果的缓存时长（秒），避免每次 search_hot_content 都额外查询水位和各表最新时间
+    ROLLUP_FRESHNESS_TTL_SECONDS = 60
+    _rollup_table_present = False
+    _rollup_table_checked_at = None
+    _rollup_fresh_cache = None  # (判断时间, 是否足够新)
+    def _has_rollup_table(self) -> bool:
+        """判断 hot_content_rollup_state 表是否存在；与 hotness_score 列一样只缓存"存在"，不存在时按间隔重查且不记录错误"""
+        if MediaCrawlerDB._rollup_table_present: return True
+        checked_at = MediaCrawlerDB._rollup_table_checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.HOTNESS_COLUMN_RECHECK_SECONDS: return False
+        schema_expr = 'current_schema()' if settings.DB_DIALECT == 'postgresql' else 'DATABASE()'
+        results = self._execute_query(
+            f"SELECT table_name AS tbl FROM information_schema.tables WHERE table_schema = {schema_expr} AND table_name = 'hot_content_rollup_state'"
+        )
+        if results:
+            MediaCrawlerDB._rollup_table_present = True
+            return True
+        if checked_at is None:
+            logger.info("未找到 hot_content_rollup_state 表，search_hot_content 将直接查询各内容表")
+        MediaCrawlerDB._rollup_table_checked_at = time.monotonic()
+        return False
+
+    def _is_rollup_fresh(self) -> bool:
+        """判断 hot_content_rollup 的水位是否已追上各内容表的最新 last_modify_ts（结果缓存 ROLLUP_FRESHNESS_TTL_SECONDS 秒）"""
+        if not self._has_rollup_table(): return False
+        cached = MediaCrawlerDB._rollup_fresh_cache
+        if cached is not None and time.monotonic() - cached[0] < self.ROLLUP_FRESHNESS_TTL_SECONDS: return cached[1]
+        fresh = self._check_rollup_fresh()
+        MediaCrawlerDB._rollup_fresh_cache = (time.monotonic(), fresh)
+        return fresh
+
+    def _check_rollup_fresh(self) -> bool:
+        state = self._execute_query("SELECT source_table, watermark_ts FROM hot_content_rollup_state")
+        watermarks = {r['source_table']: r['watermark_ts'] or 0 for r in state}
+        if not watermarks: return False
+        latest = self._execute_query(" UNION ALL ".join(
+            f"SELECT '{table}' as tbl, MAX(last_modify_ts) as latest FROM {self._wrap_query_field_with_dialect(table)}" for table in watermarks
+        ))
+        if not latest: return False
+        return all((r['latest'] or 0) - watermarks[r['tbl']] <= self.ROLLUP_MAX_LAG_MS for r in latest)
+
     def _extract_engagement(self, row: Dict[str, Any]) -> Dict[str, int]:
         """从数据行中提取并统一互动指标"""
         engagement = {}
-        mapping = { 'likes': ['liked_count', 'like_count', 'voteup_count', 'comment_like_count'], 'comments': ['video_comment', 'comments_count', 'comment_count', 'total_replay_num', 'sub_comment_count'], 'shares': ['video_share_count', 'shared_count', 'share_count', 'total_forwards'], 'views': ['video_play_count', 'viewd_count'], 'favorites': ['video_favorite_count', 'collected_count'], 'coins': ['video_coin_count'], 'danmaku': ['video_danmaku'], }
+        mapping = { 'likes': ['liked_count', 'like_count', 'voteup_count', 'comment_like_count', 'like_num'], 'comments': ['video_comment', 'comments_count', 'comment_count', 'total_replay_num', 'sub_comment_count', 'comment_num'], 'shares': ['video_share_count', 'shared_count', 'share_count', 'total_forwards', 'share_num'], 'views': ['video_play_count', 'viewd_count', 'view_num'], 'favorites': ['video_favorite_count', 'collected_count', 'collect_num'], 'coins': ['video_coin_count', 'coin_num'], 'danmaku': ['video_danmaku', 'danmaku_num'], }
         for key, potential_cols in mapping.items():
             for col in potential_cols:
                 if col in row and row[col] is not None:
@@ -148,7 +222,17 @@ class MediaCrawlerDB:
         now = datetime.now()
         start_time = now - timedelta(days={'24h': 1, 'week': 7}.get(time_period, 365))
 
-        # 定义各平台的热度计算SQL片段
+        # 汇总表足够新时直接读取，避免对各内容表做 UNION ALL
+        if self._is_rollup_fresh():
+            raw_results = self._execute_query(
+                "SELECT platform as p, content_type as t, title, author, url, publish_ts as ts, hotness_score, like_num, comment_num, share_num, view_num, source_keyword, source_table as tbl "
+                "FROM hot_content_rollup WHERE publish_ts >= :start_ts ORDER BY hotness_score DESC LIMIT :limit",
+                {'start_ts': int(start_time.timestamp()), 'limit': limit},
+            )
+            formatted_results = [QueryResult(platform=r['p'], content_type=r['t'], title_or_content=r['title'], author_nickname=r.get('author'), url=r['url'], publish_time=self._to_datetime(r['ts']), engagement=self._extract_engagement(r), hotness_score=r.get('hotness_score') or 0.0, source_keyword=r.get('source_keyword'), source_table=r['tbl']) for r in raw_results]
+            return DBResponse("search_hot_content", params_for_log, results=formatted_results, results_count=len(formatted_results))
+
+        # 定义各平台的热度计算SQL片段（仅用于尚未执行 hotness_score 迁移的表）
         hotness_formulas = {
             'bilibili_video': f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(video_comment AS UNSIGNED), 0) * {self.W_COMMENT} + COALESCE(CAST(video_share_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_favorite_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_coin_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(video_danmaku AS UNSIGNED), 0) * {self.W_DANMAKU} + COALESCE(CAST(video_play_count AS DECIMAL(20,2)), 0) * {self.W_VIEW})",
             'douyin_aweme':   f"(COALESCE(CAST(liked_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(comment_count AS UNSIGNED), 0) * {self.W_COMMENT} + COALESCE(CAST(share_count AS UNSIGNED), 0) * {self.W_SHARE} + COALESCE(CAST(collected_count AS UNSIGNED), 0) * {self.W_SHARE})",
@@ -158,30 +242,37 @@ class MediaCrawlerDB:
             'zhihu_content':  f"(COALESCE(CAST(voteup_count AS UNSIGNED), 0) * {self.W_LIKE} + COALESCE(CAST(comment_count AS UNSIGNED), 0) * {self.W_COMMENT})",
         }
 
-        all_queries, params = [], []
+        all_queries, params = [], {'limit': limit}
         for table, formula in hotness_formulas.items():
-            time_filter_sql, time_filter_param = "", None
-            if table == 'weibo_note': time_filter_sql, time_filter_param = "`create_date_time` >= %s", start_time.strftime('%Y-%m-%d %H:%M:%S')
-            elif table in ['kuaishou_video', 'xhs_note', 'douyin_aweme']: time_col = 'time' if table == 'xhs_note' else 'create_time'; time_filter_sql, time_filter_param = f"`{time_col}` >= %s", str(int(start_time.timestamp() * 1000))
-            elif table == 'zhihu_content': time_filter_sql, time_filter_param = "CAST(`created_time` AS UNSIGNED) >= %s", str(int(start_time.timestamp()))
-            else: time_filter_sql, time_filter_param = "`create_time` >= %s", str(int(start_time.timestamp()))
+            pname = f"t_{table}"
+            if table == 'weibo_note': time_filter_sql, params[pname] = f"`create_date_time` >= :{pname}", start_time.strftime('%Y-%m-%d %H:%M:%S')
+            elif table in ['kuaishou_video', 'xhs_note', 'douyin_aweme']: time_col = 'time' if table == 'xhs_note' else 'create_time'; time_filter_sql, params[pname] = f"`{time_col}` >= :{pname}", str(int(start_time.timestamp() * 1000))
+            # created_time 为秒级时间戳字符串：先按字符串范围筛选以使用 (created_time, hotness_score) 索引，再按数值精确过滤
+            elif table == 'zhihu_content': time_filter_sql, params[pname] = f"`created_time` >= :{pname} AND CAST(`created_time` AS UNSIGNED) >= :{pname}", str(int(start_time.timestamp()))
+            else: time_filter_sql, params[pname] = f"`create_time` >= :{pname}", str(int(start_time.timestamp()))
+
+            # 已迁移的表直接读取预计算的 hotness_score 与数值列，按索引取前 limit 条
+            if self._has_hotness_column(table):
+                formula = 'hotness_score'
+                numeric_select = ", ".join(self.NUMERIC_ENGAGEMENT_COLUMNS)
+            else:
+                numeric_select = ", ".join(f"NULL as {col}" for col in self.NUMERIC_ENGAGEMENT_COLUMNS)
 
             content_type = 'note' if table in ['weibo_note', 'xhs_note'] else 'content' if table == 'zhihu_content' else 'video'
-            query_template = "SELECT '{platform}' as p, '{type}' as t, {title} as title, {author} as author, {url} as url, {ts} as ts, {formula} as hotness_score, source_keyword, '{tbl}' as tbl FROM `{tbl}` WHERE {time_filter}"
+            query_template = "SELECT '{platform}' as p, '{type}' as t, {title} as title, {author} as author, {url} as url, {ts} as ts, {formula} as hotness_score, {numeric}, source_keyword, '{tbl}' as tbl FROM `{tbl}` WHERE {time_filter} ORDER BY {formula} DESC LIMIT :limit"
             
-            field_subs = {'platform': table.split('_')[0], 'type': content_type, 'title': 'title', 'author': 'nickname', 'url': 'video_url', 'ts': 'create_time', 'formula': formula, 'tbl': table, 'time_filter': time_filter_sql}
+            field_subs = {'platform': table.split('_')[0], 'type': content_type, 'title': 'title', 'author': 'nickname', 'url': 'video_url', 'ts': 'create_time', 'formula': formula, 'numeric': numeric_select, 'tbl': table, 'time_filter': time_filter_sql}
             if table == 'weibo_note': field_subs.update({'title': 'content', 'url': 'note_url', 'ts': 'create_date_time'})
             elif table == 'xhs_note': field_subs.update({'ts': 'time', 'url': 'note_url'})
             elif table == 'zhihu_content': field_subs.update({'author': 'user_nickname', 'url': 'content_url', 'ts': 'created_time'})
             elif table == 'douyin_aweme': field_subs.update({'url': 'aweme_url'})
 
             all_queries.append(query_template.format(**field_subs))
-            params.append(time_filter_param)
         
-        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY hotness_score DESC LIMIT %s"
-        raw_results = self._execute_query(final_query, tuple(params) + (limit,))
+        final_query = f"({' ) UNION ALL ( '.join(all_queries)}) ORDER BY hotness_score DESC LIMIT :limit"
+        raw_results = self._execute_query(final_query, params)
 
-        formatted_results = [QueryResult(platform=r['p'], content_type=r['t'], title_or_content=r['title'], author_nickname=r.get('author'), url=r['url'], publish_time=self._to_datetime(r['ts']), engagement=self._extract_engagement(r), hotness_score=r.get('hotness_score', 0.0), source_keyword=r.get('source_keyword'), source_table=r['tbl']) for r in raw_results]
+        formatted_results = [QueryResult(platform=r['p'], content_type=r['t'], title_or_content=r['title'], author_nickname=r.get('author'), url=r['url'], publish_time=self._to_datetime(r['ts']), engagement=self._extract_engagement(r), hotness_score=r.get('hotness_score') or 0.0, source_keyword=r.get('source_keyword'), source_table=r['tbl']) for r in raw_results]
         return DBResponse("search_hot_content", params_for_log, results=formatted_results, results_count=len(formatted_results))    
 
     def _wrap_query_field_with_dialect(self, field: str) -> str:
@@ -190,34 +281,106 @@ class MediaCrawlerDB:
             return f'"{field}"'
         return f'`{field}`'
 
-    def search_topic_globally(self, topic: str, limit_per_table: int = 100) -> DBResponse:
+    def _build_time_clause(self, table: str, config: Dict[str, Any], start_dt: datetime, end_dt: datetime) -> tuple:
+        """根据表的时间列类型生成时间范围条件及其命名参数"""
+        time_col, time_type = config['time_col'], config['time_type']
+        if time_type == 'sec': t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
+        elif time_type == 'ms': t_params = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
+        elif time_type == 'date_str': t_params = (start_dt.date(), end_dt.date())
+        elif time_type == 'str': t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
+        else: t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
+
+        col = self._wrap_query_field_with_dialect(time_col)
+        if time_type == 'sec_str':
+            cast_type = 'BIGINT' if settings.DB_DIALECT == 'postgresql' else 'UNSIGNED'
+            col = f"CAST({col} AS {cast_type})"
+        return f"{col} >= :t_start AND {col} < :t_end", {'t_start': t_params[0], 't_end': t_params[1]}
+
+    def _keyset_search(
+        self,
+        table: str,
+        fields: List[str],
+        search_term: str,
+        limit: int,
+        cursor_id: Optional[int] = None,
+        extra_clause: str = "",
+        extra_params: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        按 id 倒序的键集分页查询：`WHERE (...LIKE...) AND id < :cursor ORDER BY id DESC LIMIT :limit`。
+        翻页时直接从上一页最小 id 处继续，无需重新扫描前面的记录。
+        """
+        param_dict: Dict[str, Any] = dict(extra_params or {})
+        like_clauses = []
+        for idx, field in enumerate(fields):
+            pname = f"term_{idx}"
+            like_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
+            param_dict[pname] = search_term
+        conditions = [f"({' OR '.join(like_clauses)})"]
+        if extra_clause:
+            conditions.append(f"({extra_clause})")
+        if cursor_id is not None:
+            conditions.append("id < :cursor_id")
+            param_dict['cursor_id'] = cursor_id
+        param_dict['limit'] = limit
+        query = (f"SELECT * FROM {self._wrap_query_field_with_dialect(table)} "
+                 f"WHERE {' AND '.join(conditions)} ORDER BY id DESC LIMIT :limit")
+        return self._execute_query(query, param_dict)
+
+    @staticmethod
+    def _tables_for_page(tables: List[str], cursor: Optional[Dict[str, int]]) -> List[str]:
+        """首页查询全部表；翻页时只查询游标中仍有剩余结果的表"""
+        if cursor is None:
+            return list(tables)
+        return [t for t in tables if t in cursor]
+
+    @staticmethod
+    def _advance_cursor(next_cursor: Dict[str, int], table: str, rows: List[Dict[str, Any]], limit: int) -> None:
+        """本页取满时记录该表的最小 id，作为下一页的上界"""
+        if len(rows) >= limit and limit > 0:
+            ids = [r['id'] for r in rows if r.get('id') is not None]
+            if ids:
+                next_cursor[table] = min(ids)
+
+    def fetch_more(self, response: DBResponse) -> DBResponse:
+        """
+        【工具】获取更多结果: 以上一次话题搜索返回的 next_cursor 继续翻页，只返回新的记录。
+
+        适用于 search_topic_globally / search_topic_by_date / search_topic_on_platform。
+        """
+        if not response.next_cursor:
+            return DBResponse(response.tool_name, dict(response.parameters), next_cursor=None)
+        method = getattr(self, response.tool_name, None)
+        if method is None or response.tool_name not in ('search_topic_globally', 'search_topic_by_date', 'search_topic_on_platform'):
+            return DBResponse(response.tool_name, dict(response.parameters), error_message=f"工具 {response.tool_name} 不支持分页")
+        accepted = inspect.signature(method).parameters
+        params = {k: v for k, v in response.parameters.items() if k in accepted and k != 'cursor'}
+        return method(**params, cursor=response.next_cursor)
+
+    def search_topic_globally(self, topic: str, limit_per_table: int = 100, cursor: Optional[Dict[str, int]] = None) -> DBResponse:
         """
         【工具】全局话题搜索: 在数据库中（内容、评论、标签、来源关键字）全面搜索指定话题。
 
         Args:
             topic (str): 要搜索的话题关键词。
             limit_per_table (int): 从每个相关表中返回的最大记录数，默认为 100。
+            cursor (Optional[Dict[str, int]]): 上一页返回的 next_cursor，用于获取更多结果。默认为None（首页）。
 
         Returns:
-            DBResponse: 包含所有匹配结果的聚合列表。
+            DBResponse: 包含所有匹配结果的聚合列表，next_cursor 指向下一页。
         """
-        params_for_log = {'topic': topic, 'limit_per_table': limit_per_table}
+        params_for_log = {'topic': topic, 'limit_per_table': limit_per_table, 'cursor': cursor}
         logger.info(f"--- TOOL: 全局话题搜索 (params: {params_for_log}) ---")
         
         search_term, all_results = f"%{topic}%", []
         search_configs = { 'bilibili_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'bilibili_video_comment': {'fields': ['content'], 'type': 'comment'}, 'douyin_aweme': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'douyin_aweme_comment': {'fields': ['content'], 'type': 'comment'}, 'kuaishou_video': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'video'}, 'kuaishou_video_comment': {'fields': ['content'], 'type': 'comment'}, 'weibo_note': {'fields': ['content', 'source_keyword'], 'type': 'note'}, 'weibo_note_comment': {'fields': ['content'], 'type': 'comment'}, 'xhs_note': {'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note'}, 'xhs_note_comment': {'fields': ['content'], 'type': 'comment'}, 'zhihu_content': {'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content'}, 'zhihu_comment': {'fields': ['content'], 'type': 'comment'}, 'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note'}, 'tieba_comment': {'fields': ['content'], 'type': 'comment'}, 'daily_news': {'fields': ['title'], 'type': 'news'}, }
         
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = " OR ".join(where_clauses)
-            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
+        next_cursor: Dict[str, int] = {}
+        for table in self._tables_for_page(list(search_configs), cursor):
+            config = search_configs[table]
+            raw_results = self._keyset_search(table, config['fields'], search_term, limit_per_table,
+                                              cursor_id=cursor.get(table) if cursor else None)
+            self._advance_cursor(next_cursor, table, raw_results, limit_per_table)
             for row in raw_results:
                 content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
                 time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
@@ -231,9 +394,11 @@ class MediaCrawlerDB:
                     source_keyword=row.get('source_keyword'),
                     source_table=table
                 ))
-        return DBResponse("search_topic_globally", params_for_log, results=all_results, results_count=len(all_results))
+        return DBResponse("search_topic_globally", params_for_log, results=all_results, results_count=len(all_results),
+                          next_cursor=next_cursor or None)
 
-    def search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100) -> DBResponse:
+    def search_topic_by_date(self, topic: str, start_date: str, end_date: str, limit_per_table: int = 100,
+                             cursor: Optional[Dict[str, int]] = None) -> DBResponse:
         """
         【工具】按日期搜索话题: 在明确的历史时间段内，搜索与特定话题相关的内容。
 
@@ -242,11 +407,12 @@ class MediaCrawlerDB:
             start_date (str): 开始日期，格式 'YYYY-MM-DD'。
             end_date (str): 结束日期，格式 'YYYY-MM-DD'。
             limit_per_table (int): 从每个相关表中返回的最大记录数，默认为 100。
+            cursor (Optional[Dict[str, int]]): 上一页返回的 next_cursor，用于获取更多结果。默认为None（首页）。
 
         Returns:
-            DBResponse: 包含在指定日期范围内找到的结果的聚合列表。
+            DBResponse: 包含在指定日期范围内找到的结果的聚合列表，next_cursor 指向下一页。
         """
-        params_for_log = {'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit_per_table': limit_per_table}
+        params_for_log = {'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit_per_table': limit_per_table, 'cursor': cursor}
         logger.info(f"--- TOOL: 按日期搜索话题 (params: {params_for_log}) ---")
         
         try:
@@ -262,17 +428,14 @@ class MediaCrawlerDB:
             'tieba_note': {'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, 'daily_news': {'fields': ['title'], 'type': 'news', 'time_col': 'crawl_date', 'time_type': 'date_str'},
         }
 
-        for table, config in search_configs.items():
-            param_dict = {}
-            where_clauses = []
-            for idx, field in enumerate(config['fields']):
-                pname = f"term_{idx}"
-                where_clauses.append(f'{self._wrap_query_field_with_dialect(field)} LIKE :{pname}')
-                param_dict[pname] = search_term
-            param_dict['limit'] = limit_per_table
-            where_clause = ' OR '.join(where_clauses)
-            query = f'SELECT * FROM {self._wrap_query_field_with_dialect(table)} WHERE {where_clause} ORDER BY id DESC LIMIT :limit'
-            raw_results = self._execute_query(query, param_dict)
+        next_cursor: Dict[str, int] = {}
+        for table in self._tables_for_page(list(search_configs), cursor):
+            config = search_configs[table]
+            time_clause, time_params = self._build_time_clause(table, config, start_dt, end_dt)
+            raw_results = self._keyset_search(table, config['fields'], search_term, limit_per_table,
+                                              cursor_id=cursor.get(table) if cursor else None,
+                                              extra_clause=time_clause, extra_params=time_params)
+            self._advance_cursor(next_cursor, table, raw_results, limit_per_table)
             for row in raw_results:
                 content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
                 time_key = row.get('create_time') or row.get('time') or row.get('created_time') or row.get('publish_time') or row.get('crawl_date')
@@ -286,7 +449,8 @@ class MediaCrawlerDB:
                     source_keyword=row.get('source_keyword'),
                     source_table=table
                 ))
-        return DBResponse("search_topic_by_date", params_for_log, results=all_results, results_count=len(all_results))
+        return DBResponse("search_topic_by_date", params_for_log, results=all_results, results_count=len(all_results),
+                          next_cursor=next_cursor or None)
         
     def get_comments_for_topic(self, topic: str, limit: int = 500) -> DBResponse:
         """
@@ -331,7 +495,8 @@ class MediaCrawlerDB:
         topic: str,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        limit: int = 20
+        limit: int = 20,
+        cursor: Optional[Dict[str, int]] = None
     ) -> DBResponse:
         """
         【工具】平台定向搜索: (新增) 在指定的单个社交媒体平台上搜索特定话题。
@@ -342,11 +507,12 @@ class MediaCrawlerDB:
             start_date (Optional[str]): 开始日期，格式 'YYYY-MM-DD'。默认为None。
             end_date (Optional[str]): 结束日期，格式 'YYYY-MM-DD'。默认为None。
             limit (int): 返回结果的最大数量，默认为 20。
+            cursor (Optional[Dict[str, int]]): 上一页返回的 next_cursor，用于获取更多结果。默认为None（首页）。
 
         Returns:
-            DBResponse: 包含在该平台找到的结果列表。
+            DBResponse: 包含在该平台找到的结果列表，next_cursor 指向下一页。
         """
-        params_for_log = {'platform': platform, 'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit': limit}
+        params_for_log = {'platform': platform, 'topic': topic, 'start_date': start_date, 'end_date': end_date, 'limit': limit, 'cursor': cursor}
         logger.info(f"--- TOOL: 平台定向搜索 (params: {params_for_log}) ---")
 
         all_configs = { 'bilibili': [{'table': 'bilibili_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'sec'}, {'table': 'bilibili_video_comment', 'fields': ['content'], 'type': 'comment'}], 'douyin': [{'table': 'douyin_aweme', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'douyin_aweme_comment', 'fields': ['content'], 'type': 'comment'}], 'kuaishou': [{'table': 'kuaishou_video', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'video', 'time_col': 'create_time', 'time_type': 'ms'}, {'table': 'kuaishou_video_comment', 'fields': ['content'], 'type': 'comment'}], 'weibo': [{'table': 'weibo_note', 'fields': ['content', 'source_keyword'], 'type': 'note', 'time_col': 'create_date_time', 'time_type': 'str'}, {'table': 'weibo_note_comment', 'fields': ['content'], 'type': 'comment'}], 'xhs': [{'table': 'xhs_note', 'fields': ['title', 'desc', 'tag_list', 'source_keyword'], 'type': 'note', 'time_col': 'time', 'time_type': 'ms'}, {'table': 'xhs_note_comment', 'fields': ['content'], 'type': 'comment'}], 'zhihu': [{'table': 'zhihu_content', 'fields': ['title', 'desc', 'content_text', 'source_keyword'], 'type': 'content', 'time_col': 'created_time', 'time_type': 'sec_str'}, {'table': 'zhihu_comment', 'fields': ['content'], 'type': 'comment'}], 'tieba': [{'table': 'tieba_note', 'fields': ['title', 'desc', 'source_keyword'], 'type': 'note', 'time_col': 'publish_time', 'time_type': 'str'}, {'table': 'tieba_comment', 'fields': ['content'], 'type': 'comment'}] }
@@ -357,7 +523,6 @@ class MediaCrawlerDB:
         search_term, all_results = f"%{topic}%", []
         platform_configs = all_configs[platform]
 
-        time_clause, time_params_tuple = "", ()
         if start_date and end_date:
             try:
                 start_dt, end_dt = datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1)
@@ -366,35 +531,25 @@ class MediaCrawlerDB:
         else:
             start_dt, end_dt = None, None
 
-        for config in platform_configs:
-            table = config['table']
-            topic_clause = " OR ".join([f"`{field}` LIKE %s" for field in config['fields']])
-            query = f"SELECT * FROM `{table}` WHERE {topic_clause}"
-            params = [search_term] * len(config['fields'])
-
+        next_cursor: Dict[str, int] = {}
+        configs_by_table = {c['table']: c for c in platform_configs}
+        for table in self._tables_for_page(list(configs_by_table), cursor):
+            config = configs_by_table[table]
+            time_clause, time_params = "", None
             if start_dt and end_dt and 'time_col' in config:
-                time_col, time_type = config['time_col'], config['time_type']
-                if time_type == 'sec': t_params = (int(start_dt.timestamp()), int(end_dt.timestamp()))
-                elif time_type == 'ms': t_params = (int(start_dt.timestamp() * 1000), int(end_dt.timestamp() * 1000))
-                elif time_type in ['str', 'date_str']: t_params = (start_dt.strftime('%Y-%m-%d'), end_dt.strftime('%Y-%m-%d'))
-                else: t_params = (str(int(start_dt.timestamp())), str(int(end_dt.timestamp())))
-                
-                t_clause = f"`{time_col}` >= %s AND `{time_col}` < %s"
-                if table == 'zhihu_content': t_clause = f"CAST(`{time_col}` AS UNSIGNED) >= %s AND CAST(`{time_col}` AS UNSIGNED) < %s"
-                
-                query += f" AND ({t_clause})"
-                params.extend(t_params)
-
-            query += f" ORDER BY id DESC LIMIT %s"
-            params.append(limit)
-
-            raw_results = self._execute_query(query, tuple(params))
+                time_clause, time_params = self._build_time_clause(table, config, start_dt, end_dt)
+
+            raw_results = self._keyset_search(table, config['fields'], search_term, limit,
+                                              cursor_id=cursor.get(table) if cursor else None,
+                                              extra_clause=time_clause, extra_params=time_params)
+            self._advance_cursor(next_cursor, table, raw_results, limit)
             for row in raw_results:
                 content = (row.get('title') or row.get('content') or row.get('desc') or row.get('content_text', ''))
                 time_key = config.get('time_col') and row.get(config.get('time_col'))
                 all_results.append(QueryResult(platform=platform, content_type=config['type'], title_or_content=content if content else '', author_nickname=row.get('nickname') or row.get('user_nickname'), url=row.get('video_url') or row.get('note_url') or row.get('content_url') or row.get('url') or row.get('aweme_url'), publish_time=self._to_datetime(time_key), engagement=self._extract_engagement(row), source_keyword=row.get('source_keyword'), source_table=table))
         
-        return DBResponse("search_topic_on_platform", params_for_log, results=all_results, results_count=len(all_results))
+        return DBResponse("search_topic_on_platform", params_for_log, results=all_results, results_count=len(all_results),
+                          next_cursor=next_cursor or None)
 
 # --- 3. 测试与使用示例 ---
 def print_response_summary(response: DBResponse):
@@ -6,32 +6,67 @@
 
 import os
 import sys
+import time
+import threading
+import importlib.util
 from typing import List, Dict, Any, Optional, Union
 from dataclasses import dataclass
 import re
 
-try:
-    import torch
+# torch / transformers 导入耗时较长，这里只检查是否已安装，真正导入推迟到首次加载模型时
+TORCH_AVAILABLE = importlib.util.find_spec("torch") is not None
+TRANSFORMERS_AVAILABLE = importlib.util.find_spec("transformers") is not None
 
-    TORCH_AVAILABLE = True
-    torch.classes.__path__ = []
-except ImportError:
-    torch = None  # type: ignore
-    TORCH_AVAILABLE = False
+torch = None  # type: ignore
+AutoTokenizer = None  # type: ignore
+AutoModelForSequenceClassification = None  # type: ignore
 
-try:
-    from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    AutoTokenizer = None  # type: ignore
-    AutoModelForSequenceClassification = None  # type: ignore
-    TRANSFORMERS_AVAILABLE = False
+def _import_torch() -> bool:
+    """首次使用时导入 torch，返回是否可用"""
+    global torch, TORCH_AVAILABLE
+    if torch is None and TORCH_AVAILABLE:
+        try:
+            import torch as _torch
+
+            _torch.classes.__path__ = []
+            torch = _torch
+        except ImportError:
+            TORCH_AVAILABLE = False
+    return torch is not None
+
+
+def _import_transformers() -> bool:
+    """首次使用时导入 transformers，返回是否可用"""
+    global AutoTokenizer, AutoModelForSequenceClassification, TRANSFORMERS_AVAILABLE
+    if AutoTokenizer is None and TRANSFORMERS_AVAILABLE:
+        try:
+            from transformers import AutoTokenizer as _tokenizer_cls
+            from transformers import AutoModelForSequenceClassification as _model_cls
+
+            AutoTokenizer, AutoModelForSequenceClassification = _tokenizer_cls, _model_cls
+        except ImportError:
+            TRANSFORMERS_AVAILABLE = False
+    return AutoTokenizer is not None
 
 
 # INFO：若想跳过情感分析，可手动切换此开关为False
 SENTIMENT_ANALYSIS_ENABLED = True
 
+# 推理后端：torch（默认，自动选择 CUDA/MPS/CPU）或 onnx（int8 量化，仅 CPU，需安装 onnxruntime）
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "torch").strip().lower()
+
+# 共享推理服务地址（由 app.py 启动 sentiment_server 后注入），设置后以客户端模式调用，不在本进程加载模型
+SENTIMENT_SERVER_URL = os.getenv("SENTIMENT_SERVER_URL", "").strip()
+# 客户端等待服务端模型加载的提示间隔（秒）：服务进程仍在加载时持续等待，每隔这么久提示一次
+SENTIMENT_SERVER_WAIT = float(os.getenv("SENTIMENT_SERVER_WAIT", "60"))
+# 等待服务端就绪时两次健康检查之间的最长间隔（秒），从1秒开始逐步退避
+SENTIMENT_SERVER_MAX_BACKOFF = 10.0
+SENTIMENT_SERVER_TIMEOUT = 120
+
+# 是否在 start_background_warmup() 被调用时于后台预加载模型
+SENTIMENT_WARMUP = os.getenv("SENTIMENT_WARMUP", "true").strip().lower() in ("1", "true", "yes")
+
 
 def _describe_missing_dependencies() -> str:
     missing = []
@@ -51,6 +86,9 @@ weibo_sentiment_path = os.path.join(
 )
 sys.path.append(weibo_sentiment_path)
 
+MODEL_NAME = "tabularisai/multilingual-sentiment-analysis"
+LOCAL_MODEL_PATH = os.path.join(weibo_sentiment_path, "model")
+
 
 @dataclass
 class SentimentResult:
@@ -84,11 +122,25 @@ class WeiboMultilingualSentimentAnalyzer:
     这是一个通用工具，可以被任何Engine调用进行情感分析
     """
 
-    def __init__(self):
-        """初始化情感分析器"""
+    # 批量分析时单次推理的文本数
+    BATCH_SIZE = 16
+
+    def __init__(self, backend: Optional[str] = None, server_url: Optional[str] = None):
+        """
+        初始化情感分析器
+
+        Args:
+            backend: 推理后端 "torch" 或 "onnx"，默认读取环境变量 SENTIMENT_BACKEND
+            server_url: 共享推理服务地址，默认读取环境变量 SENTIMENT_SERVER_URL；传入空字符串强制本地推理
+        """
         self.model = None
         self.tokenizer = None
         self.device = None
+        self.onnx_session = None
+        self.backend = (backend or SENTIMENT_BACKEND or "torch").lower()
+        self.server_url = (SENTIMENT_SERVER_URL if server_url is None else server_url).rstrip("/")
+        self._http = None
+        self._init_lock = threading.RLock()
         self.is_initialized = False
         self.is_disabled = False
         self.disable_reason: Optional[str] = None
@@ -104,7 +156,7 @@ class WeiboMultilingualSentimentAnalyzer:
 
         if not SENTIMENT_ANALYSIS_ENABLED:
             self.disable("情感分析功能已在配置中关闭。")
-        elif not (TORCH_AVAILABLE and TRANSFORMERS_AVAILABLE):
+        elif not self.server_url and not (TORCH_AVAILABLE and TRANSFORMERS_AVAILABLE):
             missing = _describe_missing_dependencies() or "未知依赖"
             self.disable(f"缺少依赖: {missing}，情感分析已禁用。")
 
@@ -126,6 +178,7 @@ class WeiboMultilingualSentimentAnalyzer:
             self.model = None
             self.tokenizer = None
             self.device = None
+            self.onnx_session = None
             self.is_initialized = False
 
     def enable(self) -> bool:
@@ -133,7 +186,7 @@ class WeiboMultilingualSentimentAnalyzer:
         if not SENTIMENT_ANALYSIS_ENABLED:
             self.disable("情感分析功能已在配置中关闭。")
             return False
-        if not (TORCH_AVAILABLE and TRANSFORMERS_AVAILABLE):
+        if not self.server_url and not (TORCH_AVAILABLE and TRANSFORMERS_AVAILABLE):
             missing = _describe_missing_dependencies() or "未知依赖"
             self.disable(f"缺少依赖: {missing}，情感分析已禁用。")
             return False
@@ -143,7 +196,7 @@ class WeiboMultilingualSentimentAnalyzer:
 
     def _select_device(self):
         """Select the best available torch device."""
-        if not TORCH_AVAILABLE:
+        if not _import_torch():
             return None
         assert torch is not None
         if torch.cuda.is_available():
@@ -159,34 +212,53 @@ class WeiboMultilingualSentimentAnalyzer:
 
     def initialize(self) -> bool:
         """
-        初始化模型和分词器
+        初始化模型和分词器（线程安全，可与后台预热并发调用）
 
         Returns:
             是否初始化成功
         """
+        with self._init_lock:
+            return self._initialize_locked()
+
+    def _initialize_locked(self) -> bool:
         if self.is_disabled:
             reason = self.disable_reason or "情感分析功能已禁用"
             print(f"情感分析功能已禁用，跳过模型加载：{reason}")
             return False
 
+        if self.is_initialized:
+            print("模型已经初始化，无需重复加载")
+            return True
+
+        if self.server_url:
+            if self._initialize_remote():
+                return True
+            if self.is_disabled:
+                return False
+
+        # ONNX 缓存可用时只需 transformers 分词器，不必导入 torch
+        if self.backend == "onnx" and _import_transformers():
+            if self._initialize_onnx():
+                return True
+            if self.is_disabled or self.is_initialized:
+                return self.is_initialized
+
+        _import_torch()
+        _import_transformers()
         if not (TORCH_AVAILABLE and TRANSFORMERS_AVAILABLE):
             missing = _describe_missing_dependencies() or "未知依赖"
             self.disable(f"缺少依赖: {missing}，情感分析已禁用。", drop_state=True)
             print(f"缺少依赖: {missing}，无法加载情感分析模型。")
             return False
 
-        if self.is_initialized:
-            print("模型已经初始化，无需重复加载")
-            return True
-
         try:
             print("正在加载多语言情感分析模型...")
             assert AutoTokenizer is not None
             assert AutoModelForSequenceClassification is not None
 
             # 使用多语言情感分析模型
-            model_name = "tabularisai/multilingual-sentiment-analysis"
-            local_model_path = os.path.join(weibo_sentiment_path, "model")
+            model_name = MODEL_NAME
+            local_model_path = LOCAL_MODEL_PATH
 
             # 检查本地是否已有模型
             if os.path.exists(local_model_path):
@@ -217,6 +289,7 @@ class WeiboMultilingualSentimentAnalyzer:
             self.device = device
             self.model.to(self.device)
             self.model.eval()
+            self.backend = "torch"
             self.is_initialized = True
             self.enable()
 
@@ -241,6 +314,159 @@ class WeiboMultilingualSentimentAnalyzer:
             self.disable(error_message, drop_state=True)
             return False
 
+    def _initialize_remote(self) -> bool:
+        """
+        连接共享推理服务，等待其模型加载完成。
+        服务进程仍在响应（模型加载中或健康检查超时）时以退避间隔持续等待，不在本进程加载模型，
+        避免每个Engine各自驻留一份模型；只有服务不可达（进程已退出或未能启动）时才清空 server_url
+        并返回 False，由调用方回退到本地加载。服务端报告情感分析已禁用时禁用本地分析。
+        """
+        import requests
+
+        self._http = requests.Session()
+        self._http.trust_env = False  # 本地服务不走代理
+        started = time.time()
+        next_notice = started + SENTIMENT_SERVER_WAIT
+        delay = 1.0
+        while True:
+            try:
+                health = self._http.get(f"{self.server_url}/health", timeout=3).json()
+            except requests.Timeout:
+                # 服务进程忙于加载模型时可能来不及响应，仍视为存活
+                health = {"ready": False}
+            except Exception as e:
+                return self._abandon_remote(
+                    f"情感分析推理服务不可达（{self.server_url}），服务进程可能已退出，改为本地加载模型: {e}"
+                )
+
+            if health.get("disabled"):
+                self.disable(f"推理服务端情感分析不可用: {health.get('reason')}")
+                return False
+            if health.get("ready"):
+                self.backend = "remote"
+                self.device = f"remote:{self.server_url}({health.get('backend')})"
+                self.is_initialized = True
+                print(f"已连接共享情感分析推理服务: {self.server_url}（服务端后端: {health.get('backend')}，"
+                      f"等待 {time.time() - started:.0f} 秒）")
+                return True
+            if time.time() >= next_notice:
+                print(f"情感分析推理服务仍在加载模型（已等待 {time.time() - started:.0f} 秒，{self.server_url}），"
+                      f"继续等待，不在本进程重复加载")
+                next_notice = time.time() + SENTIMENT_SERVER_WAIT
+            time.sleep(delay)
+            delay = min(delay * 2, SENTIMENT_SERVER_MAX_BACKOFF)
+
+    def _abandon_remote(self, message: str) -> bool:
+        """放弃推理服务，交由调用方本地加载模型"""
+        print(message)
+        self.server_url = ""
+        self._http = None
+        self.enable()
+        return False
+
+    def _fallback_to_local(self) -> bool:
+        """推理服务中途不可用时切换为本地推理"""
+        print(f"情感分析推理服务连接中断（{self.server_url}），切换为本地加载模型")
+        self.server_url = ""
+        self._http = None
+        self.is_initialized = False
+        self.backend = (SENTIMENT_BACKEND or "torch").lower()
+        return self.enable() and self.initialize()
+
+    def _initialize_onnx(self) -> bool:
+        """
+        加载 int8 量化的 ONNX 模型；缓存不存在或已过期时先由本地 PyTorch 模型导出。
+        失败时回退到 PyTorch 后端并返回 False。
+        """
+        try:
+            from .sentiment_onnx import OnnxSentimentSession, export_quantized_onnx, is_export_current
+
+            if not is_export_current(LOCAL_MODEL_PATH):
+                if not os.path.exists(LOCAL_MODEL_PATH):
+                    print("本地模型不存在，先通过 PyTorch 后端下载模型...")
+                    self.backend = "torch"
+                    if not self.initialize():
+                        return False
+                    self.model = None
+                    self.is_initialized = False
+                export_quantized_onnx(LOCAL_MODEL_PATH)
+
+            if not _import_transformers():
+                raise RuntimeError("缺少依赖: Transformers")
+            self.tokenizer = AutoTokenizer.from_pretrained(LOCAL_MODEL_PATH)
+            session = OnnxSentimentSession(LOCAL_MODEL_PATH)
+            if session.num_labels != len(self.sentiment_map):
+                raise RuntimeError(
+                    f"ONNX 模型输出类别数 {session.num_labels} 与标签映射 {len(self.sentiment_map)} 不一致"
+                )
+
+            self.onnx_session = session
+            self.model = None
+            self.device = "onnxruntime-cpu"
+            self.backend = "onnx"
+            self.is_initialized = True
+            self.enable()
+            print(f"ONNX int8 量化模型加载成功! intra-op 线程数: {session.intra_op_threads}")
+            return True
+        except Exception as e:
+            print(f"ONNX 后端加载失败，回退到 PyTorch 后端: {e}")
+            self.onnx_session = None
+            self.backend = "torch"
+            self.is_initialized = False
+            return False
+
+    def predict_probabilities(self, texts: List[str]) -> List[List[float]]:
+        """
+        对已预处理的非空文本批量推理，返回每条文本在5个情感等级上的概率分布（顺序与 sentiment_map 一致）
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            概率分布列表
+        """
+        if self.backend == "remote":
+            import requests
+
+            try:
+                resp = self._http.post(
+                    f"{self.server_url}/predict", json={"texts": texts}, timeout=SENTIMENT_SERVER_TIMEOUT
+                )
+            except requests.ConnectionError:
+                if not self._fallback_to_local():
+                    raise RuntimeError(self.disable_reason or "本地情感分析模型加载失败")
+                return self.predict_probabilities(texts)
+            if resp.status_code != 200:
+                raise RuntimeError(f"推理服务返回错误 {resp.status_code}: {resp.text[:200]}")
+            return resp.json()["probabilities"]
+
+        assert self.tokenizer is not None
+        if self.onnx_session is not None:
+            encoded = self.tokenizer(
+                texts,
+                max_length=512,
+                padding=True,
+                truncation=True,
+                return_tensors="np",
+            )
+            return self.onnx_session.predict_proba(encoded).tolist()
+
+        inputs = self.tokenizer(
+            texts,
+            max_length=512,
+            padding=True,
+            truncation=True,
+            return_tensors="pt",
+        )
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+
+        assert torch is not None
+        assert self.model is not None
+        with torch.no_grad():
+            logits = self.model(**inputs).logits
+            probabilities = torch.softmax(logits, dim=1)
+        return probabilities.cpu().tolist()
+
     def _preprocess_text(self, text: str) -> str:
         """
         文本预处理
@@ -306,44 +532,9 @@ class WeiboMultilingualSentimentAnalyzer:
                     error_message="输入文本为空或无效内容",
                     analysis_performed=False,
                 )
-            assert self.tokenizer is not None
-            # 分词编码
-            inputs = self.tokenizer(
-                processed_text,
-                max_length=512,
-                padding=True,
-                truncation=True,
-                return_tensors="pt",
-            )
-
-            # 转移到设备
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-
             # 预测
-            assert torch is not None
-            assert self.model is not None
-            with torch.no_grad():
-                outputs = self.model(**inputs)
-                logits = outputs.logits
-                probabilities = torch.softmax(logits, dim=1)
-                prediction = int(torch.argmax(probabilities, dim=1).item())
-
-            # 构建结果
-            confidence = probabilities[0][prediction].item()
-            label = self.sentiment_map[prediction]
-
-            # 构建概率分布字典
-            prob_dist = {}
-            for label_name, prob in zip(self.sentiment_map.values(), probabilities[0]):
-                prob_dist[label_name] = prob.item()
-
-            return SentimentResult(
-                text=text,
-                sentiment_label=label,
-                confidence=confidence,
-                probability_distribution=prob_dist,
-                success=True,
-            )
+            probabilities = self.predict_probabilities([processed_text])[0]
+            return self._build_result(text, probabilities)
 
         except Exception as e:
             return SentimentResult(
@@ -356,6 +547,23 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False,
             )
 
+    def _build_result(self, text: str, probabilities: List[float]) -> SentimentResult:
+        """根据概率分布构建成功的分析结果"""
+        prediction = max(range(len(probabilities)), key=probabilities.__getitem__)
+
+        # 构建概率分布字典
+        prob_dist = {}
+        for label_name, prob in zip(self.sentiment_map.values(), probabilities):
+            prob_dist[label_name] = float(prob)
+
+        return SentimentResult(
+            text=text,
+            sentiment_label=self.sentiment_map[prediction],
+            confidence=float(probabilities[prediction]),
+            probability_distribution=prob_dist,
+            success=True,
+        )
+
     def analyze_batch(
         self, texts: List[str], show_progress: bool = True
     ) -> BatchSentimentResult:
@@ -401,17 +609,32 @@ class WeiboMultilingualSentimentAnalyzer:
                 analysis_performed=False,
             )
 
-        results = []
-        success_count = 0
-        total_confidence = 0.0
-
+        results: List[Optional[SentimentResult]] = [None] * len(texts)
+        valid = []  # (下标, 预处理后文本)
         for i, text in enumerate(texts):
-            if show_progress and len(texts) > 1:
-                print(f"处理进度: {i + 1}/{len(texts)}")
+            processed_text = self._preprocess_text(text)
+            if processed_text:
+                valid.append((i, processed_text))
+            else:
+                # 空文本走单条路径，得到统一的错误结果
+                results[i] = self.analyze_single_text(text)
 
-            result = self.analyze_single_text(text)
-            results.append(result)
+        # 按批推理；某批失败时退回逐条分析，只影响该批
+        for start in range(0, len(valid), self.BATCH_SIZE):
+            chunk = valid[start:start + self.BATCH_SIZE]
+            if show_progress and len(texts) > 1:
+                print(f"处理进度: {min(start + len(chunk), len(valid))}/{len(valid)}")
+            try:
+                probabilities = self.predict_probabilities([t for _, t in chunk])
+                for (i, _), probs in zip(chunk, probabilities):
+                    results[i] = self._build_result(texts[i], probs)
+            except Exception:
+                for i, _ in chunk:
+                    results[i] = self.analyze_single_text(texts[i])
 
+        success_count = 0
+        total_confidence = 0.0
+        for result in results:
             if result.success:
                 success_count += 1
                 total_confidence += result.confidence
@@ -599,7 +822,8 @@ class WeiboMultilingualSentimentAnalyzer:
             模型信息字典
         """
         return {
-            "model_name": "tabularisai/multilingual-sentiment-analysis",
+            "model_name": MODEL_NAME,
+            "backend": self.backend,
             "supported_languages": [
                 "中文",
                 "英文",
@@ -634,6 +858,37 @@ class WeiboMultilingualSentimentAnalyzer:
 multilingual_sentiment_analyzer = WeiboMultilingualSentimentAnalyzer()
 
 
+_warmup_thread: Optional[threading.Thread] = None
+
+
+def start_background_warmup(
+    analyzer: Optional[WeiboMultilingualSentimentAnalyzer] = None,
+) -> Optional[threading.Thread]:
+    """
+    在后台线程中预加载情感分析模型（每个进程只启动一次）
+    供 Streamlit 页面渲染完成后调用，使界面先可用、模型随后就绪；
+    可通过环境变量 SENTIMENT_WARMUP=false 关闭。
+
+    Returns:
+        预热线程；未启用或无需预热时返回 None
+    """
+    global _warmup_thread
+    analyzer = analyzer or multilingual_sentiment_analyzer
+    if not SENTIMENT_WARMUP or analyzer.is_disabled or analyzer.is_initialized:
+        return None
+    if _warmup_thread is not None:
+        return _warmup_thread
+
+    def _warmup():
+        started = time.time()
+        if analyzer.initialize():
+            print(f"情感分析模型后台预热完成，用时 {time.time() - started:.1f}s")
+
+    _warmup_thread = threading.Thread(target=_warmup, name="sentiment-warmup", daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
+
+
 def enable_sentiment_analysis() -> bool:
     """Public helper to enable sentiment analysis at runtime."""
     return multilingual_sentiment_analyzer.enable()
@@ -0,0 +1,288 @@
+"""
+多语言情感分析模型的 ONNX Runtime 推理后端（int8 动态量化，CPU）
+
+首次使用时将本地 PyTorch 模型导出为 ONNX 并做 int8 动态量化，产物缓存在模型目录旁
+（WeiboMultilingualSentiment/model_onnx/），之后直接由 onnxruntime 加载，无需再加载 PyTorch 权重。
+源模型更新（config.json 修改时间变化）后会自动重新导出。
+
+命令行:
+    python -m MarketEngine.tools.sentiment_onnx export   # 导出并量化
+    python -m MarketEngine.tools.sentiment_onnx check    # 与 PyTorch 推理结果对比精度漂移
+    python -m MarketEngine.tools.sentiment_onnx bench    # 吞吐量对比
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Any, Dict, List, Optional
+
+ONNX_DIRNAME = "model_onnx"
+FP32_FILENAME = "model.onnx"
+INT8_FILENAME = "model.int8.onnx"
+META_FILENAME = "export_meta.json"
+ONNX_OPSET = 14
+
+# 精度漂移检查与吞吐测试使用的多语言样例
+SAMPLE_TEXTS = [
+    "今天天气真好，心情特别棒！",
+    "这家餐厅的菜味道非常棒！",
+    "服务态度太差了，很失望",
+    "物流很慢，包装也破了，不会再买了。",
+    "一般般吧，没有想象中那么好，也不算差。",
+    "新款的续航提升明显，值得推荐。",
+    "客服踢皮球，问题拖了一个月都没解决！",
+    "I absolutely love this product!",
+    "The customer service was disappointing.",
+    "It's okay, nothing special.",
+    "¡Me encanta este lugar, volveré pronto!",
+    "この商品は最悪です。二度と買いません。",
+    "정말 좋은 경험이었어요. 강력 추천합니다.",
+    "Das Essen war leider kalt und teuer.",
+    "Le film était magnifique, j'ai adoré.",
+]
+
+
+def onnx_dir_for(model_path: str) -> str:
+    """返回与本地模型目录相邻的 ONNX 缓存目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(model_path)), ONNX_DIRNAME)
+
+
+def _source_signature(model_path: str) -> Dict[str, Any]:
+    """以源模型配置文件的修改时间作为导出缓存的失效依据"""
+    config_path = os.path.join(model_path, "config.json")
+    mtime = os.path.getmtime(config_path) if os.path.exists(config_path) else 0.0
+    return {"model_path": os.path.abspath(model_path), "config_mtime": mtime}
+
+
+def is_export_current(model_path: str) -> bool:
+    """判断缓存的量化模型是否存在且与源模型一致"""
+    out_dir = onnx_dir_for(model_path)
+    meta_path = os.path.join(out_dir, META_FILENAME)
+    if not (os.path.exists(os.path.join(out_dir, INT8_FILENAME)) and os.path.exists(meta_path)):
+        return False
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return meta.get("source") == _source_signature(model_path)
+
+
+def export_quantized_onnx(model_path: str, force: bool = False) -> str:
+    """
+    将本地 PyTorch 模型导出为 ONNX 并做 int8 动态量化
+
+    Args:
+        model_path: 本地模型目录（含 config.json 与权重）
+        force: 为 True 时忽略缓存重新导出
+
+    Returns:
+        量化后 ONNX 模型路径
+    """
+    out_dir = onnx_dir_for(model_path)
+    int8_path = os.path.join(out_dir, INT8_FILENAME)
+    if not force and is_export_current(model_path):
+        return int8_path
+
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSequenceClassification
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    os.makedirs(out_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    model.eval()
+
+    input_names = list(tokenizer.model_input_names)
+    dummy = tokenizer(["导出示例文本", "export sample"], padding=True, return_tensors="pt")
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = os.path.join(out_dir, FP32_FILENAME)
+    print(f"正在导出 ONNX 模型: {fp32_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+            do_constant_folding=True,
+        )
+
+    print(f"正在进行 int8 动态量化: {int8_path}")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    meta = {
+        "source": _source_signature(model_path),
+        "input_names": input_names,
+        "num_labels": int(model.config.num_labels),
+        "id2label": {str(k): v for k, v in model.config.id2label.items()},
+        "opset": ONNX_OPSET,
+        "exported_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(os.path.join(out_dir, META_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print("ONNX 量化模型导出完成")
+    return int8_path
+
+
+def default_intra_op_threads() -> int:
+    """默认 intra-op 线程数：环境变量 SENTIMENT_ONNX_THREADS 优先，否则使用全部逻辑核"""
+    env_value = os.getenv("SENTIMENT_ONNX_THREADS")
+    if env_value and env_value.isdigit() and int(env_value) > 0:
+        return int(env_value)
+    return max(os.cpu_count() or 1, 1)
+
+
+class OnnxSentimentSession:
+    """
+    量化 ONNX 模型的推理会话
+    输入为分词器产出的 numpy 数组，输出为 softmax 后的概率矩阵
+    """
+
+    def __init__(self, model_path: str, intra_op_threads: Optional[int] = None):
+        import onnxruntime as ort
+
+        onnx_path = os.path.join(onnx_dir_for(model_path), INT8_FILENAME)
+        with open(os.path.join(onnx_dir_for(model_path), META_FILENAME), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads or default_intra_op_threads()
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.num_labels = int(self.meta.get("num_labels", 0))
+        self.intra_op_threads = options.intra_op_num_threads
+
+    def predict_proba(self, encoded: Dict[str, Any]):
+        """
+        Args:
+            encoded: 分词器输出（return_tensors="np"）
+
+        Returns:
+            形状为 (batch, num_labels) 的概率矩阵
+        """
+        import numpy as np
+
+        feeds = {name: np.asarray(encoded[name], dtype=np.int64) for name in self.input_names}
+        logits = self.session.run(["logits"], feeds)[0]
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+# ==================== 精度漂移检查与吞吐测试 ====================
+
+def _load_texts(path: Optional[str]) -> List[str]:
+    if not path:
+        return list(SAMPLE_TEXTS)
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _build_analyzers():
+    """分别构建 PyTorch 与 ONNX 后端的分析器"""
+    from MarketEngine.tools.sentiment_analyzer import WeiboMultilingualSentimentAnalyzer
+
+    torch_analyzer = WeiboMultilingualSentimentAnalyzer(backend="torch")
+    onnx_analyzer = WeiboMultilingualSentimentAnalyzer(backend="onnx")
+    if not torch_analyzer.initialize() or not onnx_analyzer.initialize():
+        raise RuntimeError("模型初始化失败")
+    if onnx_analyzer.backend != "onnx":
+        raise RuntimeError(f"ONNX 后端不可用: {onnx_analyzer.disable_reason or '已回退到 PyTorch'}")
+    return torch_analyzer, onnx_analyzer
+
+
+def check_drift(texts: List[str], min_agreement: float = 0.95, max_prob_diff: float = 0.15) -> bool:
+    """
+    对比 ONNX(int8) 与 PyTorch 的预测结果
+
+    Args:
+        texts: 待对比文本
+        min_agreement: 标签一致率下限
+        max_prob_diff: 单条样本概率分布最大绝对差的上限
+
+    Returns:
+        是否通过检查
+    """
+    torch_analyzer, onnx_analyzer = _build_analyzers()
+    torch_probs = torch_analyzer.predict_probabilities(texts)
+    onnx_probs = onnx_analyzer.predict_probabilities(texts)
+
+    agree, worst = 0, 0.0
+    for text, p_t, p_o in zip(texts, torch_probs, onnx_probs):
+        label_t = max(range(len(p_t)), key=p_t.__getitem__)
+        label_o = max(range(len(p_o)), key=p_o.__getitem__)
+        diff = max(abs(a - b) for a, b in zip(p_t, p_o))
+        worst = max(worst, diff)
+        if label_t == label_o:
+            agree += 1
+        else:
+            print(f"[不一致] {text[:40]} -> torch={torch_analyzer.sentiment_map[label_t]} "
+                  f"onnx={onnx_analyzer.sentiment_map[label_o]} (diff={diff:.4f})")
+
+    agreement = agree / len(texts) if texts else 1.0
+    passed = agreement >= min_agreement and worst <= max_prob_diff
+    print(f"标签一致率: {agreement:.2%}（阈值 {min_agreement:.0%}），最大概率差: {worst:.4f}（阈值 {max_prob_diff}）")
+    print("精度漂移检查通过" if passed else "精度漂移检查未通过")
+    return passed
+
+
+def benchmark(texts: List[str], rounds: int = 5, batch_size: int = 16) -> Dict[str, float]:
+    """以相同文本与批大小对比两种后端的吞吐量（条/秒）"""
+    analyzers = dict(zip(("torch", "onnx"), _build_analyzers()))
+    stats = {}
+    for name, analyzer in analyzers.items():
+        analyzer.predict_probabilities(texts[:batch_size])  # 预热
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for i in range(0, len(texts), batch_size):
+                analyzer.predict_probabilities(texts[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        stats[name] = len(texts) * rounds / elapsed if elapsed > 0 else 0.0
+        print(f"{name:>5}: {stats[name]:.1f} 条/秒")
+    if stats.get("torch"):
+        print(f"加速比: {stats['onnx'] / stats['torch']:.2f}x")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="多语言情感模型 ONNX int8 后端工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = sub.add_parser("export", help="导出并量化 ONNX 模型")
+    export_parser.add_argument("--force", action="store_true", help="忽略缓存重新导出")
+
+    check_parser = sub.add_parser("check", help="与 PyTorch 推理结果对比精度漂移")
+    check_parser.add_argument("--texts", help="每行一条文本的样本文件，默认使用内置多语言样例")
+    check_parser.add_argument("--min-agreement", type=float, default=0.95, help="标签一致率下限 (默认0.95)")
+    check_parser.add_argument("--max-prob-diff", type=float, default=0.15, help="概率最大绝对差上限 (默认0.15)")
+
+    bench_parser = sub.add_parser("bench", help="吞吐量对比")
+    bench_parser.add_argument("--texts", help="每行一条文本的样本文件，默认使用内置多语言样例")
+    bench_parser.add_argument("--rounds", type=int, default=5, help="重复轮数 (默认5)")
+    bench_parser.add_argument("--batch-size", type=int, default=16, help="批大小 (默认16)")
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        from MarketEngine.tools.sentiment_analyzer import LOCAL_MODEL_PATH
+        print(export_quantized_onnx(LOCAL_MODEL_PATH, force=args.force))
+    elif args.command == "check":
+        sys.exit(0 if check_drift(_load_texts(args.texts), args.min_agreement, args.max_prob_diff) else 1)
+    else:
+        benchmark(_load_texts(args.texts), rounds=args.rounds, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+本地共享情感分析推理服务
+
+由 app.py 在启动各 Engine 前拉起，整机只持有一份多语言情感模型。
+各 Engine 进程中的 WeiboMultilingualSentimentAnalyzer 在设置了 SENTIMENT_SERVER_URL 时以客户端模式
+调用本服务；服务端把一个短时间窗口内来自所有进程的请求合并成一个批次推理（动态批处理）。
+
+接口（仅监听 127.0.0.1）:
+    GET  /health   -> {"ready": bool, "disabled": bool, "reason": str, "backend": str}
+    POST /predict  {"texts": [...]} -> {"probabilities": [[...], ...], "labels": [...]}
+
+运行:
+    python -m MarketEngine.tools.sentiment_server --port 8765
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional
+
+# 允许以脚本方式直接运行
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 15
+MAX_TEXTS_PER_REQUEST = 2000
+
+
+class _PendingRequest:
+    """等待批处理结果的单个请求"""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result: Optional[List[List[float]]] = None
+        self.error: Optional[BaseException] = None
+
+
+class DynamicBatcher:
+    """
+    动态批处理器
+    第一个请求到达后最多等待 max_wait_ms，期间到达的请求合并为一个批次，
+    凑满 max_batch_size 条文本时立即执行。
+    """
+
+    def __init__(self, predict_fn: Callable[[List[str]], List[List[float]]],
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: int = DEFAULT_MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="sentiment-batcher", daemon=True)
+        self._thread.start()
+
+        # 批处理统计，用于观察批次填充率
+        self.batches = 0
+        self.texts = 0
+
+    def submit(self, texts: List[str], timeout: float = 120.0) -> List[List[float]]:
+        """提交文本并阻塞等待结果"""
+        pending = _PendingRequest(texts)
+        self._queue.put(pending)
+        if not pending.done.wait(timeout):
+            raise TimeoutError("情感分析推理超时")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result or []
+
+    def _collect(self) -> List[_PendingRequest]:
+        first = self._queue.get()
+        batch = [first]
+        count = len(first.texts)
+        deadline = time.monotonic() + self.max_wait
+        while count < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(item)
+            count += len(item.texts)
+        return batch
+
+    def _loop(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = [t for item in batch for t in item.texts]
+            try:
+                probabilities: List[List[float]] = []
+                for i in range(0, len(texts), self.max_batch_size):
+                    probabilities.extend(self.predict_fn(texts[i:i + self.max_batch_size]))
+                    self.batches += 1
+                self.texts += len(texts)
+                offset = 0
+                for item in batch:
+                    item.result = probabilities[offset:offset + len(item.texts)]
+                    offset += len(item.texts)
+            except BaseException as e:  # 将错误传回每个等待的请求
+                for item in batch:
+                    item.error = e
+            finally:
+                for item in batch:
+                    item.done.set()
+
+
+class SentimentServer:
+    """持有唯一模型实例的推理服务"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE, max_wait_ms: int = DEFAULT_MAX_WAIT_MS,
+                 backend: Optional[str] = None):
+        from MarketEngine.tools.sentiment_analyzer import WeiboMultilingualSentimentAnalyzer
+
+        self.host = host
+        self.port = port
+        # 服务端始终在本进程内加载模型，不能再以客户端模式转发给自己
+        self.analyzer = WeiboMultilingualSentimentAnalyzer(backend=backend, server_url="")
+        self.batcher = DynamicBatcher(self.analyzer.predict_probabilities, max_batch_size, max_wait_ms)
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):  # 静默默认访问日志
+                pass
+
+            def _send_json(self, status: int, payload: dict) -> None:
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path != "/health":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                analyzer = server.analyzer
+                self._send_json(200, {
+                    "ready": analyzer.is_initialized,
+                    "disabled": analyzer.is_disabled,
+                    "reason": analyzer.disable_reason,
+                    "backend": analyzer.backend,
+                    "batches": server.batcher.batches,
+                    "texts": server.batcher.texts,
+                })
+
+            def do_POST(self):
+                if self.path != "/predict":
+                    self._send_json(404, {"error": "not found"})
+                    return
+                analyzer = server.analyzer
+                if not analyzer.is_initialized:
+                    self._send_json(503, {"error": analyzer.disable_reason or "模型尚未加载完成"})
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                    texts = [str(t) for t in payload.get("texts", [])]
+                except (ValueError, TypeError) as e:
+                    self._send_json(400, {"error": f"请求格式错误: {e}"})
+                    return
+                if len(texts) > MAX_TEXTS_PER_REQUEST:
+                    self._send_json(413, {"error": f"单次请求最多 {MAX_TEXTS_PER_REQUEST} 条文本"})
+                    return
+                try:
+                    probabilities = server.batcher.submit(texts) if texts else []
+                except Exception as e:
+                    self._send_json(500, {"error": f"推理失败: {e}"})
+                    return
+                self._send_json(200, {
+                    "probabilities": probabilities,
+                    "labels": list(analyzer.sentiment_map.values()),
+                })
+
+        return Handler
+
+    def serve_forever(self) -> None:
+        """在后台加载模型，同时立即开始监听（加载完成前 /health 返回 ready=false）"""
+        threading.Thread(target=self.analyzer.initialize, name="sentiment-model-loader", daemon=True).start()
+        print(f"情感分析推理服务已启动: http://{self.host}:{self.port}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地共享情感分析推理服务（动态批处理）")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址 (默认127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口 (默认{DEFAULT_PORT})")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE, help="单批最大文本数")
+    parser.add_argument("--max-wait-ms", type=int, default=DEFAULT_MAX_WAIT_MS, help="凑批最长等待毫秒数")
+    parser.add_argument("--backend", choices=["torch", "onnx"], default=None, help="推理后端，默认读取 SENTIMENT_BACKEND")
+    args = parser.parse_args()
+
+    SentimentServer(args.host, args.port, args.max_batch_size, args.max_wait_ms, args.backend).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -72,10 +72,64 @@ class DatabaseManager:
 
     # ==================== 新闻数据操作 ====================
 
+    # 批量写入时每个保存点包含的行数
+    BULK_CHUNK_SIZE = 200
+
+    def _upsert_sql(self, table: str, columns: List[str], conflict_cols: List[str], update_cols: List[str]) -> str:
+        """
+        按数据库方言生成 "插入或更新" 语句
+
+        Args:
+            table: 表名
+            columns: 插入列
+            conflict_cols: 唯一键列（PostgreSQL ON CONFLICT 使用）
+            update_cols: 冲突时需要更新的列
+        """
+        cols = ", ".join(columns)
+        values = ", ".join(f":{c}" for c in columns)
+        sql = f"INSERT INTO {table} ({cols}) VALUES ({values})"
+        if self.engine.dialect.name == "postgresql":
+            updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
+            return f"{sql} ON CONFLICT ({', '.join(conflict_cols)}) DO UPDATE SET {updates}"
+        updates = ", ".join(f"{c} = VALUES({c})" for c in update_cols)
+        return f"{sql} ON DUPLICATE KEY UPDATE {updates}"
+
+    def _bulk_execute(self, conn, sql: str, rows: List[Dict], label: str) -> int:
+        """
+        在当前事务内分块批量执行（executemany），某块失败时仅对该块逐行回退
+
+        每块和每行都在独立保存点中执行，失败的行只回滚自身，不影响同一事务内的其他行。
+
+        Returns:
+            成功写入的行数
+        """
+        stmt = text(sql)
+        saved = 0
+        for i in range(0, len(rows), self.BULK_CHUNK_SIZE):
+            chunk = rows[i:i + self.BULK_CHUNK_SIZE]
+            try:
+                with conn.begin_nested():
+                    conn.execute(stmt, chunk)
+                saved += len(chunk)
+                continue
+            except Exception as e:
+                logger.warning(f"批量写入{label}失败，改为逐行写入该批 {len(chunk)} 条: {e}")
+
+            for row in chunk:
+                try:
+                    with conn.begin_nested():
+                        conn.execute(stmt, row)
+                    saved += 1
+                except Exception as e:
+                    logger.exception(f"保存单条{label}失败: {e}")
+        return saved
+
     def save_daily_news(self, news_data: List[Dict], crawl_date: date = None) -> int:
         """
         保存每日新闻数据，如果当天已有数据则覆盖
 
+        在单个事务内按 news_id 批量插入或更新，再清理当天不在本次结果中的旧记录。
+
         Args:
             news_data: 新闻数据列表
             crawl_date: 爬取日期，默认为今天
@@ -88,52 +142,49 @@ class DatabaseManager:
 
         current_timestamp = int(datetime.now().timestamp())
 
+        rows = {}
+        for news_item in news_data:
+            # news_item.get('id') 已经是完整的 news_id（格式：source_item_id）
+            # 为了支持同一条新闻在不同日期出现，将 crawl_date 加入到 news_id 中
+            base_news_id = news_item.get(
+                'id') or f"{news_item.get('source', 'unknown')}_rank_{news_item.get('rank', 0)}"
+            # 将日期格式化为字符串并加入到 news_id 中，确保全局唯一性
+            news_id = f"{base_news_id}_{crawl_date.strftime('%Y%m%d')}"
+
+            title_val = (news_item.get("title", "") or "")
+            if len(title_val) > 500:
+                title_val = title_val[:500]
+            # 同一批次内重复的 news_id 以最后一条为准
+            rows[news_id] = {
+                "news_id": news_id,
+                "source_platform": news_item.get("source", "unknown"),
+                "title": title_val,
+                "url": news_item.get("url", ""),
+                "crawl_date": crawl_date,
+                "rank_position": news_item.get("rank", None),
+                "add_ts": current_timestamp,
+                "last_modify_ts": current_timestamp,
+            }
+
+        sql = self._upsert_sql(
+            "daily_news",
+            ["news_id", "source_platform", "title", "url", "crawl_date",
+             "rank_position", "add_ts", "last_modify_ts"],
+            conflict_cols=["news_id"],
+            update_cols=["source_platform", "title", "url", "crawl_date",
+                         "rank_position", "last_modify_ts"],
+        )
+
         try:
-            saved_count = 0
-            # 先独立事务执行删除，防止后续插入失败导致无法清理
             with self.engine.begin() as conn:
-                deleted = conn.execute(text("DELETE FROM daily_news WHERE crawl_date = :d"), {"d": crawl_date}).rowcount
+                saved_count = self._bulk_execute(conn, sql, list(rows.values()), "新闻")
+                # 覆盖模式：本次未写入的当天旧记录视为过期
+                deleted = conn.execute(
+                    text("DELETE FROM daily_news WHERE crawl_date = :d AND last_modify_ts < :ts"),
+                    {"d": crawl_date, "ts": current_timestamp},
+                ).rowcount
                 if deleted and deleted > 0:
-                    logger.info(f"覆盖模式：删除了当天已有的 {deleted} 条新闻记录")
-
-            # 逐条插入，单条失败不影响后续（每条独立事务）
-            for news_item in news_data:
-                try:
-                    # news_item.get('id') 已经是完整的 news_id（格式：source_item_id）
-                    # 为了支持同一条新闻在不同日期出现，将 crawl_date 加入到 news_id 中
-                    base_news_id = news_item.get(
-                        'id') or f"{news_item.get('source', 'unknown')}_rank_{news_item.get('rank', 0)}"
-                    # 将日期格式化为字符串并加入到 news_id 中，确保全局唯一性
-                    news_id = f"{base_news_id}_{crawl_date.strftime('%Y%m%d')}"
-
-                    title_val = (news_item.get("title", "") or "")
-                    if len(title_val) > 500:
-                        title_val = title_val[:500]
-                    with self.engine.begin() as conn:
-                        conn.execute(
-                            text(
-                                """
-                                INSERT INTO daily_news (
-                                    news_id, source_platform, title, url, crawl_date,
-                                    rank_position, add_ts, last_modify_ts
-                                ) VALUES (:news_id, :source_platform, :title, :url, :crawl_date, :rank_position, :add_ts, :last_modify_ts)
-                                """
-                            ),
-                            {
-                                "news_id": news_id,
-                                "source_platform": news_item.get("source", "unknown"),
-                                "title": title_val,
-                                "url": news_item.get("url", ""),
-                                "crawl_date": crawl_date,
-                                "rank_position": news_item.get("rank", None),
-                                "add_ts": current_timestamp,
-                                "last_modify_ts": current_timestamp,
-                            },
-                        )
-                    saved_count += 1
-                except Exception as e:
-                    logger.exception(f"保存单条新闻失败: {e}")
-                    continue
+                    logger.info(f"覆盖模式：删除了当天已过期的 {deleted} 条新闻记录")
             logger.info(f"成功保存 {saved_count} 条新闻记录")
             return saved_count
         except Exception as e:
@@ -185,29 +236,22 @@ class DatabaseManager:
             # 为了支持外键引用，topic_id 需要全局唯一，所以将日期加入到 topic_id 中
             topic_id = f"summary_{extract_date.strftime('%Y%m%d')}"
 
+            sql = self._upsert_sql(
+                "daily_topics",
+                ["extract_date", "topic_id", "topic_name", "keywords", "topic_description",
+                 "add_ts", "last_modify_ts"],
+                conflict_cols=["topic_id"],
+                update_cols=["topic_name", "keywords", "topic_description", "add_ts", "last_modify_ts"],
+            )
+            row = {"extract_date": extract_date, "topic_id": topic_id, "topic_name": "每日新闻分析",
+                   "keywords": keywords_json, "topic_description": summary,
+                   "add_ts": current_timestamp, "last_modify_ts": current_timestamp}
+
             with self.engine.begin() as conn:
-                check = conn.execute(
-                    text("SELECT id FROM daily_topics WHERE extract_date = :d AND topic_id = :tid"),
-                    {"d": extract_date, "tid": topic_id},
-                ).first()
-                if check:
-                    conn.execute(
-                        text(
-                            "UPDATE daily_topics SET keywords = :k, topic_description = :s, add_ts = :ts, last_modify_ts = :lmt, topic_name = :tn WHERE extract_date = :d AND topic_id = :tid"
-                        ),
-                        {"k": keywords_json, "s": summary, "ts": current_timestamp, "lmt": current_timestamp,
-                         "d": extract_date, "tid": topic_id, "tn": "每日新闻分析"},
-                    )
-                    logger.info(f"更新了 {extract_date} 的话题分析")
-                else:
-                    conn.execute(
-                        text(
-                            "INSERT INTO daily_topics (extract_date, topic_id, topic_name, keywords, topic_description, add_ts, last_modify_ts) VALUES (:d, :tid, :tn, :k, :s, :ts, :lmt)"
-                        ),
-                        {"d": extract_date, "tid": topic_id, "tn": "每日新闻分析", "k": keywords_json, "s": summary,
-                         "ts": current_timestamp, "lmt": current_timestamp},
-                    )
-                    logger.info(f"保存了 {extract_date} 的话题分析")
+                saved = self._bulk_execute(conn, sql, [row], "话题分析")
+            if not saved:
+                return False
+            logger.info(f"保存了 {extract_date} 的话题分析")
             return True
         except Exception as e:
             logger.exception(f"保存话题分析失败: {e}")
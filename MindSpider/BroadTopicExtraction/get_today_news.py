@@ -6,12 +6,14 @@ BroadTopicExtraction模块 - 新闻获取和收集
 """
 
 import sys
+import time
 import asyncio
 import httpx
 import json
 from datetime import datetime, date
 from pathlib import Path
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 from loguru import logger
 
 # 添加项目根目录到路径
@@ -42,13 +44,69 @@ SOURCE_NAMES = {
     "xueqiu": "雪球热榜"
 }
 
+# 请求头（所有新闻源共用）
+REQUEST_HEADERS = {
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    ),
+    "Referer": BASE_URL,
+    "Connection": "keep-alive",
+}
+
+# 并发抓取参数
+SOURCE_TIMEOUT = 15.0        # 单个新闻源单次请求超时（秒）
+SOURCE_RETRIES = 2           # 单个新闻源失败后的最大重试次数
+SOURCE_TOTAL_BUDGET = 40.0   # 单个新闻源（含重试）的总耗时上限（秒）
+HOST_MIN_INTERVAL = 0.5      # 同一主机相邻两次请求发起的最小间隔（秒）
+MAX_CONNECTIONS = 8          # 共享连接池的最大连接数
+
+
+class HostRateLimiter:
+    """按主机限速：保证同一主机上相邻两次请求的发起间隔不小于 min_interval"""
+
+    def __init__(self, min_interval: float = HOST_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._last_request: Dict[str, float] = {}
+
+    async def acquire(self, url: str):
+        """等待直到允许向 url 所在主机发起下一次请求"""
+        host = urlsplit(url).netloc
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            wait = self._last_request.get(host, 0.0) + self.min_interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_request[host] = time.monotonic()
+
+
 class NewsCollector:
     """新闻收集器 - 整合API调用和数据库存储"""
     
-    def __init__(self):
-        """初始化新闻收集器"""
+    def __init__(self,
+                 timeout: float = SOURCE_TIMEOUT,
+                 max_retries: int = SOURCE_RETRIES,
+                 total_budget: float = SOURCE_TOTAL_BUDGET,
+                 host_min_interval: float = HOST_MIN_INTERVAL):
+        """
+        初始化新闻收集器
+
+        Args:
+            timeout: 单个新闻源单次请求超时（秒）
+            max_retries: 单个新闻源失败后的最大重试次数
+            total_budget: 单个新闻源（含重试）的总耗时上限（秒）
+            host_min_interval: 同一主机相邻请求的最小间隔（秒）
+        """
         self.db_manager = DatabaseManager()
         self.supported_sources = list(SOURCE_NAMES.keys())
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.total_budget = total_budget
+        self.rate_limiter = HostRateLimiter(host_min_interval)
     
     def close(self):
         """关闭资源"""
@@ -69,85 +127,126 @@ class NewsCollector:
     
     # ==================== 新闻API调用 ====================
     
-    async def fetch_news(self, source: str) -> dict:
-        """从指定源获取最新新闻"""
+    def _create_client(self) -> httpx.AsyncClient:
+        """创建所有新闻源共享的连接池客户端"""
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            headers=REQUEST_HEADERS,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS,
+                                max_keepalive_connections=MAX_CONNECTIONS),
+        )
+
+    async def fetch_news(self, source: str, client: Optional[httpx.AsyncClient] = None) -> dict:
+        """
+        从指定源获取最新新闻
+
+        Args:
+            source: 新闻源ID
+            client: 共享的httpx客户端，None时临时创建一个
+
+        Returns:
+            获取结果字典，包含 status、latency（秒）和 attempts（尝试次数）
+        """
+        if client is None:
+            async with self._create_client() as own_client:
+                return await self.fetch_news(source, own_client)
+
         url = f"{BASE_URL}/api/s?id={source}&latest"
-        headers = {
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/124.0.0.0 Safari/537.36"
-            ),
-            "Referer": BASE_URL,
-            "Connection": "keep-alive",
-        }
-        
+        started = time.monotonic()
+        attempts = 0
+        result: dict = {}
+
+        async def _attempt_loop():
+            nonlocal attempts, result
+            for attempt in range(self.max_retries + 1):
+                attempts = attempt + 1
+                result = await self._fetch_once(client, source, url)
+                # 4xx 属于请求本身的问题，重试无意义
+                if result["status"] == "success" or result.get("retryable") is False:
+                    return
+                if attempt < self.max_retries:
+                    await asyncio.sleep(min(2 ** attempt, 5))
+
         try:
-            async with httpx.AsyncClient(timeout=30.0, follow_redirects=True) as client:
-                response = await client.get(url, headers=headers)
-                response.raise_for_status()
-                
-                # 解析JSON响应
-                data = response.json()
-                return {
-                    "source": source,
-                    "status": "success",
-                    "data": data,
-                    "timestamp": datetime.now().isoformat()
-                }
+            await asyncio.wait_for(_attempt_loop(), timeout=self.total_budget)
+        except asyncio.TimeoutError:
+            result = {
+                "source": source,
+                "status": "timeout",
+                "error": f"超出总耗时预算 {self.total_budget}s: {source}({url})",
+            }
+
+        result.pop("retryable", None)
+        result["latency"] = round(time.monotonic() - started, 3)
+        result["attempts"] = attempts
+        result["timestamp"] = datetime.now().isoformat()
+        return result
+
+    async def _fetch_once(self, client: httpx.AsyncClient, source: str, url: str) -> dict:
+        """对单个新闻源发起一次请求"""
+        await self.rate_limiter.acquire(url)
+        try:
+            response = await client.get(url)
+            response.raise_for_status()
+
+            # 解析JSON响应
+            data = response.json()
+            return {
+                "source": source,
+                "status": "success",
+                "data": data,
+            }
         except httpx.TimeoutException:
             return {
                 "source": source,
                 "status": "timeout",
                 "error": f"请求超时: {source}({url})",
-                "timestamp": datetime.now().isoformat()
             }
         except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
             return {
                 "source": source,
                 "status": "http_error",
-                "error": f"HTTP错误: {source}({url}) - {e.response.status_code}",
-                "timestamp": datetime.now().isoformat()
+                "error": f"HTTP错误: {source}({url}) - {status_code}",
+                "retryable": status_code == 429 or status_code >= 500,
             }
         except Exception as e:
             return {
                 "source": source,
                 "status": "error",
                 "error": f"未知错误: {source}({url}) - {str(e)}",
-                "timestamp": datetime.now().isoformat()
             }
-    
+
     async def get_popular_news(self, sources: List[str] = None) -> List[dict]:
-        """获取热门新闻"""
+        """并发获取热门新闻（共享连接池，按主机限速）"""
         if sources is None:
             sources = list(SOURCE_NAMES.keys())
-        
-        logger.info(f"正在获取 {len(sources)} 个新闻源的最新内容...")
+
+        logger.info(f"正在并发获取 {len(sources)} 个新闻源的最新内容...")
         logger.info("=" * 80)
-        
-        results = []
-        for source in sources:
-            source_name = SOURCE_NAMES.get(source, source)
-            logger.info(f"正在获取 {source_name} 的新闻...")
-            result = await self.fetch_news(source)
-            results.append(result)
-            
+
+        started = time.monotonic()
+        async with self._create_client() as client:
+            results = await asyncio.gather(
+                *(self.fetch_news(source, client) for source in sources)
+            )
+
+        for result in results:
+            source_name = SOURCE_NAMES.get(result["source"], result["source"])
+            timing = f"耗时 {result['latency']:.2f}s，尝试 {result['attempts']} 次"
             if result["status"] == "success":
                 data = result["data"]
                 if 'items' in data and isinstance(data['items'], list):
                     count = len(data['items'])
-                    logger.info(f"✓ {source_name}: 获取成功，共 {count} 条新闻")
+                    logger.info(f"✓ {source_name}: 获取成功，共 {count} 条新闻（{timing}）")
                 else:
-                    logger.info(f"✓ {source_name}: 获取成功")
+                    logger.info(f"✓ {source_name}: 获取成功（{timing}）")
             else:
-                logger.error(f"✗ {source_name}: {result.get('error', '获取失败')}")
-            
-            # 避免请求过快
-            await asyncio.sleep(0.5)
-        
-        return results
+                logger.error(f"✗ {source_name}: {result.get('error', '获取失败')}（{timing}）")
+
+        logger.info(f"全部新闻源获取完成，总耗时 {time.monotonic() - started:.2f}s")
+        return list(results)
     
     # ==================== 数据处理和存储 ====================
     
@@ -211,10 +310,12 @@ class NewsCollector:
         news_list = []
         successful_sources = 0
         total_news = 0
+        source_latency = {}
         
         for result in results:
             source = result['source']
             status = result['status']
+            source_latency[source] = result.get('latency')
             
             if status == 'success':
                 successful_sources += 1
@@ -236,6 +337,7 @@ class NewsCollector:
             'successful_sources': successful_sources,
             'total_sources': len(results),
             'total_news': total_news,
+            'source_latency': source_latency,
             'collection_time': datetime.now().isoformat()
         }
     
@@ -279,6 +381,12 @@ class NewsCollector:
         collection_summary_message += f"总新闻数: {data['total_news']}\n"
         if 'saved_count' in data:
             collection_summary_message += f"已保存数: {data['saved_count']}\n"
+        latencies = {k: v for k, v in data.get('source_latency', {}).items() if v is not None}
+        if latencies:
+            slowest = max(latencies, key=latencies.get)
+            collection_summary_message += (
+                f"最慢新闻源: {SOURCE_NAMES.get(slowest, slowest)} ({latencies[slowest]:.2f}s)\n"
+            )
         logger.info(collection_summary_message)
     
     def get_today_news(self) -> List[Dict]:
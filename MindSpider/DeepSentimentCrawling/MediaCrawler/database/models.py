@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger
+from sqlalchemy import create_engine, Column, Integer, Text, String, BigInteger, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -28,6 +28,17 @@ class BilibiliVideo(Base):
     video_comment = Column(Text)
     video_cover_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 数值化互动指标与热度分（写入时由 tools/hotness.py 计算；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    coin_num = Column(BigInteger, default=0)
+    danmaku_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, default=None)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index('ix_bilibili_video_publish_hotness', 'create_time', 'hotness_score'),)
 
 class BilibiliVideoComment(Base):
     __tablename__ = 'bilibili_video_comment'
@@ -119,6 +130,17 @@ class DouyinAweme(Base):
     music_download_url = Column(Text)
     note_download_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 数值化互动指标与热度分（写入时由 tools/hotness.py 计算；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    coin_num = Column(BigInteger, default=0)
+    danmaku_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, default=None)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index('ix_douyin_aweme_publish_hotness', 'create_time', 'hotness_score'),)
 
 class DouyinAwemeComment(Base):
     __tablename__ = 'douyin_aweme_comment'
@@ -177,6 +199,17 @@ class KuaishouVideo(Base):
     video_cover_url = Column(Text)
     video_play_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 数值化互动指标与热度分（写入时由 tools/hotness.py 计算；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    coin_num = Column(BigInteger, default=0)
+    danmaku_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, default=None)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index('ix_kuaishou_video_publish_hotness', 'create_time', 'hotness_score'),)
 
 class KuaishouVideoComment(Base):
     __tablename__ = 'kuaishou_video_comment'
@@ -212,6 +245,17 @@ class WeiboNote(Base):
     shared_count = Column(Text)
     note_url = Column(Text)
     source_keyword = Column(Text, default='')
+    # 数值化互动指标与热度分（写入时由 tools/hotness.py 计算；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    coin_num = Column(BigInteger, default=0)
+    danmaku_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, default=None)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index('ix_weibo_note_publish_hotness', 'create_date_time', 'hotness_score'),)
 
 class WeiboNoteComment(Base):
     __tablename__ = 'weibo_note_comment'
@@ -289,6 +333,17 @@ class XhsNote(Base):
     note_url = Column(Text)
     source_keyword = Column(Text, default='')
     xsec_token = Column(Text)
+    # 数值化互动指标与热度分（写入时由 tools/hotness.py 计算；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    coin_num = Column(BigInteger, default=0)
+    danmaku_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, default=None)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index('ix_xhs_note_publish_hotness', 'time', 'hotness_score'),)
 
 class XhsNoteComment(Base):
     __tablename__ = 'xhs_note_comment'
@@ -386,6 +441,17 @@ class ZhihuContent(Base):
     user_url_token = Column(Text)
     add_ts = Column(BigInteger)
     last_modify_ts = Column(BigInteger)
+    # 数值化互动指标与热度分（写入时由 tools/hotness.py 计算；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num = Column(BigInteger, default=0)
+    comment_num = Column(BigInteger, default=0)
+    share_num = Column(BigInteger, default=0)
+    collect_num = Column(BigInteger, default=0)
+    coin_num = Column(BigInteger, default=0)
+    danmaku_num = Column(BigInteger, default=0)
+    view_num = Column(BigInteger, default=0)
+    hotness_score = Column(Float, default=None)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index('ix_zhihu_content_publish_hotness', 'created_time', 'hotness_score'),)
 
     # persist-1<persist1@126.com>
     # 原因：修复 ORM 模型定义错误，确保与数据库表结构一致。
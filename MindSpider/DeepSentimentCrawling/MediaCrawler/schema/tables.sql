@@ -588,3 +588,12 @@ alter table douyin_aweme_comment add column `like_count` varchar(255) NOT NULL D
 alter table xhs_note add column xsec_token varchar(50) default null comment '签名算法';
 alter table douyin_aweme_comment add column `pictures` varchar(500) NOT NULL DEFAULT '' COMMENT '评论图片列表';
 alter table bilibili_video_comment add column `like_count` varchar(255) NOT NULL DEFAULT '0' COMMENT '点赞数';
+
+-- 数值化互动指标与热度分（写入时由 tools/hotness.py 维护，历史数据可用 MindSpider/schema/migrate_engagement_columns.py 回填）
+-- 热门内容查询先按发布时间筛选再按热度排序，索引为 (发布时间列, hotness_score)
+alter table bilibili_video add column `like_num` bigint default 0 comment '点赞数', add column `comment_num` bigint default 0 comment '评论数', add column `share_num` bigint default 0 comment '分享数', add column `collect_num` bigint default 0 comment '收藏数', add column `coin_num` bigint default 0 comment '投币数', add column `danmaku_num` bigint default 0 comment '弹幕数', add column `view_num` bigint default 0 comment '播放数', add column `hotness_score` double default null comment '综合热度分', add index `ix_bilibili_video_publish_hotness` (`create_time`, `hotness_score`);
+alter table douyin_aweme add column `like_num` bigint default 0 comment '点赞数', add column `comment_num` bigint default 0 comment '评论数', add column `share_num` bigint default 0 comment '分享数', add column `collect_num` bigint default 0 comment '收藏数', add column `coin_num` bigint default 0 comment '投币数', add column `danmaku_num` bigint default 0 comment '弹幕数', add column `view_num` bigint default 0 comment '播放数', add column `hotness_score` double default null comment '综合热度分', add index `ix_douyin_aweme_publish_hotness` (`create_time`, `hotness_score`);
+alter table kuaishou_video add column `like_num` bigint default 0 comment '点赞数', add column `comment_num` bigint default 0 comment '评论数', add column `share_num` bigint default 0 comment '分享数', add column `collect_num` bigint default 0 comment '收藏数', add column `coin_num` bigint default 0 comment '投币数', add column `danmaku_num` bigint default 0 comment '弹幕数', add column `view_num` bigint default 0 comment '播放数', add column `hotness_score` double default null comment '综合热度分', add index `ix_kuaishou_video_publish_hotness` (`create_time`, `hotness_score`);
+alter table weibo_note add column `like_num` bigint default 0 comment '点赞数', add column `comment_num` bigint default 0 comment '评论数', add column `share_num` bigint default 0 comment '分享数', add column `collect_num` bigint default 0 comment '收藏数', add column `coin_num` bigint default 0 comment '投币数', add column `danmaku_num` bigint default 0 comment '弹幕数', add column `view_num` bigint default 0 comment '播放数', add column `hotness_score` double default null comment '综合热度分', add index `ix_weibo_note_publish_hotness` (`create_date_time`, `hotness_score`);
+alter table xhs_note add column `like_num` bigint default 0 comment '点赞数', add column `comment_num` bigint default 0 comment '评论数', add column `share_num` bigint default 0 comment '分享数', add column `collect_num` bigint default 0 comment '收藏数', add column `coin_num` bigint default 0 comment '投币数', add column `danmaku_num` bigint default 0 comment '弹幕数', add column `view_num` bigint default 0 comment '播放数', add column `hotness_score` double default null comment '综合热度分', add index `ix_xhs_note_publish_hotness` (`time`, `hotness_score`);
+alter table zhihu_content add column `like_num` bigint default 0 comment '点赞数', add column `comment_num` bigint default 0 comment '评论数', add column `share_num` bigint default 0 comment '分享数', add column `collect_num` bigint default 0 comment '收藏数', add column `coin_num` bigint default 0 comment '投币数', add column `danmaku_num` bigint default 0 comment '弹幕数', add column `view_num` bigint default 0 comment '播放数', add column `hotness_score` double default null comment '综合热度分', add index `ix_zhihu_content_publish_hotness` (`created_time`, `hotness_score`);
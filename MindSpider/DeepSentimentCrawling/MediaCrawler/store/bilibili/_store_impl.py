@@ -29,6 +29,7 @@ from base.base_crawler import AbstractStore
 from database.db_session import get_session
 from database.models import BilibiliVideoComment, BilibiliVideo, BilibiliUpInfo, BilibiliUpDynamic, BilibiliContactInfo
 from tools.async_file_writer import AsyncFileWriter
+from tools.hotness import fill_engagement_columns
 from tools import utils, words
 from var import crawler_type_var
 
@@ -118,6 +119,7 @@ class BiliDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
+        fill_engagement_columns("bilibili_video", content_item)
         video_id = content_item.get("video_id")
         # 确保 video_id 为整数类型，匹配数据库 BigInteger 字段
         if video_id is not None:
@@ -26,6 +26,7 @@ from base.base_crawler import AbstractStore
 from database.db_session import get_session
 from database.models import DouyinAweme, DouyinAwemeComment, DyCreator
 from tools import utils, words
+from tools.hotness import fill_engagement_columns
 from tools.async_file_writer import AsyncFileWriter
 from var import crawler_type_var
 
@@ -87,6 +88,7 @@ class DouyinDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
+        fill_engagement_columns("douyin_aweme", content_item)
         aweme_id = content_item.get("aweme_id")
         async with get_session() as session:
             result = await session.execute(select(DouyinAweme).where(DouyinAweme.aweme_id == aweme_id))
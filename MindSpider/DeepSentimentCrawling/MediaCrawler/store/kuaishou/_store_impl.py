@@ -20,6 +20,7 @@ import os
 import pathlib
 from typing import Dict
 from tools.async_file_writer import AsyncFileWriter
+from tools.hotness import fill_engagement_columns
 
 import aiofiles
 from sqlalchemy import select
@@ -88,6 +89,7 @@ class KuaishouDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
+        fill_engagement_columns("kuaishou_video", content_item)
         video_id = content_item.get("video_id")
         async with get_session() as session:
             result = await session.execute(select(KuaishouVideo).where(KuaishouVideo.video_id == video_id))
@@ -28,6 +28,7 @@ import config
 from base.base_crawler import AbstractStore
 from database.models import WeiboCreator, WeiboNote, WeiboNoteComment
 from tools import utils, words
+from tools.hotness import fill_engagement_columns
 from tools.async_file_writer import AsyncFileWriter
 from database.db_session import get_session
 from var import crawler_type_var
@@ -98,6 +99,7 @@ class WeiboDbStoreImplement(AbstractStore):
         Returns:
 
         """
+        fill_engagement_columns("weibo_note", content_item)
         note_id = content_item.get("note_id")
         async with get_session() as session:
             stmt = select(WeiboNote).where(WeiboNote.note_id == note_id)
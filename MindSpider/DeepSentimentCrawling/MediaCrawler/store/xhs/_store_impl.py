@@ -17,6 +17,7 @@ from database.models import XhsNote, XhsNoteComment, XhsCreator
 
 from tools.async_file_writer import AsyncFileWriter
 from tools.time_util import get_current_timestamp
+from tools.hotness import engagement_columns
 from var import crawler_type_var
 
 class XhsCsvStoreImplement(AbstractStore):
@@ -120,7 +121,8 @@ class XhsDbStoreImplement(AbstractStore):
             tag_list=json.dumps(content_item.get("tag_list")),
             note_url=content_item.get("note_url"),
             source_keyword=content_item.get("source_keyword", ""),
-            xsec_token=content_item.get("xsec_token", "")
+            xsec_token=content_item.get("xsec_token", ""),
+            **engagement_columns("xhs_note", content_item)
         )
         session.add(note)
 
@@ -134,6 +136,7 @@ class XhsDbStoreImplement(AbstractStore):
             "comment_count": str(content_item.get("comment_count")),
             "share_count": str(content_item.get("share_count")),
             "last_update_time": content_item.get("last_update_time"),
+            **engagement_columns("xhs_note", content_item),
         }
         stmt = update(XhsNote).where(XhsNote.note_id == note_id).values(**update_data)
         await session.execute(stmt)
@@ -29,6 +29,7 @@ from base.base_crawler import AbstractStore
 from database.db_session import get_session
 from database.models import ZhihuContent, ZhihuComment, ZhihuCreator
 from tools import utils, words
+from tools.hotness import fill_engagement_columns
 from var import crawler_type_var
 from tools.async_file_writer import AsyncFileWriter
 
@@ -93,6 +94,7 @@ class ZhihuDbStoreImplement(AbstractStore):
         Args:
             content_item: content item dict
         """
+        fill_engagement_columns("zhihu_content", content_item)
         content_id = content_item.get("content_id")
         async with get_session() as session:
             stmt = select(ZhihuContent).where(ZhihuContent.content_id == content_id)
@@ -0,0 +1,38 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：  
+# 1. 不得用于任何商业用途。  
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。  
+# 3. 不得进行大规模爬取或对平台造成运营干扰。  
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。   
+# 5. 不得用于任何非法或不当的用途。
+#   
+# 详细许可条款请参阅项目根目录下的LICENSE文件。  
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。  
+
+
+# -*- coding: utf-8 -*-
+
+from tools import hotness
+
+
+def test_parse_count():
+    assert hotness.parse_count(None) == 0
+    assert hotness.parse_count(123) == 123
+    assert hotness.parse_count("1,234") == 1234
+    assert hotness.parse_count("1.2万") == 12000
+    assert hotness.parse_count("10w+") == 100000
+    assert hotness.parse_count("3亿") == 300000000
+    assert hotness.parse_count("赞") == 0
+
+
+def test_fill_engagement_columns():
+    item = {"liked_count": "10", "comment_count": "2", "share_count": "1", "collected_count": "1"}
+    hotness.fill_engagement_columns("douyin_aweme", item)
+    assert item["like_num"] == 10
+    assert item["view_num"] == 0
+    assert item["hotness_score"] == 10 * hotness.W_LIKE + 2 * hotness.W_COMMENT + 2 * hotness.W_SHARE
+
+
+def test_non_content_table_untouched():
+    item = {"like_count": "5"}
+    hotness.fill_engagement_columns("douyin_aweme_comment", item)
+    assert item == {"like_count": "5"}
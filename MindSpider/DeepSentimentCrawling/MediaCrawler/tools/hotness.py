@@ -0,0 +1,119 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 互动指标数值化与热度分计算（写入时维护 *_num 与 hotness_score 列）
+
+import re
+from typing import Any, Dict
+
+# 热度权重，与 MarketEngine/tools/search.py 中 MediaCrawlerDB.W_* 保持一致
+W_LIKE = 1.0
+W_COMMENT = 5.0
+W_SHARE = 10.0  # 分享/转发/收藏/投币等高价值互动
+W_VIEW = 0.1
+W_DANMAKU = 0.5
+
+# 各内容表统一的数值型互动列
+NUMERIC_COLUMNS = ("like_num", "comment_num", "share_num", "collect_num", "coin_num", "danmaku_num", "view_num")
+
+# 各内容表：数值列 -> 原始（文本）计数列
+COUNTER_SOURCES: Dict[str, Dict[str, str]] = {
+    "bilibili_video": {
+        "like_num": "liked_count",
+        "comment_num": "video_comment",
+        "share_num": "video_share_count",
+        "collect_num": "video_favorite_count",
+        "coin_num": "video_coin_count",
+        "danmaku_num": "video_danmaku",
+        "view_num": "video_play_count",
+    },
+    "douyin_aweme": {
+        "like_num": "liked_count",
+        "comment_num": "comment_count",
+        "share_num": "share_count",
+        "collect_num": "collected_count",
+    },
+    "kuaishou_video": {
+        "like_num": "liked_count",
+        "view_num": "viewd_count",
+    },
+    "weibo_note": {
+        "like_num": "liked_count",
+        "comment_num": "comments_count",
+        "share_num": "shared_count",
+    },
+    "xhs_note": {
+        "like_num": "liked_count",
+        "comment_num": "comment_count",
+        "share_num": "share_count",
+        "collect_num": "collected_count",
+    },
+    "zhihu_content": {
+        "like_num": "voteup_count",
+        "comment_num": "comment_count",
+    },
+}
+
+_UNITS = {"万": 10_000, "w": 10_000, "W": 10_000, "亿": 100_000_000, "千": 1_000, "k": 1_000, "K": 1_000}
+_COUNT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*([万wW亿千kK]?)")
+
+
+def parse_count(value: Any) -> int:
+    """
+    将平台返回的计数值转换为整数
+    支持 1234 / "1,234" / "1.2万" / "10w+" / "3亿" 等形式，无法解析时返回 0
+    """
+    if value is None or isinstance(value, bool):
+        return 0
+    if isinstance(value, (int, float)):
+        return max(int(value), 0)
+    match = _COUNT_PATTERN.search(str(value).replace(",", ""))
+    if not match:
+        return 0
+    number, unit = match.groups()
+    return int(float(number) * _UNITS.get(unit, 1))
+
+
+def compute_hotness(nums: Dict[str, int]) -> float:
+    """按统一权重计算热度分，与 MediaCrawlerDB.search_hot_content 的公式一致"""
+    return (
+        nums.get("like_num", 0) * W_LIKE
+        + nums.get("comment_num", 0) * W_COMMENT
+        + (nums.get("share_num", 0) + nums.get("collect_num", 0) + nums.get("coin_num", 0)) * W_SHARE
+        + nums.get("danmaku_num", 0) * W_DANMAKU
+        + nums.get("view_num", 0) * W_VIEW
+    )
+
+
+def engagement_columns(table: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    根据原始计数字段计算数值列与 hotness_score
+    Args:
+        table: 内容表名
+        item: 含原始计数字段的数据（字典）
+
+    Returns:
+        {数值列: 值, ..., "hotness_score": 分值}；非内容表返回空字典
+    """
+    sources = COUNTER_SOURCES.get(table)
+    if not sources:
+        return {}
+    nums = {col: parse_count(item.get(src)) for col, src in sources.items()}
+    values: Dict[str, Any] = {col: nums.get(col, 0) for col in NUMERIC_COLUMNS}
+    values["hotness_score"] = compute_hotness(nums)
+    return values
+
+
+def fill_engagement_columns(table: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """就地为待入库的内容数据补充数值列与 hotness_score，返回同一个字典"""
+    item.update(engagement_columns(table, item))
+    return item
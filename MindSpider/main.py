@@ -287,6 +287,37 @@ class MindSpider:
             logger.exception(f"DeepSentimentCrawling模块执行异常: {e}")
             return False
     
+    def run_hot_content_rollup(self, full: bool = False) -> bool:
+        """运行热点内容汇总任务（增量更新 hot_content_rollup）"""
+        logger.info("运行热点内容汇总任务...")
+        
+        try:
+            cmd = [sys.executable, "hot_content_rollup.py"]
+            if full:
+                cmd.append("--full")
+            
+            logger.info(f"执行命令: {' '.join(cmd)}")
+            
+            result = subprocess.run(
+                cmd,
+                cwd=self.schema_path,
+                timeout=1800  # 30分钟超时
+            )
+            
+            if result.returncode == 0:
+                logger.info("热点内容汇总任务执行成功")
+                return True
+            else:
+                logger.error(f"热点内容汇总任务执行失败，返回码: {result.returncode}")
+                return False
+                
+        except subprocess.TimeoutExpired:
+            logger.error("热点内容汇总任务执行超时")
+            return False
+        except Exception as e:
+            logger.exception(f"热点内容汇总任务执行异常: {e}")
+            return False
+    
     def run_complete_workflow(self, target_date: date = None, platforms: list = None,
                              keywords_count: int = 100, max_keywords: int = 50,
                              max_notes: int = 50, test_mode: bool = False) -> bool:
@@ -312,6 +343,11 @@ class MindSpider:
             logger.error("情感爬取失败，但话题提取已完成")
             return False
         
+        # 第三步：增量更新热点汇总表（失败不影响已完成的爬取结果）
+        logger.info("=== 第三步：热点汇总 ===")
+        if not self.run_hot_content_rollup():
+            logger.warning("热点汇总失败，MarketEngine将回退到实时计算热度")
+        
         logger.info("完整工作流程执行成功！")
         return True
     
@@ -381,6 +417,8 @@ def main():
     parser.add_argument("--broad-topic", action="store_true", help="只运行话题提取模块")
     parser.add_argument("--deep-sentiment", action="store_true", help="只运行情感爬取模块")
     parser.add_argument("--complete", action="store_true", help="运行完整工作流程")
+    parser.add_argument("--rollup", action="store_true", help="只运行热点内容汇总任务")
+    parser.add_argument("--rollup-full", action="store_true", help="全量重建热点内容汇总表")
     
     # 参数配置
     parser.add_argument("--date", type=str, help="目标日期 (YYYY-MM-DD)，默认为今天")
@@ -435,6 +473,8 @@ def main():
             spider.run_deep_sentiment_crawling(
                 target_date, args.platforms, args.max_keywords, args.max_notes, args.test
             )
+        elif args.rollup or args.rollup_full:
+            spider.run_hot_content_rollup(full=args.rollup_full)
         elif args.complete:
             spider.run_complete_workflow(
                 target_date, args.platforms, args.keywords_count, 
@@ -27,6 +27,21 @@ except ImportError:
 
 from config import settings
 
+
+def build_database_url() -> str:
+    """按 config.settings 生成同步 SQLAlchemy 连接串（schema 目录下各维护脚本共用）"""
+    dialect = (settings.DB_DIALECT or "mysql").lower()
+    password = quote_plus(settings.DB_PASSWORD)
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+psycopg://{settings.DB_USER}:{password}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+    return f"mysql+pymysql://{settings.DB_USER}:{password}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}?charset={settings.DB_CHARSET}"
+
+
+def create_db_engine() -> Engine:
+    """创建同步数据库引擎"""
+    return create_engine(build_database_url(), future=True)
+
+
 class DatabaseManager:
     def __init__(self):
         self.engine: Engine = None
@@ -35,12 +50,7 @@ class DatabaseManager:
     def connect(self):
         """连接数据库"""
         try:
-            dialect = (settings.DB_DIALECT or "mysql").lower()
-            if dialect in ("postgresql", "postgres"):
-                url = f"postgresql+psycopg://{settings.DB_USER}:{quote_plus(settings.DB_PASSWORD)}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
-            else:
-                url = f"mysql+pymysql://{settings.DB_USER}:{quote_plus(settings.DB_PASSWORD)}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}?charset={settings.DB_CHARSET}"
-            self.engine = create_engine(url, future=True)
+            self.engine = create_db_engine()
             logger.info(f"成功连接到数据库: {settings.DB_NAME}")
         except Exception as e:
             logger.error(f"数据库连接失败: {e}")
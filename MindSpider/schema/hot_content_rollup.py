@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MindSpider 热点内容汇总任务
+
+将六张内容表（bilibili_video / douyin_aweme / kuaishou_video / weibo_note / xhs_note / zhihu_content）
+汇总为一张紧凑的 hot_content_rollup 表：每条内容一行，统一平台、标题、链接、发布时间（秒级）
+与加权热度分（权重与 MarketEngine 的 MediaCrawlerDB.W_* 一致）。
+
+任务按各表的 (last_modify_ts, id) 水位增量执行，水位记录在 hot_content_rollup_state 中，
+每批汇总与水位推进在同一事务内提交，可随时中断后重跑。
+MarketEngine 的 search_hot_content 在汇总足够新时直接读取该表。
+
+数据模型定义位置：
+- MindSpider/schema/models_sa.py（HotContentRollup / HotContentRollupState）
+"""
+
+import sys
+import time
+import argparse
+import importlib.util
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from loguru import logger
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from db_manager import create_db_engine
+
+# 直接按文件加载 MediaCrawler 的热度计算模块，保证汇总与写入时使用同一套规则
+_HOTNESS_PATH = project_root / "DeepSentimentCrawling" / "MediaCrawler" / "tools" / "hotness.py"
+_spec = importlib.util.spec_from_file_location("mediacrawler_hotness", _HOTNESS_PATH)
+hotness = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hotness)
+
+# 各内容表到汇总字段的映射
+ROLLUP_SOURCES: Dict[str, Dict[str, str]] = {
+    "bilibili_video": {"platform": "bilibili", "type": "video", "title": "title", "author": "nickname", "url": "video_url", "ts": "create_time"},
+    "douyin_aweme":   {"platform": "douyin", "type": "video", "title": "title", "author": "nickname", "url": "aweme_url", "ts": "create_time"},
+    "kuaishou_video": {"platform": "kuaishou", "type": "video", "title": "title", "author": "nickname", "url": "video_url", "ts": "create_time"},
+    "weibo_note":     {"platform": "weibo", "type": "note", "title": "content", "author": "nickname", "url": "note_url", "ts": "create_date_time"},
+    "xhs_note":       {"platform": "xhs", "type": "note", "title": "title", "author": "nickname", "url": "note_url", "ts": "time"},
+    "zhihu_content":  {"platform": "zhihu", "type": "content", "title": "title", "author": "user_nickname", "url": "content_url", "ts": "created_time"},
+}
+
+ROLLUP_COLUMNS = [
+    "source_table", "source_id", "platform", "content_type", "title", "author", "url", "source_keyword",
+    "publish_ts", "like_num", "comment_num", "share_num", "view_num", "hotness_score",
+    "source_modify_ts", "last_modify_ts",
+]
+
+
+def normalize_publish_ts(value: Any) -> Optional[int]:
+    """将各平台的发布时间（秒/毫秒时间戳、数字字符串、日期时间字符串）统一为秒级时间戳"""
+    if value is None or value == "":
+        return None
+    try:
+        if isinstance(value, datetime):
+            return int(value.timestamp())
+        if isinstance(value, (int, float)) or str(value).strip().isdigit():
+            val = int(float(value))
+            return val // 1000 if val > 1_000_000_000_000 else val
+        return int(datetime.fromisoformat(str(value).split('+')[0].strip()).timestamp())
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+class HotContentRollupJob:
+    """热点内容汇总任务"""
+
+    def __init__(self, engine: Engine, batch_size: int = 1000):
+        self.engine = engine
+        self.batch_size = batch_size
+        self._quote = engine.dialect.identifier_preparer.quote
+
+    def _upsert_sql(self, table: str, columns: List[str], conflict_cols: List[str]) -> str:
+        """按数据库方言生成 "插入或更新" 语句，冲突时更新除唯一键外的所有列"""
+        update_cols = [c for c in columns if c not in conflict_cols]
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(f':{c}' for c in columns)})"
+        if self.engine.dialect.name == "postgresql":
+            updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_cols)
+            return f"{sql} ON CONFLICT ({', '.join(conflict_cols)}) DO UPDATE SET {updates}"
+        updates = ", ".join(f"{c} = VALUES({c})" for c in update_cols)
+        return f"{sql} ON DUPLICATE KEY UPDATE {updates}"
+
+    def ensure_source_indexes(self, table: str) -> None:
+        """为来源表的水位列建立索引，保证增量扫描是索引范围扫描"""
+        index_name = f"ix_{table}_last_modify_ts"
+        if index_name in {idx["name"] for idx in inspect(self.engine).get_indexes(table)}:
+            return
+        with self.engine.begin() as conn:
+            conn.execute(text(f"CREATE INDEX {index_name} ON {table} (last_modify_ts, id)"))
+        logger.info(f"{table}: 已创建水位索引 {index_name}")
+
+    def _get_watermark(self, conn, table: str) -> tuple:
+        row = conn.execute(
+            text("SELECT watermark_ts, watermark_id FROM hot_content_rollup_state WHERE source_table = :t"),
+            {"t": table},
+        ).first()
+        return (row[0], row[1]) if row else (0, 0)
+
+    def _build_row(self, table: str, source: Dict[str, str], row: Dict[str, Any], now_ts: int) -> Dict[str, Any]:
+        """将来源行转换为汇总行"""
+        metrics = hotness.engagement_columns(table, row)
+        title = (row.get("title") or "")[:2000]
+        return {
+            "source_table": table,
+            "source_id": row["id"],
+            "platform": source["platform"],
+            "content_type": source["type"],
+            "title": title,
+            "author": (row.get("author") or "")[:255] or None,
+            "url": row.get("url"),
+            "source_keyword": (row.get("source_keyword") or "")[:255] or None,
+            "publish_ts": normalize_publish_ts(row.get("ts")),
+            "like_num": metrics["like_num"],
+            "comment_num": metrics["comment_num"],
+            "share_num": metrics["share_num"],
+            "view_num": metrics["view_num"],
+            "hotness_score": metrics["hotness_score"],
+            "source_modify_ts": row.get("last_modify_ts"),
+            "last_modify_ts": now_ts,
+        }
+
+    def refresh_table(self, table: str) -> int:
+        """增量汇总单张内容表，返回本次处理的行数"""
+        source = ROLLUP_SOURCES[table]
+        q = self._quote
+        counter_cols = sorted(set(hotness.COUNTER_SOURCES[table].values()))
+        select_cols = ", ".join(
+            ["id", "last_modify_ts", "source_keyword"]
+            + [f"{q(source[k])} AS {k}" for k in ("title", "author", "url", "ts")]
+            + [q(c) for c in counter_cols]
+        )
+        select_stmt = text(
+            f"SELECT {select_cols} FROM {table} "
+            f"WHERE last_modify_ts > :wm_ts OR (last_modify_ts = :wm_ts AND id > :wm_id) "
+            f"ORDER BY last_modify_ts, id LIMIT :limit"
+        )
+        upsert_stmt = text(self._upsert_sql("hot_content_rollup", ROLLUP_COLUMNS, ["source_table", "source_id"]))
+        state_stmt = text(self._upsert_sql(
+            "hot_content_rollup_state", ["source_table", "watermark_ts", "watermark_id", "last_run_ts"], ["source_table"]
+        ))
+
+        total = 0
+        while True:
+            now_ts = int(time.time())
+            with self.engine.begin() as conn:
+                wm_ts, wm_id = self._get_watermark(conn, table)
+                rows = conn.execute(
+                    select_stmt, {"wm_ts": wm_ts, "wm_id": wm_id, "limit": self.batch_size}
+                ).mappings().all()
+                if rows:
+                    conn.execute(upsert_stmt, [self._build_row(table, source, r, now_ts) for r in rows])
+                    wm_ts, wm_id = rows[-1]["last_modify_ts"], rows[-1]["id"]
+                # 即使没有新数据也刷新 last_run_ts，用于判断汇总是否足够新
+                conn.execute(state_stmt, {"source_table": table, "watermark_ts": wm_ts,
+                                          "watermark_id": wm_id, "last_run_ts": now_ts})
+            total += len(rows)
+            if len(rows) < self.batch_size:
+                break
+        logger.info(f"{table}: 本次汇总 {total} 行")
+        return total
+
+    def reset(self) -> None:
+        """清空汇总表与水位，下次运行时全量重建"""
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM hot_content_rollup"))
+            conn.execute(text("DELETE FROM hot_content_rollup_state"))
+        logger.info("已清空热点汇总表与水位")
+
+    def run(self) -> int:
+        """对所有存在的内容表执行一次增量汇总，返回处理的总行数"""
+        tables = set(inspect(self.engine).get_table_names())
+        if "hot_content_rollup" not in tables:
+            logger.error("hot_content_rollup 表不存在，请先执行数据库初始化")
+            return 0
+        total = 0
+        for table in ROLLUP_SOURCES:
+            if table not in tables:
+                logger.warning(f"{table}: 表不存在，跳过")
+                continue
+            self.ensure_source_indexes(table)
+            total += self.refresh_table(table)
+        logger.info(f"热点汇总完成，共处理 {total} 行")
+        return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="增量维护热点内容汇总表 hot_content_rollup")
+    parser.add_argument("--batch-size", type=int, default=1000, help="每批处理的行数 (默认1000)")
+    parser.add_argument("--full", action="store_true", help="清空汇总表与水位后全量重建")
+    args = parser.parse_args()
+
+    engine = create_db_engine()
+    try:
+        job = HotContentRollupJob(engine, batch_size=args.batch_size)
+        if args.full:
+            job.reset()
+        job.run()
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
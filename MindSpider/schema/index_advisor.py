@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MindSpider 索引建议与创建工具
+
+MarketEngine 的话题搜索（search_topic_by_date / search_topic_on_platform）按
+`时间范围 + id < :cursor ORDER BY id DESC` 的方式做键集分页。
+本脚本为这些查询涉及的每张表检查是否存在以 (time_col, id) 开头的复合索引，
+缺失时给出建议并（非 --dry-run 时）直接创建，使时间过滤和翻页都走索引范围扫描。
+
+表与时间列需与 MarketEngine/tools/search.py 中各搜索配置的 time_col 保持一致。
+脚本可重复执行：已满足的表会被跳过。
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from loguru import logger
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from db_manager import create_db_engine
+
+# 搜索配置中的表 -> 时间列
+SEARCH_TIME_COLUMNS: Dict[str, str] = {
+    "bilibili_video": "create_time",
+    "douyin_aweme": "create_time",
+    "kuaishou_video": "create_time",
+    "weibo_note": "create_date_time",
+    "xhs_note": "time",
+    "zhihu_content": "created_time",
+    "tieba_note": "publish_time",
+    "daily_news": "crawl_date",
+}
+
+
+def _find_covering_index(indexes: List[Dict], columns: List[str]) -> Optional[str]:
+    """返回列前缀与 columns 一致的已有索引名，不存在时返回 None"""
+    for idx in indexes:
+        if list(idx.get("column_names") or [])[:len(columns)] == columns:
+            return idx["name"]
+    return None
+
+
+def advise(engine: Engine, apply: bool = True) -> List[str]:
+    """
+    检查并创建 (time_col, id) 复合索引
+
+    Args:
+        engine: 数据库引擎
+        apply: 为 False 时只输出建议的 DDL，不执行
+
+    Returns:
+        建议（或已执行）的 DDL 列表
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    quote = engine.dialect.identifier_preparer.quote
+    statements = []
+
+    for table, time_col in SEARCH_TIME_COLUMNS.items():
+        if table not in tables:
+            logger.warning(f"{table}: 表不存在，跳过")
+            continue
+        columns = {c["name"]: c for c in inspector.get_columns(table)}
+        if time_col not in columns:
+            logger.warning(f"{table}: 缺少时间列 {time_col}，跳过")
+            continue
+
+        existing = _find_covering_index(inspector.get_indexes(table), [time_col, "id"])
+        if existing:
+            logger.info(f"{table}: 已有复合索引 {existing}")
+            continue
+
+        # MySQL 不能直接索引 TEXT 列，需要前缀长度
+        col_expr = quote(time_col)
+        if engine.dialect.name == "mysql" and "TEXT" in str(columns[time_col]["type"]).upper():
+            col_expr = f"{col_expr}(64)"
+        index_name = f"idx_{table}_{time_col}_id"
+        statements.append(f"CREATE INDEX {index_name} ON {quote(table)} ({col_expr}, id)")
+
+    for stmt in statements:
+        if not apply:
+            logger.info(f"[建议] {stmt}")
+            continue
+        with engine.begin() as conn:
+            conn.execute(text(stmt))
+        logger.info(f"[已创建] {stmt}")
+
+    if not statements:
+        logger.info("所有搜索表的复合索引均已就绪")
+    return statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="为话题搜索涉及的表创建 (time_col, id) 复合索引")
+    parser.add_argument("--dry-run", action="store_true", help="只输出建议的DDL，不执行")
+    args = parser.parse_args()
+
+    engine = create_db_engine()
+    try:
+        advise(engine, apply=not args.dry_run)
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MindSpider 数据库迁移 - 数值化互动指标与热度分
+
+为六张内容表（bilibili_video / douyin_aweme / kuaishou_video / weibo_note / xhs_note / zhihu_content）
+补充数值型互动列（like_num、comment_num、share_num、collect_num、coin_num、danmaku_num、view_num）
+以及 hotness_score 列和 (发布时间列, hotness_score) 复合索引，并按原始文本计数字段回填历史数据。
+
+新数据由 MediaCrawler 存储层写入时维护（见 MediaCrawler/tools/hotness.py），
+MarketEngine 的 search_hot_content 检测到 hotness_score 列后即改走索引查询。
+脚本可重复执行：已存在的列和索引会被跳过，仅回填 hotness_score 为空的行；
+旧版本脚本创建的 hotness_score 单列索引会被删除。
+"""
+
+import sys
+import argparse
+import importlib.util
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from loguru import logger
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from db_manager import create_db_engine
+
+# 直接按文件加载 MediaCrawler 的热度计算模块，保证回填与写入时使用同一套规则
+_HOTNESS_PATH = project_root / "DeepSentimentCrawling" / "MediaCrawler" / "tools" / "hotness.py"
+_spec = importlib.util.spec_from_file_location("mediacrawler_hotness", _HOTNESS_PATH)
+hotness = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(hotness)
+
+# 各内容表的发布时间列（与 MarketEngine 中 search_hot_content 的时间筛选一致）
+PUBLISH_TIME_COLUMNS = {
+    "bilibili_video": "create_time",
+    "douyin_aweme": "create_time",
+    "kuaishou_video": "create_time",
+    "weibo_note": "create_date_time",
+    "xhs_note": "time",
+    "zhihu_content": "created_time",
+}
+
+
+def add_columns_and_indexes(engine: Engine, table: str) -> None:
+    """为单张内容表补充缺失的数值列、hotness_score 列及复合索引"""
+    inspector = inspect(engine)
+    existing = {c["name"] for c in inspector.get_columns(table)}
+    ddl = [f"ALTER TABLE {table} ADD COLUMN {col} BIGINT DEFAULT 0"
+           for col in hotness.NUMERIC_COLUMNS if col not in existing]
+    if "hotness_score" not in existing:
+        ddl.append(f"ALTER TABLE {table} ADD COLUMN hotness_score DOUBLE PRECISION DEFAULT NULL")
+
+    # search_hot_content 先按发布时间筛选再按热度排序，单列的 hotness_score 索引用不上
+    indexes = {idx["name"] for idx in inspector.get_indexes(table)}
+    index_name = f"ix_{table}_publish_hotness"
+    if index_name not in indexes:
+        time_col = engine.dialect.identifier_preparer.quote(PUBLISH_TIME_COLUMNS[table])
+        ddl.append(f"CREATE INDEX {index_name} ON {table} ({time_col}, hotness_score)")
+    legacy_index = f"ix_{table}_hotness_score"
+    if legacy_index in indexes:
+        ddl.append(f"DROP INDEX {legacy_index} ON {table}" if engine.dialect.name == "mysql" else f"DROP INDEX {legacy_index}")
+
+    with engine.begin() as conn:
+        for stmt in ddl:
+            conn.execute(text(stmt))
+    if ddl:
+        logger.info(f"{table}: 执行了 {len(ddl)} 条结构变更")
+
+
+def backfill(engine: Engine, table: str, batch_size: int = 1000) -> int:
+    """按 id 分批回填 hotness_score 为空的历史行，返回回填行数"""
+    sources = hotness.COUNTER_SOURCES[table]
+    select_cols = ", ".join(["id"] + sorted(set(sources.values())))
+    assignments = ", ".join(f"{col} = :{col}" for col in list(hotness.NUMERIC_COLUMNS) + ["hotness_score"])
+    update_stmt = text(f"UPDATE {table} SET {assignments} WHERE id = :id")
+
+    total, last_id = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                text(f"SELECT {select_cols} FROM {table} "
+                     f"WHERE hotness_score IS NULL AND id > :last_id ORDER BY id LIMIT :limit"),
+                {"last_id": last_id, "limit": batch_size},
+            ).mappings().all()
+            if not rows:
+                break
+            params = []
+            for row in rows:
+                values = hotness.engagement_columns(table, row)
+                values["id"] = row["id"]
+                params.append(values)
+            conn.execute(update_stmt, params)
+        last_id = rows[-1]["id"]
+        total += len(rows)
+        logger.info(f"{table}: 已回填 {total} 行")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="为内容表添加数值化互动列与 hotness_score 并回填历史数据")
+    parser.add_argument("--batch-size", type=int, default=1000, help="回填批大小 (默认1000)")
+    parser.add_argument("--skip-backfill", action="store_true", help="只变更表结构，不回填历史数据")
+    args = parser.parse_args()
+
+    engine = create_db_engine()
+    try:
+        tables = set(inspect(engine).get_table_names())
+        for table in hotness.COUNTER_SOURCES:
+            if table not in tables:
+                logger.warning(f"{table}: 表不存在，跳过")
+                continue
+            add_columns_and_indexes(engine, table)
+            if not args.skip_backfill:
+                backfill(engine, table, args.batch_size)
+        logger.info("互动指标迁移完成")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -105,6 +105,48 @@ CREATE TABLE `crawling_tasks` (
     FOREIGN KEY (`topic_id`) REFERENCES `daily_topics`(`topic_id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='爬取任务表';
 
+-- ----------------------------
+-- Table structure for hot_content_rollup
+-- 热点内容汇总表：由 hot_content_rollup.py 按 last_modify_ts 水位从各内容表增量汇总
+-- ----------------------------
+DROP TABLE IF EXISTS `hot_content_rollup`;
+CREATE TABLE `hot_content_rollup` (
+    `id` int NOT NULL AUTO_INCREMENT COMMENT '自增ID',
+    `source_table` varchar(32) NOT NULL COMMENT '来源内容表',
+    `source_id` bigint NOT NULL COMMENT '来源表中的行ID',
+    `platform` varchar(16) NOT NULL COMMENT '平台(bilibili|douyin|kuaishou|weibo|xhs|zhihu)',
+    `content_type` varchar(16) NOT NULL COMMENT '内容类型(video|note|content)',
+    `title` text COMMENT '标题或正文摘要',
+    `author` varchar(255) DEFAULT NULL COMMENT '作者昵称',
+    `url` text COMMENT '内容链接',
+    `source_keyword` varchar(255) DEFAULT NULL COMMENT '搜索来源关键字',
+    `publish_ts` bigint DEFAULT NULL COMMENT '发布时间(秒级时间戳)',
+    `like_num` bigint DEFAULT 0 COMMENT '点赞数',
+    `comment_num` bigint DEFAULT 0 COMMENT '评论数',
+    `share_num` bigint DEFAULT 0 COMMENT '分享数',
+    `view_num` bigint DEFAULT 0 COMMENT '播放数',
+    `hotness_score` double NOT NULL DEFAULT 0 COMMENT '加权热度分',
+    `source_modify_ts` bigint DEFAULT NULL COMMENT '来源行的last_modify_ts',
+    `last_modify_ts` bigint NOT NULL COMMENT '记录最后修改时间戳',
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `uq_hot_rollup_source` (`source_table`, `source_id`),
+    KEY `idx_hot_rollup_publish_hotness` (`publish_ts`, `hotness_score`),
+    KEY `idx_hot_rollup_hotness` (`hotness_score`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='热点内容汇总表';
+
+-- ----------------------------
+-- Table structure for hot_content_rollup_state
+-- 热点汇总增量水位表：每张来源表一行
+-- ----------------------------
+DROP TABLE IF EXISTS `hot_content_rollup_state`;
+CREATE TABLE `hot_content_rollup_state` (
+    `source_table` varchar(32) NOT NULL COMMENT '来源内容表',
+    `watermark_ts` bigint NOT NULL DEFAULT 0 COMMENT '已汇总的最大last_modify_ts',
+    `watermark_id` bigint NOT NULL DEFAULT 0 COMMENT '水位时间戳相同时已汇总的最大行ID',
+    `last_run_ts` bigint NOT NULL COMMENT '最近一次汇总时间(秒级时间戳)',
+    PRIMARY KEY (`source_table`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_0900_ai_ci COMMENT='热点汇总增量水位表';
+
 -- ===============================
 -- MediaCrawler表结构扩展字段
 -- ===============================
@@ -11,7 +11,7 @@
 
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import Integer, String, BigInteger, Text, ForeignKey
+from sqlalchemy import Integer, String, BigInteger, Text, ForeignKey, Float, Index
 
 # 使用 models_sa 中的 Base，确保所有表在同一个 metadata 中，外键引用可以正常工作
 from models_sa import Base
@@ -42,6 +42,17 @@ class BilibiliVideo(Base):
     source_keyword: Mapped[Optional[str]] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 数值化互动指标与热度分（由爬虫存储层写入时维护；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    coin_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    danmaku_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[Optional[float]] = mapped_column(Float, default=None, nullable=True)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index("ix_bilibili_video_publish_hotness", "create_time", "hotness_score"),)
 
 class BilibiliVideoComment(Base):
     __tablename__ = "bilibili_video_comment"
@@ -139,6 +150,17 @@ class DouyinAweme(Base):
     source_keyword: Mapped[Optional[str]] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 数值化互动指标与热度分（由爬虫存储层写入时维护；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    coin_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    danmaku_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[Optional[float]] = mapped_column(Float, default=None, nullable=True)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index("ix_douyin_aweme_publish_hotness", "create_time", "hotness_score"),)
 
 class DouyinAwemeComment(Base):
     __tablename__ = "douyin_aweme_comment"
@@ -201,6 +223,17 @@ class KuaishouVideo(Base):
     source_keyword: Mapped[Optional[str]] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 数值化互动指标与热度分（由爬虫存储层写入时维护；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    coin_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    danmaku_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[Optional[float]] = mapped_column(Float, default=None, nullable=True)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index("ix_kuaishou_video_publish_hotness", "create_time", "hotness_score"),)
 
 class KuaishouVideoComment(Base):
     __tablename__ = "kuaishou_video_comment"
@@ -238,6 +271,17 @@ class WeiboNote(Base):
     source_keyword: Mapped[Optional[str]] = mapped_column(Text, default='', nullable=True)
     topic_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 数值化互动指标与热度分（由爬虫存储层写入时维护；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    coin_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    danmaku_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[Optional[float]] = mapped_column(Float, default=None, nullable=True)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index("ix_weibo_note_publish_hotness", "create_date_time", "hotness_score"),)
 
 class WeiboNoteComment(Base):
     __tablename__ = "weibo_note_comment"
@@ -320,6 +364,17 @@ class XhsNote(Base):
     xsec_token: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     topic_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 数值化互动指标与热度分（由爬虫存储层写入时维护；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    coin_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    danmaku_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[Optional[float]] = mapped_column(Float, default=None, nullable=True)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index("ix_xhs_note_publish_hotness", "time", "hotness_score"),)
 
 
 class XhsNoteComment(Base):
@@ -424,6 +479,17 @@ class ZhihuContent(Base):
     last_modify_ts: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
     topic_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("daily_topics.topic_id", ondelete="SET NULL"), nullable=True)
     crawling_task_id: Mapped[Optional[str]] = mapped_column(String(64), ForeignKey("crawling_tasks.task_id", ondelete="SET NULL"), nullable=True)
+    # 数值化互动指标与热度分（由爬虫存储层写入时维护；hotness_score 为空表示尚未计算，迁移脚本据此回填）
+    like_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    comment_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    share_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    collect_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    coin_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    danmaku_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    view_num: Mapped[Optional[int]] = mapped_column(BigInteger, default=0, nullable=True)
+    hotness_score: Mapped[Optional[float]] = mapped_column(Float, default=None, nullable=True)
+    # 按发布时间窗口筛选后按热度排序（search_hot_content）使用的复合索引
+    __table_args__ = (Index("ix_zhihu_content_publish_hotness", "created_time", "hotness_score"),)
 
 class ZhihuComment(Base):
     __tablename__ = "zhihu_comment"
@@ -21,6 +21,8 @@ __all__ = [
     "DailyTopic",
     "TopicNewsRelation",
     "CrawlingTask",
+    "HotContentRollup",
+    "HotContentRollupState",
 ]
 
 
@@ -125,3 +127,39 @@ class CrawlingTask(Base):
     last_modify_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
 
 
+class HotContentRollup(Base):
+    """热点内容汇总表：每条内容一行，由 hot_content_rollup.py 按 last_modify_ts 水位增量维护"""
+    __tablename__ = "hot_content_rollup"
+    __table_args__ = (
+        UniqueConstraint("source_table", "source_id", name="uq_hot_rollup_source"),
+        Index("idx_hot_rollup_publish_hotness", "publish_ts", "hotness_score"),
+        Index("idx_hot_rollup_hotness", "hotness_score"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source_table: Mapped[str] = mapped_column(String(32), nullable=False)
+    source_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    platform: Mapped[str] = mapped_column(String(16), nullable=False)
+    content_type: Mapped[str] = mapped_column(String(16), nullable=False)
+    title: Mapped[Optional[str]] = mapped_column(Text)
+    author: Mapped[Optional[str]] = mapped_column(String(255))
+    url: Mapped[Optional[str]] = mapped_column(Text)
+    source_keyword: Mapped[Optional[str]] = mapped_column(String(255))
+    publish_ts: Mapped[Optional[int]] = mapped_column(BigInteger)
+    like_num: Mapped[int] = mapped_column(BigInteger, default=0)
+    comment_num: Mapped[int] = mapped_column(BigInteger, default=0)
+    share_num: Mapped[int] = mapped_column(BigInteger, default=0)
+    view_num: Mapped[int] = mapped_column(BigInteger, default=0)
+    hotness_score: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    source_modify_ts: Mapped[Optional[int]] = mapped_column(BigInteger)
+    last_modify_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class HotContentRollupState(Base):
+    """热点汇总任务的增量水位：每张源表一行"""
+    __tablename__ = "hot_content_rollup_state"
+
+    source_table: Mapped[str] = mapped_column(String(32), primary_key=True)
+    watermark_ts: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    watermark_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_run_ts: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -4,9 +4,15 @@ Report Engine
 基于三个子agent的输出和论坛日志生成综合HTML报告
 """
 
-from .agent import ReportAgent, create_agent
-
 __version__ = "1.0.0"
 __author__ = "Report Engine Team"
 
 __all__ = ["ReportAgent", "create_agent"]
+
+
+def __getattr__(name):
+    # 延迟导入 agent（及其 LLM / 渲染依赖），使导入 ReportEngine.flask_interface 时不必加载整个引擎
+    if name in __all__:
+        from . import agent
+        return getattr(agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,9 +5,11 @@ Report Agent主类
 
 import json
 import os
+import time
+from contextlib import contextmanager
 from loguru import logger
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable
 
 from .llms import LLMClient
 from .nodes import (
@@ -16,6 +18,8 @@ from .nodes import (
 )
 from .state import ReportState
 from .utils.config import settings, Settings
+from .utils.context_packer import ContextPacker, describe_dropped
+from .utils.report_index import ReportIndex
 
 # 导入ExpertEngine
 try:
@@ -32,6 +36,7 @@ class FileCountBaseline:
     def __init__(self):
         self.baseline_file = 'logs/report_baseline.json'
         self.baseline_data = self._load_baseline()
+        self.index: Optional[ReportIndex] = None
     
     def reset_baseline(self, directories: Dict[str, str] = None):
         """重置基准数据（用于开始新的搜索任务）"""
@@ -68,16 +73,15 @@ class FileCountBaseline:
         except Exception as e:
             logger.exception(f"保存基准数据失败: {e}")
     
+    def get_index(self, directories: Dict[str, str]) -> ReportIndex:
+        """获取目录对应的报告索引（目录集合变化时重建）"""
+        if self.index is None or self.index.directories != directories:
+            self.index = ReportIndex(directories)
+        return self.index
+    
     def initialize_baseline(self, directories: Dict[str, str]) -> Dict[str, int]:
         """初始化文件数量基准"""
-        current_counts = {}
-        
-        for engine, directory in directories.items():
-            if os.path.exists(directory):
-                md_files = [f for f in os.listdir(directory) if f.endswith('.md')]
-                current_counts[engine] = len(md_files)
-            else:
-                current_counts[engine] = 0
+        current_counts = self.get_index(directories).counts()
         
         # 保存基准数据
         self.baseline_data = current_counts.copy()
@@ -87,47 +91,12 @@ class FileCountBaseline:
         return current_counts
     
     def check_new_files(self, directories: Dict[str, str]) -> Dict[str, Any]:
-        """检查是否有新文件"""
-        current_counts = {}
-        new_files_found = {}
-        all_have_new = True
-        
-        for engine, directory in directories.items():
-            if os.path.exists(directory):
-                md_files = [f for f in os.listdir(directory) if f.endswith('.md')]
-                current_counts[engine] = len(md_files)
-                baseline_count = self.baseline_data.get(engine, 0)
-                
-                if current_counts[engine] > baseline_count:
-                    new_files_found[engine] = current_counts[engine] - baseline_count
-                else:
-                    new_files_found[engine] = 0
-                    all_have_new = False
-            else:
-                current_counts[engine] = 0
-                new_files_found[engine] = 0
-                all_have_new = False
-        
-        return {
-            'ready': all_have_new,
-            'baseline_counts': self.baseline_data,
-            'current_counts': current_counts,
-            'new_files_found': new_files_found,
-            'missing_engines': [engine for engine, count in new_files_found.items() if count == 0]
-        }
+        """检查是否有新文件（基于内存索引，不扫描目录）"""
+        return self.get_index(directories).status(self.baseline_data)
     
     def get_latest_files(self, directories: Dict[str, str]) -> Dict[str, str]:
         """获取每个目录的最新文件"""
-        latest_files = {}
-        
-        for engine, directory in directories.items():
-            if os.path.exists(directory):
-                md_files = [f for f in os.listdir(directory) if f.endswith('.md')]
-                if md_files:
-                    latest_file = max(md_files, key=lambda x: os.path.getmtime(os.path.join(directory, x)))
-                    latest_files[engine] = os.path.join(directory, latest_file)
-        
-        return latest_files
+        return self.get_index(directories).latest_files()
 
 
 class ReportAgent:
@@ -205,14 +174,28 @@ class ReportAgent:
     
     def _initialize_nodes(self):
         """初始化处理节点"""
+        self.context_packer = ContextPacker(
+            budget_tokens=self.config.CONTEXT_TOKEN_BUDGET,
+            forum_share=self.config.CONTEXT_FORUM_SHARE
+        )
         self.template_selection_node = TemplateSelectionNode(
             self.llm_client,
-            self.config.TEMPLATE_DIR
+            self.config.TEMPLATE_DIR,
+            context_packer=ContextPacker(
+                budget_tokens=self.config.TEMPLATE_SELECTION_TOKEN_BUDGET,
+                forum_share=self.config.CONTEXT_FORUM_SHARE
+            )
+        )
+        self.html_generation_node = HTMLGenerationNode(
+            self.llm_client,
+            mode=self.config.HTML_GENERATION_MODE,
+            max_workers=self.config.HTML_SECTION_WORKERS,
+            section_context_chars=self.config.HTML_SECTION_CONTEXT_CHARS
         )
-        self.html_generation_node = HTMLGenerationNode(self.llm_client)
     
     def generate_report(self, query: str, reports: List[Any], forum_logs: str = "", 
-                       custom_template: str = "", save_report: bool = True) -> str:
+                       custom_template: str = "", save_report: bool = True,
+                       event_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> str:
         """
         生成综合报告
         
@@ -222,6 +205,7 @@ class ReportAgent:
             forum_logs: 论坛日志内容
             custom_template: 用户自定义模板（可选）
             save_report: 是否保存报告到文件
+            event_callback: 进度回调 (事件类型, 数据)，事件类型为 stage / html_chunk / html_reset / html_section
             
         Returns:
             dict: 包含HTML内容与保存文件信息
@@ -239,29 +223,43 @@ class ReportAgent:
         
         try:
             # Step 1: 模板选择
-            template_result = self._select_template(query, reports, forum_logs, custom_template)
+            with self._stage('template_selection', event_callback):
+                template_result = self._select_template(query, reports, forum_logs, custom_template)
             
-            # Step 2: 直接生成HTML报告
-            html_report = self._generate_html_report(query, reports, forum_logs, template_result)
+            # Step 2: 按token预算打包输入后生成HTML报告
+            with self._stage('context_packing', event_callback):
+                packed = self._pack_context(query, reports, forum_logs)
+            with self._stage('html_generation', event_callback):
+                html_report = self._generate_html_report(query, packed.reports, packed.forum_logs,
+                                                         template_result, event_callback)
             
             # Step 3: ExpertEngine专家批注和修改（如果可用）
-            if self.expert_agent:
-                try:
-                    logger.info("开始ExpertEngine专家批注和修改...")
-                    expert_result = self.expert_agent.review_and_annotate(
-                        report_content=html_report,
-                        business_rules="",  # 业务逻辑先留空，后续补充了再应用
-                        save_result=save_report
-                    )
-                    html_report = expert_result.get('reviewed_content', html_report)
-                    logger.info("ExpertEngine专家批注和修改完成")
-                except Exception as e:
-                    logger.warning(f"ExpertEngine批注失败: {str(e)}，使用原始报告")
+            # 后处理模式下跳过这里，报告保存后再在后台批注
+            review_async = bool(self.expert_agent and self.expert_agent.config.EXPERT_REVIEW_ASYNC)
+            if self.expert_agent and not review_async:
+                with self._stage('expert_review', event_callback):
+                    try:
+                        logger.info("开始ExpertEngine专家批注和修改...")
+                        expert_result = self.expert_agent.review_and_annotate(
+                            report_content=html_report,
+                            business_rules="",  # 业务逻辑先留空，后续补充了再应用
+                            save_result=save_report
+                        )
+                        html_report = expert_result.get('reviewed_content', html_report)
+                        logger.info("ExpertEngine专家批注和修改完成")
+                    except Exception as e:
+                        logger.warning(f"ExpertEngine批注失败: {str(e)}，使用原始报告")
             
             # Step 4: 保存报告
             saved_files = {}
             if save_report:
-                saved_files = self._save_report(html_report)
+                with self._stage('save', event_callback):
+                    saved_files = self._save_report(html_report)
+            
+            if review_async:
+                saved_files['expert_review_future'] = self._start_background_review(
+                    html_report, saved_files.get('report_filepath', ''), save_report
+                )
             
             # 更新生成时间
             end_time = datetime.now()
@@ -279,6 +277,50 @@ class ReportAgent:
             logger.exception(f"报告生成过程中发生错误: {str(e)}")
             raise e
     
+    @contextmanager
+    def _stage(self, name: str, event_callback: Optional[Callable[[str, Dict[str, Any]], None]]):
+        """向 event_callback 报告阶段的开始与结束（含耗时）；回调异常不影响报告生成"""
+        def emit(data: Dict[str, Any]):
+            if not event_callback:
+                return
+            try:
+                event_callback('stage', data)
+            except Exception as e:
+                logger.warning(f"进度回调失败: {str(e)}")
+        
+        emit({'stage': name, 'status': 'started'})
+        started = time.monotonic()
+        try:
+            yield
+        except Exception:
+            emit({'stage': name, 'status': 'failed', 'elapsed': round(time.monotonic() - started, 3)})
+            raise
+        emit({'stage': name, 'status': 'finished', 'elapsed': round(time.monotonic() - started, 3)})
+    
+    def _start_background_review(self, html_report: str, report_filepath: str, save_report: bool):
+        """
+        后台执行专家批注，完成后把批注版另存为 *_reviewed.html
+        
+        Returns:
+            Future，结果为批注结果字典（另存成功时包含 reviewed_report_filepath）
+        """
+        def on_complete(result: Dict[str, Any]):
+            reviewed_content = result.get('reviewed_content', '')
+            if not report_filepath or not reviewed_content or reviewed_content == html_report:
+                return
+            reviewed_path = os.path.splitext(report_filepath)[0] + "_reviewed.html"
+            with open(reviewed_path, 'w', encoding='utf-8') as f:
+                f.write(reviewed_content)
+            result['reviewed_report_filepath'] = reviewed_path
+            logger.info(f"专家批注版报告已保存到: {reviewed_path}")
+        
+        return self.expert_agent.review_in_background(
+            report_content=html_report,
+            business_rules="",  # 业务逻辑先留空，后续补充了再应用
+            save_result=save_report,
+            on_complete=on_complete
+        )
+    
     def _select_template(self, query: str, reports: List[Any], forum_logs: str, custom_template: str):
         """选择报告模板"""
         logger.info("选择报告模板...")
@@ -319,8 +361,19 @@ class ReportAgent:
             self.state.metadata.template_used = fallback_template['template_name']
             return fallback_template
     
-    def _generate_html_report(self, query: str, reports: List[Any], forum_logs: str, template_result: Dict[str, Any]) -> str:
-        """生成HTML报告"""
+    def _pack_context(self, query: str, reports: List[Any], forum_logs: str):
+        """在 CONTEXT_TOKEN_BUDGET 内挑选报告与论坛内容，打包统计记录到状态元数据"""
+        packed = self.context_packer.pack(query, reports, forum_logs)
+        self.state.metadata.context_packing = packed.to_dict()
+        logger.info(f"上下文打包: {packed.original_tokens} -> {packed.used_tokens} tokens（预算 {packed.budget_tokens}）")
+        summary = describe_dropped(packed)
+        if summary:
+            logger.info(summary)
+        return packed
+    
+    def _generate_html_report(self, query: str, reports: List[Any], forum_logs: str, template_result: Dict[str, Any],
+                              event_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> str:
+        """生成HTML报告（提供 event_callback 时边生成边推送HTML片段）"""
         logger.info("多轮生成HTML报告...")
         
         # 准备报告内容，确保有3个报告（按顺序：竞争分析、用户分析、市场分析）
@@ -343,7 +396,20 @@ class ReportAgent:
         }
         
         # 使用HTML生成节点生成报告
-        html_content = self.html_generation_node.run(html_input)
+        stream_callbacks = {}
+        if event_callback:
+            def on_chunk(text: Optional[str]):
+                # None 表示LLM调用重试，之前推送的片段作废
+                if text is None:
+                    event_callback('html_reset', {})
+                else:
+                    event_callback('html_chunk', {'text': text})
+            
+            def on_section(section, html: str):
+                event_callback('html_section', {'index': section.index, 'title': section.title, 'html': html})
+            
+            stream_callbacks = {'on_chunk': on_chunk, 'on_section': on_section}
+        html_content = self.html_generation_node.run(html_input, **stream_callbacks)
         
         # 更新状态
         self.state.html_content = html_content
@@ -4,15 +4,19 @@ Report Engine Flask接口
 """
 
 import os
+import re
 import json
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Blueprint, request, jsonify, Response, send_file
+from html.parser import HTMLParser
+from flask import Blueprint, request, jsonify, Response, send_file, stream_with_context
 from typing import Dict, Any
 from loguru import logger
-from .agent import ReportAgent, create_agent
 from .utils.config import settings
+from .utils.event_stream import EventStream
+from .utils.template_catalog import get_template_catalog
 
 
 # 创建Blueprint
@@ -28,6 +32,8 @@ def initialize_report_engine():
     """初始化Report Engine"""
     global report_agent
     try:
+        # 延迟到初始化时才导入 agent，避免拖慢 app.py 启动
+        from .agent import create_agent
         report_agent = create_agent()
         logger.info("Report Engine初始化成功")
         return True
@@ -56,6 +62,33 @@ class ReportTask:
         self.state_file_path = ""
         self.state_file_relative_path = ""
         self.pdf_file_path = ""
+        # PDF导出是独立的后台任务，不影响报告本身的完成状态
+        self.pdf_status = "none"  # none, pending, running, completed, error
+        self.pdf_error = ""
+        self.pdf_done = threading.Event()
+        # 专家批注以后处理方式运行时的状态
+        self.review_status = "none"  # none, running, completed, error
+        self.reviewed_file_path = ""
+        # 生成过程的事件流（阶段、HTML片段），供 /stream/<task_id> 订阅
+        self.stream = EventStream()
+        self.stage = ""
+        self.stage_timings: Dict[str, float] = {}
+
+    def emit(self, event_type: str, data: Dict[str, Any] = None):
+        """发布生成事件，阶段事件同时更新当前阶段与各阶段耗时"""
+        data = data or {}
+        if event_type == "stage":
+            self.stage = data.get('stage', '')
+            if 'elapsed' in data:
+                self.stage_timings[self.stage] = data['elapsed']
+        self.stream.publish(event_type, data)
+
+    def update_pdf_status(self, status: str, error: str = ""):
+        """更新PDF导出状态"""
+        self.pdf_status = status
+        self.pdf_error = error
+        if status in ("completed", "error"):
+            self.pdf_done.set()
 
     def update_status(self, status: str, progress: int = None, error_message: str = ""):
         """更新任务状态"""
@@ -65,6 +98,12 @@ class ReportTask:
         if error_message:
             self.error_message = error_message
         self.updated_at = datetime.now()
+        if status == "completed":
+            self.stream.publish("done", self.to_dict())
+        elif status in ("error", "cancelled"):
+            self.stream.publish("error", self.to_dict())
+        else:
+            self.stream.publish("status", {'status': status, 'progress': self.progress})
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -80,7 +119,14 @@ class ReportTask:
             'report_file_ready': bool(self.report_file_path),
             'report_file_name': self.report_file_name,
             'report_file_path': self.report_file_relative_path,
-            'pdf_file_path': self.pdf_file_path if hasattr(self, 'pdf_file_path') else ''
+            'pdf_file_path': self.pdf_file_path if hasattr(self, 'pdf_file_path') else '',
+            'pdf_status': self.pdf_status,
+            'pdf_error': self.pdf_error,
+            'pdf_ready': self.pdf_status == "completed" and bool(self.pdf_file_path),
+            'review_status': self.review_status,
+            'reviewed_file_path': self.reviewed_file_path,
+            'stage': self.stage,
+            'stage_timings': self.stage_timings
         }
 
 
@@ -108,6 +154,144 @@ def check_engines_ready() -> Dict[str, Any]:
     )
 
 
+# PDF在单线程执行器中渲染：渲染服务本身是串行的，多开线程只会排队
+pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-pdf")
+# /export_pdf 等待后台PDF任务的最长秒数
+PDF_WAIT_TIMEOUT = 180
+
+
+class HTMLToMarkdown(HTMLParser):
+    """把报告HTML粗略转换为Markdown（仅在HTML直接转PDF失败时使用）"""
+
+    SKIP_TAGS = {'script', 'style', 'head'}
+    START_MARKS = {'h1': '\n# ', 'h2': '\n## ', 'h3': '\n### ', 'p': '\n', 'br': '\n'}
+    END_MARK_TAGS = {'h1', 'h2', 'h3', 'p'}
+
+    def __init__(self):
+        super().__init__()
+        self.text = []
+        self.in_skip = False
+
+    def handle_starttag(self, tag, attrs):
+        tag = tag.lower()
+        if tag in self.SKIP_TAGS:
+            self.in_skip = True
+        elif tag in self.START_MARKS:
+            self.text.append(self.START_MARKS[tag])
+
+    def handle_endtag(self, tag):
+        tag = tag.lower()
+        if tag in self.SKIP_TAGS:
+            self.in_skip = False
+        elif tag in self.END_MARK_TAGS:
+            self.text.append('\n')
+
+    def handle_data(self, data):
+        if not self.in_skip:
+            self.text.append(data.strip())
+
+
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def html_to_markdown(html_content: str) -> str:
+    """提取HTML文本内容并保留标题层级"""
+    parser = HTMLToMarkdown()
+    parser.feed(html_content)
+    return _BLANK_LINES.sub('\n\n', ''.join(parser.text))
+
+
+def _task_html_file(task: ReportTask) -> str:
+    """返回任务对应的HTML文件，没有保存的文件时把HTML内容写入临时文件"""
+    if task.report_file_path and os.path.exists(task.report_file_path):
+        return task.report_file_path
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    query_safe = "".join(c for c in task.query if c.isalnum() or c in (' ', '-', '_')).rstrip()[:30]
+    if not query_safe:
+        query_safe = "report"
+
+    html_file = os.path.join(report_agent.config.OUTPUT_DIR, f"temp_report_{query_safe}_{timestamp}.html")
+    os.makedirs(os.path.dirname(html_file), exist_ok=True)
+    with open(html_file, 'w', encoding='utf-8') as f:
+        f.write(task.html_content)
+    logger.info(f"临时HTML文件已保存: {html_file}")
+    return html_file
+
+
+def export_task_pdf(task: ReportTask) -> str:
+    """
+    为已完成的任务生成PDF（优先直接HTML转PDF，失败时回退到Markdown转PDF）
+
+    Returns:
+        PDF文件路径，失败时返回空字符串（原因记录在 task.pdf_error）
+    """
+    from utils.pdf_export import html_to_pdf_direct, export_report_to_pdf, PDF_EXPORT_AVAILABLE
+
+    task.update_pdf_status("running")
+    try:
+        html_file = _task_html_file(task)
+        pdf_filename = os.path.splitext(os.path.basename(html_file))[0] + ".pdf"
+        pdf_path = os.path.abspath(os.path.join(report_agent.config.OUTPUT_DIR, pdf_filename))
+
+        logger.info(f"开始导出PDF（直接HTML转PDF）: {html_file} -> {pdf_path}")
+        if html_to_pdf_direct(html_file, pdf_path) and os.path.exists(pdf_path):
+            if html_file != task.report_file_path:
+                try:
+                    os.remove(html_file)
+                except OSError:
+                    pass
+            task.pdf_file_path = pdf_path
+            task.update_pdf_status("completed")
+            logger.info(f"汇总报告PDF已生成（直接HTML转PDF）: {pdf_path}")
+            return pdf_path
+
+        logger.warning("直接HTML转PDF失败，尝试使用Markdown转PDF方法")
+        if not PDF_EXPORT_AVAILABLE:
+            task.update_pdf_status("error", "PDF导出功能不可用，请安装: pip install playwright 或 pip install markdown reportlab")
+            return ""
+
+        pdf_path = export_report_to_pdf(
+            report_content=html_to_markdown(task.html_content),
+            output_dir=report_agent.config.OUTPUT_DIR,
+            query=task.query,
+            engine_name="report"
+        )
+        if pdf_path and os.path.exists(pdf_path):
+            task.pdf_file_path = pdf_path
+            task.update_pdf_status("completed")
+            logger.info(f"汇总报告PDF已生成: {pdf_path}")
+            return pdf_path
+
+        task.update_pdf_status("error", "PDF生成失败")
+        return ""
+
+    except Exception as e:
+        logger.exception(f"导出PDF失败: {str(e)}")
+        task.update_pdf_status("error", str(e))
+        return ""
+
+
+def schedule_pdf_export(task: ReportTask) -> None:
+    """把PDF导出提交到后台执行器（同一任务只提交一次）"""
+    if task.pdf_status in ("pending", "running", "completed"):
+        return
+    task.pdf_done.clear()
+    task.update_pdf_status("pending")
+    pdf_executor.submit(export_task_pdf, task)
+
+
+def _on_review_done(task: ReportTask, future) -> None:
+    """后台专家批注结束时更新任务状态"""
+    try:
+        result = future.result()
+        task.reviewed_file_path = result.get('reviewed_report_filepath', '')
+        task.review_status = "completed"
+    except Exception as e:
+        logger.warning(f"后台专家批注失败: {str(e)}")
+        task.review_status = "error"
+
+
 def run_report_generation(task: ReportTask, query: str, custom_template: str = ""):
     """在后台线程中运行报告生成"""
     global current_task
@@ -116,15 +300,23 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
         task.update_status("running", 10)
 
         # 检查输入文件
+        stage_started = time.monotonic()
+        task.emit("stage", {'stage': 'check_inputs', 'status': 'started'})
         check_result = check_engines_ready()
         if not check_result['ready']:
             task.update_status("error", 0, f"输入文件未准备就绪: {check_result.get('missing_files', [])}")
             return
+        task.emit("stage", {'stage': 'check_inputs', 'status': 'finished',
+                            'elapsed': round(time.monotonic() - stage_started, 3)})
 
         task.update_status("running", 30)
 
         # 加载输入文件
+        stage_started = time.monotonic()
+        task.emit("stage", {'stage': 'load_inputs', 'status': 'started'})
         content = report_agent.load_input_files(check_result['latest_files'])
+        task.emit("stage", {'stage': 'load_inputs', 'status': 'finished',
+                            'elapsed': round(time.monotonic() - stage_started, 3)})
 
         task.update_status("running", 50)
 
@@ -134,7 +326,8 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
             reports=content['reports'],
             forum_logs=content['forum_logs'],
             custom_template=custom_template,
-            save_report=True
+            save_report=True,
+            event_callback=task.emit
         )
 
         html_report = generation_result.get('html_content', '')
@@ -149,6 +342,12 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
         task.state_file_path = generation_result.get('state_filepath', '')
         task.state_file_relative_path = generation_result.get('state_relative_path', '')
         
+        # 专家批注在后台进行时，任务先以未批注的报告完成
+        review_future = generation_result.get('expert_review_future')
+        if review_future is not None:
+            task.review_status = "running"
+            review_future.add_done_callback(lambda future: _on_review_done(task, future))
+        
         # 报告生成完成后，更新基准（将当前文件数量设为新基准）
         try:
             directories = {
@@ -161,117 +360,10 @@ def run_report_generation(task: ReportTask, query: str, custom_template: str = "
         except Exception as e:
             logger.warning(f"更新基准失败: {str(e)}")
         
-        # 自动导出PDF报告（优先使用直接HTML转PDF）
-        try:
-            from utils.pdf_export import html_to_pdf_direct
-            
-            # 如果报告已保存为HTML文件，直接使用HTML文件
-            if task.report_file_path and os.path.exists(task.report_file_path):
-                html_file = task.report_file_path
-                
-                # 生成PDF文件名
-                base_name = os.path.basename(html_file)
-                pdf_filename = os.path.splitext(base_name)[0] + ".pdf"
-                pdf_path = os.path.join(report_agent.config.OUTPUT_DIR, pdf_filename)
-                pdf_path = os.path.abspath(pdf_path)
-                
-                logger.info(f"开始自动导出PDF（直接HTML转PDF）: {html_file} -> {pdf_path}")
-                
-                # 直接HTML转PDF
-                success = html_to_pdf_direct(html_file, pdf_path)
-                
-                if success and os.path.exists(pdf_path):
-                    task.pdf_file_path = pdf_path
-                    logger.info(f"汇总报告PDF已生成（直接HTML转PDF）: {pdf_path}")
-                else:
-                    logger.warning("直接HTML转PDF失败，尝试使用Markdown转PDF方法")
-                    # 回退到Markdown方法
-                    raise Exception("HTML转PDF失败")
-            else:
-                logger.warning("HTML文件不存在，跳过自动PDF导出")
-                
-        except Exception as html_error:
-            logger.warning(f"直接HTML转PDF失败: {str(html_error)}，尝试使用Markdown转PDF方法")
-            
-            # 回退到Markdown转PDF方法
-            try:
-                # 确保重新导入以获取最新状态
-                import importlib
-                import sys
-                
-                # 如果模块已经在sys.modules中，先移除它
-                if 'utils.pdf_export' in sys.modules:
-                    del sys.modules['utils.pdf_export']
-                
-                # 重新导入模块
-                import utils.pdf_export
-                importlib.reload(utils.pdf_export)
-                from utils.pdf_export import export_report_to_pdf, PDF_EXPORT_AVAILABLE, MARKDOWN_AVAILABLE
-                
-                logger.info(f"PDF导出功能状态检查: MARKDOWN_AVAILABLE={MARKDOWN_AVAILABLE}, PDF_EXPORT_AVAILABLE={PDF_EXPORT_AVAILABLE}")
-                
-                if PDF_EXPORT_AVAILABLE:
-                # 将HTML转换为Markdown（简单提取文本内容）
-                import re
-                from html.parser import HTMLParser
-                
-                class HTMLToText(HTMLParser):
-                    def __init__(self):
-                        super().__init__()
-                        self.text = []
-                        self.skip_tags = {'script', 'style', 'head'}
-                        self.in_skip = False
-                    
-                    def handle_starttag(self, tag, attrs):
-                        if tag.lower() in self.skip_tags:
-                            self.in_skip = True
-                        elif tag.lower() == 'h1':
-                            self.text.append('\n# ')
-                        elif tag.lower() == 'h2':
-                            self.text.append('\n## ')
-                        elif tag.lower() == 'h3':
-                            self.text.append('\n### ')
-                        elif tag.lower() == 'p':
-                            self.text.append('\n')
-                        elif tag.lower() == 'br':
-                            self.text.append('\n')
-                    
-                    def handle_endtag(self, tag):
-                        if tag.lower() in self.skip_tags:
-                            self.in_skip = False
-                        elif tag.lower() in {'h1', 'h2', 'h3', 'p'}:
-                            self.text.append('\n')
-                    
-                    def handle_data(self, data):
-                        if not self.in_skip:
-                            self.text.append(data.strip())
-                
-                parser = HTMLToText()
-                parser.feed(html_report)
-                markdown_content = ''.join(parser.text)
-                
-                # 清理多余的空白行
-                markdown_content = re.sub(r'\n{3,}', '\n\n', markdown_content)
-                
-                # 导出PDF
-                pdf_path = export_report_to_pdf(
-                    report_content=markdown_content,
-                    output_dir=report_agent.config.OUTPUT_DIR,
-                    query=query,
-                    engine_name="report"
-                )
-                
-                if pdf_path:
-                    task.pdf_file_path = pdf_path
-                    logger.info(f"汇总报告PDF已生成: {pdf_path}")
-                else:
-                    logger.warning("PDF导出失败")
-            else:
-                logger.warning("PDF导出功能不可用")
-        except Exception as e:
-            logger.warning(f"自动导出PDF失败: {str(e)}")
-        
+        # HTML就绪即标记完成，PDF在后台单独生成，进度见 to_dict() 中的 pdf_status
         task.update_status("completed", 100)
+        if task.html_content:
+            schedule_pdf_export(task)
 
     except Exception as e:
         logger.exception(f"报告生成过程中发生错误: {str(e)}")
@@ -304,6 +396,55 @@ def get_status():
         }), 500
 
 
+@report_bp.route('/status/stream', methods=['GET'])
+def stream_status():
+    """
+    以 Server-Sent Events 推送引擎报告就绪状态，替代轮询 /status
+
+    连接后先推送一次当前状态（event: engines），此后每当有引擎保存新报告就再推送一次；
+    三个引擎都有新报告时推送 event: ready 并结束。
+    就绪还取决于 logs/forum.log 与文件数基准，二者不在报告索引的监视范围内，
+    因此每次心跳超时也重新检查一遍，状态有变化时同样推送。
+    """
+    if not report_agent or not report_agent.file_baseline.index:
+        return jsonify({
+            'success': False,
+            'error': 'Report Engine未初始化'
+        }), 500
+
+    index = report_agent.file_baseline.index
+
+    def generate():
+        version = index.version
+        last_payload = None
+        while True:
+            engines_status = check_engines_ready()
+            payload = json.dumps({
+                'engines_ready': engines_status['ready'],
+                'files_found': engines_status.get('files_found', []),
+                'missing_files': engines_status.get('missing_files', [])
+            }, ensure_ascii=False)
+            if payload != last_payload:
+                yield f"event: engines\ndata: {payload}\n\n"
+                last_payload = payload
+            else:
+                yield ": keep-alive\n\n"
+            if engines_status['ready']:
+                yield f"event: ready\ndata: {payload}\n\n"
+                return
+            # 索引变化或心跳超时后都重新检查
+            version = index.wait_for_change(version, 15)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @report_bp.route('/generate', methods=['POST'])
 def generate_report():
     """开始生成报告"""
@@ -414,6 +555,35 @@ def get_progress(task_id: str):
         }), 500
 
 
+@report_bp.route('/stream/<task_id>', methods=['GET'])
+def stream_task(task_id: str):
+    """
+    以 Server-Sent Events 推送报告生成事件（stage / status / html_chunk / html_reset / html_section / done / error）
+
+    断线重连时浏览器会带上 Last-Event-ID，从其下一条事件继续推送；也可以用 ?offset= 指定起始序号。
+    """
+    task = current_task
+    if not task or task.task_id != task_id:
+        return jsonify({
+            'success': False,
+            'error': '任务不存在'
+        }), 404
+
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        last_event_id = request.headers.get('Last-Event-ID', '')
+        offset = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+
+    return Response(
+        stream_with_context(task.stream.iter_sse(offset)),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+
 @report_bp.route('/result/<task_id>', methods=['GET'])
 def get_result(task_id: str):
     """获取报告生成结果"""
@@ -461,162 +631,34 @@ def export_pdf(task_id: str):
                 'task': current_task.to_dict()
             }), 400
         
-        # 优先使用直接HTML转PDF（保持与浏览器完全一致的格式）
-        try:
-            from utils.pdf_export import html_to_pdf_direct
-            
-            # 如果报告已保存为HTML文件，直接使用HTML文件
-            if current_task.report_file_path and os.path.exists(current_task.report_file_path):
-                html_file = current_task.report_file_path
-            else:
-                # 如果没有保存的HTML文件，先保存HTML内容到临时文件
-                from datetime import datetime
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                query_safe = "".join(c for c in current_task.query if c.isalnum() or c in (' ', '-', '_')).rstrip()[:30]
-                if not query_safe:
-                    query_safe = "report"
-                
-                html_file = os.path.join(report_agent.config.OUTPUT_DIR, f"temp_report_{query_safe}_{timestamp}.html")
-                os.makedirs(os.path.dirname(html_file), exist_ok=True)
-                
-                with open(html_file, 'w', encoding='utf-8') as f:
-                    f.write(current_task.html_content)
-                logger.info(f"临时HTML文件已保存: {html_file}")
-            
-            # 生成PDF文件名
-            base_name = os.path.basename(html_file)
-            pdf_filename = os.path.splitext(base_name)[0] + ".pdf"
-            pdf_path = os.path.join(report_agent.config.OUTPUT_DIR, pdf_filename)
-            pdf_path = os.path.abspath(pdf_path)
-            
-            logger.info(f"开始将HTML直接转换为PDF: {html_file} -> {pdf_path}")
-            
-            # 直接HTML转PDF
-            success = html_to_pdf_direct(html_file, pdf_path)
-            
-            if success and os.path.exists(pdf_path):
-                # 清理临时HTML文件（如果是临时文件）
-                if html_file.startswith('temp_'):
-                    try:
-                        os.remove(html_file)
-                        logger.info(f"临时HTML文件已删除: {html_file}")
-                    except:
-                        pass
-                
-                # 返回PDF文件
-                return send_file(
-                    pdf_path,
-                    as_attachment=True,
-                    download_name=os.path.basename(pdf_path),
-                    mimetype='application/pdf'
-                )
-            else:
-                logger.warning("直接HTML转PDF失败，尝试使用Markdown转PDF方法")
-                # 如果直接HTML转PDF失败，回退到Markdown方法
-                raise Exception("HTML转PDF失败，尝试Markdown方法")
-                
-        except Exception as e:
-            logger.warning(f"直接HTML转PDF失败: {str(e)}，尝试使用Markdown转PDF方法")
-            
-            # 回退到Markdown转PDF方法
-            try:
-                import importlib
-                import sys
-                
-                # 如果模块已经在sys.modules中，先移除它
-                if 'utils.pdf_export' in sys.modules:
-                    del sys.modules['utils.pdf_export']
-                
-                # 重新导入模块
-                import utils.pdf_export
-                importlib.reload(utils.pdf_export)
-                from utils.pdf_export import export_report_to_pdf, PDF_EXPORT_AVAILABLE, MARKDOWN_AVAILABLE
-                
-                logger.info(f"PDF导出功能状态检查: MARKDOWN_AVAILABLE={MARKDOWN_AVAILABLE}, PDF_EXPORT_AVAILABLE={PDF_EXPORT_AVAILABLE}")
-                
-                if not PDF_EXPORT_AVAILABLE:
-                    return jsonify({
-                        'success': False,
-                        'error': 'PDF导出功能不可用，请安装: pip install playwright 或 pip install markdown reportlab'
-                    }), 400
-                
-                # 将HTML转换为Markdown
-                import re
-                from html.parser import HTMLParser
-                
-                class HTMLToText(HTMLParser):
-                    def __init__(self):
-                        super().__init__()
-                        self.text = []
-                        self.skip_tags = {'script', 'style', 'head'}
-                        self.in_skip = False
-                    
-                    def handle_starttag(self, tag, attrs):
-                        if tag.lower() in self.skip_tags:
-                            self.in_skip = True
-                        elif tag.lower() == 'h1':
-                            self.text.append('\n# ')
-                        elif tag.lower() == 'h2':
-                            self.text.append('\n## ')
-                        elif tag.lower() == 'h3':
-                            self.text.append('\n### ')
-                        elif tag.lower() == 'p':
-                            self.text.append('\n')
-                        elif tag.lower() == 'br':
-                            self.text.append('\n')
-                    
-                    def handle_endtag(self, tag):
-                        if tag.lower() in self.skip_tags:
-                            self.in_skip = False
-                        elif tag.lower() in {'h1', 'h2', 'h3', 'p'}:
-                            self.text.append('\n')
-                    
-                    def handle_data(self, data):
-                        if not self.in_skip:
-                            self.text.append(data.strip())
-                
-                parser = HTMLToText()
-                parser.feed(current_task.html_content)
-                markdown_content = ''.join(parser.text)
-                
-                # 清理多余的空白行
-                markdown_content = re.sub(r'\n{3,}', '\n\n', markdown_content)
-                
-                # 导出PDF
-                pdf_path = export_report_to_pdf(
-                    report_content=markdown_content,
-                    output_dir=report_agent.config.OUTPUT_DIR,
-                    query=current_task.query,
-                    engine_name="report"
-                )
-                
-                if pdf_path and os.path.exists(pdf_path):
-                    # 返回PDF文件
-                    return send_file(
-                        pdf_path,
-                        as_attachment=True,
-                        download_name=os.path.basename(pdf_path),
-                        mimetype='application/pdf'
-                    )
-                else:
-                    return jsonify({
-                        'success': False,
-                        'error': 'PDF生成失败'
-                    }), 500
-            except Exception as markdown_error:
-                logger.exception(f"Markdown转PDF也失败: {str(markdown_error)}")
-                return jsonify({
-                    'success': False,
-                    'error': f'PDF导出失败: {str(markdown_error)}'
-                }), 500
-                
-        except ImportError as e:
-            logger.exception(f"PDF导出功能导入失败: {str(e)}")
+        task = current_task
+
+        # 后台PDF任务尚未开始（或上次失败）时重新提交，然后等待其完成
+        if task.pdf_status in ("none", "error") or (task.pdf_status == "completed" and not os.path.exists(task.pdf_file_path)):
+            task.pdf_status = "none"
+            schedule_pdf_export(task)
+
+        if not task.pdf_done.wait(PDF_WAIT_TIMEOUT):
             return jsonify({
                 'success': False,
-                'error': f'PDF导出功能不可用: {str(e)}'
+                'error': 'PDF仍在生成中，请稍后重试',
+                'task': task.to_dict()
+            }), 202
+
+        if task.pdf_status != "completed" or not os.path.exists(task.pdf_file_path):
+            return jsonify({
+                'success': False,
+                'error': f'PDF导出失败: {task.pdf_error}',
+                'task': task.to_dict()
             }), 500
-            
+
+        return send_file(
+            task.pdf_file_path,
+            as_attachment=True,
+            download_name=os.path.basename(task.pdf_file_path),
+            mimetype='application/pdf'
+        )
+
     except Exception as e:
         logger.exception(f"导出PDF失败: {str(e)}")
         return jsonify({
@@ -735,24 +777,14 @@ def get_templates():
             }), 500
 
         template_dir = settings.TEMPLATE_DIR
-        templates = []
-
-        if os.path.exists(template_dir):
-            for filename in os.listdir(template_dir):
-                if filename.endswith('.md'):
-                    template_path = os.path.join(template_dir, filename)
-                    try:
-                        with open(template_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-
-                        templates.append({
-                            'name': filename.replace('.md', ''),
-                            'filename': filename,
-                            'description': content.split('\n')[0] if content else '无描述',
-                            'size': len(content)
-                        })
-                    except Exception as e:
-                        logger.exception(f"读取模板失败 {filename}: {str(e)}")
+        templates = [{
+            'name': entry.name,
+            'filename': entry.filename,
+            'description': entry.first_line,
+            'summary': entry.description,
+            'sections': [section.title for section in entry.sections],
+            'size': len(entry.content)
+        } for entry in get_template_catalog(template_dir).templates()]
 
         return jsonify({
             'success': True,
@@ -877,4 +909,4 @@ def reset_baseline_api():
         return jsonify({
             'success': False,
             'error': f'重置基准失败: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
@@ -142,14 +142,22 @@ class LLMClient:
             system_prompt: 系统提示词
             user_prompt: 用户提示词
             **kwargs: 额外参数（temperature, top_p等）
+                - on_chunk: 可选回调，每收到一个文本块调用一次；每次（重试）开始前以 None 调用一次，
+                  调用方据此丢弃上一次尝试已转发的部分输出
             
         Returns:
             完整的响应字符串
         """
+        on_chunk = kwargs.pop("on_chunk", None)
+        if on_chunk:
+            on_chunk(None)
+        
         # 以字节形式收集所有块
         byte_chunks = []
         for chunk in self.stream_invoke(system_prompt, user_prompt, **kwargs):
             byte_chunks.append(chunk.encode('utf-8'))
+            if on_chunk:
+                on_chunk(chunk)
         
         # 拼接所有字节，然后一次性解码
         if byte_chunks:
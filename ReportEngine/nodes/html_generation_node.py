@@ -3,29 +3,55 @@ HTML生成节点
 将整合后的内容转换为美观的HTML报告
 """
 
+import re
 import json
+import html
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Callable
 from loguru import logger
 
 from .base_node import StateMutationNode
 from ..llms.base import LLMClient
 from ..state.state import ReportState
-from ..prompts import SYSTEM_PROMPT_HTML_GENERATION
+from ..prompts import SYSTEM_PROMPT_HTML_GENERATION, SYSTEM_PROMPT_HTML_SECTION
+from ..utils.text_sections import (
+    TemplateSection,
+    parse_template_sections,
+    split_markdown_sections,
+    split_forum_speeches,
+    select_relevant,
+)
 # 不再需要text_processing依赖
 
 
+# 分章节模式：每个章节的上下文来源（输入字段 -> 章节输入中的片段字段）
+SECTION_SOURCES = {
+    'compete_engine_report': 'compete_engine_excerpts',
+    'customer_engine_report': 'customer_engine_excerpts',
+    'market_engine_report': 'market_engine_excerpts',
+}
+_BODY_CONTENT = re.compile(r'<body[^>]*>(.*)</body>', re.IGNORECASE | re.DOTALL)
+
+
 class HTMLGenerationNode(StateMutationNode):
     """HTML生成处理节点"""
     
-    def __init__(self, llm_client: LLMClient):
+    def __init__(self, llm_client: LLMClient, mode: str = "single",
+                 max_workers: int = 4, section_context_chars: int = 16000):
         """
         初始化HTML生成节点
         
         Args:
             llm_client: LLM客户端
+            mode: 生成模式，single（一次调用生成全文）或 sections（按模板章节并行生成后拼装）
+            max_workers: 分章节模式下并发生成的章节数
+            section_context_chars: 分章节模式下每个章节的上下文字符预算
         """
         super().__init__(llm_client, "HTMLGenerationNode")
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.section_context_chars = section_context_chars
     
     def run(self, input_data: Dict[str, Any], **kwargs) -> str:
         """
@@ -39,40 +65,105 @@ class HTMLGenerationNode(StateMutationNode):
                 - market_engine_report: 市场分析报告内容
                 - forum_logs: 论坛日志内容
                 - selected_template: 选择的模板内容
+            **kwargs: mode 可临时覆盖节点的生成模式（single / sections）；
+                on_chunk(text) 接收单次生成模式的流式HTML块（重试前以 None 调用）；
+                on_section(section, html) 在分章节模式下每完成一个章节时调用
                 
         Returns:
             生成的HTML内容
         """
-        logger.info("开始生成HTML报告...")
+        mode = kwargs.get('mode') or self.mode
+        logger.info(f"开始生成HTML报告（模式: {mode}）...")
         
         try:
-            # 准备LLM输入数据
-            llm_input = {
-                "query": input_data.get('query', ''),
-                "compete_engine_report": input_data.get('compete_engine_report', ''),
-                "customer_engine_report": input_data.get('customer_engine_report', ''),
-                "market_engine_report": input_data.get('market_engine_report', ''),
-                "forum_logs": input_data.get('forum_logs', ''),
-                "selected_template": input_data.get('selected_template', '')
-            }
-            
-            # 转换为JSON格式传递给LLM
-            message = json.dumps(llm_input, ensure_ascii=False, indent=2)
-            
-            # 调用LLM生成HTML
-            response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_HTML_GENERATION, message)
-            
-            # 处理响应（简化版）
-            processed_response = self.process_output(response)
-            
-            logger.info("HTML报告生成完成")
-            return processed_response
+            if mode == "sections":
+                sections = parse_template_sections(input_data.get('selected_template', ''))
+                if len(sections) >= 2:
+                    return self._run_sections(input_data, sections, on_section=kwargs.get('on_section'))
+                logger.warning("模板无法拆分为多个章节，改用单次生成模式")
+            return self._run_single(input_data, on_chunk=kwargs.get('on_chunk'))
             
         except Exception as e:
             logger.exception(f"HTML生成失败: {str(e)}")
             # 返回备用HTML
             return self._generate_fallback_html(input_data)
     
+    def _run_single(self, input_data: Dict[str, Any], on_chunk: Optional[Callable[[Optional[str]], None]] = None) -> str:
+        """单次调用：把全部输入交给LLM生成完整HTML文档"""
+        # 准备LLM输入数据
+        llm_input = {
+            "query": input_data.get('query', ''),
+            "compete_engine_report": input_data.get('compete_engine_report', ''),
+            "customer_engine_report": input_data.get('customer_engine_report', ''),
+            "market_engine_report": input_data.get('market_engine_report', ''),
+            "forum_logs": input_data.get('forum_logs', ''),
+            "selected_template": input_data.get('selected_template', '')
+        }
+        
+        # 转换为JSON格式传递给LLM
+        message = json.dumps(llm_input, ensure_ascii=False, indent=2)
+        
+        # 调用LLM生成HTML
+        response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_HTML_GENERATION, message, on_chunk=on_chunk)
+        
+        # 处理响应（简化版）
+        processed_response = self.process_output(response)
+        
+        logger.info("HTML报告生成完成")
+        return processed_response
+    
+    def _run_sections(self, input_data: Dict[str, Any], sections: List[TemplateSection],
+                      on_section: Optional[Callable[[TemplateSection, str], None]] = None) -> str:
+        """
+        分章节生成：每个章节只携带与其提纲相关的片段，章节并发生成后拼装进统一的HTML外壳
+        
+        单个章节失败时以占位内容代替，不影响其他章节。
+        """
+        query = input_data.get('query', '')
+        source_chunks = {
+            excerpt_key: [body for _, body in split_markdown_sections(str(input_data.get(input_key) or ''))]
+            for input_key, excerpt_key in SECTION_SOURCES.items()
+        }
+        forum_speeches = [line for _, line in split_forum_speeches(input_data.get('forum_logs', ''))]
+        # 三份报告与论坛日志平分章节上下文预算
+        budget = self.section_context_chars // (len(SECTION_SOURCES) + 1)
+        report_outline = [section.title for section in sections]
+        
+        def generate(section: TemplateSection) -> str:
+            focus = f"{query}\n{section.to_text()}"
+            section_input = {
+                "query": query,
+                "report_outline": report_outline,
+                "section_id": section.anchor,
+                "section_title": section.title,
+                "section_outline": section.outline,
+                **{key: select_relevant(chunks, focus, budget) for key, chunks in source_chunks.items()},
+                "forum_excerpts": select_relevant(forum_speeches, focus, budget),
+            }
+            message = json.dumps(section_input, ensure_ascii=False, indent=2)
+            response = self.llm_client.stream_invoke_to_string(SYSTEM_PROMPT_HTML_SECTION, message)
+            return self._normalize_section(self.process_output(response), section)
+        
+        workers = min(self.max_workers, len(sections))
+        logger.info(f"分章节生成HTML: {len(sections)} 个章节，并发 {workers}")
+        fragments: Dict[int, str] = {}
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="html-section") as executor:
+            futures = {executor.submit(generate, section): section for section in sections}
+            for future in as_completed(futures):
+                section = futures[future]
+                try:
+                    fragments[section.index] = future.result()
+                    logger.info(f"章节生成完成 ({len(fragments)}/{len(sections)}): {section.title}")
+                except Exception as e:
+                    logger.exception(f"章节生成失败，使用占位内容: {section.title}: {str(e)}")
+                    fragments[section.index] = self._placeholder_section(section)
+                if on_section:
+                    on_section(section, fragments[section.index])
+        
+        html_content = self._assemble_sections(query, sections, [fragments[s.index] for s in sections])
+        logger.info(f"HTML报告生成完成（分章节），长度: {len(html_content)} 字符")
+        return html_content
+    
     def mutate_state(self, input_data: Dict[str, Any], state: ReportState, **kwargs) -> ReportState:
         """
         修改报告状态，添加生成的HTML内容
@@ -131,6 +222,149 @@ class HTMLGenerationNode(StateMutationNode):
             logger.exception(f"处理HTML输出失败: {str(e)}，返回原始输出")
             return output
     
+    def _normalize_section(self, fragment: str, section: TemplateSection) -> str:
+        """保证章节输出是单个 <section> 片段（LLM偶尔会返回完整文档或漏掉外层标签）"""
+        body = _BODY_CONTENT.search(fragment)
+        if body:
+            fragment = body.group(1).strip()
+        if '<section' not in fragment.lower():
+            fragment = f'<section id="{section.anchor}" class="report-section">\n{fragment}\n</section>'
+        return fragment
+    
+    def _placeholder_section(self, section: TemplateSection) -> str:
+        """章节生成失败时的占位内容：保留标题与提纲"""
+        items = "".join(f"<li>{html.escape(item)}</li>" for item in section.outline)
+        return (
+            f'<section id="{section.anchor}" class="report-section">\n'
+            f'<h2>{html.escape(section.title)}</h2>\n'
+            f'<p class="section-error">本章节生成失败，以下为该章节的分析提纲。</p>\n'
+            f'<ul>{items}</ul>\n</section>'
+        )
+    
+    def _assemble_sections(self, query: str, sections: List[TemplateSection], fragments: List[str]) -> str:
+        """把各章节片段拼装为完整HTML文档（目录放在正文开头）"""
+        generation_time = datetime.now().strftime("%Y年%m月%d日 %H:%M:%S")
+        title = html.escape(query or '智能舆情分析报告')
+        toc = "\n".join(
+            f'            <li><a href="#{section.anchor}">{html.escape(section.title)}</a></li>'
+            for section in sections
+        )
+        body = "\n\n".join(fragments)
+        
+        return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title} - 智能舆情分析报告</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <style>
+        body {{
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Microsoft YaHei', sans-serif;
+            line-height: 1.7;
+            color: #333;
+            max-width: 1200px;
+            margin: 0 auto;
+            padding: 20px;
+            background: #f5f5f5;
+        }}
+        .container {{
+            background: white;
+            padding: 40px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        h1 {{
+            color: #2c3e50;
+            border-bottom: 3px solid #3498db;
+            padding-bottom: 10px;
+        }}
+        h2 {{
+            color: #34495e;
+            margin-top: 30px;
+            margin-bottom: 15px;
+        }}
+        h3 {{
+            color: #3d566e;
+        }}
+        .meta {{
+            background: #e9ecef;
+            padding: 15px;
+            border-radius: 5px;
+            margin-bottom: 20px;
+        }}
+        .toc {{
+            background: #f8f9fa;
+            border-left: 4px solid #3498db;
+            padding: 15px 25px;
+            margin-bottom: 30px;
+        }}
+        .toc a {{
+            color: #2c3e50;
+            text-decoration: none;
+        }}
+        .report-section {{
+            margin-bottom: 40px;
+        }}
+        .section-error {{
+            color: #c0392b;
+        }}
+        table {{
+            border-collapse: collapse;
+            width: 100%;
+            margin: 15px 0;
+        }}
+        th, td {{
+            border: 1px solid #dee2e6;
+            padding: 8px 12px;
+            text-align: left;
+        }}
+        th {{
+            background: #f1f3f5;
+        }}
+        canvas {{
+            max-width: 100%;
+            margin: 15px 0;
+        }}
+        .footer {{
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid #eee;
+            text-align: center;
+            color: #666;
+        }}
+        @media print {{
+            body {{ background: white; padding: 0; }}
+            .container {{ box-shadow: none; padding: 0; }}
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>{title}</h1>
+        
+        <div class="meta">
+            <strong>报告生成时间:</strong> {generation_time}<br>
+            <strong>数据来源:</strong> 竞争分析、用户分析、市场分析、ForumEngine
+        </div>
+        
+        <nav class="toc">
+            <strong>目录</strong>
+            <ol>
+{toc}
+            </ol>
+        </nav>
+        
+{body}
+        
+        <div class="footer">
+            <p>本报告由智能舆情分析平台自动生成</p>
+            <p>ReportEngine v1.0 | 生成时间: {generation_time}</p>
+        </div>
+    </div>
+</body>
+</html>"""
+    
     def _generate_fallback_html(self, input_data: Dict[str, Any]) -> str:
         """
         生成备用HTML报告（当LLM失败时使用）
@@ -3,28 +3,33 @@
 根据查询内容和可用模板选择最合适的报告模板
 """
 
-import os
 import json
 from typing import Dict, Any, List, Optional
 from loguru import logger
 
 from .base_node import BaseNode
 from ..prompts import SYSTEM_PROMPT_TEMPLATE_SELECTION
+from ..utils.context_packer import ContextPacker
+from ..utils.template_catalog import get_template_catalog
 
 
 class TemplateSelectionNode(BaseNode):
     """模板选择处理节点"""
     
-    def __init__(self, llm_client, template_dir: str = "ReportEngine/report_template"):
+    def __init__(self, llm_client, template_dir: str = "ReportEngine/report_template",
+                 context_packer: Optional[ContextPacker] = None):
         """
         初始化模板选择节点
         
         Args:
             llm_client: LLM客户端
             template_dir: 模板目录路径
+            context_packer: 报告与论坛摘要的上下文打包器（默认3000 tokens预算）
         """
         super().__init__(llm_client, "TemplateSelectionNode")
         self.template_dir = template_dir
+        self.catalog = get_template_catalog(template_dir)
+        self.context_packer = context_packer or ContextPacker(budget_tokens=3000)
         
     def run(self, input_data: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """
@@ -71,37 +76,23 @@ class TemplateSelectionNode(BaseNode):
         logger.info("尝试使用LLM进行模板选择...")
         
         # 构建模板列表
-        template_list = "\n".join([f"- {t['name']}: {t['description']}" for t in available_templates])
+        template_list = "\n".join(t['descriptor'] for t in available_templates)
+        
+        # 在token预算内构建报告与论坛摘要（按相关度挑选章节和发言，而不是简单截取开头）
+        packed = self.context_packer.pack(query, reports, forum_logs)
         
-        # 构建报告内容摘要
         reports_summary = ""
         if reports:
             reports_summary = "\n\n=== 分析引擎报告内容 ===\n"
-            for i, report in enumerate(reports, 1):
-                # 获取报告内容，支持不同的数据格式
-                if isinstance(report, dict):
-                    content = report.get('content', str(report))
-                elif hasattr(report, 'content'):
-                    content = report.content
-                else:
-                    content = str(report)
-                
-                # 截断过长的内容，保留前1000个字符
-                if len(content) > 1000:
-                    content = content[:1000] + "...(内容已截断)"
-                
+            for i, content in enumerate(packed.reports, 1):
                 reports_summary += f"\n报告{i}内容:\n{content}\n"
         
-        # 构建论坛日志摘要
         forum_summary = ""
-        if forum_logs and forum_logs.strip():
-            forum_summary = "\n\n=== 三个引擎的讨论内容 ===\n"
-            # 截断过长的日志内容，保留前800个字符
-            if len(forum_logs) > 800:
-                forum_content = forum_logs[:800] + "...(讨论内容已截断)"
-            else:
-                forum_content = forum_logs
-            forum_summary += forum_content
+        if packed.forum_logs:
+            forum_summary = "\n\n=== 三个引擎的讨论内容 ===\n" + packed.forum_logs
+        
+        if packed.dropped:
+            logger.info(f"模板选择上下文: {packed.original_tokens} -> {packed.used_tokens} tokens，省略 {len(packed.dropped)} 项")
         
         user_message = f"""查询内容: {query}
 
@@ -186,69 +177,8 @@ class TemplateSelectionNode(BaseNode):
         return None
     
     def _get_available_templates(self) -> List[Dict[str, Any]]:
-        """获取可用的模板列表"""
-        templates = []
-        
-        if not os.path.exists(self.template_dir):
-            logger.error(f"模板目录不存在: {self.template_dir}")
-            return templates
-        
-        # 查找所有markdown模板文件
-        for filename in os.listdir(self.template_dir):
-            if filename.endswith('.md'):
-                template_path = os.path.join(self.template_dir, filename)
-                try:
-                    with open(template_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    template_name = filename.replace('.md', '')
-                    description = self._extract_template_description(template_name)
-                    
-                    templates.append({
-                        'name': template_name,
-                        'path': template_path,
-                        'content': content,
-                        'description': description
-                    })
-                except Exception as e:
-                    logger.exception(f"读取模板文件失败 {filename}: {str(e)}")
-        
-        return templates
-    
-    def _extract_template_description(self, template_name: str) -> str:
-        """根据模板名称生成描述"""
-        if '综合分析' in template_name or '全面分析' in template_name:
-            return "适用于全面深度综合分析，整合Market、Customer、Compete三个Agent的协同分析能力，进行多维度交叉验证和深度洞察"
-        elif '企业品牌' in template_name:
-            return "适用于企业品牌声誉和形象分析"
-        elif '市场竞争' in template_name:
-            return "适用于市场竞争格局和对手分析"
-        elif '日常' in template_name or '定期' in template_name:
-            return "适用于日常监测和定期汇报"
-        elif '政策' in template_name or '行业' in template_name:
-            return "适用于政策影响和行业动态分析"
-        elif '热点' in template_name or '社会' in template_name:
-            return "适用于社会热点和公共事件分析"
-        elif '突发' in template_name or '危机' in template_name:
-            return "适用于突发事件和危机公关"
-        elif '产品发布' in template_name or '上市' in template_name:
-            return "适用于产品发布与上市综合分析，整合市场、用户、竞争数据"
-        elif '用户满意' in template_name or '体验' in template_name:
-            return "适用于用户满意度与体验分析，深度分析多平台用户反馈"
-        elif '趋势' in template_name or '机会' in template_name:
-            return "适用于行业趋势预测与机会洞察，整合三个Agent的数据"
-        elif '营销效果' in template_name or '社交媒体' in template_name:
-            return "适用于社交媒体营销效果评估，分析跨平台传播效果"
-        elif '竞品功能' in template_name or '功能对比' in template_name:
-            return "适用于竞品功能对比深度分析，对比功能、体验、市场表现"
-        elif '传播路径' in template_name or '影响力' in template_name:
-            return "适用于品牌传播路径与影响力分析，分析传播路径和影响力"
-        elif '用户画像' in template_name or '行为洞察' in template_name:
-            return "适用于用户画像与行为洞察，构建用户画像和分析行为模式"
-        
-        return "通用报告模板"
-    
-
+        """获取可用的模板列表（来自共享的模板目录缓存，模板变化后自动重新加载）"""
+        return [entry.to_dict() for entry in self.catalog.templates()]
     
     def _get_fallback_template(self) -> Dict[str, Any]:
         """获取备用默认模板（空模板，让LLM自行发挥）"""
@@ -145,3 +145,43 @@ SYSTEM_PROMPT_HTML_GENERATION = f"""
 
 **重要：直接返回完整的HTML代码，不要包含任何解释、说明或其他文本。只返回HTML代码本身。**
 """
+
+# 分章节生成模式：单个章节的输入Schema
+input_schema_html_section = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string"},
+        "report_outline": {"type": "array", "items": {"type": "string"}, "description": "整份报告的章节标题，用于避免与其他章节重复"},
+        "section_id": {"type": "string", "description": "本章节的HTML锚点ID"},
+        "section_title": {"type": "string"},
+        "section_outline": {"type": "array", "items": {"type": "string"}, "description": "本章节需要覆盖的小节"},
+        "compete_engine_excerpts": {"type": "array", "items": {"type": "string"}, "description": "竞争分析报告中与本章节相关的片段"},
+        "customer_engine_excerpts": {"type": "array", "items": {"type": "string"}, "description": "用户分析报告中与本章节相关的片段"},
+        "market_engine_excerpts": {"type": "array", "items": {"type": "string"}, "description": "市场分析报告中与本章节相关的片段"},
+        "forum_excerpts": {"type": "array", "items": {"type": "string"}, "description": "论坛讨论中与本章节相关的发言"}
+    }
+}
+
+# 分章节生成模式：单个章节的系统提示词
+SYSTEM_PROMPT_HTML_SECTION = f"""
+你是一位专业的HTML报告生成专家，正在与其他专家并行撰写同一份分析报告，你只负责其中的一个章节。
+你将收到整份报告的章节列表、本章节的标题与小节提纲，以及从三个分析引擎报告（竞争分析、用户分析、市场分析）和论坛讨论中摘出的相关片段。
+
+<INPUT JSON SCHEMA>
+{json.dumps(input_schema_html_section, indent=2, ensure_ascii=False)}
+</INPUT JSON SCHEMA>
+
+**你的任务：**
+1. 按本章节的小节提纲逐一展开，内容详实、有数据支撑，整合多个引擎的观点并指出分歧
+2. 只写本章节，不要写其他章节已覆盖的内容，不要写全文标题、目录或总结全文
+3. 适合用图表呈现的数据使用Chart.js绘制（页面已引入Chart.js，不要重复引入）
+
+**输出要求：**
+- 只输出一个HTML片段：<section id="{{section_id}}" class="report-section">……</section>
+- 章节标题使用<h2>，小节标题使用<h3>
+- 不要输出DOCTYPE、html、head、body、style标签，样式由外层页面统一提供
+- canvas的id和脚本中的变量名都以section_id为前缀，避免与其他章节冲突；脚本用<script>写在section内部
+- 不要采用需要展开内容的前端效果，一次性完整显示
+
+**重要：直接返回HTML片段，不要包含任何解释、说明或Markdown代码块标记。**
+"""
@@ -16,6 +16,7 @@ class ReportMetadata:
     template_used: str = ""              # 使用的模板名称
     generation_time: float = 0.0         # 生成耗时（秒）
     timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    context_packing: Dict[str, Any] = field(default_factory=dict)  # 上下文打包统计与被丢弃的内容
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典格式"""
@@ -23,7 +24,8 @@ class ReportMetadata:
             "query": self.query,
             "template_used": self.template_used,
             "generation_time": self.generation_time,
-            "timestamp": self.timestamp
+            "timestamp": self.timestamp,
+            "context_packing": self.context_packing
         }
 
 
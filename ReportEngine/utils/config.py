@@ -24,6 +24,12 @@ class Settings(BaseSettings):
     LOG_FILE: str = Field("logs/report.log", description="日志输出文件")
     ENABLE_PDF_EXPORT: bool = Field(True, description="是否允许导出PDF")
     CHART_STYLE: str = Field("modern", description="图表样式：modern/classic/")
+    CONTEXT_TOKEN_BUDGET: int = Field(60000, description="HTML生成时引擎报告与论坛日志合计的token预算")
+    CONTEXT_FORUM_SHARE: float = Field(0.25, description="论坛日志最多占用上下文预算的比例")
+    TEMPLATE_SELECTION_TOKEN_BUDGET: int = Field(3000, description="模板选择时报告摘要与论坛日志的token预算")
+    HTML_GENERATION_MODE: str = Field("single", description="HTML生成模式：single（一次调用生成全文）/sections（按模板章节并行生成）")
+    HTML_SECTION_WORKERS: int = Field(4, description="分章节模式下并发生成的章节数")
+    HTML_SECTION_CONTEXT_CHARS: int = Field(16000, description="分章节模式下每个章节的上下文字符预算")
 
     class Config:
         env_file = ".env"
@@ -48,6 +54,8 @@ def print_config(config: Settings):
     message += f"日志文件: {config.LOG_FILE}\n"
     message += f"PDF 导出: {config.ENABLE_PDF_EXPORT}\n"
     message += f"图表样式: {config.CHART_STYLE}\n"
+    message += f"上下文预算: {config.CONTEXT_TOKEN_BUDGET} tokens（模板选择 {config.TEMPLATE_SELECTION_TOKEN_BUDGET}）\n"
+    message += f"HTML生成模式: {config.HTML_GENERATION_MODE}（并发 {config.HTML_SECTION_WORKERS}）\n"
     message += f"LLM API Key: {'已配置' if config.REPORT_ENGINE_API_KEY else '未配置'}\n"
     message += "=========================\n"
     logger.info(message)
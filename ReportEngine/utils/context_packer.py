@@ -0,0 +1,283 @@
+"""
+报告输入的上下文打包
+在给定的token预算内挑选三个引擎报告和论坛日志中信息量最高的内容：
+- 论坛日志：按发言去重、按信息量排序，保留最有价值的发言（保持原时间顺序）
+- 引擎报告：按章节去重；超出预算时把章节压缩为摘要（标题 + 开头几句），仍超出时丢弃相关度最低的章节
+所有被截断或丢弃的内容都记录在 PackedContext.dropped 中。
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .text_sections import split_markdown_sections, split_forum_speeches, char_bigrams, relevance
+
+_CJK = re.compile(r'[㐀-鿿豈-﫿]')
+_DIGITS = re.compile(r'\d+(?:\.\d+)?%?')
+_SENTENCE_END = re.compile(r'(?<=[。！？!?；;\n])')
+# 两段文本的字符二元组 Jaccard 相似度超过该值视为重复
+DUPLICATE_THRESHOLD = 0.8
+# 章节摘要的最小token数，低于该值的摘要没有意义，直接丢弃章节
+MIN_SUMMARY_TOKENS = 60
+# 摘要章节末尾的标记
+SUMMARY_MARKER = "\n…（本节已摘要）"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估计token数：中日韩字符约1个token/字，其余字符约4个字符/token
+
+    与主流分词器的误差通常在±20%以内，足够用于预算控制，且不依赖任何分词器。
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """按句子截断到不超过 max_tokens，第一句就超出时保留其前缀"""
+    if max_tokens <= 0:
+        return ""
+    sentences = [s for s in _SENTENCE_END.split(text) if s and s.strip()]
+    kept: List[str] = []
+    used = 0
+    for sentence in sentences:
+        tokens = estimate_tokens(sentence)
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += tokens
+    if not kept and sentences:
+        # 第一句就超出预算：按字符比例截断
+        first = sentences[0]
+        ratio = max_tokens / max(1, estimate_tokens(first))
+        prefix = first[:max(1, int(len(first) * ratio))]
+        # 中英文混排时按比例截断可能略微超出，逐步缩短直到满足预算
+        while prefix and estimate_tokens(prefix) > max_tokens:
+            prefix = prefix[:len(prefix) * 9 // 10]
+        kept.append(prefix)
+    return "".join(kept).strip()
+
+
+@dataclass
+class PackedContext:
+    """打包后的报告输入"""
+    reports: List[str]                                       # 与输入顺序一致的报告
+    forum_logs: str                                          # 保留的论坛发言（原时间顺序）
+    budget_tokens: int                                       # token预算
+    used_tokens: int = 0                                     # 实际使用的token数（估计值）
+    original_tokens: int = 0                                 # 打包前的token数（估计值）
+    dropped: List[Dict[str, Any]] = field(default_factory=list)  # 被截断或丢弃的内容
+
+    def to_dict(self) -> Dict[str, Any]:
+        """打包统计（不含正文），用于日志和状态文件"""
+        return {
+            "budget_tokens": self.budget_tokens,
+            "used_tokens": self.used_tokens,
+            "original_tokens": self.original_tokens,
+            "dropped_count": len(self.dropped),
+            "dropped": self.dropped,
+        }
+
+
+class ContextPacker:
+    """按token预算打包引擎报告与论坛日志"""
+
+    def __init__(self, budget_tokens: int = 60000, forum_share: float = 0.25):
+        """
+        Args:
+            budget_tokens: 报告与论坛日志合计的token预算
+            forum_share: 论坛日志最多占用的预算比例（报告用不完的预算不会分给论坛，反之亦然）
+        """
+        self.budget_tokens = budget_tokens
+        self.forum_share = min(max(forum_share, 0.0), 1.0)
+
+    def pack(self, query: str, reports: List[Any], forum_logs: str = "") -> PackedContext:
+        """
+        打包输入
+
+        Args:
+            query: 原始查询，用于计算内容相关度
+            reports: 引擎报告列表（字符串，或带 content 字段/属性的对象）
+            forum_logs: 论坛日志全文
+        """
+        texts = [self._report_text(r) for r in reports]
+        forum_logs = forum_logs or ""
+        original = sum(estimate_tokens(t) for t in texts) + estimate_tokens(forum_logs)
+        dropped: List[Dict[str, Any]] = []
+
+        forum_budget = int(self.budget_tokens * self.forum_share) if forum_logs.strip() else 0
+        report_budget = self.budget_tokens - forum_budget
+        query_grams = char_bigrams(query)
+
+        packed_forum = self._pack_forum(forum_logs, forum_budget, query_grams, dropped)
+
+        # 从短到长依次打包，短报告用不完的预算留给后面的长报告
+        seen_sections: List[set] = []
+        packed_reports = [""] * len(texts)
+        remaining = report_budget
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        for n, i in enumerate(order):
+            share = remaining // (len(order) - n)
+            packed_reports[i] = self._pack_report(i, texts[i], share, query_grams, seen_sections, dropped)
+            remaining -= estimate_tokens(packed_reports[i])
+
+        used = sum(estimate_tokens(t) for t in packed_reports) + estimate_tokens(packed_forum)
+        return PackedContext(
+            reports=packed_reports,
+            forum_logs=packed_forum,
+            budget_tokens=self.budget_tokens,
+            used_tokens=used,
+            original_tokens=original,
+            dropped=dropped,
+        )
+
+    @staticmethod
+    def _report_text(report: Any) -> str:
+        if isinstance(report, dict):
+            return str(report.get('content', report))
+        if hasattr(report, 'content'):
+            return str(report.content)
+        return str(report) if report else ""
+
+    @staticmethod
+    def _informativeness(text: str, grams: set, query_grams: set) -> float:
+        """信息量：与查询的相关度 + 数据密度 + 内容长度（对数衰减）"""
+        numbers = len(_DIGITS.findall(text))
+        length = estimate_tokens(text)
+        return (
+            2.0 * relevance(query_grams, text)
+            + min(numbers, 20) / 20.0
+            + min(length, 400) / 400.0
+            + 0.2 * min(len(grams), 200) / 200.0
+        )
+
+    def _pack_forum(self, forum_logs: str, budget: int, query_grams: set,
+                    dropped: List[Dict[str, Any]]) -> str:
+        if budget <= 0 or not forum_logs.strip():
+            return ""
+        speeches = split_forum_speeches(forum_logs)
+        if not speeches:
+            # 非标准格式的日志：整体按句截断
+            packed = _truncate_to_tokens(forum_logs, budget)
+            if len(packed) < len(forum_logs):
+                dropped.append({"source": "forum", "title": "论坛日志", "reason": "truncated",
+                                "tokens": estimate_tokens(forum_logs) - estimate_tokens(packed)})
+            return packed
+        if estimate_tokens(forum_logs) <= budget:
+            return "\n".join(line for _, line in speeches)
+
+        candidates: List[Tuple[int, str, str, set]] = []
+        kept_grams: List[set] = []
+        for i, (speaker, line) in enumerate(speeches):
+            grams = char_bigrams(line)
+            if any(_jaccard(grams, other) >= DUPLICATE_THRESHOLD for other in kept_grams):
+                dropped.append({"source": "forum", "title": f"{speaker} 发言#{i + 1}", "reason": "duplicate",
+                                "tokens": estimate_tokens(line)})
+                continue
+            kept_grams.append(grams)
+            candidates.append((i, speaker, line, grams))
+
+        ranked = sorted(candidates, key=lambda c: self._informativeness(c[2], c[3], query_grams), reverse=True)
+        # 单条发言最多占预算的 1/4，避免几条长发言挤占全部预算
+        speech_cap = max(MIN_SUMMARY_TOKENS, budget // 4)
+        chosen: List[Tuple[int, str]] = []
+        chosen_grams: List[set] = []
+        used = 0
+        for i, speaker, line, _ in ranked:
+            tokens = estimate_tokens(line)
+            if tokens > speech_cap:
+                summary = _truncate_to_tokens(line, speech_cap) + "…"
+                # 多条发言开头相同（常见于同一引擎的多轮总结）时，摘要后会变成重复内容
+                grams = char_bigrams(summary)
+                if any(_jaccard(grams, other) >= DUPLICATE_THRESHOLD for other in chosen_grams):
+                    dropped.append({"source": "forum", "title": f"{speaker} 发言#{i + 1}", "reason": "duplicate",
+                                    "tokens": tokens})
+                    continue
+                dropped.append({"source": "forum", "title": f"{speaker} 发言#{i + 1}", "reason": "summarized",
+                                "tokens": tokens - estimate_tokens(summary)})
+                line, tokens = summary, estimate_tokens(summary)
+            # 发言之间的换行按1个token计入
+            cost = tokens + (1 if chosen else 0)
+            if used + cost > budget:
+                dropped.append({"source": "forum", "title": f"{speaker} 发言#{i + 1}", "reason": "over_budget",
+                                "tokens": tokens})
+                continue
+            chosen.append((i, line))
+            chosen_grams.append(char_bigrams(line))
+            used += cost
+        return "\n".join(line for _, line in sorted(chosen))
+
+    def _pack_report(self, index: int, text: str, budget: int, query_grams: set,
+                     seen_sections: List[set], dropped: List[Dict[str, Any]]) -> str:
+        if not text.strip():
+            return ""
+        source = f"report_{index + 1}"
+
+        # 章节去重（跨报告）
+        blocks: List[Tuple[str, str]] = []
+        for title, body in split_markdown_sections(text):
+            grams = char_bigrams(body)
+            if any(_jaccard(grams, other) >= DUPLICATE_THRESHOLD for other in seen_sections):
+                dropped.append({"source": source, "title": title, "reason": "duplicate",
+                                "tokens": estimate_tokens(body)})
+                continue
+            seen_sections.append(grams)
+            blocks.append((title, body))
+
+        # 章节之间的空行按1个token计入
+        total = sum(estimate_tokens(body) for _, body in blocks) + max(0, len(blocks) - 1)
+        if total <= budget:
+            return "\n\n".join(body for _, body in blocks)
+
+        # 超出预算：每个章节压缩为等额的摘要；章节太多时按相关度丢弃排在后面的章节
+        max_blocks = max(1, budget // MIN_SUMMARY_TOKENS)
+        order = sorted(range(len(blocks)),
+                       key=lambda i: (relevance(query_grams, blocks[i][0] + blocks[i][1]), -i),
+                       reverse=True)
+        keep = set(order[:max_blocks])
+        for i in order[max_blocks:]:
+            title, body = blocks[i]
+            dropped.append({"source": source, "title": title, "reason": "low_relevance",
+                            "tokens": estimate_tokens(body)})
+
+        per_block = (budget - (len(keep) - 1)) // len(keep)
+        summary_budget = per_block - estimate_tokens(SUMMARY_MARKER)
+        packed_blocks = []
+        for i, (title, body) in enumerate(blocks):
+            if i not in keep:
+                continue
+            tokens = estimate_tokens(body)
+            if tokens <= per_block:
+                packed_blocks.append(body)
+                continue
+            summary = _truncate_to_tokens(body, summary_budget)
+            if not summary:
+                # 预算连摘要标记都放不下
+                dropped.append({"source": source, "title": title, "reason": "over_budget", "tokens": tokens})
+                continue
+            packed_blocks.append(summary + SUMMARY_MARKER)
+            dropped.append({"source": source, "title": title, "reason": "summarized",
+                            "tokens": tokens - estimate_tokens(summary)})
+        return "\n\n".join(packed_blocks)
+
+
+def describe_dropped(packed: PackedContext, limit: int = 10) -> Optional[str]:
+    """把丢弃记录概括为一行日志，没有丢弃时返回 None"""
+    if not packed.dropped:
+        return None
+    by_reason: Dict[str, int] = {}
+    for item in packed.dropped:
+        by_reason[item["reason"]] = by_reason.get(item["reason"], 0) + 1
+    top = sorted(packed.dropped, key=lambda d: d["tokens"], reverse=True)[:limit]
+    return (
+        "上下文打包: " + ", ".join(f"{reason} {count}项" for reason, count in by_reason.items())
+        + " | 最大项: " + "; ".join(f"{d['source']}:{d['title'][:20]}(-{d['tokens']})" for d in top)
+    )
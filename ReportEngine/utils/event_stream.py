@@ -0,0 +1,105 @@
+"""
+报告生成事件流
+生成线程只管追加事件（从不阻塞），订阅者按序号拉取，因此：
+- 慢订阅者不会拖慢报告生成（背压由订阅者一侧的合并发送吸收）
+- 晚到或断线重连的订阅者可以从任意序号继续读取（SSE 的 Last-Event-ID）
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 订阅者落后时，连续的 html_chunk 事件合并成一条发送，单条最多这么多字符
+MAX_COALESCED_CHARS = 16384
+# 没有新事件时发送 SSE 注释保持连接的间隔（秒）
+HEARTBEAT_INTERVAL = 15.0
+# 结束事件类型：订阅者读到后关闭连接
+TERMINAL_EVENTS = ("done", "error")
+
+
+class EventStream:
+    """只追加的事件日志，支持多个订阅者从任意偏移量读取"""
+
+    def __init__(self):
+        self._events: List[Tuple[str, Dict[str, Any]]] = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self.started_at = time.time()
+
+    def publish(self, event_type: str, data: Optional[Dict[str, Any]] = None) -> int:
+        """追加事件并唤醒订阅者，返回事件序号（从0开始）"""
+        payload = dict(data or {})
+        payload.setdefault("t", round(time.time() - self.started_at, 3))
+        with self._cond:
+            if self._closed:
+                return len(self._events) - 1
+            self._events.append((event_type, payload))
+            if event_type in TERMINAL_EVENTS:
+                self._closed = True
+            self._cond.notify_all()
+            return len(self._events) - 1
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def read(self, offset: int, timeout: float) -> Tuple[List[Tuple[int, str, Dict[str, Any]]], bool]:
+        """
+        读取 offset 之后的事件，没有新事件时最多等待 timeout 秒
+
+        Returns:
+            ([(序号, 类型, 数据), ...], 流是否已结束且已读完)
+        """
+        with self._cond:
+            if offset >= len(self._events) and not self._closed:
+                self._cond.wait(timeout)
+            events = [(i, etype, data) for i, (etype, data) in enumerate(self._events[offset:], start=offset)]
+            finished = self._closed and offset + len(events) >= len(self._events)
+        return events, finished
+
+    def iter_sse(self, offset: int = 0, heartbeat: float = HEARTBEAT_INTERVAL) -> Iterator[str]:
+        """
+        以 Server-Sent Events 格式输出 offset 之后的事件，直到流结束
+
+        每条消息的 id 是其最后一个事件的序号，客户端重连时以 Last-Event-ID + 1 作为 offset。
+        """
+        offset = max(0, offset)
+        while True:
+            events, finished = self.read(offset, heartbeat)
+            if not events and not finished:
+                yield ": keep-alive\n\n"
+                continue
+            for seq, event_type, data in _coalesce(events):
+                yield f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            if events:
+                offset = events[-1][0] + 1
+            if finished:
+                return
+
+
+def _coalesce(events: List[Tuple[int, str, Dict[str, Any]]]) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """把连续的 html_chunk 事件合并为一条，减少慢订阅者需要发送的消息数"""
+    pending: Optional[Tuple[int, List[str]]] = None
+    pending_chars = 0
+    for seq, event_type, data in events:
+        if event_type == "html_chunk":
+            text = data.get("text", "")
+            if pending is not None and pending_chars + len(text) <= MAX_COALESCED_CHARS:
+                pending = (seq, pending[1] + [text])
+                pending_chars += len(text)
+                continue
+            if pending is not None:
+                yield pending[0], "html_chunk", {"text": "".join(pending[1])}
+            pending, pending_chars = (seq, [text]), len(text)
+            continue
+        if pending is not None:
+            yield pending[0], "html_chunk", {"text": "".join(pending[1])}
+            pending, pending_chars = None, 0
+        yield seq, event_type, data
+    if pending is not None:
+        yield pending[0], "html_chunk", {"text": "".join(pending[1])}
@@ -0,0 +1,205 @@
+"""
+引擎报告索引
+在内存中维护每个引擎报告目录的 .md 文件数和最新文件：
+- 启动时扫描一次目录，之后只增量读取各引擎追加的报告清单（见 utils/report_manifest.py）
+- 目录没有变化时，每次查询只需对清单和目录各做一次 stat，与目录中的报告数量无关
+- 目录变化却没有对应的清单记录时（旧版本引擎、手工拷入的报告）才重新扫描该目录
+- 订阅者可以等待索引变化，而不必轮询 /status
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set, Tuple
+from loguru import logger
+
+from utils.report_manifest import MANIFEST_FILENAME, parse_manifest_line
+
+# 后台监视线程检查清单的间隔（秒）
+WATCH_INTERVAL = 1.0
+
+
+@dataclass
+class _EngineIndex:
+    """单个引擎目录的索引"""
+    directory: str
+    files: Set[str] = field(default_factory=set)
+    latest: Optional[Tuple[float, str]] = None     # (mtime, 文件名)
+    manifest_offset: int = 0
+    dir_mtime: Optional[float] = None
+
+    def add(self, filename: str, mtime: float) -> bool:
+        """登记一个文件，返回是否为新文件"""
+        if self.latest is None or mtime >= self.latest[0]:
+            self.latest = (mtime, filename)
+        if filename in self.files:
+            return False
+        self.files.add(filename)
+        return True
+
+
+class ReportIndex:
+    """多个引擎报告目录的内存索引"""
+
+    def __init__(self, directories: Dict[str, str]):
+        """
+        Args:
+            directories: 引擎名 -> 报告目录
+        """
+        self.directories = dict(directories)
+        self._engines = {engine: _EngineIndex(directory) for engine, directory in self.directories.items()}
+        self._cond = threading.Condition()
+        self._version = 0
+        self._watcher: Optional[threading.Thread] = None
+        with self._cond:
+            for engine in self._engines.values():
+                self._rescan(engine)
+
+    @property
+    def version(self) -> int:
+        """索引内容每变化一次加一"""
+        return self._version
+
+    def refresh(self) -> bool:
+        """读取新增的清单记录（必要时重新扫描目录），返回索引是否有变化"""
+        with self._cond:
+            changed = False
+            for engine in self._engines.values():
+                changed |= self._refresh_engine(engine)
+            if changed:
+                self._version += 1
+                self._cond.notify_all()
+            return changed
+
+    def counts(self) -> Dict[str, int]:
+        """每个引擎目录的 .md 文件数"""
+        self.refresh()
+        with self._cond:
+            return {name: len(engine.files) for name, engine in self._engines.items()}
+
+    def latest_files(self) -> Dict[str, str]:
+        """每个引擎目录的最新报告路径（目录为空的引擎不出现在结果中）"""
+        self.refresh()
+        with self._cond:
+            return {
+                name: os.path.join(engine.directory, engine.latest[1])
+                for name, engine in self._engines.items()
+                if engine.latest is not None
+            }
+
+    def status(self, baseline: Dict[str, int]) -> Dict[str, Any]:
+        """与基准文件数比较，返回各引擎的新增文件数（格式同 FileCountBaseline.check_new_files）"""
+        current_counts = self.counts()
+        new_files_found = {
+            engine: max(0, count - baseline.get(engine, 0))
+            for engine, count in current_counts.items()
+        }
+        return {
+            'ready': all(count > 0 for count in new_files_found.values()),
+            'baseline_counts': baseline,
+            'current_counts': current_counts,
+            'new_files_found': new_files_found,
+            'missing_engines': [engine for engine, count in new_files_found.items() if count == 0]
+        }
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """等待索引版本超过 version（最多 timeout 秒），返回当前版本；需要已启动监视线程"""
+        self.start_watcher()
+        with self._cond:
+            if self._version <= version:
+                self._cond.wait(timeout)
+            return self._version
+
+    def start_watcher(self, interval: float = WATCH_INTERVAL) -> None:
+        """启动后台监视线程，索引变化时唤醒 wait_for_change 的订阅者（重复调用无副作用）"""
+        with self._cond:
+            if self._watcher and self._watcher.is_alive():
+                return
+            self._watcher = threading.Thread(target=self._watch, args=(interval,),
+                                             name="report-index-watcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self, interval: float) -> None:
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"报告索引刷新失败: {str(e)}")
+            time.sleep(interval)
+
+    def _refresh_engine(self, engine: _EngineIndex) -> bool:
+        try:
+            dir_mtime = os.stat(engine.directory).st_mtime
+        except OSError:
+            if engine.files or engine.dir_mtime is not None:
+                self._reset(engine)
+                return True
+            return False
+
+        changed = self._read_manifest(engine)
+        if dir_mtime != engine.dir_mtime:
+            # 新建报告、状态文件或清单都会改变目录mtime；只有报告数对不上清单时才需要扫描
+            if engine.dir_mtime is None or self._count_md(engine.directory) != len(engine.files):
+                before = (len(engine.files), engine.latest)
+                self._rescan(engine)
+                changed |= before != (len(engine.files), engine.latest)
+            engine.dir_mtime = dir_mtime
+        return changed
+
+    def _read_manifest(self, engine: _EngineIndex) -> bool:
+        path = os.path.join(engine.directory, MANIFEST_FILENAME)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return False
+        if size < engine.manifest_offset:
+            # 清单被截断或替换：从头读取，已登记的文件会被去重
+            engine.manifest_offset = 0
+        if size == engine.manifest_offset:
+            return False
+
+        with open(path, 'rb') as f:
+            f.seek(engine.manifest_offset)
+            data = f.read(size - engine.manifest_offset)
+        # 只消费完整的行，写入中途的半行留到下次
+        end = data.rfind(b"\n") + 1
+        engine.manifest_offset += end
+        changed = False
+        for line in data[:end].decode('utf-8', errors='ignore').splitlines():
+            record = parse_manifest_line(line)
+            if record:
+                latest = engine.latest
+                changed |= engine.add(record['file'], float(record.get('mtime', 0)))
+                changed |= latest != engine.latest
+        return changed
+
+    @staticmethod
+    def _count_md(directory: str) -> int:
+        with os.scandir(directory) as entries:
+            return sum(1 for entry in entries if entry.name.endswith('.md'))
+
+    @staticmethod
+    def _reset(engine: _EngineIndex) -> None:
+        engine.files = set()
+        engine.latest = None
+        engine.manifest_offset = 0
+        engine.dir_mtime = None
+
+    def _rescan(self, engine: _EngineIndex) -> None:
+        """完整扫描一次目录，并把清单读取位置移到末尾"""
+        self._reset(engine)
+        if not os.path.isdir(engine.directory):
+            return
+        with os.scandir(engine.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.md'):
+                    try:
+                        engine.add(entry.name, entry.stat().st_mtime)
+                    except OSError:
+                        continue
+        engine.dir_mtime = os.stat(engine.directory).st_mtime
+        try:
+            engine.manifest_offset = os.path.getsize(os.path.join(engine.directory, MANIFEST_FILENAME))
+        except OSError:
+            engine.manifest_offset = 0
@@ -0,0 +1,170 @@
+"""
+报告模板目录
+模板只在首次使用或模板目录变化时从磁盘读取，解析出的章节提纲、描述和给LLM选择用的精简描述一并缓存，
+模板选择节点和 /templates 接口共用同一份目录。
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from .text_sections import TemplateSection, parse_template_sections
+
+# 目录 mtime 每次都检查；单个模板文件的 mtime（原地编辑不会改变目录 mtime）最多每隔这么多秒检查一次
+FILE_CHECK_INTERVAL = 5.0
+# 精简描述中最多列出的章节数
+DESCRIPTOR_MAX_SECTIONS = 8
+
+# 模板名称关键词 -> 描述，按顺序匹配第一个命中的
+_DESCRIPTION_RULES: List[Tuple[Tuple[str, ...], str]] = [
+    (('综合分析', '全面分析'), "适用于全面深度综合分析，整合Market、Customer、Compete三个Agent的协同分析能力，进行多维度交叉验证和深度洞察"),
+    (('企业品牌',), "适用于企业品牌声誉和形象分析"),
+    (('市场竞争',), "适用于市场竞争格局和对手分析"),
+    (('日常', '定期'), "适用于日常监测和定期汇报"),
+    (('政策', '行业'), "适用于政策影响和行业动态分析"),
+    (('热点', '社会'), "适用于社会热点和公共事件分析"),
+    (('突发', '危机'), "适用于突发事件和危机公关"),
+    (('产品发布', '上市'), "适用于产品发布与上市综合分析，整合市场、用户、竞争数据"),
+    (('用户满意', '体验'), "适用于用户满意度与体验分析，深度分析多平台用户反馈"),
+    (('趋势', '机会'), "适用于行业趋势预测与机会洞察，整合三个Agent的数据"),
+    (('营销效果', '社交媒体'), "适用于社交媒体营销效果评估，分析跨平台传播效果"),
+    (('竞品功能', '功能对比'), "适用于竞品功能对比深度分析，对比功能、体验、市场表现"),
+    (('传播路径', '影响力'), "适用于品牌传播路径与影响力分析，分析传播路径和影响力"),
+    (('用户画像', '行为洞察'), "适用于用户画像与行为洞察，构建用户画像和分析行为模式"),
+]
+
+
+def describe_template(template_name: str) -> str:
+    """根据模板名称生成描述"""
+    for keywords, description in _DESCRIPTION_RULES:
+        if any(keyword in template_name for keyword in keywords):
+            return description
+    return "通用报告模板"
+
+
+@dataclass
+class TemplateEntry:
+    """一个已解析的模板"""
+    name: str                                                   # 模板名（不含 .md）
+    filename: str
+    path: str
+    content: str
+    mtime: float
+    description: str                                            # 按名称生成的用途描述
+    first_line: str                                             # 模板首行（/templates 接口的原有描述字段）
+    sections: List[TemplateSection] = field(default_factory=list)
+    descriptor: str = ""                                        # 给LLM模板选择用的一行精简描述
+
+    def to_dict(self) -> Dict[str, object]:
+        """模板选择节点使用的字典格式"""
+        return {
+            'name': self.name,
+            'path': self.path,
+            'content': self.content,
+            'description': self.description,
+            'descriptor': self.descriptor,
+        }
+
+
+def _load_entry(path: str, filename: str, mtime: float) -> TemplateEntry:
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    name = filename[:-len('.md')]
+    sections = parse_template_sections(content)
+    description = describe_template(name)
+    descriptor = f"- {name}: {description}"
+    if sections:
+        titles = [s.title for s in sections[:DESCRIPTOR_MAX_SECTIONS]]
+        more = "…" if len(sections) > DESCRIPTOR_MAX_SECTIONS else ""
+        descriptor += f"（章节: {' / '.join(titles)}{more}）"
+    return TemplateEntry(
+        name=name,
+        filename=filename,
+        path=path,
+        content=content,
+        mtime=mtime,
+        description=description,
+        first_line=content.split('\n')[0] if content else '无描述',
+        sections=sections,
+        descriptor=descriptor,
+    )
+
+
+class TemplateCatalog:
+    """按目录缓存的模板集合，目录或模板文件变化后自动重新加载"""
+
+    def __init__(self, template_dir: str):
+        self.template_dir = template_dir
+        self._lock = threading.Lock()
+        self._entries: Dict[str, TemplateEntry] = {}
+        self._dir_mtime: Optional[float] = None
+        self._files_checked_at = 0.0
+
+    def templates(self) -> List[TemplateEntry]:
+        """按文件名排序的全部模板；模板目录不存在时返回空列表"""
+        with self._lock:
+            self._refresh()
+            return [self._entries[name] for name in sorted(self._entries)]
+
+    def get(self, name: str) -> Optional[TemplateEntry]:
+        """按模板名查找模板"""
+        with self._lock:
+            self._refresh()
+            return self._entries.get(name)
+
+    def invalidate(self) -> None:
+        """强制下次访问时重新扫描目录"""
+        with self._lock:
+            self._dir_mtime = None
+
+    def _refresh(self) -> None:
+        try:
+            dir_mtime = os.stat(self.template_dir).st_mtime
+        except OSError:
+            if self._dir_mtime is not None or self._entries:
+                logger.error(f"模板目录不存在: {self.template_dir}")
+            self._entries, self._dir_mtime = {}, None
+            return
+
+        now = time.monotonic()
+        if dir_mtime == self._dir_mtime and now - self._files_checked_at < FILE_CHECK_INTERVAL:
+            return
+        self._dir_mtime = dir_mtime
+        self._files_checked_at = now
+
+        entries: Dict[str, TemplateEntry] = {}
+        reloaded = 0
+        for dir_entry in os.scandir(self.template_dir):
+            if not dir_entry.name.endswith('.md') or not dir_entry.is_file():
+                continue
+            try:
+                mtime = dir_entry.stat().st_mtime
+                cached = self._entries.get(dir_entry.name[:-len('.md')])
+                if cached and cached.mtime == mtime:
+                    entries[cached.name] = cached
+                    continue
+                entry = _load_entry(dir_entry.path, dir_entry.name, mtime)
+                entries[entry.name] = entry
+                reloaded += 1
+            except Exception as e:
+                logger.exception(f"读取模板文件失败 {dir_entry.name}: {str(e)}")
+        if reloaded or len(entries) != len(self._entries):
+            logger.info(f"模板目录已加载: {self.template_dir}（{len(entries)} 个模板，重新读取 {reloaded} 个）")
+        self._entries = entries
+
+
+_catalogs: Dict[str, TemplateCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_template_catalog(template_dir: str) -> TemplateCatalog:
+    """获取模板目录对应的共享目录实例"""
+    key = os.path.abspath(template_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = TemplateCatalog(template_dir)
+        return catalog
@@ -0,0 +1,164 @@
+"""
+报告模板与报告正文的章节切分工具
+- 把模板解析为一级章节（标题 + 小节提纲）
+- 把引擎报告（Markdown）按标题切块、把论坛日志按发言切条
+- 按与章节提纲的字符二元组重合度挑选相关片段
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+# 模板中的一级章节：行首 "- **1.0 标题**"
+_TEMPLATE_BULLET_SECTION = re.compile(r'^[-*]\s+\*\*(.+?)\*\*\s*$')
+# Markdown 标题
+_MARKDOWN_HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+# 论坛日志中的一条发言："[12:12:37] [QUERY] 内容"
+_FORUM_SPEECH = re.compile(r'^\[(\d{2}:\d{2}:\d{2})\]\s+\[([A-Z_]+)\]\s*(.*)$')
+_NON_WORD = re.compile(r'[\s\W_]+', re.UNICODE)
+
+
+@dataclass
+class TemplateSection:
+    """模板中的一个一级章节"""
+    index: int                                          # 章节序号（从1开始）
+    title: str                                          # 章节标题
+    outline: List[str] = field(default_factory=list)    # 小节提纲
+
+    @property
+    def anchor(self) -> str:
+        return f"section-{self.index}"
+
+    def to_text(self) -> str:
+        lines = [self.title] + [f"  - {item}" for item in self.outline]
+        return "\n".join(lines)
+
+
+def _clean_title(text: str) -> str:
+    return text.strip().strip('*').strip()
+
+
+def parse_template_sections(template: str) -> List[TemplateSection]:
+    """
+    解析模板的一级章节
+
+    支持两种模板写法：
+    1. report_template 目录中的提纲式模板（"- **1.0 标题**" 加缩进的小节列表）
+    2. 以 "## 标题" 分章的 Markdown 模板（如内置的备用模板）
+    两者都解析不出章节时返回空列表。
+    """
+    lines = template.splitlines()
+    sections: List[TemplateSection] = []
+
+    for line in lines:
+        if not line.strip():
+            continue
+        match = _TEMPLATE_BULLET_SECTION.match(line)
+        if match and not line.startswith((' ', '\t')):
+            sections.append(TemplateSection(len(sections) + 1, _clean_title(match.group(1))))
+        elif sections and line.startswith((' ', '\t')) and line.strip().startswith(('-', '*')):
+            sections[-1].outline.append(_clean_title(line.strip()[1:]))
+    if sections:
+        return sections
+
+    # Markdown 写法：以 "##" 为一级章节，更深的标题作为提纲
+    for line in lines:
+        match = _MARKDOWN_HEADING.match(line.strip())
+        if not match:
+            if sections and line.strip().startswith(('-', '*')):
+                sections[-1].outline.append(_clean_title(line.strip()[1:]))
+            continue
+        level, title = len(match.group(1)), _clean_title(match.group(2))
+        if level == 2:
+            sections.append(TemplateSection(len(sections) + 1, title))
+        elif level > 2 and sections:
+            sections[-1].outline.append(title)
+    return sections
+
+
+def split_markdown_sections(markdown: str, max_level: int = 3) -> List[Tuple[str, str]]:
+    """
+    按标题把Markdown切块
+
+    Returns:
+        [(标题路径, 块内容), ...]，标题路径形如 "二、市场趋势 / 核心发现"
+    """
+    blocks: List[Tuple[str, str]] = []
+    path: List[Tuple[int, str]] = []  # (标题级别, 标题)，报告不一定从一级标题开始
+    current: List[str] = []
+
+    def flush():
+        body = "\n".join(current).strip()
+        if body:
+            blocks.append((" / ".join(title for _, title in path), body))
+
+    for line in markdown.splitlines():
+        match = _MARKDOWN_HEADING.match(line.strip())
+        if match and len(match.group(1)) <= max_level:
+            flush()
+            current = [line]
+            level = len(match.group(1))
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, _clean_title(match.group(2))))
+        else:
+            current.append(line)
+    flush()
+    return blocks
+
+
+def split_forum_speeches(forum_logs: str) -> List[Tuple[str, str]]:
+    """
+    把论坛日志切成单条发言（跳过 SYSTEM 消息）
+
+    Returns:
+        [(发言者, 原始行), ...]
+    """
+    speeches = []
+    for line in forum_logs.splitlines():
+        match = _FORUM_SPEECH.match(line.strip())
+        if not match:
+            continue
+        speaker, content = match.group(2), match.group(3)
+        if speaker == 'SYSTEM' or not content.strip():
+            continue
+        speeches.append((speaker, line.strip()))
+    return speeches
+
+
+def char_bigrams(text: str) -> set:
+    """去掉空白和标点后的字符二元组集合（中文无需分词）"""
+    compact = _NON_WORD.sub('', text.lower())
+    return {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+
+def relevance(query_grams: set, text: str) -> float:
+    """片段与查询二元组的重合度（按查询长度归一）"""
+    if not query_grams:
+        return 0.0
+    return len(query_grams & char_bigrams(text)) / len(query_grams)
+
+
+def select_relevant(chunks: List[str], query_text: str, max_chars: int) -> List[str]:
+    """
+    按相关度挑选片段，总长度不超过 max_chars，结果保持原文顺序
+
+    第一个片段即使超长也会被截断后保留，保证每个章节至少有上下文。
+    """
+    if max_chars <= 0 or not chunks:
+        return []
+    query_grams = char_bigrams(query_text)
+    ranked = sorted(range(len(chunks)), key=lambda i: relevance(query_grams, chunks[i]), reverse=True)
+
+    chosen = []
+    used = 0
+    for i in ranked:
+        length = len(chunks[i])
+        if used + length > max_chars:
+            if not chosen:
+                chosen.append((i, chunks[i][:max_chars]))
+                used = max_chars
+            continue
+        chosen.append((i, chunks[i]))
+        used += length
+    return [text for _, text in sorted(chosen)]
@@ -1,9 +1,11 @@
 import os
 import sys
+import csv
 import json
 import re
+import time
 import argparse
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Iterator, Optional, Any
 
 # ========== 单卡锁定（在导入 torch/transformers 前执行） ==========
 def _extract_gpu_arg(argv, default: str = "0") -> str:
@@ -77,6 +79,18 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--text", type=str, default=None, help="直接输入一条要预测的文本")
     parser.add_argument("--interactive", action="store_true", help="进入交互式预测模式")
     parser.add_argument("--max_length", type=int, default=128)
+    # 批量/流式预测
+    parser.add_argument("--input", type=str, default=None, help="批量预测输入文件（.csv 或 .jsonl）")
+    parser.add_argument("--db_url", type=str, default=None, help="批量预测数据库连接串（SQLAlchemy URL），与 --table 配合使用")
+    parser.add_argument("--table", type=str, default=None, help="批量预测的数据库表名")
+    parser.add_argument("--output", type=str, default="./topic_predictions.jsonl", help="批量预测结果输出（JSONL，追加写入）")
+    parser.add_argument("--text_col", type=str, default="text", help="文本列/字段名")
+    parser.add_argument("--id_col", type=str, default="id", help="记录ID列/字段名（缺失时使用行号）")
+    parser.add_argument("--top_k", type=int, default=3)
+    parser.add_argument("--batch_size", type=int, default=64, help="单个推理批次的文本数")
+    parser.add_argument("--chunk_size", type=int, default=4096, help="每次读入内存并按长度排序的记录数")
+    parser.add_argument("--offset", type=int, default=0, help="跳过前 N 条记录（从该偏移继续）")
+    parser.add_argument("--resume", action="store_true", help="从输出文件最后一条完整记录的 offset 之后自动续跑")
     parser.add_argument("--gpu", type=str, default=os.environ.get("CUDA_VISIBLE_DEVICES", "0"), help="指定单卡 GPU，如 0 或 1")
     return parser.parse_args()
 
@@ -97,33 +111,177 @@ def load_finetuned(model_root: str, subdir: str) -> Tuple[str, Dict[int, str]]:
 
 
 def predict_topk(model: AutoModelForSequenceClassification, tokenizer: AutoTokenizer, device: torch.device, text: str, max_length: int = 128, top_k: int = 3) -> List[Tuple[str, float]]:
-    processed = preprocess_text(text or "")
-    encoded = tokenizer(
-        processed,
-        max_length=max_length,
-        truncation=True,
-        padding="max_length",
-        return_tensors="pt",
-    )
-    input_ids = encoded["input_ids"].to(device)
-    attention_mask = encoded["attention_mask"].to(device)
+    return predict_topk_batch(model, tokenizer, device, [text], max_length, top_k)[0]
 
-    with torch.no_grad():
-        outputs = model(input_ids=input_ids, attention_mask=attention_mask)
-        logits = outputs.logits
-        probs = torch.softmax(logits, dim=-1)[0]
-        k = min(top_k, probs.shape[-1])
-        confs, idxs = torch.topk(probs, k)
+
+def predict_topk_batch(model: AutoModelForSequenceClassification, tokenizer: AutoTokenizer, device: torch.device, texts: List[str], max_length: int = 128, top_k: int = 3, batch_size: int = 64) -> List[List[Tuple[str, float]]]:
+    """批量预测：按长度排序切分小批次，批内动态补齐，结果与输入顺序一致"""
+    processed = [preprocess_text(t or "") for t in texts]
+    order = sorted(range(len(processed)), key=lambda i: len(processed[i]))
     id2label = getattr(model.config, "id2label", {}) if isinstance(getattr(model.config, "id2label", None), dict) else {}
-    results: List[Tuple[str, float]] = []
-    for i in range(k):
-        idx = int(idxs[i].item())
-        conf = float(confs[i].item())
-        label_name = id2label.get(idx, str(idx))
-        results.append((label_name, conf))
+    results: List[List[Tuple[str, float]]] = [[] for _ in processed]
+
+    with torch.no_grad():
+        for start in range(0, len(order), batch_size):
+            idx_batch = order[start:start + batch_size]
+            encoded = tokenizer(
+                [processed[i] for i in idx_batch],
+                max_length=max_length,
+                truncation=True,
+                padding=True,
+                return_tensors="pt",
+            )
+            input_ids = encoded["input_ids"].to(device)
+            attention_mask = encoded["attention_mask"].to(device)
+            logits = model(input_ids=input_ids, attention_mask=attention_mask).logits
+            probs = torch.softmax(logits, dim=-1)
+            k = min(top_k, probs.shape[-1])
+            confs, idxs = torch.topk(probs, k, dim=-1)
+            confs, idxs = confs.cpu().tolist(), idxs.cpu().tolist()
+            for row, i in enumerate(idx_batch):
+                results[i] = [(id2label.get(idx, str(idx)), float(conf)) for idx, conf in zip(idxs[row], confs[row])]
     return results
 
 
+def iter_file_records(path: str, text_col: str, id_col: str, offset: int = 0) -> Iterator[Tuple[int, Any, str]]:
+    """逐行读取 CSV/JSONL，产出 (序号, 记录ID, 文本)，跳过前 offset 条"""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if path.lower().endswith((".jsonl", ".json")):
+            rows = (json.loads(line) for line in f if line.strip())
+        else:
+            csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+            rows = csv.DictReader(f)
+        for n, row in enumerate(rows):
+            if n < offset:
+                continue
+            yield n, row.get(id_col, n), str(row.get(text_col) or "")
+
+
+def iter_db_records(db_url: str, table: str, text_col: str, id_col: str, offset: int = 0, fetch_size: int = 2000) -> Iterator[Tuple[int, Any, str]]:
+    """按 id 键集分页读取数据库表，产出 (序号, 记录ID, 文本)，跳过前 offset 条"""
+    from sqlalchemy import create_engine, text as sql_text
+
+    engine = create_engine(db_url, future=True)
+    quote = engine.dialect.identifier_preparer.quote
+    base = f"SELECT {quote(id_col)} AS id, {quote(text_col)} AS text FROM {quote(table)}"
+    n = offset
+    try:
+        with engine.connect() as conn:
+            # 续跑时先定位偏移处的 id，之后全部用 id > :last 翻页
+            last_id = None
+            if offset > 0:
+                last_id = conn.execute(
+                    sql_text(f"SELECT {quote(id_col)} FROM {quote(table)} ORDER BY {quote(id_col)} LIMIT 1 OFFSET :off"),
+                    {"off": offset - 1},
+                ).scalar()
+                if last_id is None:
+                    return
+            while True:
+                if last_id is None:
+                    rows = conn.execute(sql_text(f"{base} ORDER BY {quote(id_col)} LIMIT :lim"), {"lim": fetch_size}).fetchall()
+                else:
+                    rows = conn.execute(
+                        sql_text(f"{base} WHERE {quote(id_col)} > :last ORDER BY {quote(id_col)} LIMIT :lim"),
+                        {"last": last_id, "lim": fetch_size},
+                    ).fetchall()
+                if not rows:
+                    return
+                for row in rows:
+                    yield n, row.id, str(row.text or "")
+                    n += 1
+                last_id = rows[-1].id
+    finally:
+        engine.dispose()
+
+
+def _record_offset(line: bytes) -> Optional[int]:
+    """解析一行输出记录的 offset，不是完整的记录时返回 None"""
+    try:
+        return int(json.loads(line)["offset"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def resume_offset(path: str, block_size: int = 65536) -> Optional[int]:
+    """
+    计算 --resume 的续跑位置：最后一条完整记录的 offset + 1
+
+    输出文件末尾若有中断写入留下的半行，先将其截断，之后的追加写入从完整行之后开始；
+    末尾没有换行但本身是完整记录时保留该记录并补上换行。
+    输出文件不存在或没有可解析的记录时返回 None。
+    """
+    if not os.path.isfile(path):
+        return None
+    with open(path, "rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        pos, buf, truncated = size, b"", False
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            if not truncated:
+                cut = buf.rfind(b"\n") + 1
+                if cut == 0 and pos > 0:
+                    continue
+                if pos + cut < size:
+                    offset = _record_offset(buf[cut:])
+                    if offset is not None:
+                        f.seek(0, os.SEEK_END)
+                        f.write(b"\n")
+                        return offset + 1
+                    f.truncate(pos + cut)
+                    print(f"已截断输出文件末尾不完整的记录（{size - pos - cut} 字节）")
+                buf, truncated = buf[:cut], True
+            # buf 以换行结尾；pos > 0 时首行可能不完整，留到读入前一块后再解析
+            lines = buf.split(b"\n")
+            first = 1 if pos > 0 else 0
+            for line in reversed(lines[first:-1]):
+                offset = _record_offset(line)
+                if offset is not None:
+                    return offset + 1
+            buf = lines[0] + b"\n" if pos > 0 else b""
+    return None
+
+
+def predict_stream(model: AutoModelForSequenceClassification, tokenizer: AutoTokenizer, device: torch.device, records: Iterator[Tuple[int, Any, str]], output_path: str, max_length: int = 128, top_k: int = 3, batch_size: int = 64, chunk_size: int = 4096) -> int:
+    """
+    流式批量预测：每次读入 chunk_size 条记录推理后立即追加写出，内存占用与总量无关
+
+    Returns:
+        本次写出的记录数
+    """
+    written = 0
+    started = time.time()
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as out:
+        chunk: List[Tuple[int, Any, str]] = []
+
+        def flush() -> None:
+            nonlocal written
+            preds = predict_topk_batch(model, tokenizer, device, [t for _, _, t in chunk], max_length, top_k, batch_size)
+            for (n, rid, _), topk in zip(chunk, preds):
+                out.write(json.dumps({
+                    "offset": n,
+                    "id": rid,
+                    "labels": [label for label, _ in topk],
+                    "scores": [round(conf, 6) for _, conf in topk],
+                }, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            written += len(chunk)
+            rate = written / max(1e-6, time.time() - started)
+            print(f"已处理至 offset={chunk[-1][0] + 1}，本次 {written} 条（{rate:.1f} 条/秒）")
+            chunk.clear()
+
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+    return written
+
+
 def main() -> None:
     args = parse_args()
 
@@ -141,9 +299,26 @@ def main() -> None:
     model.to(device)
     model.eval()
 
+    if args.input or args.db_url:
+        offset = args.offset
+        if args.resume:
+            resumed = resume_offset(args.output)
+            if resumed is not None:
+                offset = resumed
+        print(f"批量预测开始，offset={offset}，输出: {args.output}")
+        if args.input:
+            records = iter_file_records(args.input, args.text_col, args.id_col, offset)
+        else:
+            if not args.table:
+                raise ValueError("使用 --db_url 时必须同时指定 --table")
+            records = iter_db_records(args.db_url, args.table, args.text_col, args.id_col, offset)
+        total = predict_stream(model, tokenizer, device, records, args.output, args.max_length, args.top_k, args.batch_size, args.chunk_size)
+        print(f"批量预测完成，本次写出 {total} 条")
+        return
+
     if args.text is not None:
-        topk = predict_topk(model, tokenizer, device, args.text, args.max_length, top_k=3)
-        print("Top-3 预测:")
+        topk = predict_topk(model, tokenizer, device, args.text, args.max_length, top_k=args.top_k)
+        print(f"Top-{args.top_k} 预测:")
         for rank, (label, conf) in enumerate(topk, 1):
             print(f"{rank}. {label} (p={conf:.4f})")
         return
@@ -160,8 +335,8 @@ def main() -> None:
                 break
             if not text:
                 continue
-            topk = predict_topk(model, tokenizer, device, text, args.max_length, top_k=3)
-            print("Top-3 预测:")
+            topk = predict_topk(model, tokenizer, device, text, args.max_length, top_k=args.top_k)
+            print(f"Top-{args.top_k} 预测:")
             for rank, (label, conf) in enumerate(topk, 1):
                 print(f"{rank}. {label} (p={conf:.4f})")
         return
@@ -42,7 +42,6 @@ from transformers import (
     AutoModel,
     AutoModelForSequenceClassification,
     AutoConfig,
-    DataCollatorWithPadding,
     Trainer,
     TrainingArguments,
     set_seed,
@@ -52,6 +51,10 @@ try:
 except Exception:  # pragma: no cover
     EarlyStoppingCallback = None  # type: ignore
 
+# 共用的预分词缓存（位于 SentimentAnalysisModel/ 目录）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from token_cache import load_or_build_token_cache, DynamicPaddingCollator
+
 # 预置可选中文基座模型（可扩展）
 BACKBONE_CANDIDATES: List[Tuple[str, str]] = [
     ("1) google-bert/bert-base-chinese", "google-bert/bert-base-chinese"),
@@ -100,7 +103,7 @@ def prompt_backbone_interactive(current_id: str) -> str:
 
 
 def preprocess_text(text: str) -> str:
-    return from django.utils.translation import ungettext
+    return text
 
 
 def ensure_base_model_local(model_name_or_path: str, local_model_root: str) -> Tuple[str, AutoTokenizer]:
@@ -144,31 +147,28 @@ class TextClassificationDataset(Dataset):
         label_column: str,
         label2id: Dict[str, int],
         max_length: int,
+        cache_dir: str,
     ) -> None:
-        self.dataframe = dataframe.reset_index(drop=True)
-        self.tokenizer = tokenizer
-        self.text_column = text_column
-        self.label_column = label_column
-        self.label2id = label2id
-        self.max_length = max_length
+        dataframe = dataframe.reset_index(drop=True)
+        # 首次运行时批量分词并写入内存映射缓存，之后各 epoch 直接读取
+        self.cache = load_or_build_token_cache(
+            dataframe[text_column].tolist(), tokenizer, max_length, cache_dir, preprocess=preprocess_text
+        )
+        # 标签预先映射为 id，缺失标签记为 -1
+        if label_column in dataframe.columns:
+            self.labels = np.array(
+                [label2id[str(x)] if pd.notna(x) else -1 for x in dataframe[label_column]], dtype=np.int64
+            )
+        else:
+            self.labels = np.full(len(dataframe), -1, dtype=np.int64)
 
     def __len__(self) -> int:
-        return len(self.dataframe)
+        return len(self.labels)
 
     def __getitem__(self, idx: int) -> Dict[str, torch.Tensor]:
-        row = self.dataframe.iloc[idx]
-        text = preprocess_text(row[self.text_column])
-        encoding = self.tokenizer(
-            text,
-            max_length=self.max_length,
-            truncation=True,
-            padding=False,
-            return_tensors="pt",
-        )
-        item = {k: v.squeeze(0) for k, v in encoding.items()}
-        if self.label_column in row and pd.notna(row[self.label_column]):
-            label_str = str(row[self.label_column])
-            item["labels"] = torch.tensor(self.label2id[label_str], dtype=torch.long)
+        item = self.cache.get(idx)
+        if self.labels[idx] >= 0:
+            item["labels"] = torch.tensor(self.labels[idx], dtype=torch.long)
         return item
 
 
@@ -238,6 +238,8 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--eval_fraction", type=float, default=0.25, help="每多少个 epoch 做一次评估与保存，例如 0.25 表示每四分之一个 epoch")
     parser.add_argument("--early_stop_patience", type=int, default=5, help="早停耐心（以评估轮次计）")
     parser.add_argument("--early_stop_threshold", type=float, default=0.0, help="早停最小改善阈值（与 metric_for_best_model 同单位）")
+    parser.add_argument("--cache_dir", type=str, default="./dataset/token_cache", help="预分词缓存目录")
+    parser.add_argument("--num_workers", type=int, default=min(4, os.cpu_count() or 1), help="DataLoader 工作进程数")
     return parser.parse_args()
 
 
@@ -293,10 +295,11 @@ def main() -> None:
     except Exception:
         pass
 
-    # 数据集
-    train_dataset = TextClassificationDataset(train_df, tokenizer, text_col, label_col, label2id, args.max_length)
-    eval_dataset = TextClassificationDataset(valid_df, tokenizer, text_col, label_col, label2id, args.max_length)
-    collator = DataCollatorWithPadding(tokenizer=tokenizer)
+    # 数据集（预分词缓存 + 动态补齐）
+    cache_dir = args.cache_dir if os.path.isabs(args.cache_dir) else os.path.join(script_dir, args.cache_dir)
+    train_dataset = TextClassificationDataset(train_df, tokenizer, text_col, label_col, label2id, args.max_length, cache_dir)
+    eval_dataset = TextClassificationDataset(valid_df, tokenizer, text_col, label_col, label2id, args.max_length, cache_dir)
+    collator = DynamicPaddingCollator(tokenizer.pad_token_id or 0)
 
     # 模型
     config = AutoConfig.from_pretrained(
@@ -335,6 +338,11 @@ def main() -> None:
         args_dict["warmup_ratio"] = args.warmup_ratio
     if "report_to" in allowed:
         args_dict["report_to"] = []
+    # 长度相近的样本组成一批，减少 padding；多进程加载数据
+    if "group_by_length" in allowed:
+        args_dict["group_by_length"] = True
+    if "dataloader_num_workers" in allowed:
+        args_dict["dataloader_num_workers"] = args.num_workers
     # 评估/保存步进：按 eval_fraction 折算每个 epoch 的步数
     steps_per_epoch = max(1, math.ceil(len(train_dataset) / max(1, args.batch_size)))
     eval_every_steps = max(1, math.ceil(steps_per_epoch * max(0.01, min(1.0, args.eval_fraction))))
@@ -386,7 +394,7 @@ def main() -> None:
     training_args = TrainingArguments(**args_dict)
     print("[Info] 训练参数要点:")
     print(f"       epochs={args.num_epochs}, batch_size={args.batch_size}, lr={args.learning_rate}, weight_decay={args.weight_decay}")
-    print(f"       max_length={args.max_length}, seed={args.seed}, fp16={args.fp16}")
+    print(f"       max_length={args.max_length}, seed={args.seed}, fp16={args.fp16}, num_workers={args.num_workers}")
     if "warmup_ratio" in allowed and "warmup_ratio" in args_dict:
         print(f"       warmup_ratio={args_dict['warmup_ratio']}")
     elif "warmup_steps" in allowed and "warmup_steps" in args_dict:
@@ -1,4 +1,5 @@
 import os
+import sys
 import random
 import numpy as np
 import pandas as pd
@@ -20,6 +21,15 @@ from tqdm import tqdm
 # 导入PEFT库中的LoRA相关组件
 from peft import LoraConfig, TaskType, get_peft_model
 
+# 共用的预分词缓存（位于 SentimentAnalysisModel/ 目录）
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from token_cache import load_or_build_token_cache, DynamicPaddingCollator, LengthGroupedBatchSampler
+
+# 预分词缓存目录与DataLoader工作进程数
+TOKEN_CACHE_DIR = './dataset/token_cache'
+NUM_WORKERS = int(os.environ.get('NUM_WORKERS', min(4, os.cpu_count() or 1)))
+BATCH_SIZE = 16
+
 # 设置随机种子
 def set_seed(seed):
     random.seed(seed)
@@ -30,34 +40,23 @@ def set_seed(seed):
 
 set_seed(42)
 
-# 定义微博情感分析数据集
+# 定义微博情感分析数据集（首次运行时整体分词并缓存，之后直接读取内存映射数组）
 class WeiboSentimentDataset(Dataset):
-    def __init__(self, reviews, labels, tokenizer, max_length=128):
-        self.reviews = reviews
-        self.labels = labels
-        self.tokenizer = tokenizer
-        self.max_length = max_length
+    def __init__(self, reviews, labels, tokenizer, max_length=128, cache_dir=TOKEN_CACHE_DIR):
+        self.labels = np.asarray(labels, dtype=np.int64)
+        self.cache = load_or_build_token_cache(reviews, tokenizer, max_length, cache_dir)
         
     def __len__(self):
-        return len(self.reviews)
+        return len(self.labels)
+    
+    @property
+    def lengths(self):
+        return self.cache.lengths
     
     def __getitem__(self, idx):
-        review = str(self.reviews[idx])
-        label = self.labels[idx]
-        
-        encoding = self.tokenizer(
-            review,
-            max_length=self.max_length,
-            padding='max_length',
-            truncation=True,
-            return_tensors='pt'
-        )
-        
-        return {
-            'input_ids': encoding['input_ids'].flatten(),
-            'attention_mask': encoding['attention_mask'].flatten(),
-            'labels': torch.tensor(label, dtype=torch.long)
-        }
+        item = self.cache.get(idx)
+        item['labels'] = torch.tensor(self.labels[idx], dtype=torch.long)
+        return item
 
 # 训练函数
 def train_model(model, train_dataloader, val_dataloader, optimizer, scheduler, device, epochs=3):
@@ -205,9 +204,20 @@ def main():
         tokenizer
     )
     
-    # 创建数据加载器
-    train_dataloader = DataLoader(train_dataset, batch_size=16, shuffle=True)
-    val_dataloader = DataLoader(val_dataset, batch_size=16)
+    # 创建数据加载器：长度相近的样本组成一批，按批内最长样本动态补齐
+    collator = DynamicPaddingCollator(pad_token_id)
+    train_dataloader = DataLoader(
+        train_dataset,
+        batch_sampler=LengthGroupedBatchSampler(train_dataset.lengths, BATCH_SIZE, shuffle=True),
+        collate_fn=collator,
+        num_workers=NUM_WORKERS
+    )
+    val_dataloader = DataLoader(
+        val_dataset,
+        batch_sampler=LengthGroupedBatchSampler(val_dataset.lengths, BATCH_SIZE, shuffle=False),
+        collate_fn=collator,
+        num_workers=NUM_WORKERS
+    )
     
     # 设置设备
     device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
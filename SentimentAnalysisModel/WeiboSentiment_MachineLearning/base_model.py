@@ -42,6 +42,19 @@ class BaseModel(ABC):
         predictions = self.predict([text])
         return predictions[0], 0.0  # 默认置信度为0
     
+    def predict_proba(self, texts: List[str]) -> List[float]:
+        """批量预测正面情感的概率，供集成预测使用
+        
+        默认以硬标签作为概率，能输出概率的模型应重写该方法
+        
+        Args:
+            texts: 待预测文本列表
+            
+        Returns:
+            与输入顺序一致的正面概率列表
+        """
+        return [float(p) for p in self.predict(texts)]
+    
     def evaluate(self, test_data: List[Tuple[str, int]]) -> Dict[str, float]:
         """评估模型性能"""
         if not self.is_trained:
@@ -71,6 +71,17 @@ class BayesModel(BaseModel):
         
         return predictions.tolist()
     
+    def predict_proba(self, texts: List[str]) -> List[float]:
+        """批量预测正面情感的概率"""
+        if not self.is_trained:
+            raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
+            
+        X = self.vectorizer.transform(texts)
+        probabilities = self.model.predict_proba(X)
+        positive_col = list(self.model.classes_).index(1)
+        
+        return probabilities[:, positive_col].tolist()
+    
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感
         
@@ -4,10 +4,13 @@ BERT情感分析模型训练脚本
 """
 import argparse
 import os
+import json
+import hashlib
+import numpy as np
 import pandas as pd
 import torch
 import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset
 from transformers import BertTokenizer, BertModel
 from sklearn.metrics import accuracy_score, f1_score, classification_report, roc_auc_score
 from typing import List, Tuple
@@ -23,6 +26,11 @@ warnings.filterwarnings("ignore")
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
 
+# [CLS]特征缓存目录，BERT冻结时训练集特征只需计算一次
+FEATURE_CACHE_DIR = "./model/bert_feature_cache"
+MAX_LENGTH = 512
+
+
 class BertDataset(Dataset):
     """BERT数据集"""
     
@@ -136,6 +144,75 @@ class BertModel_Custom(BaseModel):
                 print(f"❌ 在线模型也加载失败: {e2}")
                 raise FileNotFoundError(f"无法加载BERT模型，请检查网络连接或手动下载模型到: {self.model_path}")
     
+    def _extract_cls_features(self, texts: List[str], out: np.ndarray, batch_size: int = 64) -> None:
+        """按长度分桶批量计算[CLS]向量，按原顺序写入out"""
+        # 长度相近的文本放在同一批，减少padding带来的无效计算
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        
+        self.bert.eval()
+        with torch.no_grad():
+            for start in range(0, len(order), batch_size):
+                idx = order[start:start + batch_size]
+                tokens = self.tokenizer([texts[i] for i in idx], padding=True, truncation=True,
+                                        max_length=MAX_LENGTH, return_tensors='pt')
+                input_ids = tokens["input_ids"].to(self.device)
+                attention_mask = tokens["attention_mask"].to(self.device)
+                bert_outputs = self.bert(input_ids, attention_mask=attention_mask)
+                out[idx] = bert_outputs[0][:, 0].cpu().numpy()
+                
+                done = min(start + batch_size, len(order))
+                if (start // batch_size + 1) % 50 == 0 or done == len(order):
+                    print(f"提取[CLS]特征: {done}/{len(order)}")
+    
+    def _feature_cache_key(self, texts: List[str]) -> str:
+        """由BERT模型路径、截断长度和数据内容计算缓存键"""
+        digest = hashlib.sha1()
+        digest.update(f"{os.path.abspath(self.model_path)}|{MAX_LENGTH}|{len(texts)}".encode('utf-8'))
+        for text in texts:
+            digest.update(text.encode('utf-8'))
+            digest.update(b"\0")
+        return digest.hexdigest()[:16]
+    
+    def get_cls_features(self, texts: List[str], cache_dir: str = FEATURE_CACHE_DIR) -> np.ndarray:
+        """获取文本的[CLS]特征矩阵
+        
+        cache_dir 不为空时，特征以内存映射的float32数组保存在磁盘上，
+        相同数据集和BERT模型再次训练时直接复用
+        
+        Returns:
+            形状为 (len(texts), hidden_size) 的数组（缓存命中时为只读memmap）
+        """
+        hidden_size = self.bert.config.hidden_size
+        if not cache_dir:
+            features = np.empty((len(texts), hidden_size), dtype=np.float32)
+            self._extract_cls_features(texts, features)
+            return features
+        
+        os.makedirs(cache_dir, exist_ok=True)
+        key = self._feature_cache_key(texts)
+        data_path = os.path.join(cache_dir, f"cls_{key}.f32")
+        meta_path = os.path.join(cache_dir, f"cls_{key}.json")
+        
+        if os.path.exists(data_path) and os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            shape = tuple(meta['shape'])
+            if shape == (len(texts), hidden_size):
+                print(f"使用[CLS]特征缓存: {data_path}")
+                return np.memmap(data_path, dtype=np.float32, mode='r', shape=shape)
+        
+        print(f"计算[CLS]特征并写入缓存: {data_path}")
+        tmp_path = data_path + ".tmp"
+        features = np.memmap(tmp_path, dtype=np.float32, mode='w+', shape=(len(texts), hidden_size))
+        self._extract_cls_features(texts, features)
+        features.flush()
+        del features
+        os.replace(tmp_path, data_path)
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'shape': [len(texts), hidden_size], 'model_path': self.model_path}, f)
+        
+        return np.memmap(data_path, dtype=np.float32, mode='r', shape=(len(texts), hidden_size))
+    
     def train(self, train_data: List[Tuple[str, int]], **kwargs) -> None:
         """训练BERT模型"""
         print(f"开始训练 {self.model_name} 模型...")
@@ -149,13 +226,16 @@ class BertModel_Custom(BaseModel):
         batch_size = kwargs.get('batch_size', 100)
         input_size = kwargs.get('input_size', 768)
         decay_rate = kwargs.get('decay_rate', 0.9)
+        cache_dir = kwargs.get('feature_cache_dir', FEATURE_CACHE_DIR)
         
         print(f"BERT超参数: lr={learning_rate}, epochs={num_epochs}, "
               f"batch_size={batch_size}, input_size={input_size}")
         
-        # 创建数据集
+        # BERT参数冻结，[CLS]特征只计算一次，之后各epoch直接在特征上训练分类器
         train_dataset = BertDataset(train_data)
-        train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
+        features = self.get_cls_features(train_dataset.data, cache_dir)
+        all_labels = np.asarray(train_dataset.labels, dtype=np.float32)
+        num_samples = len(all_labels)
         
         # 创建分类器
         self.classifier = BertClassifier(input_size).to(self.device)
@@ -166,25 +246,17 @@ class BertModel_Custom(BaseModel):
         scheduler = torch.optim.lr_scheduler.ExponentialLR(optimizer, gamma=decay_rate)
         
         # 训练循环
-        self.bert.eval()  # BERT始终保持评估模式
         self.classifier.train()
         
         for epoch in range(num_epochs):
             total_loss = 0
             num_batches = 0
+            permutation = np.random.permutation(num_samples)
             
-            for i, (words, labels) in enumerate(train_loader):
-                # 分词和编码
-                tokens = self.tokenizer(words, padding=True, truncation=True, 
-                                      max_length=512, return_tensors='pt')
-                input_ids = tokens["input_ids"].to(self.device)
-                attention_mask = tokens["attention_mask"].to(self.device)
-                labels = torch.tensor(labels, dtype=torch.float32).to(self.device)
-                
-                # 获取BERT输出（冻结参数）
-                with torch.no_grad():
-                    bert_outputs = self.bert(input_ids, attention_mask=attention_mask)
-                    bert_output = bert_outputs[0][:, 0]  # [CLS] token的输出
+            for i, start in enumerate(range(0, num_samples, batch_size)):
+                idx = np.sort(permutation[start:start + batch_size])  # 有序下标读取memmap更快
+                bert_output = torch.from_numpy(np.asarray(features[idx])).to(self.device)
+                labels = torch.from_numpy(all_labels[idx]).to(self.device)
                 
                 # 分类器前向传播
                 optimizer.zero_grad()
@@ -220,10 +292,15 @@ class BertModel_Custom(BaseModel):
     
     def predict(self, texts: List[str]) -> List[int]:
         """预测文本情感"""
+        # 转换为类别标签
+        return [int(prob > 0.5) for prob in self.predict_proba(texts)]
+    
+    def predict_proba(self, texts: List[str]) -> List[float]:
+        """批量预测正面情感的概率"""
         if not self.is_trained:
             raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
         
-        predictions = []
+        probs = []
         batch_size = 32
         
         self.bert.eval()
@@ -235,7 +312,7 @@ class BertModel_Custom(BaseModel):
                 
                 # 分词和编码
                 tokens = self.tokenizer(batch_texts, padding=True, truncation=True,
-                                      max_length=512, return_tensors='pt')
+                                      max_length=MAX_LENGTH, return_tensors='pt')
                 input_ids = tokens["input_ids"].to(self.device)
                 attention_mask = tokens["attention_mask"].to(self.device)
                 
@@ -245,13 +322,9 @@ class BertModel_Custom(BaseModel):
                 
                 # 分类器预测
                 outputs = self.classifier(bert_output)
-                outputs = outputs.view(-1)
-                
-                # 转换为类别标签
-                preds = (outputs > 0.5).cpu().numpy()
-                predictions.extend(preds.astype(int).tolist())
+                probs.extend(outputs.view(-1).cpu().tolist())
         
-        return predictions
+        return probs
     
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感"""
@@ -264,7 +337,7 @@ class BertModel_Custom(BaseModel):
         with torch.no_grad():
             # 分词和编码
             tokens = self.tokenizer([text], padding=True, truncation=True,
-                                  max_length=512, return_tensors='pt')
+                                  max_length=MAX_LENGTH, return_tensors='pt')
             input_ids = tokens["input_ids"].to(self.device)
             attention_mask = tokens["attention_mask"].to(self.device)
             
@@ -358,6 +431,8 @@ def main():
                         help='学习率')
     parser.add_argument('--eval_only', action='store_true',
                         help='仅评估已有模型，不进行训练')
+    parser.add_argument('--feature_cache_dir', type=str, default=FEATURE_CACHE_DIR,
+                        help='[CLS]特征缓存目录，传空字符串则不缓存')
     
     args = parser.parse_args()
     
@@ -384,7 +459,8 @@ def main():
             train_data,
             num_epochs=args.epochs,
             batch_size=args.batch_size,
-            learning_rate=args.learning_rate
+            learning_rate=args.learning_rate,
+            feature_cache_dir=args.feature_cache_dir
         )
         
         # 评估模型
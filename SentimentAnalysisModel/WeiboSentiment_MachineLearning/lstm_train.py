@@ -4,44 +4,106 @@ LSTM情感分析模型训练脚本
 """
 import argparse
 import os
+import random
 import pandas as pd
 import torch
 import torch.nn as nn
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import Dataset, DataLoader, Sampler
 from torch.nn.utils.rnn import pad_sequence, pack_padded_sequence, pad_packed_sequence
 from gensim import models
 from sklearn.metrics import accuracy_score, f1_score, classification_report, roc_auc_score
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Iterator, Optional
 import numpy as np
 
 from base_model import BaseModel
 
 
 class LSTMDataset(Dataset):
-    """LSTM数据集"""
+    """LSTM数据集
     
-    def __init__(self, data: List[Tuple[str, int]], word2vec_model):
-        self.data = []
-        self.label = []
-        
-        for text, label in data:
-            vectors = []
-            for word in text.split(" "):
-                if word in word2vec_model.wv.key_to_index:
-                    vectors.append(word2vec_model.wv[word])
-            
-            if len(vectors) > 0:  # 确保有有效的词向量
-                vectors = torch.Tensor(vectors)
-                self.data.append(vectors)
-                self.label.append(label)
+    所有句子的词向量按顺序拼接为一个连续的float32矩阵 vectors，
+    第 i 条样本对应 vectors[offsets[i]:offsets[i+1]]，避免为每个句子单独创建tensor。
+    没有有效词向量的文本会被跳过，indices 记录保留样本在原始数据中的位置。
+    """
+    
+    def __init__(self, data: List[Tuple[str, int]], word2vec_model, mmap_path: Optional[str] = None):
+        key_to_index = word2vec_model.wv.key_to_index
+        
+        # 词表下标查找，所有句子的下标拼成一维数组
+        token_ids = []
+        lengths = []
+        labels = []
+        indices = []
+        for i, (text, label) in enumerate(data):
+            ids = [key_to_index[w] for w in text.split(" ") if w in key_to_index]
+            if ids:  # 确保有有效的词向量
+                token_ids.extend(ids)
+                lengths.append(len(ids))
+                labels.append(label)
+                indices.append(i)
+        
+        token_ids = np.asarray(token_ids, dtype=np.int64)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(self.lengths, out=self.offsets[1:])
+        self.label = np.asarray(labels, dtype=np.float32)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        
+        # 一次向量化索引取出全部词向量；语料较大时可写入内存映射文件以降低常驻内存
+        wv_vectors = word2vec_model.wv.vectors
+        shape = (len(token_ids), wv_vectors.shape[1])
+        if mmap_path:
+            os.makedirs(os.path.dirname(os.path.abspath(mmap_path)), exist_ok=True)
+            self.vectors = np.memmap(mmap_path, dtype=np.float32, mode='w+', shape=shape)
+            for start in range(0, len(token_ids), 1_000_000):
+                chunk = token_ids[start:start + 1_000_000]
+                self.vectors[start:start + len(chunk)] = wv_vectors[chunk]
+            self.vectors.flush()
+        else:
+            self.vectors = wv_vectors[token_ids].astype(np.float32, copy=False)
     
     def __getitem__(self, index):
-        return self.data[index], self.label[index]
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return torch.from_numpy(np.asarray(self.vectors[start:end])), self.label[index]
     
     def __len__(self):
         return len(self.label)
 
 
+class LengthBucketSampler(Sampler):
+    """按长度分桶的批采样器
+    
+    打乱后每 batch_size * bucket_multiplier 条样本为一个桶，桶内按长度降序切分批次，
+    使同一批内句子长度相近、padding更少；shuffle=False 时全局按长度降序。
+    """
+    
+    def __init__(self, lengths: np.ndarray, batch_size: int, shuffle: bool = True, bucket_multiplier: int = 50):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size = batch_size * bucket_multiplier
+    
+    def __iter__(self) -> Iterator[List[int]]:
+        if not self.shuffle:
+            order = np.argsort(-self.lengths, kind='stable')
+            for start in range(0, len(order), self.batch_size):
+                yield order[start:start + self.batch_size].tolist()
+            return
+        
+        order = np.random.permutation(len(self.lengths))
+        batches = []
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start:start + self.bucket_size]
+            bucket = bucket[np.argsort(-self.lengths[bucket], kind='stable')]
+            batches.extend(bucket[i:i + self.batch_size].tolist()
+                           for i in range(0, len(bucket), self.batch_size))
+        random.shuffle(batches)
+        yield from batches
+    
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+
 def collate_fn(data):
     """批处理函数"""
     data.sort(key=lambda x: len(x[0]), reverse=True)
@@ -127,9 +189,9 @@ class LSTMModel(BaseModel):
               f"batch_size={batch_size}, hidden_size={hidden_size}")
         
         # 创建数据集
-        train_dataset = LSTMDataset(train_data, self.word2vec_model)
-        train_loader = DataLoader(train_dataset, batch_size=batch_size, 
-                                 collate_fn=collate_fn, shuffle=True)
+        train_dataset = LSTMDataset(train_data, self.word2vec_model, mmap_path=kwargs.get('mmap_path'))
+        train_loader = DataLoader(train_dataset, collate_fn=collate_fn,
+                                 batch_sampler=LengthBucketSampler(train_dataset.lengths, batch_size))
         
         # 创建模型
         self.model = LSTMNet(embed_size, hidden_size, num_layers).to(self.device)
@@ -180,25 +242,33 @@ class LSTMModel(BaseModel):
         if not self.is_trained:
             raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
         
-        # 创建数据集
-        test_data = [(text, 0) for text in texts]  # 标签无关紧要
-        test_dataset = LSTMDataset(test_data, self.word2vec_model)
-        test_loader = DataLoader(test_dataset, batch_size=32, collate_fn=collate_fn)
+        # 转换为类别标签
+        return [int(prob > 0.5) for prob in self.predict_proba(texts)]
+    
+    def predict_proba(self, texts: List[str], batch_size: int = 32) -> List[float]:
+        """批量预测正面情感的概率
         
-        predictions = []
-        self.model.eval()
+        结果与输入一一对应：没有有效词向量的文本返回0.5（与predict_single一致）
+        """
+        if not self.is_trained:
+            raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
+        
+        probs = [0.5] * len(texts)
+        dataset = LSTMDataset([(text, 0) for text in texts], self.word2vec_model)  # 标签无关紧要
         
+        # 全局按长度降序分批：批内已有序，collate_fn的稳定排序不会改变顺序，输出可直接对应回原下标
+        batches = list(LengthBucketSampler(dataset.lengths, batch_size, shuffle=False))
+        loader = DataLoader(dataset, batch_sampler=batches, collate_fn=collate_fn)
+        
+        self.model.eval()
         with torch.no_grad():
-            for x, _, lengths in test_loader:
+            for batch, (x, _, lengths) in zip(batches, loader):
                 x = x.to(self.device)
-                outputs = self.model(x, lengths)
-                outputs = outputs.view(-1)
-                
-                # 转换为类别标签
-                preds = (outputs > 0.5).cpu().numpy()
-                predictions.extend(preds.astype(int).tolist())
+                outputs = self.model(x, lengths).view(-1).cpu().tolist()
+                for row, prob in zip(batch, outputs):
+                    probs[dataset.indices[row]] = prob
         
-        return predictions
+        return probs
     
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感"""
@@ -296,6 +366,8 @@ def main():
                         help='学习率')
     parser.add_argument('--eval_only', action='store_true',
                         help='仅评估已有模型，不进行训练')
+    parser.add_argument('--mmap_path', type=str, default=None,
+                        help='训练集词向量矩阵的内存映射文件路径（语料较大时使用）')
     
     args = parser.parse_args()
     
@@ -323,6 +395,7 @@ def main():
             num_epochs=args.epochs,
             batch_size=args.batch_size,
             hidden_size=args.hidden_size,
+            mmap_path=args.mmap_path,
             learning_rate=args.learning_rate
         )
         
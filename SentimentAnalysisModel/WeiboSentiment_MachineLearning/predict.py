@@ -8,6 +8,8 @@ import os
 import re
 from typing import Dict, Tuple, List
 import warnings
+import numpy as np
+import pandas as pd
 warnings.filterwarnings("ignore")
 
 # 导入所有模型类
@@ -16,7 +18,7 @@ from svm_train import SVMModel
 from xgboost_train import XGBoostModel
 from lstm_train import LSTMModel
 from bert_train import BertModel_Custom
-from utils import processing
+from utils import processing, processing_batch
 
 
 class SentimentPredictor:
@@ -117,18 +119,19 @@ class SentimentPredictor:
         
         return results
     
-    def predict_batch(self, texts: List[str], model_type: str = None) -> Dict[str, List[int]]:
+    def predict_batch(self, texts: List[str], model_type: str = None, workers: int = None) -> Dict[str, List[int]]:
         """批量预测文本情感
         
         Args:
             texts: 待预测文本列表
             model_type: 指定模型类型，如果为None则使用所有已加载的模型
+            workers: 预处理分词的进程数，默认CPU核数
             
         Returns:
             Dict[model_type, predictions]
         """
-        # 文本预处理
-        processed_texts = [processing(text) for text in texts]
+        # 文本预处理（多进程分词）
+        processed_texts = processing_batch(texts, workers=workers)
         
         if model_type:
             if model_type not in self.models:
@@ -187,6 +190,67 @@ class SentimentPredictor:
         
         return final_pred, final_conf
     
+    def ensemble_predict_batch(self, texts: List[str], weights: Dict[str, float] = None,
+                               workers: int = None) -> Tuple[List[int], List[float]]:
+        """批量集成预测
+        
+        每个模型对整批文本只推理一次，再用NumPy按权重合并概率
+        
+        Args:
+            texts: 待预测文本列表
+            weights: 模型权重，如果为None则平均权重
+            workers: 预处理分词的进程数，默认CPU核数
+            
+        Returns:
+            (predictions, confidences)
+        """
+        if len(self.models) == 0:
+            raise ValueError("没有加载任何模型")
+        if not texts:
+            return [], []
+        
+        processed_texts = processing_batch(texts, workers=workers)
+        
+        if weights is None:
+            weights = {name: 1.0 for name in self.models.keys()}
+        
+        # 各模型的正面概率堆叠为 (n_models, n_texts) 矩阵
+        prob_rows = []
+        weight_list = []
+        for name, model in self.models.items():
+            if weights.get(name, 0) <= 0:
+                continue
+            try:
+                probs = model.predict_proba(processed_texts)
+            except Exception as e:
+                print(f"模型 {name} 预测失败: {e}")
+                continue
+            prob_rows.append(probs)
+            weight_list.append(weights[name])
+        
+        if not prob_rows:
+            return [0] * len(texts), [0.5] * len(texts)
+        
+        probs = np.asarray(prob_rows, dtype=np.float64)
+        w = np.asarray(weight_list, dtype=np.float64)
+        final_prob = w @ probs / w.sum()
+        final_pred = (final_prob > 0.5).astype(int)
+        final_conf = np.where(final_pred == 1, final_prob, 1 - final_prob)
+        
+        return final_pred.tolist(), final_conf.tolist()
+    
+    def predict_file(self, input_path: str, output_path: str, workers: int = None) -> None:
+        """对文本文件（每行一条）做批量集成预测，结果写为CSV"""
+        with open(input_path, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        
+        print(f"共 {len(texts)} 条文本，开始批量预测...")
+        preds, confs = self.ensemble_predict_batch(texts, workers=workers)
+        
+        pd.DataFrame({'text': texts, 'label': preds, 'confidence': confs}).to_csv(
+            output_path, index=False, encoding='utf-8-sig')
+        print(f"预测结果已保存到: {output_path}")
+    
     def interactive_predict(self):
         """交互式预测模式"""
         if len(self.models) == 0:
@@ -266,6 +330,12 @@ def main():
                         help='交互式预测模式（默认）')
     parser.add_argument('--ensemble', action='store_true',
                         help='使用集成预测')
+    parser.add_argument('--file', type=str,
+                        help='批量预测的文本文件（每行一条），使用已加载模型集成预测')
+    parser.add_argument('--output', type=str, default='./predictions.csv',
+                        help='批量预测结果输出路径')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='批量预测时分词的进程数（默认CPU核数）')
     
     args = parser.parse_args()
     
@@ -288,8 +358,11 @@ def main():
         # 加载所有模型
         predictor.load_all_models(args.model_dir, args.bert_path)
     
+    # 批量预测文件
+    if args.file:
+        predictor.predict_file(args.file, args.output, workers=args.workers)
     # 如果指定了文本，直接预测
-    if args.text:
+    elif args.text:
         if args.ensemble and len(predictor.models) > 1:
             pred, conf = predictor.ensemble_predict(args.text)
             sentiment = "正面" if pred == 1 else "负面"
@@ -3,7 +3,8 @@ import jieba
 import re
 import os
 import pickle
-from typing import List, Tuple, Any
+import multiprocessing
+from typing import List, Tuple, Any, Optional
 
 
 # 加载停用词
@@ -17,6 +18,44 @@ else:
     print(f"警告: 停用词文件 {stopwords_path} 不存在，将使用空停用词列表")
 
 
+# 预编译的清洗正则（processing / processing_bert / preprocess_text_simple 共用）
+_RE_TOPIC = re.compile(r"\{%.+?%\}")         # {%xxx%} (地理定位, 微博话题等)
+_RE_MENTION = re.compile(r"@.+?( |$)")         # @xxx (用户名)
+_RE_BRACKET = re.compile(r"【.+?】")            # 【xx】 (里面的内容通常都不是用户自己写的)
+_RE_EMOJI = re.compile(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000027BF\U0001f900-\U0001f9ff\U0001f018-\U0001f270\U0000231a-\U0000231b\U0000238d-\U0000238d\U000024c2-\U0001f251]+')
+_RE_SPACES = re.compile(r"\s+")
+
+# 文本数量少于该值时不启动进程池，直接串行分词
+PARALLEL_MIN_TEXTS = 2000
+
+
+def clean_text(text):
+    """
+    数据清洗：去除话题/定位、@用户名、【】内容以及零宽空格
+    """
+    text = _RE_TOPIC.sub(" ", text)
+    text = _RE_MENTION.sub(" ", text)
+    text = _RE_BRACKET.sub(" ", text)
+    text = text.replace("\u200b", " ")              # '\u200b'是这个数据集中的一个bad case, 不用特别在意
+    return text
+
+
+def merge_negation(words):
+    """
+    对否定词`不`做特殊处理: 与其后面的词进行拼接（单次线性扫描）
+    """
+    merged = []
+    i, n = 0, len(words)
+    while i < n:
+        if words[i] == "不" and i + 1 < n:
+            merged.append(words[i] + words[i + 1])
+            i += 2
+        else:
+            merged.append(words[i])
+            i += 1
+    return merged
+
+
 def load_corpus(path):
     """
     加载语料库
@@ -48,33 +87,51 @@ def processing(text):
     数据预处理, 可以根据自己的需求进行重载
     """
     # 数据清洗部分
-    text = re.sub("\{%.+?%\}", " ", text)           # 去除 {%xxx%} (地理定位, 微博话题等)
-    text = re.sub("@.+?( |$)", " ", text)           # 去除 @xxx (用户名)
-    text = re.sub("【.+?】", " ", text)              # 去除 【xx】 (里面的内容通常都不是用户自己写的)
-    text = re.sub("\u200b", " ", text)              # '\u200b'是这个数据集中的一个bad case, 不用特别在意
+    text = clean_text(text)
     # 分词
     words = [w for w in jieba.lcut(text) if w.isalpha()]
     # 对否定词`不`做特殊处理: 与其后面的词进行拼接
-    while "不" in words:
-        index = words.index("不")
-        if index == len(words) - 1:
-            break
-        words[index: index+2] = ["".join(words[index: index+2])]  # 列表切片赋值的酷炫写法
+    words = merge_negation(words)
     # 用空格拼接成字符串
     result = " ".join(words)
     return result
 
 
+def _init_segment_worker():
+    """进程池初始化：每个工作进程只加载一次 jieba 词典"""
+    jieba.setLogLevel(60)
+    jieba.initialize()
+
+
+def processing_batch(texts: List[str], workers: Optional[int] = None, chunksize: Optional[int] = None) -> List[str]:
+    """
+    批量预处理（清洗 + 分词），文本较多时使用多进程并行
+
+    Args:
+        texts: 原始文本列表
+        workers: 进程数，默认 CPU 核数；为 1 时串行执行
+        chunksize: 每次分发给工作进程的文本数，默认按进程数均分为若干块
+
+    Returns:
+        与输入顺序一致的预处理结果
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) < PARALLEL_MIN_TEXTS:
+        return [processing(text) for text in texts]
+
+    if chunksize is None:
+        # 每个进程约分到 4 块，兼顾负载均衡与进程间通信开销
+        chunksize = max(1, len(texts) // (workers * 4))
+    with multiprocessing.Pool(processes=workers, initializer=_init_segment_worker) as pool:
+        return pool.map(processing, texts, chunksize=chunksize)
+
+
 def processing_bert(text):
     """
     数据预处理, 可以根据自己的需求进行重载
     """
     # 数据清洗部分
-    text = re.sub("\{%.+?%\}", " ", text)           # 去除 {%xxx%} (地理定位, 微博话题等)
-    text = re.sub("@.+?( |$)", " ", text)           # 去除 @xxx (用户名)
-    text = re.sub("【.+?】", " ", text)              # 去除 【xx】 (里面的内容通常都不是用户自己写的)
-    text = re.sub("\u200b", " ", text)              # '\u200b'是这个数据集中的一个bad case, 不用特别在意
-    return text
+    return clean_text(text)
 
 
 def save_model(model: Any, model_path: str) -> None:
@@ -124,15 +181,12 @@ def preprocess_text_simple(text: str) -> str:
         清洗后的文本
     """
     # 数据清洗
-    text = re.sub("\{%.+?%\}", " ", text)           # 去除 {%xxx%}
-    text = re.sub("@.+?( |$)", " ", text)           # 去除 @xxx
-    text = re.sub("【.+?】", " ", text)              # 去除 【xx】
-    text = re.sub("\u200b", " ", text)              # 去除特殊字符
+    text = clean_text(text)
     
     # 删除表情符号
-    text = re.sub(r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF\U00002600-\U000027BF\U0001f900-\U0001f9ff\U0001f018-\U0001f270\U0000231a-\U0000231b\U0000238d-\U0000238d\U000024c2-\U0001f251]+', '', text)
+    text = _RE_EMOJI.sub('', text)
     
     # 多个空格合并为一个
-    text = re.sub(r"\s+", " ", text)
+    text = _RE_SPACES.sub(" ", text)
     
     return text.strip()
\ No newline at end of file
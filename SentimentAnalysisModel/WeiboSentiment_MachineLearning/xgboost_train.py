@@ -99,6 +99,16 @@ class XGBoostModel(BaseModel):
         
         return y_pred.tolist()
     
+    def predict_proba(self, texts: List[str]) -> List[float]:
+        """批量预测正面情感的概率"""
+        if not self.is_trained:
+            raise ValueError(f"模型 {self.model_name} 尚未训练，请先调用train方法")
+            
+        X = self.vectorizer.transform(texts)
+        y_prob = self.model.predict(xgb.DMatrix(X))
+        
+        return y_prob.astype(float).tolist()
+    
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感
         
@@ -5,11 +5,13 @@ Qwen3模型基础类，统一接口
 import os
 import pickle
 from abc import ABC, abstractmethod
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 import pandas as pd
 from sklearn.metrics import accuracy_score, f1_score, classification_report
 from sklearn.model_selection import train_test_split
 
+from inference_utils import DEFAULT_MAX_BATCH_TOKENS, open_cache
+
 
 class BaseQwenModel(ABC):
     """Qwen3情感分析模型基类"""
@@ -18,6 +20,17 @@ class BaseQwenModel(ABC):
         self.model_name = model_name
         self.model = None
         self.is_trained = False
+        # 推理时单批 token 预算与可选的磁盘缓存
+        self.max_batch_tokens = DEFAULT_MAX_BATCH_TOKENS
+        self.cache = None
+        
+    def cache_namespace(self) -> str:
+        """缓存命名空间，结果依赖的模型变化时应随之变化"""
+        return self.model_name
+    
+    def enable_cache(self, cache_dir: str) -> None:
+        """启用磁盘缓存，重复文本不再经过主干模型"""
+        self.cache = open_cache(cache_dir, self.cache_namespace())
         
     @abstractmethod
     def train(self, train_data: List[Tuple[str, int]], **kwargs) -> None:
@@ -41,6 +54,23 @@ class BaseQwenModel(ABC):
         predictions = self.predict([text])
         return predictions[0], 0.0  # 默认置信度为0
     
+    def predict_proba(self, texts: List[str], encodings: Dict[str, List[List[int]]] = None) -> List[float]:
+        """批量预测正面情感的概率，默认以硬标签作为概率
+        
+        Args:
+            texts: 待预测文本列表
+            encodings: tokenize_for_inference 的结果，多个模型共用分词器时可复用
+        """
+        return [float(p) for p in self.predict(texts)]
+    
+    def tokenizer_signature(self) -> Any:
+        """分词结果可共享的判定依据，None 表示不参与共享分词"""
+        return None
+    
+    def tokenize_for_inference(self, texts: List[str]) -> Optional[Dict[str, List[List[int]]]]:
+        """推理用分词（不补齐），结果可通过 predict_proba 的 encodings 参数复用；不支持共享分词的模型返回 None"""
+        return None
+    
     def evaluate(self, test_data: List[Tuple[str, int]]) -> Dict[str, float]:
         """评估模型性能"""
         if not self.is_trained:
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Qwen3推理辅助工具
+- 按分词长度分桶、在token预算内动态决定批大小
+- 可选的磁盘缓存：相同文本再次预测时跳过主干模型
+"""
+import os
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# 单批 token 预算（批大小 × 批内最长序列长度）
+DEFAULT_MAX_BATCH_TOKENS = 8192
+DEFAULT_MAX_LENGTH = 512
+
+
+def token_budget_batches(lengths: Sequence[int], max_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+                         max_batch_size: int = 64) -> List[List[int]]:
+    """按长度降序切分批次，保证每批 len(batch) * 批内最长长度 <= max_tokens
+
+    Args:
+        lengths: 每条文本分词后的长度
+        max_tokens: 单批 token 预算
+        max_batch_size: 单批最多文本数
+
+    Returns:
+        原始下标组成的批次列表（调用方按下标把结果写回原顺序）
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_max = 0
+    for idx in order:
+        length = max(1, lengths[idx])
+        batch_max = max(current_max, length)
+        if current and (batch_max * (len(current) + 1) > max_tokens or len(current) >= max_batch_size):
+            batches.append(current)
+            current, batch_max = [], length
+        current.append(idx)
+        current_max = batch_max
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingCache:
+    """基于SQLite的向量缓存
+
+    以 (模型标识, 文本) 的哈希为键保存 float32 向量，可跨进程、跨运行复用。
+    """
+
+    def __init__(self, cache_dir: str, namespace: str):
+        os.makedirs(cache_dir, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in namespace)
+        self.path = os.path.join(cache_dir, f"{safe_name}.sqlite")
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+        self._conn.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> Dict[int, np.ndarray]:
+        """返回命中缓存的 {下标: 向量}"""
+        keys = [self._key(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM vectors WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return {i: found[k] for i, k in enumerate(keys) if k in found}
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray) -> None:
+        rows = [(self._key(t), np.asarray(v, dtype=np.float32).tobytes()) for t, v in zip(texts, vectors)]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO vectors (key, vec) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_cache(cache_dir: Optional[str], namespace: str) -> Optional[EmbeddingCache]:
+    """cache_dir 为空时不启用缓存"""
+    return EmbeddingCache(cache_dir, namespace) if cache_dir else None
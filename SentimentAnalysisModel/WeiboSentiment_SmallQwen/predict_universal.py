@@ -8,8 +8,13 @@ Qwen3微博情感分析统一预测接口
 import os
 import sys
 import argparse
+import numpy as np
 import torch
-from typing import List, Dict, Tuple, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple, Any, Optional
+
+# 并发运行多个模型时要求的最低空闲显存（字节）
+MIN_FREE_GPU_MEMORY_FOR_PARALLEL = 4 * 1024 ** 3
 
 # 添加当前目录到路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -22,8 +27,10 @@ from qwen3_lora_universal import Qwen3LoRAUniversal
 class Qwen3UniversalPredictor:
     """Qwen3统一预测器"""
     
-    def __init__(self):
+    def __init__(self, cache_dir: str = None, max_batch_tokens: int = None):
         self.models = {}  # 存储已加载的模型 {model_key: {model: obj, display_name: str}}
+        self.cache_dir = cache_dir  # 预测缓存目录，None表示不缓存
+        self.max_batch_tokens = max_batch_tokens  # 单批token预算，None使用模型默认值
         
     def _get_model_key(self, model_type: str, model_size: str) -> str:
         """生成模型键值"""
@@ -55,6 +62,11 @@ class Qwen3UniversalPredictor:
                 model = Qwen3LoRAUniversal(model_size)
                 model.load_model(model_path)
             
+            if self.max_batch_tokens:
+                model.max_batch_tokens = self.max_batch_tokens
+            if self.cache_dir:
+                model.enable_cache(self.cache_dir)
+            
             self.models[model_key] = {
                 'model': model,
                 'display_name': f"Qwen3-{model_type.title()}-{model_size}"
@@ -138,7 +150,7 @@ class Qwen3UniversalPredictor:
         return results
     
     def predict_batch(self, texts: List[str]) -> Dict[str, List[int]]:
-        """批量预测"""
+        """批量预测（各模型内部按长度分桶、在token预算内动态组批）"""
         results = {}
         
         for model_info in self.models.values():
@@ -151,31 +163,123 @@ class Qwen3UniversalPredictor:
         
         return results
     
-    def ensemble_predict(self, text: str) -> Tuple[int, float]:
-        """集成预测"""
-        if len(self.models) < 2:
-            raise ValueError("集成预测需要至少2个模型")
+    def _can_run_parallel(self) -> bool:
+        """多个模型同时在GPU上推理时需要足够的空闲显存；CPU上并发只会争抢核心"""
+        if len(self.models) < 2 or not torch.cuda.is_available():
+            return False
+        try:
+            free, _ = torch.cuda.mem_get_info()
+        except Exception:
+            return False
+        return free >= MIN_FREE_GPU_MEMORY_FOR_PARALLEL
+    
+    def _score_models(self, texts: List[str], parallel: bool) -> Dict[str, np.ndarray]:
+        """每个模型对整批文本推理一次，返回 {model_key: 正面概率数组}"""
+        def score(model_key: str, encodings=None) -> np.ndarray:
+            model_info = self.models[model_key]
+            try:
+                probs = model_info['model'].predict_proba(texts, encodings=encodings)
+                return np.asarray(probs, dtype=np.float64)
+            except Exception as e:
+                print(f"模型 {model_info['display_name']} 预测失败: {e}")
+                return np.full(len(texts), np.nan)
+        
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(self.models)) as pool:
+                futures = {key: pool.submit(score, key) for key in self.models}
+                return {key: future.result() for key, future in futures.items()}
+        
+        # 顺序执行：分词器相同的模型共用同一份分词结果
+        shared_encodings: Dict[Any, Any] = {}
+        scores = {}
+        for model_key, model_info in self.models.items():
+            model = model_info['model']
+            signature = model.tokenizer_signature()
+            encodings = None
+            # 只有声明了分词器签名的模型才做共享分词；返回 None 时各自分词
+            if signature is not None:
+                if signature not in shared_encodings:
+                    shared_encodings[signature] = model.tokenize_for_inference(texts)
+                encodings = shared_encodings[signature]
+            scores[model_key] = score(model_key, encodings)
+        return scores
+    
+    def ensemble_predict_batch(self, texts: List[str], weights: Dict[str, float] = None,
+                               parallel: Optional[bool] = None) -> Dict[str, Any]:
+        """批量集成预测
         
-        results = self.predict_single(text)
+        每个模型对整批文本只推理一次，概率以NumPy数组按权重融合。
         
-        # 加权平均（这里使用简单平均，可以根据模型性能调整权重）
-        total_weight = 0
-        weighted_prob = 0
+        Args:
+            texts: 待预测文本列表
+            weights: {model_key 或 display_name: 权重}，None表示平均权重
+            parallel: 是否并发运行各模型；None时根据空闲显存自动判断
         
-        for model_name, (pred, conf) in results.items():
-            if conf > 0:  # 只考虑有效预测
-                prob = conf if pred == 1 else 1 - conf
-                weighted_prob += prob
-                total_weight += 1
+        Returns:
+            {
+                'per_model': {display_name: 正面概率数组},
+                'probabilities': 融合后的正面概率数组,
+                'predictions': 预测标签列表,
+                'confidences': 置信度列表,
+            }
+        """
+        if len(self.models) == 0:
+            raise ValueError("没有加载任何模型")
+        texts = [str(t) for t in texts]
+        if parallel is None:
+            parallel = self._can_run_parallel()
         
-        if total_weight == 0:
-            return 0, 0.5
+        scores = self._score_models(texts, parallel)
+        keys = list(scores.keys())
+        probs = np.vstack([scores[key] for key in keys]) if texts else np.zeros((len(keys), 0))
         
-        final_prob = weighted_prob / total_weight
-        final_pred = int(final_prob > 0.5)
-        final_conf = final_prob if final_pred == 1 else 1 - final_prob
+        if weights is None:
+            w = np.ones(len(keys))
+        else:
+            w = np.array([
+                weights.get(key, weights.get(self.models[key]['display_name'], 0.0)) for key in keys
+            ], dtype=np.float64)
+        
+        # 预测失败的模型（NaN）不参与对应文本的融合
+        valid = ~np.isnan(probs)
+        weight_matrix = w[:, None] * valid
+        total = weight_matrix.sum(axis=0)
+        fused = np.where(total > 0, (np.nan_to_num(probs) * weight_matrix).sum(axis=0) / np.maximum(total, 1e-12), 0.5)
+        predictions = (fused > 0.5).astype(int)
+        confidences = np.where(predictions == 1, fused, 1 - fused)
+        
+        return {
+            'per_model': {self.models[key]['display_name']: scores[key] for key in keys},
+            'probabilities': fused,
+            'predictions': predictions.tolist(),
+            'confidences': confidences.tolist(),
+        }
+    
+    def ensemble_predict(self, text: str) -> Tuple[int, float]:
+        """集成预测"""
+        if len(self.models) < 2:
+            raise ValueError("集成预测需要至少2个模型")
         
-        return final_pred, final_conf
+        result = self.ensemble_predict_batch([text])
+        return result['predictions'][0], result['confidences'][0]
+    
+    def predict_file(self, input_path: str, output_path: str, weights: Dict[str, float] = None) -> None:
+        """对文本文件（每行一条）做批量集成预测，逐模型概率与融合结果写为CSV"""
+        import pandas as pd
+        
+        with open(input_path, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+        print(f"共 {len(texts)} 条文本，开始批量预测...")
+        
+        result = self.ensemble_predict_batch(texts, weights)
+        df = pd.DataFrame({'text': texts})
+        for name, probs in result['per_model'].items():
+            df[name] = probs
+        df['probability'] = result['probabilities']
+        df['label'] = result['predictions']
+        df['confidence'] = result['confidences']
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        print(f"预测结果已保存到: {output_path}")
     
     def _select_and_load_model(self):
         """让用户选择并加载模型"""
@@ -300,12 +404,17 @@ class Qwen3UniversalPredictor:
         print(f"\n模型性能比较 - 文本: {text}")
         print("-" * 60)
         
-        results = self.predict_single(text)
+        per_model = self.ensemble_predict_batch([text])['per_model']
         
         embedding_models = []
         lora_models = []
         
-        for model_name, (pred, conf) in results.items():
+        for model_name, probs in per_model.items():
+            prob = float(probs[0])
+            if np.isnan(prob):
+                continue
+            pred = int(prob > 0.5)
+            conf = prob if pred == 1 else 1 - prob
             sentiment = "正面" if pred == 1 else "负面"
             if "Embedding" in model_name:
                 embedding_models.append((model_name, sentiment, conf))
@@ -340,11 +449,19 @@ def main():
                         help='使用集成预测')
     parser.add_argument('--load_all', action='store_true',
                         help='加载所有可用模型')
+    parser.add_argument('--file', type=str,
+                        help='批量预测的文本文件（每行一条），使用已加载模型集成预测')
+    parser.add_argument('--output', type=str, default='./predictions.csv',
+                        help='批量预测结果输出路径')
+    parser.add_argument('--cache_dir', type=str, default=None,
+                        help='预测缓存目录（重复文本跳过主干模型），默认不缓存')
+    parser.add_argument('--max_batch_tokens', type=int, default=None,
+                        help='单批token预算（批大小×最长长度），默认8192')
     
     args = parser.parse_args()
     
     # 创建预测器
-    predictor = Qwen3UniversalPredictor()
+    predictor = Qwen3UniversalPredictor(cache_dir=args.cache_dir, max_batch_tokens=args.max_batch_tokens)
     
     # 加载模型
     if args.load_all:
@@ -355,8 +472,14 @@ def main():
         predictor.load_model(args.model_type, args.model_size)
     # 如果没有指定模型，交互式模式会让用户选择
     
+    # 批量预测文件
+    if args.file:
+        if len(predictor.models) == 0:
+            print("没有加载任何模型，请使用 --load_all 或 --model_type/--model_size 指定模型")
+            return
+        predictor.predict_file(args.file, args.output)
     # 如果指定了文本，直接预测
-    if args.text:
+    elif args.text:
         if args.ensemble and len(predictor.models) > 1:
             pred, conf = predictor.ensemble_predict(args.text)
             sentiment = "正面" if pred == 1 else "负面"
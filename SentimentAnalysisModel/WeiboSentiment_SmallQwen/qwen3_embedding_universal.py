@@ -5,6 +5,7 @@ Qwen3-Embedding通用训练脚本
 """
 import argparse
 import os
+import numpy as np
 import torch
 import torch.nn as nn
 from torch.utils.data import Dataset, DataLoader
@@ -15,6 +16,7 @@ from tqdm import tqdm
 
 from base_model import BaseQwenModel
 from models_config import QWEN3_MODELS, MODEL_PATHS
+from inference_utils import DEFAULT_MAX_LENGTH, token_budget_batches
 
 warnings.filterwarnings("ignore")
 
@@ -70,11 +72,15 @@ class SentimentClassifier(nn.Module):
             nn.Sigmoid()
         )
     
-    def forward(self, input_ids, attention_mask):
-        # 获取embedding
+    def embed(self, input_ids, attention_mask):
+        """主干模型输出的句向量（取第一个位置）"""
         with torch.no_grad():
             outputs = self.embedding_model(input_ids=input_ids, attention_mask=attention_mask)
-            embeddings = outputs.last_hidden_state[:, 0, :]
+            return outputs.last_hidden_state[:, 0, :]
+    
+    def forward(self, input_ids, attention_mask):
+        # 获取embedding
+        embeddings = self.embed(input_ids, attention_mask)
         
         # 通过分类头
         logits = self.classifier(embeddings)
@@ -93,6 +99,7 @@ class Qwen3EmbeddingUniversal(BaseQwenModel):
         self.config = QWEN3_MODELS[model_size]
         self.model_name_hf = self.config["embedding_model"]
         self.embedding_dim = self.config["embedding_dim"]
+        self.max_length = DEFAULT_MAX_LENGTH
         
         self.tokenizer = None
         self.embedding_model = None
@@ -222,58 +229,93 @@ class Qwen3EmbeddingUniversal(BaseQwenModel):
         self.is_trained = True
         print(f"Qwen3-Embedding-{self.model_size} 模型训练完成！")
     
-    def predict(self, texts: List[str]) -> List[int]:
-        """预测文本情感"""
+    def cache_namespace(self) -> str:
+        # 主干冻结，句向量只取决于embedding模型与截断长度
+        return f"{self.model_name_hf}_len{self.max_length}"
+    
+    def tokenizer_signature(self):
+        return ('embedding', type(self.tokenizer).__name__, len(self.tokenizer), self.max_length)
+    
+    def tokenize_for_inference(self, texts: List[str]):
+        return self.tokenizer([str(t) for t in texts], max_length=self.max_length, truncation=True)
+    
+    def encode_texts(self, texts: List[str], encodings=None) -> np.ndarray:
+        """计算句向量
+        
+        命中缓存的文本直接读取；其余文本去重后按分词长度分桶，
+        在 max_batch_tokens 预算内动态组批，结果按原顺序返回。
+        encodings 为与 texts 对齐的分词结果时不再重复分词。
+        """
+        result = np.zeros((len(texts), self.embedding_dim), dtype=np.float32)
+        cached = self.cache.get_many(texts) if self.cache else {}
+        for i, vec in cached.items():
+            result[i] = vec
+        
+        # 未命中的文本去重
+        pending: dict = {}
+        for i, text in enumerate(texts):
+            if i not in cached:
+                pending.setdefault(text, []).append(i)
+        if not pending:
+            return result
+        
+        unique_texts = list(pending.keys())
+        if encodings is None:
+            encodings = self.tokenize_for_inference(unique_texts)
+        else:
+            first = [pending[text][0] for text in unique_texts]
+            encodings = {key: [encodings[key][i] for i in first] for key in ('input_ids', 'attention_mask')}
+        lengths = [len(ids) for ids in encodings['input_ids']]
+        batches = token_budget_batches(lengths, self.max_batch_tokens, self.config['recommended_batch_size'])
+        
+        vectors = np.zeros((len(unique_texts), self.embedding_dim), dtype=np.float32)
+        self.classifier_model.eval()
+        for batch in batches:
+            padded = self.tokenizer.pad(
+                {
+                    'input_ids': [encodings['input_ids'][j] for j in batch],
+                    'attention_mask': [encodings['attention_mask'][j] for j in batch],
+                },
+                return_tensors='pt'
+            )
+            embeddings = self.classifier_model.embed(
+                padded['input_ids'].to(self.device),
+                padded['attention_mask'].to(self.device)
+            )
+            vectors[batch] = embeddings.float().cpu().numpy()
+        
+        for j, text in enumerate(unique_texts):
+            result[pending[text]] = vectors[j]
+        if self.cache:
+            self.cache.put_many(unique_texts, vectors)
+        return result
+    
+    def predict_proba(self, texts: List[str], encodings=None) -> List[float]:
+        """批量预测正面情感的概率"""
         if not self.is_trained:
             raise ValueError(f"模型 {self.model_name} 尚未训练")
         
-        predictions = []
-        batch_size = 32
+        texts = [str(t) for t in texts]
+        embeddings = self.encode_texts(texts, encodings)
+        dtype = next(self.classifier_model.classifier.parameters()).dtype
         
+        probs = []
         self.classifier_model.eval()
         with torch.no_grad():
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i+batch_size]
-                
-                encodings = self.tokenizer(
-                    batch_texts,
-                    max_length=512,
-                    padding=True,
-                    truncation=True,
-                    return_tensors='pt'
-                )
-                
-                input_ids = encodings['input_ids'].to(self.device)
-                attention_mask = encodings['attention_mask'].to(self.device)
-                
-                outputs = self.classifier_model(input_ids, attention_mask)
-                preds = (outputs > 0.5).cpu().numpy()
-                predictions.extend(preds.astype(int).tolist())
-        
-        return predictions
+            for i in range(0, len(texts), 1024):
+                x = torch.from_numpy(embeddings[i:i + 1024]).to(self.device, dtype=dtype)
+                probs.extend(self.classifier_model.classifier(x).view(-1).float().cpu().tolist())
+        return probs
+    
+    def predict(self, texts: List[str]) -> List[int]:
+        """预测文本情感"""
+        return [int(prob > 0.5) for prob in self.predict_proba(texts)]
     
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感"""
-        if not self.is_trained:
-            raise ValueError(f"模型 {self.model_name} 尚未训练")
-        
-        self.classifier_model.eval()
-        with torch.no_grad():
-            encoding = self.tokenizer(
-                text,
-                max_length=512,
-                padding=True,
-                truncation=True,
-                return_tensors='pt'
-            )
-            
-            input_ids = encoding['input_ids'].to(self.device)
-            attention_mask = encoding['attention_mask'].to(self.device)
-            
-            output = self.classifier_model(input_ids, attention_mask)
-            prob = output.item()
-            prediction = int(prob > 0.5)
-            confidence = prob if prediction == 1 else 1 - prob
+        prob = self.predict_proba([text])[0]
+        prediction = int(prob > 0.5)
+        confidence = prob if prediction == 1 else 1 - prob
         
         return prediction, confidence
     
@@ -21,9 +21,14 @@ from tqdm import tqdm
 
 from base_model import BaseQwenModel
 from models_config import QWEN3_MODELS, MODEL_PATHS
+from inference_utils import token_budget_batches
 
 warnings.filterwarnings("ignore")
 
+# 生成式模型没有校准概率，沿用固定置信度
+LORA_CONFIDENCE = 0.8
+MAX_NEW_TOKENS = 10
+
 
 class Qwen3LoRAUniversal(BaseQwenModel):
     """通用Qwen3-LoRA模型"""
@@ -40,6 +45,7 @@ class Qwen3LoRAUniversal(BaseQwenModel):
         self.tokenizer = None
         self.base_model = None
         self.lora_model = None
+        self.lora_path = None
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
         
     def _load_base_model(self):
@@ -272,52 +278,107 @@ class Qwen3LoRAUniversal(BaseQwenModel):
         else:
             return 0
     
-    def predict(self, texts: List[str]) -> List[int]:
+    def cache_namespace(self) -> str:
+        # 结果取决于LoRA权重，用权重目录及其修改时间区分
+        path = self.lora_path or ''
+        mtime = int(os.path.getmtime(path)) if path and os.path.exists(path) else 0
+        return f"{self.model_name}_{os.path.basename(os.path.normpath(path)) or 'untrained'}_{mtime}"
+    
+    def tokenizer_signature(self):
+        return ('lora', type(self.tokenizer).__name__, len(self.tokenizer))
+    
+    def tokenize_for_inference(self, texts: List[str]):
+        instructions = [
+            f"请分析以下微博文本的情感倾向，回答'正面'或'负面'。\n\n文本：{text}\n\n情感："
+            for text in texts
+        ]
+        return self.tokenizer(instructions)
+    
+    def _generate_labels(self, texts: List[str], encodings=None) -> List[int]:
+        """批量生成情感标签
+        
+        命中缓存的文本直接返回；其余文本去重后按指令长度分桶，
+        在 max_batch_tokens 预算内动态组批（左侧填充）生成。
+        encodings 为与 texts 对齐的分词结果时不再重复分词。
+        """
+        labels: List[int] = [0] * len(texts)
+        cached = self.cache.get_many(texts) if self.cache else {}
+        for i, vec in cached.items():
+            labels[i] = int(vec[0])
+        
+        pending: dict = {}
+        for i, text in enumerate(texts):
+            if i not in cached:
+                pending.setdefault(text, []).append(i)
+        if not pending:
+            return labels
+        
+        unique_texts = list(pending.keys())
+        if encodings is None:
+            encodings = self.tokenize_for_inference(unique_texts)
+        else:
+            first = [pending[text][0] for text in unique_texts]
+            encodings = {key: [encodings[key][i] for i in first] for key in ('input_ids', 'attention_mask')}
+        lengths = [len(ids) + MAX_NEW_TOKENS for ids in encodings['input_ids']]
+        batches = token_budget_batches(lengths, self.max_batch_tokens, self.config['recommended_batch_size'])
+        
+        unique_labels = [0] * len(unique_texts)
+        # 解码器模型批量生成需要左侧填充
+        padding_side = self.tokenizer.padding_side
+        self.tokenizer.padding_side = 'left'
+        self.lora_model.eval()
+        try:
+            with torch.no_grad():
+                for batch in tqdm(batches, desc=f"Qwen3-{self.model_size}预测中"):
+                    inputs = self.tokenizer.pad(
+                        {
+                            'input_ids': [encodings['input_ids'][j] for j in batch],
+                            'attention_mask': [encodings['attention_mask'][j] for j in batch],
+                        },
+                        return_tensors='pt'
+                    )
+                    if torch.cuda.is_available():
+                        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+                    
+                    outputs = self.lora_model.generate(
+                        **inputs,
+                        max_new_tokens=MAX_NEW_TOKENS,
+                        do_sample=True,
+                        temperature=0.1,
+                        pad_token_id=self.tokenizer.pad_token_id,
+                        eos_token_id=self.tokenizer.eos_token_id,
+                    )
+                    
+                    # 只解码新生成的部分，再提取情感标签
+                    new_tokens = outputs[:, inputs['input_ids'].shape[1]:]
+                    for j, seq in zip(batch, new_tokens):
+                        response = self.tokenizer.decode(seq, skip_special_tokens=True)
+                        unique_labels[j] = self._extract_sentiment(response, "")
+        finally:
+            self.tokenizer.padding_side = padding_side
+        
+        for j, text in enumerate(unique_texts):
+            for i in pending[text]:
+                labels[i] = unique_labels[j]
+        if self.cache:
+            self.cache.put_many(unique_texts, [[float(label)] for label in unique_labels])
+        return labels
+    
+    def predict(self, texts: List[str], encodings=None) -> List[int]:
         """预测文本情感"""
         if not self.is_trained:
             raise ValueError(f"模型 {self.model_name} 尚未训练")
         
-        predictions = []
-        
-        self.lora_model.eval()
-        with torch.no_grad():
-            for text in tqdm(texts, desc=f"Qwen3-{self.model_size}预测中"):
-                pred, _ = self.predict_single(text)
-                predictions.append(pred)
-        
-        return predictions
+        return self._generate_labels([str(t) for t in texts], encodings)
+    
+    def predict_proba(self, texts: List[str], encodings=None) -> List[float]:
+        """批量预测正面情感的概率（生成式模型使用固定置信度）"""
+        return [LORA_CONFIDENCE if pred == 1 else 1 - LORA_CONFIDENCE for pred in self.predict(texts, encodings)]
     
     def predict_single(self, text: str) -> Tuple[int, float]:
         """预测单条文本的情感"""
-        if not self.is_trained:
-            raise ValueError(f"模型 {self.model_name} 尚未训练")
-        
-        # 构建指令
-        instruction = f"请分析以下微博文本的情感倾向，回答'正面'或'负面'。\n\n文本：{text}\n\n情感："
-        
-        # 分词
-        inputs = self.tokenizer(instruction, return_tensors="pt")
-        if torch.cuda.is_available():
-            inputs = {k: v.to(self.device) for k, v in inputs.items()}
-        
-        # 生成回答
-        self.lora_model.eval()
-        with torch.no_grad():
-            outputs = self.lora_model.generate(
-                **inputs,
-                max_new_tokens=10,
-                do_sample=True,
-                temperature=0.1,
-                pad_token_id=self.tokenizer.pad_token_id,
-                eos_token_id=self.tokenizer.eos_token_id,
-            )
-        
-        # 解码生成的文本
-        generated_text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        
-        # 提取情感标签
-        prediction = self._extract_sentiment(generated_text, instruction)
-        confidence = 0.8  # 生成式模型的置信度计算较复杂，这里给个固定值
+        prediction = self.predict([text])[0]
+        confidence = LORA_CONFIDENCE  # 生成式模型的置信度计算较复杂，这里给个固定值
         
         return prediction, confidence
     
@@ -347,6 +408,7 @@ class Qwen3LoRAUniversal(BaseQwenModel):
         
         # 加载LoRA权重
         self.lora_model = PeftModel.from_pretrained(self.base_model, model_path)
+        self.lora_path = model_path
         
         self.model = self.lora_model
         self.is_trained = True
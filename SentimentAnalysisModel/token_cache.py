@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+微调脚本共用的预分词缓存
+
+训练集只在第一次运行时批量分词一次，结果以内存映射数组保存在磁盘上：
+    <key>.input_ids.npy       int32  (N, max_length)
+    <key>.attention_mask.npy  int8   (N, max_length)
+    <key>.lengths.npy         int32  (N,)
+缓存键由分词器、max_length 和全部文本内容共同决定，数据或分词器变化时自动重建。
+
+配合 DynamicPaddingCollator（按批内最长样本补齐）和 LengthGroupedBatchSampler
+（长度相近的样本组成一批）使用，训练时各 epoch 不再调用分词器。
+
+使用方式（脚本位于子目录中时先把本目录加入 sys.path）:
+    from token_cache import load_or_build_token_cache, DynamicPaddingCollator, LengthGroupedBatchSampler
+"""
+
+import os
+import json
+import hashlib
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import torch
+
+CACHE_VERSION = 1
+
+
+def _cache_key(texts: Sequence[str], tokenizer, max_length: int) -> str:
+    """分词器 + max_length + 数据内容的哈希"""
+    digest = hashlib.sha1()
+    name = getattr(tokenizer, "name_or_path", "") or ""
+    header = f"v{CACHE_VERSION}|{type(tokenizer).__name__}|{name}|{len(tokenizer)}|{max_length}|{len(texts)}"
+    digest.update(header.encode("utf-8"))
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:20]
+
+
+class TokenCache:
+    """
+    预分词结果（惰性打开的内存映射数组）
+
+    只保存文件路径，每个进程首次访问时再打开，DataLoader 多进程 worker 之间
+    不会复制整份数组。
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+
+    def _open(self) -> Dict[str, np.ndarray]:
+        if self._arrays is None:
+            self._arrays = {
+                name: np.load(f"{self.prefix}.{name}.npy", mmap_mode="r")
+                for name in ("input_ids", "attention_mask", "lengths")
+            }
+        return self._arrays
+
+    @property
+    def input_ids(self) -> np.ndarray:
+        return self._open()["input_ids"]
+
+    @property
+    def attention_mask(self) -> np.ndarray:
+        return self._open()["attention_mask"]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return self._open()["lengths"]
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def get(self, idx: int) -> Dict[str, torch.Tensor]:
+        """返回去掉尾部 padding 的单条样本"""
+        arrays = self._open()
+        length = int(arrays["lengths"][idx])
+        return {
+            "input_ids": torch.from_numpy(np.array(arrays["input_ids"][idx, :length], dtype=np.int64)),
+            "attention_mask": torch.from_numpy(np.array(arrays["attention_mask"][idx, :length], dtype=np.int64)),
+        }
+
+    def __getstate__(self):
+        return {"prefix": self.prefix, "_arrays": None}
+
+
+def load_or_build_token_cache(
+    texts: Sequence[str],
+    tokenizer,
+    max_length: int,
+    cache_dir: str,
+    batch_size: int = 1000,
+    preprocess: Optional[Callable[[str], str]] = None,
+) -> TokenCache:
+    """
+    加载或构建预分词缓存
+
+    Args:
+        texts: 原始文本
+        tokenizer: Hugging Face 分词器
+        max_length: 截断长度
+        cache_dir: 缓存目录
+        batch_size: 构建缓存时每次送入分词器的文本数
+        preprocess: 分词前的文本预处理函数（会参与缓存键计算）
+    """
+    texts = [preprocess(str(t)) if preprocess else str(t) for t in texts]
+    os.makedirs(cache_dir, exist_ok=True)
+    key = _cache_key(texts, tokenizer, max_length)
+    prefix = os.path.join(cache_dir, key)
+    meta_path = f"{prefix}.json"
+
+    if os.path.exists(meta_path):
+        print(f"使用预分词缓存: {prefix} ({len(texts)} 条)")
+        return TokenCache(prefix)
+
+    print(f"预分词 {len(texts)} 条文本 (max_length={max_length}) -> {prefix}")
+    n = len(texts)
+    input_ids = np.lib.format.open_memmap(f"{prefix}.input_ids.npy.tmp", mode="w+", dtype=np.int32, shape=(n, max_length))
+    attention_mask = np.lib.format.open_memmap(f"{prefix}.attention_mask.npy.tmp", mode="w+", dtype=np.int8, shape=(n, max_length))
+    lengths = np.zeros(n, dtype=np.int32)
+
+    pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else 0
+    for start in range(0, n, batch_size):
+        batch = texts[start:start + batch_size]
+        encoded = tokenizer(batch, max_length=max_length, truncation=True, padding="max_length", return_tensors="np")
+        end = start + len(batch)
+        input_ids[start:end] = encoded["input_ids"]
+        mask = encoded.get("attention_mask")
+        if mask is None:
+            mask = (encoded["input_ids"] != pad_id).astype(np.int8)
+        attention_mask[start:end] = mask
+        lengths[start:end] = mask.sum(axis=1)
+
+    input_ids.flush()
+    attention_mask.flush()
+    del input_ids, attention_mask
+    os.replace(f"{prefix}.input_ids.npy.tmp", f"{prefix}.input_ids.npy")
+    os.replace(f"{prefix}.attention_mask.npy.tmp", f"{prefix}.attention_mask.npy")
+    np.save(f"{prefix}.lengths.npy", lengths)
+    # 元数据最后写入，存在即表示缓存完整
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"count": n, "max_length": max_length, "tokenizer": getattr(tokenizer, "name_or_path", "")}, f)
+    return TokenCache(prefix)
+
+
+class DynamicPaddingCollator:
+    """按批内最长样本动态补齐（右侧补 pad_token_id）"""
+
+    def __init__(self, pad_token_id: int):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, features: List[Dict[str, torch.Tensor]]) -> Dict[str, torch.Tensor]:
+        max_len = max(len(f["input_ids"]) for f in features)
+        input_ids = torch.full((len(features), max_len), self.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(features), max_len), dtype=torch.long)
+        for i, f in enumerate(features):
+            length = len(f["input_ids"])
+            input_ids[i, :length] = f["input_ids"]
+            attention_mask[i, :length] = f["attention_mask"]
+        batch = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "labels" in features[0]:
+            batch["labels"] = torch.stack([f["labels"] for f in features])
+        return batch
+
+
+class LengthGroupedBatchSampler(torch.utils.data.Sampler):
+    """
+    按长度分组的批采样器
+    打乱后每 batch_size * bucket_multiplier 条样本为一组，组内按长度排序切批，再打乱批次顺序；
+    shuffle=False 时全局按长度排序（用于验证/预测）。
+    """
+
+    def __init__(self, lengths: Sequence[int], batch_size: int, shuffle: bool = True,
+                 bucket_multiplier: int = 50, seed: int = 42):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size = batch_size * bucket_multiplier
+        self.rng = np.random.default_rng(seed)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        if not self.shuffle:
+            order = np.argsort(-self.lengths, kind="stable")
+            for start in range(0, len(order), self.batch_size):
+                yield order[start:start + self.batch_size].tolist()
+            return
+
+        order = self.rng.permutation(len(self.lengths))
+        batches = []
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start:start + self.bucket_size]
+            bucket = bucket[np.argsort(-self.lengths[bucket], kind="stable")]
+            batches.extend(bucket[i:i + self.batch_size].tolist() for i in range(0, len(bucket), self.batch_size))
+        for i in self.rng.permutation(len(batches)):
+            yield batches[i]
+
+    def __len__(self) -> int:
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
@@ -28,6 +28,7 @@ except locale.Error:
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from CompeteEngine import DeepSearchAgent, Settings
+from CompeteEngine.tools import start_background_warmup
 from config import settings
 from utils.github_issues import error_with_issue_link
 
@@ -44,6 +45,10 @@ def main():
     st.markdown("专业的竞争分析AI代理")
     st.markdown("广度爬取官方报道与新闻，注重国内外资源相结合，深度分析竞争态势和竞争策略")
 
+    # 页面已开始渲染，在后台预热情感分析模型（每个进程只执行一次）
+    if start_background_warmup:
+        start_background_warmup()
+
     # 检查URL参数
     try:
         # 尝试使用新版本的query_params
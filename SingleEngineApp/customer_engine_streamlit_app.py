@@ -28,6 +28,7 @@ except locale.Error:
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from CustomerEngine import DeepSearchAgent, Settings
+from CustomerEngine.tools import start_background_warmup
 from config import settings
 from utils.github_issues import error_with_issue_link
 
@@ -45,6 +46,10 @@ def main():
     st.markdown("突破传统文本交流限制，广泛的浏览抖音、快手、小红书的视频、图文、直播，深度分析用户行为和用户反馈")
     st.markdown("使用现代化搜索引擎提供的诸如日历卡、天气卡、股票卡等多模态结构化信息进一步增强能力")
 
+    # 页面已开始渲染，在后台预热情感分析模型（每个进程只执行一次）
+    if start_background_warmup:
+        start_background_warmup()
+
     # 检查URL参数
     try:
         # 尝试使用新版本的query_params
@@ -28,6 +28,7 @@ except locale.Error:
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from MarketEngine import DeepSearchAgent, Settings
+from MarketEngine.tools import start_background_warmup
 from config import settings
 from utils.github_issues import error_with_issue_link
 
@@ -44,6 +45,10 @@ def main():
     st.markdown("专业的市场分析AI代理")
     st.markdown("24小时全自动从包括微博、知乎、github、酷安等 13个 社媒平台、技术论坛广泛的爬取市场数据，进行深度市场分析")
 
+    # 页面已开始渲染，在后台预热情感分析模型（每个进程只执行一次）
+    if start_background_warmup:
+        start_background_warmup()
+
     # 检查URL参数
     try:
         # 尝试使用新版本的query_params
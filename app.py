@@ -16,7 +16,6 @@ import requests
 from loguru import logger
 import importlib
 from pathlib import Path
-from MindSpider.main import MindSpider
 
 # 跨平台兼容性导入
 try:
@@ -235,6 +234,9 @@ def initialize_system_components():
     logs = []
     errors = []
     
+    # MindSpider 依赖数据库驱动等较重模块，仅在启动系统组件时导入
+    from MindSpider.main import MindSpider
+
     spider = MindSpider()
     if spider.initialize_database():
         logger.info("数据库初始化成功")
@@ -251,6 +253,12 @@ def initialize_system_components():
 
     processes['forum']['status'] = 'stopped'
 
+    server_url = start_sentiment_server()
+    if server_url:
+        logs.append(f"情感分析推理服务: {server_url}")
+    else:
+        logs.append("情感分析推理服务未启用，各Engine将各自加载模型")
+
     for app_name, script_path in STREAMLIT_SCRIPTS.items():
         logs.append(f"检查文件: {script_path}")
         if os.path.exists(script_path):
@@ -457,6 +465,9 @@ processes = {
     'forum': {'process': None, 'port': None, 'status': 'stopped', 'output': [], 'log_file': None}  # 启动后标记为 running
 }
 
+# 共享情感分析推理服务（各Engine进程以客户端模式调用，整机只加载一份模型）
+sentiment_server = {'process': None, 'url': None, 'log_handle': None}
+
 STREAMLIT_SCRIPTS = {
     'market': 'SingleEngineApp/market_engine_streamlit_app.py',  # 市场分析（原insight）
     'customer': 'SingleEngineApp/customer_engine_streamlit_app.py',  # 用户分析（原media）
@@ -774,6 +785,8 @@ def start_streamlit_app(app_name, script_path, port):
             'PYTHONUNBUFFERED': '1',  # 禁用Python缓冲
             'STREAMLIT_BROWSER_GATHER_USAGE_STATS': 'false'
         })
+        if sentiment_server['url']:
+            env['SENTIMENT_SERVER_URL'] = sentiment_server['url']
         
         # 使用当前工作目录而不是脚本目录
         process = subprocess.Popen(
@@ -835,6 +848,84 @@ HEALTHCHECK_PATH = "/_stcore/health"
 HEALTHCHECK_PROXIES = {'http': None, 'https': None}
 
 
+def start_sentiment_server():
+    """启动共享情感分析推理服务，返回服务地址；未启用或启动失败时返回 None"""
+    from config import settings
+
+    if not settings.SENTIMENT_SERVER_ENABLED:
+        return None
+    if sentiment_server['process'] is not None and sentiment_server['process'].poll() is None:
+        return sentiment_server['url']
+
+    port = settings.SENTIMENT_SERVER_PORT
+    url = f"http://127.0.0.1:{port}"
+    if not check_port_available(port):
+        # 端口已被占用：若是已在运行的推理服务则直接复用
+        try:
+            response = requests.get(f"{url}/health", timeout=2, proxies=HEALTHCHECK_PROXIES)
+            if response.status_code == 200:
+                sentiment_server['url'] = url
+                logger.info(f"复用已运行的情感分析推理服务: {url}")
+                return url
+        except Exception:
+            pass
+        logger.warning(f"端口 {port} 被占用，情感分析推理服务未启动")
+        return None
+
+    try:
+        log_handle = open(LOG_DIR / "sentiment_server.log", 'w', encoding='utf-8')
+        env = os.environ.copy()
+        env.update({'PYTHONIOENCODING': 'utf-8', 'PYTHONUTF8': '1', 'PYTHONUNBUFFERED': '1'})
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'MarketEngine.tools.sentiment_server', '--port', str(port)],
+            stdout=log_handle,
+            stderr=subprocess.STDOUT,
+            cwd=os.getcwd(),
+            env=env,
+            creationflags=subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+        )
+    except Exception as exc:
+        logger.exception(f"情感分析推理服务启动失败: {exc}")
+        return None
+
+    # 只等待端口可用；模型在服务端后台加载，客户端首次调用时再等待其就绪
+    for _ in range(60):
+        if process.poll() is not None:
+            logger.error("情感分析推理服务进程已退出，详见 logs/sentiment_server.log")
+            log_handle.close()
+            return None
+        try:
+            if requests.get(f"{url}/health", timeout=1, proxies=HEALTHCHECK_PROXIES).status_code == 200:
+                break
+        except Exception:
+            pass
+        time.sleep(0.5)
+    else:
+        logger.warning("情感分析推理服务启动超时，各Engine将各自加载模型")
+        process.terminate()
+        log_handle.close()
+        return None
+
+    sentiment_server.update({'process': process, 'url': url, 'log_handle': log_handle})
+    logger.info(f"情感分析推理服务已启动: {url}")
+    return url
+
+
+def stop_sentiment_server():
+    """停止共享情感分析推理服务"""
+    process = sentiment_server['process']
+    if process is not None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    if sentiment_server['log_handle'] is not None:
+        sentiment_server['log_handle'].close()
+    sentiment_server.update({'process': None, 'url': None, 'log_handle': None})
+
+
 def _build_healthcheck_url(port):
     return f"http://127.0.0.1:{port}{HEALTHCHECK_PATH}"
 
@@ -921,6 +1012,11 @@ def cleanup_processes():
     for app_name in STREAMLIT_SCRIPTS:
         stop_streamlit_app(app_name)
 
+    try:
+        stop_sentiment_server()
+    except Exception:  # pragma: no cover
+        logger.exception("停止情感分析推理服务失败")
+
     processes['forum']['status'] = 'stopped'
     try:
         stop_forum_engine()
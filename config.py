@@ -112,6 +112,14 @@ class Settings(BaseSettings):
     MAX_PARAGRAPHS: int = Field(6, description="最大段落数")
     SEARCH_TIMEOUT: int = Field(240, description="单次搜索请求超时")
     MAX_CONTENT_LENGTH: int = Field(500000, description="搜索最大内容长度")
+    REFLECTION_PIPELINE_ENABLED: bool = Field(False, description="Market Engine反思搜索流水线：数据库查询在独立线程执行，LLM总结期间预取后续可能用到的评论查询")
+    REFLECTION_PREFETCH_CACHE_SIZE: int = Field(8, description="反思搜索预取缓存的最大条目数")
+    REFLECTION_PREFETCH_TOP_ITEMS: int = Field(3, description="每轮搜索后按热度预取评论的话题数")
+    RESEARCH_CHECKPOINT_ENABLED: bool = Field(True, description="研究过程中每完成一步写检查点日志（OUTPUT_DIR/checkpoints），失败后可用 research(resume_from=...) 续跑")
+
+    # ================== 情感分析推理服务 ====================
+    SENTIMENT_SERVER_ENABLED: bool = Field(True, description="启动共享情感分析推理服务，各Engine进程共用一份模型")
+    SENTIMENT_SERVER_PORT: int = Field(8765, description="共享情感分析推理服务端口（仅监听127.0.0.1）")
     
     model_config = ConfigDict(
         env_file=ENV_FILE,
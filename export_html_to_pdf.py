@@ -1,14 +1,19 @@
 """
 直接将HTML文件导出为PDF，保持与浏览器完全一致的格式
+
+用法:
+    python export_html_to_pdf.py                          # 导出默认文件
+    python export_html_to_pdf.py a.html b.html reports/   # 批量导出（共用一个浏览器）
 """
 import os
 import sys
+from typing import List
 from loguru import logger
 
 # 添加项目路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from utils.pdf_export import html_to_pdf_direct
+from utils.pdf_export import html_to_pdf_direct, html_files_to_pdf
 
 def export_html_file_to_pdf(html_file_path: str, output_path: str = None) -> str:
     """直接将HTML文件导出为PDF，保持与浏览器完全一致的格式"""
@@ -39,7 +44,31 @@ def export_html_file_to_pdf(html_file_path: str, output_path: str = None) -> str
         logger.exception(f"导出PDF失败: {str(e)}")
         return None
 
+def export_html_files_to_pdf(paths: List[str]) -> List[str]:
+    """批量导出HTML文件（目录会展开为其中的 .html 文件），PDF保存在HTML旁边"""
+    html_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            html_files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith('.html')
+            ))
+        else:
+            html_files.append(path)
+
+    pairs = [(f, os.path.splitext(os.path.abspath(f))[0] + ".pdf") for f in html_files]
+    logger.info(f"批量导出 {len(pairs)} 个HTML文件为PDF")
+    results = html_files_to_pdf(pairs)
+    return [pdf for (_, pdf), ok in zip(pairs, results) if ok]
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        pdf_paths = export_html_files_to_pdf(sys.argv[1:])
+        for pdf_path in pdf_paths:
+            print(f"[SUCCESS] {pdf_path}")
+        print(f"\n共生成 {len(pdf_paths)} 个PDF文件")
+        sys.exit(0 if pdf_paths else 1)
+
     # HTML文件路径
     html_file = "final_report_2025年蔚来ES8在最新的改款之后定单这么多还持续保持呢_20251126_051700.html"
     
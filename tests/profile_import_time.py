@@ -0,0 +1,105 @@
+"""
+导入耗时分析脚本
+
+在独立子进程中以 `python -X importtime` 导入各启动入口模块，汇总总耗时与最耗时的依赖，
+用于检查 torch / transformers 等重依赖是否被意外地提前导入。
+
+用法:
+    python tests/profile_import_time.py                      # 分析默认入口
+    python tests/profile_import_time.py MarketEngine --top 30
+    python tests/profile_import_time.py --budget 3.0         # 任一模块超过 3 秒时返回非零退出码
+"""
+
+import re
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 项目根目录，作为子进程的工作目录
+project_root = Path(__file__).parent.parent
+
+DEFAULT_MODULES = [
+    "MarketEngine.tools.sentiment_analyzer",
+    "MarketEngine",
+    "CustomerEngine",
+    "CompeteEngine",
+    "ReportEngine",
+    "app",
+]
+
+# 不应在启动阶段被导入的重依赖
+HEAVY_MODULES = ("torch", "transformers", "onnxruntime", "playwright")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_module(module: str) -> Tuple[float, List[Tuple[str, float, int]], str]:
+    """
+    在子进程中导入模块并解析 -X importtime 输出
+
+    Returns:
+        (总耗时秒数, [(模块名, 累计耗时秒数, 嵌套深度)], 错误信息)
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(project_root),
+        capture_output=True,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            entries.append((name, int(cumulative) / 1e6, (len(indent) - 1) // 2))
+
+    total = sum(cum for _, cum, depth in entries if depth == 0)
+    error = ""
+    if proc.returncode != 0:
+        error = next((l for l in reversed(proc.stderr.splitlines()) if l and not l.startswith("import time:")), "")
+    return total, entries, error
+
+
+def summarize(module: str, top: int) -> float:
+    total, entries, error = profile_module(module)
+    print(f"\n=== {module}: {total:.2f}s" + (f"（导入失败: {error}）" if error else ""))
+
+    loaded = {name for name, _, _ in entries}
+    heavy = [m for m in HEAVY_MODULES if m in loaded]
+    if heavy:
+        print(f"  ⚠ 启动时导入了重依赖: {', '.join(heavy)}")
+
+    # 按顶层包聚合：取该包最外层一次导入的累计耗时
+    by_package: Dict[str, float] = {}
+    for name, cumulative, _ in entries:
+        package = name.split(".")[0]
+        by_package[package] = max(by_package.get(package, 0.0), cumulative)
+    for package, seconds in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+        print(f"  {seconds:8.3f}s  {package}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="统计启动入口模块的导入耗时（python -X importtime）")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="要分析的模块，默认分析各启动入口")
+    parser.add_argument("--top", type=int, default=15, help="每个模块显示的最耗时包数量 (默认15)")
+    parser.add_argument("--budget", type=float, default=None, help="单个模块允许的最长导入秒数，超出时返回非零")
+    args = parser.parse_args()
+
+    over_budget = []
+    for module in args.modules:
+        total = summarize(module, args.top)
+        if args.budget is not None and total > args.budget:
+            over_budget.append(f"{module} ({total:.2f}s)")
+
+    if over_budget:
+        print(f"\n超出导入耗时预算 {args.budget}s: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+测试ReportEngine/utils/context_packer.py与text_sections.py
+
+覆盖：
+1. 打包结果不超过token预算
+2. 跨报告重复章节、重复论坛发言被丢弃
+3. 每一个被截断或丢弃的章节/发言都记录在 PackedContext.dropped 中
+4. text_sections 的章节切分、发言切分与相关度挑选
+"""
+
+import random
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.utils.context_packer import ContextPacker, estimate_tokens, describe_dropped
+from ReportEngine.utils.text_sections import (
+    parse_template_sections,
+    split_markdown_sections,
+    split_forum_speeches,
+    char_bigrams,
+    relevance,
+    select_relevant,
+)
+
+
+# 生成互不重复的测试文本用的词表
+_WORDS = [
+    "市场", "规模", "增长", "用户", "口碑", "品牌", "渠道", "价格", "竞品", "份额", "体验", "服务",
+    "投诉", "门店", "电商", "直播", "新品", "复购", "营收", "利润", "成本", "供应", "物流", "售后",
+    "评价", "热度", "话题", "声量", "情绪", "负面", "正面", "趋势", "政策", "监管", "资本", "融资",
+]
+
+
+def _sentence(rng: random.Random, tag: str) -> str:
+    return tag + "".join(rng.choice(_WORDS) for _ in range(8)) + f"{rng.randint(1, 999)}%。"
+
+
+def _make_report(prefix: str, sections: int, sentences: int) -> str:
+    """生成带编号章节的报告，各章节内容随机生成、互不重复"""
+    rng = random.Random(f"{prefix}-{sections}-{sentences}")
+    parts = []
+    for i in range(sections):
+        body = "".join(_sentence(rng, f"{prefix}{i}") for _ in range(sentences))
+        parts.append(f"## {prefix}章节{i}\n{body}")
+    return "\n\n".join(parts)
+
+
+def _make_forum(speeches: int, repeat: int = 1) -> str:
+    rng = random.Random(f"forum-{speeches}-{repeat}")
+    lines = ["[12:00:00] [SYSTEM] 论坛开始"]
+    for i in range(speeches):
+        content = "".join(_sentence(rng, f"第{i}条") for _ in range(repeat))
+        lines.append(f"[12:{i // 60:02d}:{i % 60:02d}] [{rng.choice(['QUERY', 'MEDIA', 'INSIGHT'])}] {content}")
+    return "\n".join(lines)
+
+
+def _missing_sections(original: str, packed: str):
+    """原报告中没有完整出现在打包结果里的章节标题"""
+    return [title for title, body in split_markdown_sections(original) if body not in packed]
+
+
+class TestContextPacker:
+    """测试ContextPacker的预算控制与丢弃记录"""
+
+    def test_small_input_kept_verbatim(self):
+        """未超预算时原样保留，不产生丢弃记录"""
+        reports = [_make_report("A", 2, 2), _make_report("B", 2, 2), ""]
+        forum = _make_forum(3)
+        packed = ContextPacker(budget_tokens=100000).pack("市场规模", reports, forum)
+        assert packed.dropped == []
+        assert packed.reports[2] == ""
+        for original, result in zip(reports, packed.reports):
+            assert _missing_sections(original, result) == []
+        assert "[SYSTEM]" not in packed.forum_logs
+        assert describe_dropped(packed) is None
+
+    def test_used_tokens_within_budget(self):
+        """各种预算下 used_tokens 都不超过 budget_tokens，且与实际内容一致"""
+        reports = [_make_report("A", 12, 20), _make_report("B", 6, 40), _make_report("C", 30, 3)]
+        forum = _make_forum(80, repeat=3)
+        for budget in (1, 10, 50, 200, 800, 3000, 12000):
+            packed = ContextPacker(budget_tokens=budget, forum_share=0.3).pack("市场规模 增长", reports, forum)
+            actual = sum(estimate_tokens(r) for r in packed.reports) + estimate_tokens(packed.forum_logs)
+            assert packed.used_tokens == actual
+            assert packed.used_tokens <= budget, f"budget={budget}, used={packed.used_tokens}"
+            assert packed.original_tokens > packed.used_tokens
+
+    def test_duplicate_sections_dropped_across_reports(self):
+        """两份报告中相同的章节只保留第一次出现的"""
+        shared = "## 共同结论\n" + "三个引擎一致认为该品牌的市场份额在过去一年增长了百分之十二。" * 5
+        report_a = _make_report("A", 2, 3) + "\n\n" + shared
+        report_b = shared + "\n\n" + _make_report("B", 2, 3)
+        packed = ContextPacker(budget_tokens=100000).pack("市场份额", [report_a, report_b])
+
+        duplicates = [d for d in packed.dropped if d["reason"] == "duplicate"]
+        assert len(duplicates) == 1
+        assert duplicates[0]["title"] == "共同结论"
+        assert sum(r.count("## 共同结论") for r in packed.reports) == 1
+
+    def test_duplicate_forum_speeches_dropped(self):
+        """超出预算时重复的论坛发言被丢弃并记录"""
+        speech = "[12:00:{:02d}] [INSIGHT] 用户普遍反映售后服务响应慢，投诉集中在退换货环节，占比约三成。"
+        forum = "\n".join([speech.format(i) for i in range(10)] + [_make_forum(30, repeat=2)])
+        packed = ContextPacker(budget_tokens=800, forum_share=0.5).pack("售后服务", [], forum)
+
+        duplicates = [d for d in packed.dropped if d["source"] == "forum" and d["reason"] == "duplicate"]
+        assert len(duplicates) >= 9
+        assert packed.forum_logs.count("售后服务响应慢") <= 1
+
+    def test_every_truncated_or_omitted_section_recorded(self):
+        """打包结果中未完整保留的每一个章节都能在 dropped 中找到"""
+        reports = [_make_report("A", 15, 12), _make_report("B", 8, 30), _make_report("C", 40, 2)]
+        for budget in (100, 600, 2500):
+            packed = ContextPacker(budget_tokens=budget).pack("市场规模", reports)
+            assert packed.dropped
+            for index, (original, result) in enumerate(zip(reports, packed.reports)):
+                source = f"report_{index + 1}"
+                recorded = {d["title"] for d in packed.dropped if d["source"] == source}
+                for title in _missing_sections(original, result):
+                    assert title in recorded, f"budget={budget}: {source} 的章节 {title} 未记录"
+            for item in packed.dropped:
+                assert item["reason"] in ("duplicate", "summarized", "low_relevance", "over_budget", "truncated")
+                assert item["tokens"] >= 0
+            assert describe_dropped(packed).startswith("上下文打包:")
+
+    def test_every_omitted_forum_speech_recorded(self):
+        """未完整保留的每一条论坛发言都记录在 dropped 中"""
+        forum = _make_forum(120, repeat=4)
+        packed = ContextPacker(budget_tokens=2000, forum_share=0.5).pack("市场份额", [], forum)
+        recorded = {d["title"] for d in packed.dropped if d["source"] == "forum"}
+        for i, (speaker, line) in enumerate(split_forum_speeches(forum)):
+            if line not in packed.forum_logs:
+                assert f"{speaker} 发言#{i + 1}" in recorded
+
+    def test_forum_keeps_chronological_order(self):
+        """保留下来的发言按原时间顺序排列"""
+        forum = _make_forum(60, repeat=2)
+        packed = ContextPacker(budget_tokens=1500, forum_share=0.5).pack("市场份额", [], forum)
+        kept = packed.forum_logs.splitlines()
+        assert kept
+        original_order = [line for _, line in split_forum_speeches(forum)]
+        positions = [original_order.index(line) for line in kept if line in original_order]
+        assert positions == sorted(positions)
+
+    def test_unstructured_forum_truncated(self):
+        """非标准格式的论坛日志整体截断，并记录为 truncated"""
+        forum = "没有时间戳的自由文本。" * 500
+        packed = ContextPacker(budget_tokens=400, forum_share=0.5).pack("", [], forum)
+        assert estimate_tokens(packed.forum_logs) <= 200
+        assert [d["reason"] for d in packed.dropped] == ["truncated"]
+
+
+class TestTextSections:
+    """测试text_sections中的切分与相关度工具"""
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("市场规模") == 4
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+
+    def test_parse_bullet_template(self):
+        template = (
+            "# 模板标题\n"
+            "- **1.0 市场概况**\n"
+            "  - 1.1 市场规模\n"
+            "  - 1.2 增长趋势\n"
+            "- **2.0 竞争格局**\n"
+            "  - 2.1 主要对手\n"
+        )
+        sections = parse_template_sections(template)
+        assert [s.title for s in sections] == ["1.0 市场概况", "2.0 竞争格局"]
+        assert sections[0].outline == ["1.1 市场规模", "1.2 增长趋势"]
+        assert sections[1].anchor == "section-2"
+        assert "  - 2.1 主要对手" in sections[1].to_text()
+
+    def test_parse_markdown_template(self):
+        template = "# 报告\n## 一、概述\n### 背景\n- 要点\n## 二、结论\n"
+        sections = parse_template_sections(template)
+        assert [s.title for s in sections] == ["一、概述", "二、结论"]
+        assert sections[0].outline == ["背景", "要点"]
+        assert parse_template_sections("没有任何章节的纯文本") == []
+
+    def test_split_markdown_sections(self):
+        markdown = "前言内容\n# 总报告\n## 市场\n市场正文\n### 细分\n细分正文\n#### 更深\n更深正文\n## 用户\n用户正文"
+        blocks = split_markdown_sections(markdown)
+        titles = [title for title, _ in blocks]
+        assert titles == ["", "总报告", "总报告 / 市场", "总报告 / 市场 / 细分", "总报告 / 用户"]
+        # 超过 max_level 的标题留在上级块中
+        assert "#### 更深" in blocks[3][1]
+        assert blocks[4][1] == "## 用户\n用户正文"
+
+    def test_split_forum_speeches(self):
+        logs = (
+            "[10:00:00] [SYSTEM] 开始\n"
+            "[10:00:01] [QUERY] 第一条\n"
+            "无法识别的行\n"
+            "[10:00:02] [HOST]    \n"
+            "  [10:00:03] [MEDIA] 第二条  \n"
+        )
+        assert split_forum_speeches(logs) == [
+            ("QUERY", "[10:00:01] [QUERY] 第一条"),
+            ("MEDIA", "[10:00:03] [MEDIA] 第二条"),
+        ]
+
+    def test_char_bigrams_and_relevance(self):
+        assert char_bigrams("市场，规模!") == {"市场", "场规", "规模"}
+        assert char_bigrams("a") == set()
+        query = char_bigrams("市场规模")
+        assert relevance(query, "今年市场规模扩大") == 1.0
+        assert relevance(query, "无关内容") == 0.0
+        assert relevance(set(), "市场规模") == 0.0
+
+    def test_select_relevant(self):
+        chunks = ["无关的段落内容", "市场规模持续增长", "市场份额", "另一个无关段落"]
+        chosen = select_relevant(chunks, "市场规模", max_chars=14)
+        assert chosen == ["市场规模持续增长", "市场份额"]
+        # 预算小于任何片段时，最相关的片段被截断后保留
+        assert select_relevant(chunks, "市场规模", max_chars=4) == ["市场规模"]
+        assert select_relevant(chunks, "市场规模", max_chars=0) == []
@@ -0,0 +1,175 @@
+"""
+测试ReportEngine/utils/event_stream.py
+
+覆盖：
+1. 从任意序号继续读取（Last-Event-ID 续传），不丢事件也不重复
+2. 连续的 html_chunk 合并发送，其他事件（含结束事件）原样保留
+3. Server-Sent Events 的消息格式（id / event / data 与空行）
+4. 结束事件之后流结束，订阅者退出
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.utils.event_stream import EventStream, MAX_COALESCED_CHARS
+
+
+def _parse_sse(chunks):
+    """把 iter_sse 的输出解析为 [(id, event, data)]，跳过心跳注释"""
+    messages = []
+    for chunk in chunks:
+        assert chunk.endswith("\n\n")
+        if chunk.startswith(":"):
+            continue
+        fields = dict(line.split(": ", 1) for line in chunk[:-2].split("\n"))
+        assert list(fields) == ["id", "event", "data"]
+        messages.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return messages
+
+
+def _report_stream() -> EventStream:
+    """一次典型的报告生成：阶段、流式HTML（中途重试一次）、章节、完成"""
+    stream = EventStream()
+    stream.publish("stage", {"stage": "load_inputs", "status": "started"})   # 0
+    stream.publish("html_chunk", {"text": "<h1>"})                           # 1
+    stream.publish("html_chunk", {"text": "标题"})                            # 2
+    stream.publish("html_reset", {})                                         # 3
+    stream.publish("html_chunk", {"text": "<h1>"})                           # 4
+    stream.publish("html_chunk", {"text": "新标题</h1>"})                     # 5
+    stream.publish("html_section", {"index": 0, "title": "概述", "html": "<p>概述</p>"})  # 6
+    stream.publish("status", {"status": "running", "progress": 90})          # 7
+    stream.publish("done", {"status": "completed"})                          # 8
+    return stream
+
+
+class TestEventStream:
+    """测试事件日志的发布与读取"""
+
+    def test_publish_returns_sequence_numbers(self):
+        stream = EventStream()
+        assert [stream.publish("status", {"progress": i}) for i in range(3)] == [0, 1, 2]
+        assert len(stream) == 3
+
+    def test_read_from_middle(self):
+        """从中间序号读取得到之后的全部事件，序号连续"""
+        stream = _report_stream()
+        events, finished = stream.read(4, timeout=0)
+        assert [seq for seq, _, _ in events] == [4, 5, 6, 7, 8]
+        assert [etype for _, etype, _ in events] == ["html_chunk", "html_chunk", "html_section", "status", "done"]
+        assert finished is True
+        # 读到末尾之后没有新事件
+        assert stream.read(9, timeout=0) == ([], True)
+
+    def test_publish_after_done_ignored(self):
+        """结束事件之后的发布被忽略，返回最后一条事件的序号"""
+        stream = _report_stream()
+        assert stream.publish("status", {"progress": 100}) == 8
+        assert len(stream) == 9
+
+    def test_read_waits_for_new_event(self):
+        stream = EventStream()
+        threading.Timer(0.1, stream.publish, args=("status", {"progress": 10})).start()
+        started = time.monotonic()
+        events, finished = stream.read(0, timeout=5)
+        assert time.monotonic() - started < 4
+        assert [etype for _, etype, _ in events] == ["status"]
+        assert finished is False
+
+
+class TestIterSSE:
+    """测试SSE输出、合并与续传"""
+
+    def test_sse_framing(self):
+        stream = EventStream()
+        stream.publish("stage", {"stage": "render", "status": "started"})
+        stream.publish("done", {"status": "completed"})
+        chunks = list(stream.iter_sse(0))
+        assert chunks[0].startswith('id: 0\nevent: stage\ndata: {"stage": "render"')
+        assert chunks[0].endswith("}\n\n")
+        assert chunks[1].startswith("id: 1\nevent: done\ndata: ")
+        # 中文原样输出，不转义
+        stream = EventStream()
+        stream.publish("done", {"title": "报告"})
+        assert '"title": "报告"' in next(stream.iter_sse(0))
+
+    def test_coalesces_consecutive_chunks(self):
+        """连续的 html_chunk 合并为一条，id 为被合并的最后一个事件；html_reset 与结束事件不被合并"""
+        messages = _parse_sse(_report_stream().iter_sse(0))
+        assert [(seq, etype) for seq, etype, _ in messages] == [
+            (0, "stage"), (2, "html_chunk"), (3, "html_reset"), (5, "html_chunk"),
+            (6, "html_section"), (7, "status"), (8, "done"),
+        ]
+        assert messages[1][2] == {"text": "<h1>标题"}
+        assert messages[3][2] == {"text": "<h1>新标题</h1>"}
+        assert messages[-1][2]["status"] == "completed"
+
+    def test_coalescing_respects_size_limit(self):
+        stream = EventStream()
+        piece = "x" * (MAX_COALESCED_CHARS // 4 + 1)
+        for _ in range(8):
+            stream.publish("html_chunk", {"text": piece})
+        stream.publish("done", {})
+        messages = _parse_sse(stream.iter_sse(0))
+        chunks = [data["text"] for _, etype, data in messages if etype == "html_chunk"]
+        assert len(chunks) > 1
+        assert all(len(text) <= MAX_COALESCED_CHARS for text in chunks)
+        assert "".join(chunks) == piece * 8
+        assert messages[-1][1] == "done"
+
+    def test_resume_from_last_event_id(self):
+        """从任意一条消息的 id + 1 续传，拼接后与一次读完的内容相同，没有缺失或重复"""
+        stream = _report_stream()
+        full = _parse_sse(stream.iter_sse(0))
+        full_text = "".join(data.get("text", "") for _, _, data in full)
+        for i, (last_id, _, _) in enumerate(full):
+            resumed = _parse_sse(stream.iter_sse(last_id + 1))
+            assert resumed == full[i + 1:]
+            combined = full[:i + 1] + resumed
+            assert "".join(data.get("text", "") for _, _, data in combined) == full_text
+
+    def test_resume_inside_coalesced_run(self):
+        """续传位置落在一串合并的 html_chunk 中间时，只发送其后的片段"""
+        messages = _parse_sse(_report_stream().iter_sse(5))
+        assert [(seq, etype) for seq, etype, _ in messages] == [(5, "html_chunk"), (6, "html_section"),
+                                                                (7, "status"), (8, "done")]
+        assert messages[0][2] == {"text": "新标题</h1>"}
+
+    def test_live_subscriber_ends_after_done(self):
+        """订阅者边读边等，结束事件之后退出；空闲时发送心跳"""
+        stream = EventStream()
+        received = []
+
+        def subscriber():
+            received.extend(stream.iter_sse(0, heartbeat=0.05))
+
+        thread = threading.Thread(target=subscriber)
+        thread.start()
+        stream.publish("stage", {"stage": "render"})
+        time.sleep(0.2)
+        stream.publish("html_chunk", {"text": "<p>"})
+        stream.publish("done", {"status": "completed"})
+        thread.join(5)
+        assert not thread.is_alive()
+        assert ": keep-alive\n\n" in received
+        assert [etype for _, etype, _ in _parse_sse(received)] == ["stage", "html_chunk", "done"]
+
+    def test_error_event_ends_stream(self):
+        stream = EventStream()
+        stream.publish("stage", {"stage": "render"})
+        stream.publish("error", {"status": "error", "error_message": "LLM调用失败"})
+        messages = _parse_sse(stream.iter_sse(0))
+        assert messages[-1][1] == "error"
+
+    def test_close_ends_stream(self):
+        stream = EventStream()
+        stream.publish("status", {"progress": 10})
+        stream.close()
+        assert [etype for _, etype, _ in _parse_sse(stream.iter_sse(0))] == ["status"]
+        assert list(stream.iter_sse(1)) == []
@@ -0,0 +1,72 @@
+"""
+测试SentimentAnalysisModel/BertTopicDetection_Finetuned/predict.py中--resume的续跑位置计算
+
+覆盖：
+1. 末尾是中断写入留下的半行时截断，从最后一条完整记录之后续跑
+2. 末尾记录完整但缺少换行时保留该记录并补上换行
+3. 记录跨越多个读取块、文件为空或不存在
+"""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+PREDICT_PATH = Path(__file__).parent.parent / "SentimentAnalysisModel" / "BertTopicDetection_Finetuned" / "predict.py"
+_spec = importlib.util.spec_from_file_location("bert_topic_predict", PREDICT_PATH)
+predict = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(predict)
+
+
+def _record(offset: int) -> bytes:
+    return json.dumps({"offset": offset, "id": offset, "topk": [["体育", 0.9]]}, ensure_ascii=False).encode("utf-8")
+
+
+class TestResumeOffset:
+    """测试续跑位置与输出文件末尾的处理"""
+
+    def test_torn_tail_is_truncated(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        complete = _record(0) + b"\n" + _record(1) + b"\n"
+        path.write_bytes(complete + _record(2)[:10])
+        assert predict.resume_offset(str(path)) == 2
+        assert path.read_bytes() == complete
+
+    def test_complete_tail_without_newline_is_kept(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_bytes(_record(0) + b"\n" + _record(1))
+        assert predict.resume_offset(str(path)) == 2
+        # 补上换行，之后追加的记录另起一行
+        assert path.read_bytes() == _record(0) + b"\n" + _record(1) + b"\n"
+
+    def test_single_record_without_newline(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_bytes(b'{"offset": 5}')
+        assert predict.resume_offset(str(path)) == 6
+        assert path.read_bytes() == b'{"offset": 5}\n'
+
+    def test_single_torn_record(self, tmp_path):
+        path = tmp_path / "out.jsonl"
+        path.write_bytes(b'{"offset": 5')
+        assert predict.resume_offset(str(path)) is None
+        assert path.read_bytes() == b""
+
+    def test_records_span_blocks(self, tmp_path):
+        """记录跨越读取块边界（含较长的不完整尾行）时结果与整块读取相同"""
+        path = tmp_path / "out.jsonl"
+        complete = b"".join(_record(i) + b"\n" for i in range(20))
+        path.write_bytes(complete + _record(20)[:-3])
+        assert predict.resume_offset(str(path), block_size=7) == 20
+        assert path.read_bytes() == complete
+        path.write_bytes(complete + _record(20))
+        assert predict.resume_offset(str(path), block_size=7) == 21
+
+    def test_missing_or_empty_file(self, tmp_path):
+        assert predict.resume_offset(str(tmp_path / "missing.jsonl")) is None
+        path = tmp_path / "out.jsonl"
+        path.write_bytes(b"")
+        assert predict.resume_offset(str(path)) is None
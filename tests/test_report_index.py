@@ -0,0 +1,171 @@
+"""
+测试ReportEngine/utils/report_index.py与utils/report_manifest.py
+
+覆盖：
+1. 启动扫描与清单增量读取（含写入中途的半行）
+2. 没有清单记录的报告（手工拷入）触发目录重新扫描
+3. 目录删除、清单截断后的恢复
+4. status / latest_files / wait_for_change
+"""
+
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.utils.report_index import ReportIndex
+from utils.report_manifest import MANIFEST_FILENAME, record_report, parse_manifest_line
+
+
+def _write_report(directory: Path, name: str, mtime: float = None, manifest: bool = True) -> Path:
+    """写一份报告；manifest 为 True 时同时登记到清单（与引擎的 _save_report 一致）"""
+    path = directory / name
+    path.write_text(f"# {name}\n内容", encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    if manifest:
+        record_report(str(directory), str(path))
+    return path
+
+
+def _touch_dir(directory: Path) -> None:
+    """把目录 mtime 往后拨，避免文件系统 mtime 精度导致变化不可见"""
+    stat = os.stat(directory)
+    os.utime(directory, (stat.st_atime, stat.st_mtime + 10))
+
+
+class TestReportManifest:
+    """测试报告清单的写入与解析"""
+
+    def test_record_and_parse(self, tmp_path):
+        report = _write_report(tmp_path, "a.md", mtime=1000.0)
+        lines = (tmp_path / MANIFEST_FILENAME).read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1
+        record = parse_manifest_line(lines[0])
+        assert record == {"file": report.name, "mtime": 1000.0}
+
+    def test_parse_rejects_invalid_lines(self):
+        assert parse_manifest_line('{"file": "a.md"') is None
+        assert parse_manifest_line('{"file": "a.json", "mtime": 1}') is None
+        assert parse_manifest_line('["a.md"]') is None
+        assert parse_manifest_line('') is None
+
+    def test_record_missing_file_does_not_raise(self, tmp_path):
+        record_report(str(tmp_path), str(tmp_path / "missing.md"))
+        assert not (tmp_path / MANIFEST_FILENAME).exists()
+
+
+class TestReportIndex:
+    """测试ReportIndex的增量维护"""
+
+    def setup_method(self):
+        self.dirs = {}
+
+    def _index(self, tmp_path, engines=("market", "customer", "compete")) -> ReportIndex:
+        for engine in engines:
+            directory = tmp_path / engine
+            directory.mkdir(exist_ok=True)
+            self.dirs[engine] = directory
+        return ReportIndex({engine: str(directory) for engine, directory in self.dirs.items()})
+
+    def test_initial_scan(self, tmp_path):
+        (tmp_path / "market").mkdir()
+        _write_report(tmp_path / "market", "old.md", mtime=1000.0, manifest=False)
+        _write_report(tmp_path / "market", "new.md", mtime=2000.0, manifest=False)
+        (tmp_path / "market" / "state.json").write_text("{}", encoding="utf-8")
+        index = self._index(tmp_path)
+        assert index.counts() == {"market": 2, "customer": 0, "compete": 0}
+        assert index.latest_files() == {"market": str(tmp_path / "market" / "new.md")}
+
+    def test_manifest_records_are_picked_up(self, tmp_path):
+        index = self._index(tmp_path)
+        version = index.version
+        _write_report(self.dirs["customer"], "c1.md", mtime=3000.0)
+        assert index.refresh() is True
+        assert index.version == version + 1
+        assert index.counts()["customer"] == 1
+        assert index.latest_files()["customer"].endswith("c1.md")
+        # 没有新记录时不产生变化
+        assert index.refresh() is False
+
+    def test_partial_manifest_line_waits_for_newline(self, tmp_path):
+        index = self._index(tmp_path)
+        directory = self.dirs["market"]
+        _write_report(directory, "m1.md", manifest=False)
+        manifest = directory / MANIFEST_FILENAME
+        line = '{"file": "m1.md", "mtime": 5000.0}\n'
+        with open(manifest, "a", encoding="utf-8") as f:
+            f.write(line[:10])
+        # 目录中有一份报告但清单只有半行：按目录扫描登记，半行留到下次
+        assert index.counts()["market"] == 1
+        with open(manifest, "a", encoding="utf-8") as f:
+            f.write(line[10:])
+        assert index.counts()["market"] == 1
+        assert index.latest_files()["market"].endswith("m1.md")
+
+    def test_report_without_manifest_triggers_rescan(self, tmp_path):
+        index = self._index(tmp_path)
+        _write_report(self.dirs["compete"], "manual.md", manifest=False)
+        _touch_dir(self.dirs["compete"])
+        assert index.counts()["compete"] == 1
+
+    def test_removed_directory_and_truncated_manifest(self, tmp_path):
+        index = self._index(tmp_path)
+        directory = self.dirs["market"]
+        _write_report(directory, "m1.md")
+        _write_report(directory, "m2.md")
+        assert index.counts()["market"] == 2
+
+        # 清单被截断：从头读取，已登记的文件去重
+        (directory / MANIFEST_FILENAME).write_text("", encoding="utf-8")
+        record_report(str(directory), str(directory / "m2.md"))
+        assert index.counts()["market"] == 2
+
+        for child in directory.iterdir():
+            child.unlink()
+        directory.rmdir()
+        assert index.counts()["market"] == 0
+        assert "market" not in index.latest_files()
+
+    def test_status_against_baseline(self, tmp_path):
+        index = self._index(tmp_path)
+        _write_report(self.dirs["market"], "m0.md")
+        baseline = index.counts()
+        status = index.status(baseline)
+        assert status["ready"] is False
+        assert sorted(status["missing_engines"]) == ["compete", "customer", "market"]
+
+        for engine in ("market", "customer", "compete"):
+            _write_report(self.dirs[engine], f"{engine}_new.md")
+        status = index.status(baseline)
+        assert status["ready"] is True
+        assert status["new_files_found"] == {"market": 1, "customer": 1, "compete": 1}
+        assert status["missing_engines"] == []
+        assert status["baseline_counts"] == baseline
+
+    def test_wait_for_change_wakes_on_new_report(self, tmp_path):
+        index = self._index(tmp_path)
+        version = index.version
+
+        def writer():
+            time.sleep(0.3)
+            _write_report(self.dirs["market"], "late.md")
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        started = time.monotonic()
+        new_version = index.wait_for_change(version, timeout=10)
+        thread.join()
+        assert new_version > version
+        assert time.monotonic() - started < 5
+        assert index.counts()["market"] == 1
+
+    def test_wait_for_change_times_out(self, tmp_path):
+        index = self._index(tmp_path)
+        version = index.version
+        assert index.wait_for_change(version, timeout=0.2) == version
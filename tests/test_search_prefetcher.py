@@ -0,0 +1,192 @@
+"""
+测试MarketEngine/tools/prefetch.py中的SearchPrefetcher与Agent的流水线开关
+
+覆盖：
+1. 预取命中（含按 limit 截取）、未命中与从未预取过的工具的直接查询
+2. 缓存有界：超出上限时淘汰最早的预取，尚未开始的被取消
+3. 预取的查询失败时重新查询
+4. REFLECTION_PIPELINE_ENABLED 打开时 Agent 创建预取器（引擎配置或根目录 config.py 中的配置均可）
+"""
+
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import MarketEngine.agent as market_agent
+    from MarketEngine.tools.prefetch import SearchPrefetcher
+    from MarketEngine.tools.search import DBResponse, QueryResult
+except Exception as e:  # 缺少依赖或未配置API密钥时整个引擎包无法导入
+    pytest.skip(f"MarketEngine 无法导入: {e}", allow_module_level=True)
+
+
+class FakeDB:
+    """记录调用的数据库查询工具集，get_comments_for_topic 按 limit 返回若干条结果"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail_next = 0
+        self.gate = None
+
+    def get_comments_for_topic(self, topic: str, limit: int = 10) -> DBResponse:
+        self.calls.append(("get_comments_for_topic", topic, limit))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError("数据库连接中断")
+        results = [QueryResult(platform="weibo", content_type="comment", title_or_content=f"{topic}-{i}")
+                   for i in range(limit)]
+        return DBResponse("get_comments_for_topic", {"topic": topic, "limit": limit}, results, len(results))
+
+    def search_hot_content(self, time_period: str = "week") -> DBResponse:
+        self.calls.append(("search_hot_content", time_period))
+        return DBResponse("search_hot_content", {"time_period": time_period})
+
+
+@pytest.fixture
+def db():
+    return FakeDB()
+
+
+@pytest.fixture
+def prefetcher(db):
+    prefetcher = SearchPrefetcher(db, max_entries=2)
+    yield prefetcher
+    if db.gate is not None:
+        db.gate.set()
+    prefetcher.close()
+
+
+class TestSearchPrefetcher:
+    """测试预取缓存的命中、淘汰与失败处理"""
+
+    def test_hit_uses_prefetched_result(self, db, prefetcher):
+        """参数相同的查询取用预取结果，不再查询数据库"""
+        assert prefetcher.prefetch("get_comments_for_topic", topic="续航", limit=5) is True
+        # 已缓存的查询不重复提交
+        assert prefetcher.prefetch("get_comments_for_topic", topic="续航", limit=5) is False
+        response = prefetcher.call("get_comments_for_topic", topic="续航", limit=5)
+        assert response.results_count == 5
+        assert db.calls == [("get_comments_for_topic", "续航", 5)]
+        assert prefetcher.stats["hits"] == 1
+        assert prefetcher.stats["misses"] == 0
+
+    def test_hit_truncates_larger_limit(self, db, prefetcher):
+        """limit 更大的预取结果截取后与直接查询等价"""
+        prefetcher.prefetch("get_comments_for_topic", topic="续航", limit=10)
+        response = prefetcher.call("get_comments_for_topic", topic="续航", limit=3)
+        assert [r.title_or_content for r in response.results] == ["续航-0", "续航-1", "续航-2"]
+        assert response.parameters["limit"] == 3
+        assert len(db.calls) == 1
+
+    def test_miss_queries_database(self, db, prefetcher):
+        """预取过的工具参数不同时算作未命中，从未预取过的工具算作直接查询"""
+        prefetcher.prefetch("get_comments_for_topic", topic="续航", limit=5)
+        response = prefetcher.call("get_comments_for_topic", topic="价格", limit=5)
+        assert response.results[0].title_or_content == "价格-0"
+        prefetcher.call("search_hot_content", time_period="24h")
+        assert prefetcher.stats["misses"] == 1
+        assert prefetcher.stats["direct"] == 1
+        assert prefetcher.stats["hits"] == 0
+        # 每次命中后缓存项被取走，再次查询同样未命中
+        prefetcher.call("get_comments_for_topic", topic="续航", limit=5)
+        prefetcher.call("get_comments_for_topic", topic="续航", limit=5)
+        assert prefetcher.stats["hits"] == 1
+        assert prefetcher.stats["misses"] == 2
+
+    def test_bounded_eviction_cancels_pending(self, db, prefetcher):
+        """超出上限时淘汰最早的预取；尚未开始执行的被取消，不会查询数据库"""
+        db.gate = threading.Event()
+        # 第一个预取占住查询线程，之后的都在排队
+        prefetcher.prefetch("get_comments_for_topic", topic="a", limit=1)
+        prefetcher.prefetch("get_comments_for_topic", topic="b", limit=1)
+        prefetcher.prefetch("get_comments_for_topic", topic="c", limit=1)
+        prefetcher.prefetch("get_comments_for_topic", topic="d", limit=1)
+        assert prefetcher.stats["evicted"] == 2
+        db.gate.set()
+
+        assert prefetcher.call("get_comments_for_topic", topic="d", limit=1).results_count == 1
+        assert prefetcher.call("get_comments_for_topic", topic="c", limit=1).results_count == 1
+        assert prefetcher.stats["hits"] == 2
+        # b 在执行前被淘汰并取消
+        assert [call[1] for call in db.calls] == ["a", "c", "d"]
+        prefetcher.call("get_comments_for_topic", topic="b", limit=1)
+        assert prefetcher.stats["misses"] == 1
+
+    def test_failed_prefetch_is_retried(self, db, prefetcher):
+        """预取的查询失败时记录失败并重新查询"""
+        db.fail_next = 1
+        prefetcher.prefetch("get_comments_for_topic", topic="续航", limit=2)
+        response = prefetcher.call("get_comments_for_topic", topic="续航", limit=2)
+        assert response.results_count == 2
+        assert len(db.calls) == 2
+        assert prefetcher.stats["errors"] == 1
+        assert prefetcher.stats["hits"] == 0
+
+    def test_failure_without_prefetch_propagates(self, db, prefetcher):
+        db.fail_next = 1
+        with pytest.raises(RuntimeError):
+            prefetcher.call("get_comments_for_topic", topic="续航", limit=2)
+
+    def test_cursor_kwargs_are_hashable(self, db, prefetcher):
+        """分页游标（字典）参与缓存键"""
+        key_a = SearchPrefetcher._key("search_topic_globally", {"topic": "x", "cursor": {"t1": 5}})
+        key_b = SearchPrefetcher._key("search_topic_globally", {"topic": "x", "cursor": {"t1": 6}})
+        assert key_a != key_b
+        hash(key_a)
+
+    def test_log_stats(self, db, prefetcher):
+        prefetcher.prefetch("get_comments_for_topic", topic="续航", limit=1)
+        prefetcher.prefetch("get_comments_for_topic", topic="价格", limit=1)
+        prefetcher.call("get_comments_for_topic", topic="续航", limit=1)
+        messages = []
+        handler = market_agent.logger.add(lambda m: messages.append(str(m)), format="{message}")
+        try:
+            prefetcher.log_stats()
+        finally:
+            market_agent.logger.remove(handler)
+        assert "预取 2 次，命中 1 次（50%）" in messages[0]
+        assert "尚未使用 1 次" in messages[0]
+
+
+class TestAgentPipelineConfig:
+    """测试流水线开关从配置传到Agent"""
+
+    @pytest.fixture(autouse=True)
+    def _no_llm(self, monkeypatch):
+        # 不创建LLM客户端和节点，只检查流水线相关的初始化
+        llm = SimpleNamespace(get_model_info=lambda: "test")
+        monkeypatch.setattr(market_agent.DeepSearchAgent, "_initialize_llm", lambda self: llm)
+        monkeypatch.setattr(market_agent.DeepSearchAgent, "_initialize_nodes", lambda self: None)
+
+    def _agent(self, tmp_path, **config):
+        agent = market_agent.DeepSearchAgent(SimpleNamespace(OUTPUT_DIR=str(tmp_path), **config))
+        if agent.prefetcher:
+            agent.prefetcher.close()
+        return agent
+
+    def test_engine_config_enables_pipeline(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(market_agent.global_settings, "REFLECTION_PIPELINE_ENABLED", False)
+        agent = self._agent(tmp_path, REFLECTION_PIPELINE_ENABLED=True, REFLECTION_PREFETCH_CACHE_SIZE=3)
+        assert agent.prefetcher is not None
+        assert agent.prefetcher.max_entries == 3
+
+    def test_root_config_enables_pipeline(self, tmp_path, monkeypatch):
+        """引擎配置没有该字段时（如 Streamlit 应用构造的 Settings）使用根目录 config.py 中的配置"""
+        monkeypatch.setattr(market_agent.global_settings, "REFLECTION_PIPELINE_ENABLED", True)
+        monkeypatch.setattr(market_agent.global_settings, "REFLECTION_PREFETCH_CACHE_SIZE", 5)
+        agent = self._agent(tmp_path)
+        assert agent.prefetcher is not None
+        assert agent.prefetcher.max_entries == 5
+
+    def test_pipeline_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(market_agent.global_settings, "REFLECTION_PIPELINE_ENABLED", True)
+        assert self._agent(tmp_path, REFLECTION_PIPELINE_ENABLED=False).prefetcher is None
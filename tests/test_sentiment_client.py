@@ -0,0 +1,113 @@
+"""
+测试MarketEngine/tools/sentiment_analyzer.py连接共享情感分析推理服务的等待逻辑
+
+覆盖：
+1. 服务仍在加载模型时持续等待（超过 SENTIMENT_SERVER_WAIT 也不回退本地加载），间隔逐步退避
+2. 服务不可达（进程已退出或未能启动）时回退本地加载
+3. 健康检查超时视为服务仍存活
+4. 服务端报告情感分析已禁用时禁用本地分析
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import requests
+    from MarketEngine.tools import sentiment_analyzer
+except Exception as e:  # 缺少依赖或未配置API密钥时整个引擎包无法导入
+    pytest.skip(f"MarketEngine 无法导入: {e}", allow_module_level=True)
+
+
+class _FakeClock:
+    """替换模块中的 time：sleep 只推进时间，不真正等待"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+def _fake_session(script):
+    """按顺序返回 script 中的健康检查结果；元素为异常时抛出"""
+    calls = iter(script)
+
+    class Session:
+        trust_env = True
+
+        def get(self, url, timeout=None):
+            item = next(calls)
+            if isinstance(item, Exception):
+                raise item
+            return _Response(item)
+
+    return Session
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(sentiment_analyzer, "time", clock)
+    monkeypatch.setattr(sentiment_analyzer, "SENTIMENT_SERVER_WAIT", 5.0)
+    return clock
+
+
+def _analyzer(monkeypatch, script):
+    monkeypatch.setattr(requests, "Session", _fake_session(script))
+    return sentiment_analyzer.WeiboMultilingualSentimentAnalyzer(backend="torch", server_url="http://127.0.0.1:8765")
+
+
+class TestRemoteInitialization:
+    """测试客户端等待共享推理服务"""
+
+    def test_keeps_waiting_while_server_loads(self, monkeypatch, clock, capsys):
+        loading = {"ready": False, "disabled": False}
+        analyzer = _analyzer(monkeypatch, [loading] * 12 + [{"ready": True, "backend": "torch"}])
+        assert analyzer._initialize_remote() is True
+        assert analyzer.backend == "remote"
+        assert analyzer.server_url == "http://127.0.0.1:8765"
+        # 等待远超 SENTIMENT_SERVER_WAIT 仍未回退；间隔从1秒退避到上限
+        assert clock.now > 5 * sentiment_analyzer.SENTIMENT_SERVER_WAIT
+        assert clock.sleeps[:4] == [1.0, 2.0, 4.0, 8.0]
+        assert max(clock.sleeps) == sentiment_analyzer.SENTIMENT_SERVER_MAX_BACKOFF
+        output = capsys.readouterr().out
+        assert "仍在加载模型" in output
+        assert "已连接共享情感分析推理服务" in output
+
+    def test_falls_back_when_server_unreachable(self, monkeypatch, clock, capsys):
+        analyzer = _analyzer(monkeypatch, [{"ready": False}, requests.ConnectionError("connection refused")])
+        assert analyzer._initialize_remote() is False
+        assert analyzer.server_url == ""
+        assert analyzer._http is None
+        assert "改为本地加载模型" in capsys.readouterr().out
+
+    def test_timeout_counts_as_alive(self, monkeypatch, clock):
+        analyzer = _analyzer(monkeypatch, [requests.Timeout("busy"), requests.Timeout("busy"),
+                                           {"ready": True, "backend": "onnx"}])
+        assert analyzer._initialize_remote() is True
+        assert analyzer.device == "remote:http://127.0.0.1:8765(onnx)"
+
+    def test_disabled_on_server(self, monkeypatch, clock):
+        analyzer = _analyzer(monkeypatch, [{"ready": False, "disabled": True, "reason": "缺少依赖"}])
+        assert analyzer._initialize_remote() is False
+        assert analyzer.is_disabled
+        assert "缺少依赖" in analyzer.disable_reason
@@ -0,0 +1,298 @@
+"""
+测试MarketEngine/CustomerEngine/CompeteEngine 的 state/state.py 中的 StateJournal
+
+覆盖：
+1. 快照与增量记录的回放，超过 COMPACT_EVERY 条后压缩为快照再继续回放
+2. 末尾写了一半的记录被忽略
+3. 中途崩溃后从日志恢复：已完成的段落与反思轮次不再重复执行，结果与不中断的运行一致
+4. RESEARCH_CHECKPOINT_ENABLED 关闭时 research() 不写检查点日志（需要能导入引擎包，否则跳过）
+
+三个引擎的 state.py 相同；各引擎包的 __init__ 会导入 Agent（依赖LLM客户端），
+这里直接按文件加载 state.py。
+"""
+
+import importlib
+import importlib.util
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+ENGINES = ("MarketEngine", "CustomerEngine", "CompeteEngine")
+MAX_REFLECTIONS = 2
+
+
+def _load_state_module(engine: str):
+    path = project_root / engine / "state" / "state.py"
+    spec = importlib.util.spec_from_file_location(f"_{engine.lower()}_state", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(params=ENGINES)
+def state_module(request):
+    return _load_state_module(request.param)
+
+
+def _new_state(module, paragraphs: int = 3):
+    state = module.State(query="新能源汽车口碑", report_title="新能源汽车口碑分析")
+    for i in range(paragraphs):
+        state.add_paragraph(f"段落{i}", f"段落{i}的预期内容")
+    return state
+
+
+class _Crash(Exception):
+    """模拟进程在某一步之后崩溃"""
+
+
+def _run_research(state, journal, steps, crash_after=None):
+    """
+    按 DeepSearchAgent._process_paragraphs / _reflection_loop 的顺序与恢复条件处理段落：
+    初始搜索与总结、每轮反思各写一条增量记录，段落完成时再写一条。
+
+    steps 记录实际执行的步骤；执行完 crash_after 步后抛出 _Crash。
+    """
+    def step(name):
+        steps.append(name)
+        if crash_after is not None and len(steps) >= crash_after:
+            raise _Crash(name)
+
+    for i, paragraph in enumerate(state.paragraphs):
+        if paragraph.is_completed():
+            continue
+        research = paragraph.research
+        if not research.latest_summary:
+            research.add_search_results(f"段落{i} 初始搜索", [{"title": f"p{i}-0", "content": "初始结果"}])
+            research.latest_summary = f"段落{i} 初始总结"
+            journal.record_paragraph(state, i)
+            step((i, "initial"))
+        for r in range(research.reflection_iteration, MAX_REFLECTIONS):
+            research.add_search_results(f"段落{i} 反思{r}", [{"title": f"p{i}-r{r}", "content": "反思结果"}])
+            research.latest_summary += f" / 反思{r}"
+            research.increment_reflection()
+            journal.record_paragraph(state, i)
+            step((i, f"reflection{r}"))
+        research.mark_completed()
+        journal.record_paragraph(state, i)
+        step((i, "completed"))
+
+
+def _comparable(state):
+    """去掉时间戳后的状态，用于比较两次运行的结果"""
+    data = state.to_dict()
+    data.pop("created_at")
+    data.pop("updated_at")
+    for paragraph in data["paragraphs"]:
+        for search in paragraph["research"]["search_history"]:
+            search.pop("timestamp")
+    return data
+
+
+class TestStateJournal:
+    """测试检查点日志的写入与回放"""
+
+    def test_snapshot_and_paragraph_records(self, state_module, tmp_path):
+        """快照之后的增量记录回放后与内存中的状态一致"""
+        path = tmp_path / "checkpoint.jsonl"
+        state = _new_state(state_module)
+        journal = state_module.StateJournal(str(path))
+        journal.snapshot(state)
+
+        research = state.paragraphs[1].research
+        research.add_search_results("查询一", [{"title": "a", "content": "内容a"}, {"title": "b"}])
+        research.latest_summary = "初始总结"
+        journal.record_paragraph(state, 1)
+        research.add_search_results("查询二", [{"title": "c"}])
+        research.increment_reflection()
+        journal.record_paragraph(state, 1)
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["op"] for line in lines] == ["snapshot", "paragraph", "paragraph"]
+        # 第二条记录只包含新增的搜索
+        assert json.loads(lines[2])["search_offset"] == 2
+        assert len(json.loads(lines[2])["searches"]) == 1
+
+        replayed = state_module.StateJournal.replay(str(path))
+        assert replayed.to_dict() == state.to_dict()
+
+    def test_record_without_snapshot_writes_snapshot(self, state_module, tmp_path):
+        """日志文件不存在时第一条记录写成快照"""
+        path = tmp_path / "sub" / "checkpoint.jsonl"
+        state = _new_state(state_module)
+        state.paragraphs[0].research.latest_summary = "总结"
+        state_module.StateJournal(str(path)).record_paragraph(state, 0)
+        lines = path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 1 and json.loads(lines[0])["op"] == "snapshot"
+        assert state_module.StateJournal.replay(str(path)).paragraphs[0].research.latest_summary == "总结"
+
+    def test_replay_after_compaction(self, state_module, tmp_path):
+        """超过 COMPACT_EVERY 条增量后日志压缩为快照，压缩前后的记录都能正确回放"""
+        path = tmp_path / "checkpoint.jsonl"
+        state = _new_state(state_module)
+        journal = state_module.StateJournal(str(path))
+        journal.snapshot(state)
+
+        compact_every = state_module.StateJournal.COMPACT_EVERY
+        total = compact_every + 5
+        for n in range(total):
+            index = n % len(state.paragraphs)
+            research = state.paragraphs[index].research
+            research.add_search_results(f"查询{n}", [{"title": f"结果{n}", "content": f"内容{n}"}])
+            research.latest_summary = f"第{n}次总结"
+            research.reflection_iteration = n
+            journal.record_paragraph(state, index)
+
+        lines = path.read_text(encoding="utf-8").splitlines()
+        # 第 COMPACT_EVERY 条增量触发压缩，之后只剩一条快照加后续的增量
+        assert len(lines) == 1 + total - compact_every
+        assert json.loads(lines[0])["op"] == "snapshot"
+        assert all(json.loads(line)["op"] == "paragraph" for line in lines[1:])
+
+        replayed = state_module.StateJournal.replay(str(path))
+        assert replayed.to_dict() == state.to_dict()
+        assert sum(len(p.research.search_history) for p in replayed.paragraphs) == total
+        assert not (tmp_path / "checkpoint.jsonl.tmp").exists()
+
+    def test_torn_last_line_ignored(self, state_module, tmp_path):
+        """崩溃时写了一半的最后一行被忽略，回放到上一条完整记录为止"""
+        path = tmp_path / "checkpoint.jsonl"
+        state = _new_state(state_module)
+        journal = state_module.StateJournal(str(path))
+        journal.snapshot(state)
+        research = state.paragraphs[0].research
+        research.add_search_results("查询", [{"title": "a"}])
+        research.latest_summary = "完整记录"
+        journal.record_paragraph(state, 0)
+        expected = state.to_dict()
+
+        research.add_search_results("查询二", [{"title": "b"}])
+        research.latest_summary = "写到一半的记录"
+        journal.record_paragraph(state, 0)
+        content = path.read_bytes()
+        last_start = content.rstrip(b"\n").rfind(b"\n") + 1
+        for cut in (last_start + 1, (last_start + len(content)) // 2, len(content) - 2):
+            path.write_bytes(content[:cut])
+            assert state_module.StateJournal.replay(str(path)).to_dict() == expected
+
+    def test_replay_without_snapshot_raises(self, state_module, tmp_path):
+        """没有完整快照（如首行就被截断）时报错，而不是返回空状态"""
+        path = tmp_path / "checkpoint.jsonl"
+        path.write_text('{"op": "snapsh', encoding="utf-8")
+        with pytest.raises(ValueError):
+            state_module.StateJournal.replay(str(path))
+
+
+class TestResume:
+    """测试按Agent的恢复条件从日志继续研究"""
+
+    @pytest.mark.parametrize("crash_after", [1, 2, 4, 5, 7, 11])
+    def test_resume_skips_finished_work(self, state_module, tmp_path, crash_after):
+        """崩溃后恢复只执行尚未记录的步骤，最终结果与不中断的运行一致"""
+        reference = _new_state(state_module)
+        all_steps = []
+        _run_research(reference, state_module.StateJournal(str(tmp_path / "reference.jsonl")), all_steps)
+        assert len(all_steps) == 3 * (MAX_REFLECTIONS + 2)
+
+        path = tmp_path / "checkpoint.jsonl"
+        state = _new_state(state_module)
+        journal = state_module.StateJournal(str(path))
+        journal.snapshot(state)
+        done = []
+        with pytest.raises(_Crash):
+            _run_research(state, journal, done, crash_after=crash_after)
+
+        # 与 DeepSearchAgent._resume_from_checkpoint 相同：回放后重写为一条快照再继续
+        resumed = state_module.StateJournal.replay(str(path))
+        journal = state_module.StateJournal(str(path))
+        journal.snapshot(resumed)
+        rerun = []
+        _run_research(resumed, journal, rerun)
+
+        assert rerun == all_steps[crash_after:]
+        assert _comparable(resumed) == _comparable(reference)
+        assert _comparable(state_module.StateJournal.replay(str(path))) == _comparable(reference)
+
+    def test_resume_mid_reflection(self, state_module, tmp_path):
+        """恢复后的段落保留已有的搜索记录，反思从已完成的轮次之后继续"""
+        path = tmp_path / "checkpoint.jsonl"
+        state = _new_state(state_module, paragraphs=2)
+        journal = state_module.StateJournal(str(path))
+        journal.snapshot(state)
+        with pytest.raises(_Crash):
+            # 段落0完成（初始、两轮反思、完成），段落1完成初始总结和第一轮反思
+            _run_research(state, journal, [], crash_after=MAX_REFLECTIONS + 4)
+
+        resumed = state_module.StateJournal.replay(str(path))
+        assert resumed.paragraphs[0].is_completed()
+        research = resumed.paragraphs[1].research
+        assert not resumed.paragraphs[1].is_completed()
+        assert research.latest_summary == "段落1 初始总结 / 反思0"
+        assert research.reflection_iteration == 1
+        assert [s.title for s in research.search_history] == ["p1-0", "p1-r0"]
+
+
+def _import_agent_module(engine: str):
+    """导入引擎的 agent 模块；缺少依赖或未配置API密钥时跳过"""
+    try:
+        return importlib.import_module(f"{engine}.agent")
+    except Exception as e:
+        pytest.skip(f"{engine} 无法导入: {e}")
+
+
+class TestCheckpointSwitch:
+    """测试检查点开关从配置传到Agent"""
+
+    def _research(self, engine, tmp_path, monkeypatch, **config):
+        """不调用LLM和搜索，只走一遍 research() 的检查点流程"""
+        module = _import_agent_module(engine)
+        agent = module.DeepSearchAgent.__new__(module.DeepSearchAgent)
+        agent.config = SimpleNamespace(OUTPUT_DIR=str(tmp_path), **config)
+        agent.state = module.State()
+        agent.journal = None
+        agent.prefetcher = None
+
+        def process_paragraphs():
+            agent.state.paragraphs[0].research.latest_summary = "总结"
+            agent.state.paragraphs[0].research.mark_completed()
+            agent._checkpoint(0)
+
+        monkeypatch.setattr(agent, "_generate_report_structure",
+                            lambda query: agent.state.add_paragraph("段落", "内容"), raising=False)
+        monkeypatch.setattr(agent, "_process_paragraphs", process_paragraphs, raising=False)
+        monkeypatch.setattr(agent, "_generate_final_report", lambda: "报告", raising=False)
+        assert agent.research("检查点开关", save_report=False) == "报告"
+        return module, agent
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_disabled_in_engine_config(self, engine, tmp_path, monkeypatch):
+        module = _import_agent_module(engine)
+        monkeypatch.setattr(module.global_settings, "RESEARCH_CHECKPOINT_ENABLED", True)
+        _, agent = self._research(engine, tmp_path, monkeypatch, RESEARCH_CHECKPOINT_ENABLED=False)
+        assert agent.journal is None
+        assert not (tmp_path / "checkpoints").exists()
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_disabled_in_root_config(self, engine, tmp_path, monkeypatch):
+        """引擎配置没有该字段时（如 Streamlit 应用构造的 Settings）使用根目录 config.py 中的配置"""
+        module = _import_agent_module(engine)
+        monkeypatch.setattr(module.global_settings, "RESEARCH_CHECKPOINT_ENABLED", False)
+        _, agent = self._research(engine, tmp_path, monkeypatch)
+        assert agent.journal is None
+        assert not (tmp_path / "checkpoints").exists()
+
+    @pytest.mark.parametrize("engine", ENGINES)
+    def test_enabled_writes_journal(self, engine, tmp_path, monkeypatch):
+        module = _import_agent_module(engine)
+        monkeypatch.setattr(module.global_settings, "RESEARCH_CHECKPOINT_ENABLED", True)
+        _, agent = self._research(engine, tmp_path, monkeypatch)
+        journals = list((tmp_path / "checkpoints").glob("research_*.jsonl"))
+        assert [str(p) for p in journals] == [agent.journal.filepath]
+        replayed = module.StateJournal.replay(agent.journal.filepath)
+        assert replayed.paragraphs[0].is_completed()
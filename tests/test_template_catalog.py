@@ -0,0 +1,154 @@
+"""
+测试ReportEngine/utils/template_catalog.py
+
+覆盖：
+1. 首次加载：章节提纲、描述与给LLM用的精简描述
+2. 新增、删除模板后（目录 mtime 变化）立即生效
+3. 原地编辑模板（目录 mtime 不变）在文件检查间隔之后生效，间隔内沿用缓存
+4. 未变化的模板不会重新读取
+"""
+
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from ReportEngine.utils import template_catalog
+from ReportEngine.utils.template_catalog import TemplateCatalog, get_template_catalog, FILE_CHECK_INTERVAL
+
+
+def _write_template(directory: Path, name: str, sections, mtime: float = None) -> Path:
+    path = directory / f"{name}.md"
+    path.write_text(f"# {name}\n" + "".join(f"## {title}\n- 要点\n" for title in sections), encoding="utf-8")
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def _set_dir_mtime(directory: Path, mtime: float) -> None:
+    """固定目录 mtime，避免文件系统 mtime 精度导致变化不可见（或出现意外的变化）"""
+    os.utime(directory, (mtime, mtime))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(template_catalog, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    directory = tmp_path / "report_template"
+    directory.mkdir()
+    _write_template(directory, "企业品牌声誉分析报告", ["品牌概况", "声誉分析"], mtime=100.0)
+    _write_template(directory, "市场竞争格局报告", ["竞争格局"], mtime=100.0)
+    (directory / "说明.txt").write_text("不是模板", encoding="utf-8")
+    _set_dir_mtime(directory, 100.0)
+    return directory
+
+
+class TestTemplateCatalog:
+    """测试模板目录的加载与失效"""
+
+    def test_initial_load(self, template_dir, clock):
+        catalog = TemplateCatalog(str(template_dir))
+        entries = catalog.templates()
+        assert [e.name for e in entries] == ["企业品牌声誉分析报告", "市场竞争格局报告"]
+        brand = catalog.get("企业品牌声誉分析报告")
+        assert [s.title for s in brand.sections] == ["品牌概况", "声誉分析"]
+        assert brand.description == "适用于企业品牌声誉和形象分析"
+        assert brand.descriptor == "- 企业品牌声誉分析报告: 适用于企业品牌声誉和形象分析（章节: 品牌概况 / 声誉分析）"
+        assert brand.first_line == "# 企业品牌声誉分析报告"
+        assert brand.to_dict()["content"].startswith("# 企业品牌声誉分析报告")
+        assert catalog.get("说明") is None
+
+    def test_new_file_appears_after_dir_mtime_change(self, template_dir, clock):
+        catalog = TemplateCatalog(str(template_dir))
+        assert len(catalog.templates()) == 2
+        _write_template(template_dir, "突发事件应对报告", ["事件经过"], mtime=200.0)
+        _set_dir_mtime(template_dir, 200.0)
+        # 时钟没有前进：只靠目录 mtime 变化即可发现新模板
+        names = [e.name for e in catalog.templates()]
+        assert names == ["企业品牌声誉分析报告", "市场竞争格局报告", "突发事件应对报告"]
+        assert catalog.get("突发事件应对报告").description == "适用于突发事件和危机公关"
+
+    def test_edited_file_refreshes_after_interval(self, template_dir, clock):
+        """原地编辑不改变目录 mtime：检查间隔内沿用缓存，间隔之后重新读取"""
+        catalog = TemplateCatalog(str(template_dir))
+        assert [s.title for s in catalog.get("市场竞争格局报告").sections] == ["竞争格局"]
+
+        _write_template(template_dir, "市场竞争格局报告", ["竞争格局", "主要对手", "市场份额"], mtime=300.0)
+        _set_dir_mtime(template_dir, 100.0)
+        clock.now += FILE_CHECK_INTERVAL / 2
+        assert [s.title for s in catalog.get("市场竞争格局报告").sections] == ["竞争格局"]
+
+        clock.now += FILE_CHECK_INTERVAL
+        entry = catalog.get("市场竞争格局报告")
+        assert [s.title for s in entry.sections] == ["竞争格局", "主要对手", "市场份额"]
+        assert entry.mtime == 300.0
+        assert entry.descriptor.endswith("（章节: 竞争格局 / 主要对手 / 市场份额）")
+
+    def test_deleted_file_drops_out(self, template_dir, clock):
+        catalog = TemplateCatalog(str(template_dir))
+        assert catalog.get("企业品牌声誉分析报告") is not None
+        (template_dir / "企业品牌声誉分析报告.md").unlink()
+        _set_dir_mtime(template_dir, 400.0)
+        assert [e.name for e in catalog.templates()] == ["市场竞争格局报告"]
+        assert catalog.get("企业品牌声誉分析报告") is None
+
+    def test_unchanged_files_not_reloaded(self, template_dir, clock, monkeypatch):
+        """重新扫描时 mtime 未变的模板沿用已解析的结果"""
+        catalog = TemplateCatalog(str(template_dir))
+        before = {e.name: e for e in catalog.templates()}
+        loaded = []
+        original = template_catalog._load_entry
+        monkeypatch.setattr(template_catalog, "_load_entry",
+                            lambda path, filename, mtime: loaded.append(filename) or original(path, filename, mtime))
+
+        _write_template(template_dir, "日常监测报告", ["本周概况"], mtime=500.0)
+        _set_dir_mtime(template_dir, 500.0)
+        clock.now += FILE_CHECK_INTERVAL * 2
+        after = {e.name: e for e in catalog.templates()}
+        assert loaded == ["日常监测报告.md"]
+        assert after["市场竞争格局报告"] is before["市场竞争格局报告"]
+
+    def test_invalidate_forces_rescan(self, template_dir, clock):
+        catalog = TemplateCatalog(str(template_dir))
+        catalog.templates()
+        _write_template(template_dir, "市场竞争格局报告", ["新章节"], mtime=600.0)
+        _set_dir_mtime(template_dir, 100.0)
+        catalog.invalidate()
+        assert [s.title for s in catalog.get("市场竞争格局报告").sections] == ["新章节"]
+
+    def test_missing_directory(self, tmp_path, clock):
+        catalog = TemplateCatalog(str(tmp_path / "missing"))
+        assert catalog.templates() == []
+        assert catalog.get("任意模板") is None
+
+    def test_removed_directory_clears_catalog(self, template_dir, clock):
+        catalog = TemplateCatalog(str(template_dir))
+        assert len(catalog.templates()) == 2
+        for child in template_dir.iterdir():
+            child.unlink()
+        template_dir.rmdir()
+        assert catalog.templates() == []
+
+    def test_shared_catalog_per_directory(self, template_dir, tmp_path):
+        catalog = get_template_catalog(str(template_dir))
+        assert get_template_catalog(os.path.join(str(tmp_path), "report_template")) is catalog
+        assert get_template_catalog(str(tmp_path / "other")) is not catalog
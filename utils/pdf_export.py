@@ -4,9 +4,15 @@ PDF导出工具模块
 """
 
 import os
+import time
+import queue
+import atexit
+import asyncio
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 from loguru import logger
 
 # 初始化PDF导出功能标志
@@ -57,6 +63,23 @@ else:
     logger.warning("PDF导出功能不可用，请安装: pip install markdown reportlab")
 
 
+# Markdown 转换器构建时要加载全部扩展，进程内只创建一次；实例本身不是线程安全的，转换时加锁
+_markdown_converter = None
+_markdown_lock = threading.Lock()
+
+
+def render_markdown_html(markdown_content: str) -> str:
+    """使用缓存的 Markdown 转换器把 Markdown 转为 HTML 片段"""
+    global _markdown_converter
+    with _markdown_lock:
+        if _markdown_converter is None:
+            _markdown_converter = markdown.Markdown(extensions=['extra', 'codehilite', 'tables', 'toc'])
+        try:
+            return _markdown_converter.convert(markdown_content)
+        finally:
+            _markdown_converter.reset()
+
+
 def markdown_to_pdf(markdown_content: str, output_path: str, title: str = "报告") -> bool:
     """
     将Markdown内容转换为PDF文件
@@ -95,10 +118,7 @@ def markdown_to_pdf(markdown_content: str, output_path: str, title: str = "报
 def _markdown_to_pdf_weasyprint(markdown_content: str, output_path: str, title: str) -> bool:
     """使用 WeasyPrint 生成 PDF"""
     # 将Markdown转换为HTML
-    html_content = markdown.markdown(
-        markdown_content,
-        extensions=['extra', 'codehilite', 'tables', 'toc']
-    )
+    html_content = render_markdown_html(markdown_content)
     
     # 构建完整的HTML文档
     full_html = f"""
@@ -425,6 +445,285 @@ def _markdown_to_pdf_reportlab(markdown_content: str, output_path: str, title: s
     return True
 
 
+# ===== 常驻的 Playwright 渲染服务 =====
+# 每个浏览器实例最多渲染的文档数，超过后关闭并重新启动，防止 Chromium 内存持续增长
+PDF_BROWSER_MAX_JOBS = int(os.getenv("PDF_BROWSER_MAX_JOBS", "50"))
+# 同时渲染的页面数（每个页面独立的浏览器上下文，共用一个浏览器进程）
+PDF_RENDER_PAGES = int(os.getenv("PDF_RENDER_PAGES", "3"))
+# 单个文档的渲染超时（秒），从任务被渲染页面取走时开始计算
+PDF_RENDER_TIMEOUT = 120
+# 任务排队等待空闲页面的最长时间（秒），超过后调用方放弃，任务被取走时直接跳过
+PDF_QUEUE_TIMEOUT = int(os.getenv("PDF_QUEUE_TIMEOUT", "600"))
+PDF_MARGIN = {'top': '0.75in', 'right': '0.75in', 'bottom': '0.75in', 'left': '0.75in'}
+
+# 页面就绪判断：文档加载完成、字体加载完成、图片加载完成（或加载失败），
+# 页面也可以主动设置 window.__PDF_READY__ = false / true 来延后/声明就绪（例如等待图表动画）
+_PAGE_READY_SCRIPT = """() => {
+    if (window.__PDF_READY__ === false) return false;
+    if (document.readyState !== 'complete') return false;
+    if (document.fonts && document.fonts.status !== 'loaded') return false;
+    return Array.from(document.images).every(img => img.complete);
+}"""
+
+# 关闭 Chart.js 等库的动画，避免截取到绘制了一半的图表
+_DISABLE_ANIMATION_SCRIPT = """
+window.addEventListener('DOMContentLoaded', () => {
+    if (window.Chart && window.Chart.defaults) { window.Chart.defaults.animation = false; }
+});
+"""
+
+
+class _PdfJob:
+    """等待渲染结果的单个任务"""
+
+    def __init__(self, html_file_path: str, output_path: str, timeout: float):
+        self.html_url = f"file:///{os.path.abspath(html_file_path).replace(os.sep, '/')}"
+        self.output_path = os.path.abspath(output_path)
+        self.timeout = timeout
+        self.started = threading.Event()
+        self.started_at: Optional[float] = None
+        self.done = threading.Event()
+        self.abandoned = False
+        self.error: Optional[BaseException] = None
+
+
+class PdfRenderService:
+    """
+    常驻的HTML转PDF渲染服务
+
+    后台线程在一个事件循环中运行 Playwright 异步 API，独占一个浏览器进程和 pages 个渲染页面，
+    各调用方通过任务队列提交 (HTML文件, 输出路径) 并阻塞等待结果：
+    - 浏览器只启动一次，页面在任务之间复用，最多 pages 个文档同时渲染
+    - 以页面就绪信号代替固定的 sleep
+    - 渲染超时从任务被页面取走时开始计算，排队时间不计入；调用方已放弃的任务不再渲染
+    - 每渲染 max_jobs_per_browser 个文档，待在途任务完成后重启一次浏览器
+    """
+
+    def __init__(self, max_jobs_per_browser: int = PDF_BROWSER_MAX_JOBS, pages: int = PDF_RENDER_PAGES):
+        self.max_jobs_per_browser = max(1, max_jobs_per_browser)
+        self.pages = max(1, pages)
+        self._queue: "queue.Queue[Optional[_PdfJob]]" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="pdf-render-service", daemon=True)
+
+        # 浏览器状态（仅在服务线程的事件循环中访问）
+        self._browser = None
+        self._generation = 0
+        self._served = 0
+        self._active = 0
+        self._browser_cond = None
+
+        # 统计信息
+        self.jobs = 0
+        self.skipped = 0
+        self.browser_launches = 0
+
+        self._thread.start()
+
+    def render(self, html_file_path: str, output_path: str, timeout: float = PDF_RENDER_TIMEOUT,
+               queue_timeout: float = PDF_QUEUE_TIMEOUT) -> None:
+        """提交渲染任务并阻塞等待，失败时抛出异常"""
+        job = _PdfJob(html_file_path, output_path, timeout)
+        self._queue.put(job)
+        if not self._wait(job, queue_timeout):
+            raise TimeoutError(f"PDF渲染超时: {html_file_path}")
+        if job.error is not None:
+            raise job.error
+
+    def render_many(self, pairs: List[Tuple[str, str]], timeout: float = PDF_RENDER_TIMEOUT,
+                    queue_timeout: float = PDF_QUEUE_TIMEOUT) -> List[bool]:
+        """一次性提交多个渲染任务，返回与输入顺序一致的成功标志"""
+        jobs = []
+        for html_file_path, output_path in pairs:
+            job = _PdfJob(html_file_path, output_path, timeout)
+            self._queue.put(job)
+            jobs.append(job)
+
+        # 各任务的超时都从其被取走时起算；排队的等待时间以提交时刻为基准统一计算
+        submitted_at = time.monotonic()
+        results = []
+        for job in jobs:
+            if not self._wait(job, queue_timeout - (time.monotonic() - submitted_at)):
+                logger.error(f"PDF渲染超时: {job.html_url}")
+                results.append(False)
+            elif job.error is not None:
+                logger.error(f"PDF渲染失败 {job.html_url}: {job.error}")
+                results.append(False)
+            else:
+                results.append(os.path.exists(job.output_path))
+        return results
+
+    def _wait(self, job: _PdfJob, queue_timeout: float) -> bool:
+        """
+        等待任务完成：排队最多 queue_timeout 秒，被取走后最多 job.timeout 秒。
+        超时返回 False 并将任务标记为已放弃，尚未开始的任务不会再被渲染。
+        """
+        deadline = time.monotonic() + max(0.0, queue_timeout)
+        while not job.started.wait(1.0):
+            if job.done.is_set():
+                return True
+            if not self.alive:
+                job.abandoned = True
+                job.error = job.error or RuntimeError("PDF渲染服务已停止")
+                return True
+            if time.monotonic() >= deadline:
+                job.abandoned = True
+                return False
+        # 服务线程在渲染超时后会主动结束该任务，这里多等几秒避免与之竞争
+        remaining = job.timeout - (time.monotonic() - job.started_at) + 5
+        if job.done.wait(max(0.0, remaining)):
+            return True
+        job.abandoned = True
+        return False
+
+    def close(self) -> None:
+        """停止后台线程并关闭浏览器"""
+        for _ in range(self.pages):
+            self._queue.put(None)
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=10)
+
+    async def _render_page(self, page, job: _PdfJob) -> None:
+        await page.goto(job.html_url, wait_until="load", timeout=job.timeout * 1000)
+        try:
+            await page.wait_for_function(_PAGE_READY_SCRIPT, timeout=15000)
+        except Exception as e:
+            # 就绪信号超时（例如外链图片加载失败）时仍按当前内容输出
+            logger.warning(f"等待页面就绪超时，按当前内容生成PDF: {e}")
+        os.makedirs(os.path.dirname(job.output_path) or '.', exist_ok=True)
+        await page.pdf(
+            path=job.output_path,
+            format='A4',
+            margin=PDF_MARGIN,
+            print_background=True,  # 保留背景色和图片
+            prefer_css_page_size=False
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _loop(self) -> None:
+        try:
+            asyncio.run(self._serve())
+        except BaseException as e:
+            # Playwright 驱动无法启动等致命错误：让排队中的任务立即失败，服务随后被重建
+            logger.exception(f"PDF渲染服务异常退出: {e}")
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job.error = e
+                    job.done.set()
+
+    async def _serve(self) -> None:
+        from playwright.async_api import async_playwright
+
+        self._browser_cond = asyncio.Condition()
+        # 每个渲染页面占一个线程阻塞读取任务队列：页面空闲时才取任务，排队中的任务仍可被调用方放弃
+        getter = ThreadPoolExecutor(max_workers=self.pages, thread_name_prefix="pdf-render-queue")
+        try:
+            async with async_playwright() as p:
+                await asyncio.gather(*(self._worker(p, getter) for _ in range(self.pages)))
+                if self._browser is not None:
+                    await self._browser.close()
+        finally:
+            getter.shutdown(wait=False)
+
+    async def _worker(self, p, getter: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        page = None
+        generation = -1
+        while True:
+            job = await loop.run_in_executor(getter, self._queue.get)
+            if job is None:
+                break
+            if job.abandoned:
+                self.skipped += 1
+                logger.info(f"调用方已放弃，跳过PDF渲染任务: {job.html_url}")
+                job.done.set()
+                continue
+
+            acquired = False
+            try:
+                browser, current = await self._acquire_browser(p)
+                acquired = True
+                job.started_at = time.monotonic()
+                job.started.set()
+                if page is None or generation != current or page.is_closed():
+                    page = await browser.new_page()
+                    await page.add_init_script(_DISABLE_ANIMATION_SCRIPT)
+                    generation = current
+                await asyncio.wait_for(self._render_page(page, job), job.timeout)
+                self.jobs += 1
+            except Exception as e:  # 将错误传回等待的调用方
+                if isinstance(e, asyncio.TimeoutError):
+                    e = TimeoutError(f"PDF渲染超过 {job.timeout} 秒: {job.html_url}")
+                job.error = e
+                # 页面状态未知，下个任务重新创建
+                if page is not None:
+                    try:
+                        await page.close()
+                    except Exception:
+                        pass
+                page = None
+            finally:
+                if acquired:
+                    await self._release_browser()
+                job.done.set()
+
+    def _needs_relaunch(self) -> bool:
+        return (self._browser is None or self._served >= self.max_jobs_per_browser
+                or not self._browser.is_connected())
+
+    async def _acquire_browser(self, p):
+        """取得当前浏览器及其代数；需要重启时等在途任务全部结束后再重启"""
+        async with self._browser_cond:
+            if self._needs_relaunch():
+                await self._browser_cond.wait_for(lambda: self._active == 0)
+                if self._needs_relaunch():
+                    if self._browser is not None:
+                        try:
+                            await self._browser.close()
+                        except Exception:
+                            pass
+                        self._browser = None
+                    self._browser = await p.chromium.launch(headless=True)
+                    self._generation += 1
+                    self._served = 0
+                    self.browser_launches += 1
+                    logger.info(f"PDF渲染服务已启动浏览器（第 {self.browser_launches} 次，{self.pages} 个渲染页面）")
+            self._active += 1
+            return self._browser, self._generation
+
+    async def _release_browser(self) -> None:
+        async with self._browser_cond:
+            self._active -= 1
+            self._served += 1
+            self._browser_cond.notify_all()
+
+
+_pdf_service: Optional[PdfRenderService] = None
+_pdf_service_lock = threading.Lock()
+
+
+def get_pdf_render_service() -> PdfRenderService:
+    """
+    获取进程内共享的渲染服务（首次调用时创建）
+
+    Raises:
+        ImportError: playwright 未安装
+    """
+    global _pdf_service
+    with _pdf_service_lock:
+        if _pdf_service is None or not _pdf_service.alive:
+            import playwright.async_api  # noqa: F401  未安装时在调用方线程内抛出 ImportError
+            _pdf_service = PdfRenderService()
+            atexit.register(_pdf_service.close)
+        return _pdf_service
+
+
 def html_to_pdf_direct(html_file_path: str, output_path: str) -> bool:
     """
     直接将HTML文件转换为PDF，保持与浏览器完全一致的格式
@@ -446,40 +745,12 @@ def html_to_pdf_direct(html_file_path: str, output_path: str) -> bool:
     
     logger.info(f"开始直接HTML转PDF: {html_file_path} -> {output_path}")
     
-    # 方法1: 尝试使用playwright（最佳选择，完全保留样式）
+    # 方法1: 使用常驻的playwright渲染服务（最佳选择，完全保留样式）
     try:
-        from playwright.sync_api import sync_playwright
-        logger.info("使用 playwright 生成PDF...")
-        
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            # 加载HTML文件
-            html_url = f"file:///{html_file_path.replace(os.sep, '/')}"
-            logger.info(f"加载HTML: {html_url}")
-            page.goto(html_url, wait_until='networkidle', timeout=60000)
-            
-            # 等待页面完全加载
-            import time
-            time.sleep(2)
-            
-            # 生成PDF
-            page.pdf(
-                path=output_path,
-                format='A4',
-                margin={
-                    'top': '0.75in',
-                    'right': '0.75in',
-                    'bottom': '0.75in',
-                    'left': '0.75in'
-                },
-                print_background=True,  # 保留背景色和图片
-                prefer_css_page_size=False
-            )
-            
-            browser.close()
-        
+        service = get_pdf_render_service()
+        logger.info("使用 playwright 渲染服务生成PDF...")
+        service.render(html_file_path, output_path)
+
         if os.path.exists(output_path):
             file_size = os.path.getsize(output_path)
             logger.info(f"✅ PDF已成功生成（playwright）: {output_path}, 大小: {file_size} 字节")
@@ -527,6 +798,29 @@ def html_to_pdf_direct(html_file_path: str, output_path: str) -> bool:
     return False
 
 
+def html_files_to_pdf(pairs: List[Tuple[str, str]]) -> List[bool]:
+    """
+    批量将HTML文件转换为PDF，所有文件共用同一个浏览器
+
+    Args:
+        pairs: [(HTML文件路径, PDF输出路径), ...]
+
+    Returns:
+        与输入顺序一致的成功标志列表
+    """
+    existing = [(h, o) for h, o in pairs if os.path.exists(h)]
+    for h, _ in pairs:
+        if not os.path.exists(h):
+            logger.error(f"HTML文件不存在: {h}")
+
+    try:
+        results = dict(zip(existing, get_pdf_render_service().render_many(existing)))
+    except ImportError:
+        # playwright 不可用时逐个走 html_to_pdf_direct 的回退方案
+        results = {pair: html_to_pdf_direct(*pair) for pair in existing}
+    return [results.get((h, o), False) for h, o in pairs]
+
+
 def export_report_to_pdf(report_content: str, output_dir: str, query: str, engine_name: str = "market") -> Optional[str]:
     """
     导出报告为PDF文件
@@ -0,0 +1,45 @@
+"""
+引擎报告清单
+各引擎保存报告后向输出目录中的清单文件追加一行记录，Report Engine 据此增量更新报告索引，
+无需反复扫描积累了大量报告的目录。
+"""
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+# 清单文件名（位于各引擎的报告输出目录中）
+MANIFEST_FILENAME = ".report_manifest.jsonl"
+
+
+def record_report(directory: str, filepath: str) -> None:
+    """
+    在清单中登记一份新报告
+
+    每条记录一次 O_APPEND 写入，多个进程同时登记也不会交错；登记失败只记录警告，不影响报告保存。
+    """
+    try:
+        line = json.dumps({
+            'file': os.path.basename(filepath),
+            'mtime': os.path.getmtime(filepath),
+        }, ensure_ascii=False) + "\n"
+        fd = os.open(os.path.join(directory, MANIFEST_FILENAME), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode('utf-8'))
+        finally:
+            os.close(fd)
+    except Exception as e:
+        logger.warning(f"登记报告清单失败 {filepath}: {str(e)}")
+
+
+def parse_manifest_line(line: str) -> Optional[Dict[str, Any]]:
+    """解析一行清单记录，格式不对（如写入中途的半行）时返回 None"""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or not str(record.get('file', '')).endswith('.md'):
+        return None
+    return record